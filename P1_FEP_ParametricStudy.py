@@ -76,104 +76,82 @@
 """
 
 
-from part import *
-from material import *
-from section import *
-from assembly import *
-from step import *
-from interaction import *
-from load import *
-from mesh import *
-from optimization import *
-from job import *
-from sketch import *
-from visualization import *
-from connectorBehavior import *
-from abaqus import *
-from abaqusConstants import *
-from odbAccess import *
-import mesh   # Import the mesh module
-from abaqus import *
-from abaqusConstants import *
-from assembly import *
-from regionToolset import *
+#------------------------------------------------------------------------------
+# Abaqus/CAE modules
+#------------------------------------------------------------------------------
+# They exist only inside a CAE process, so they are star-imported into this
+# module when a model is built (Import_CAE, called by the run section at the
+# end of this file or by fep.spec.ModelSpec.build).  Importing the script
+# itself, for its settings and builders, needs plain Python only.
+CAE_MODULES = ('part', 'material', 'section', 'step', 'interaction', 'load', 'mesh', 'optimization', 'job',
+               'sketch', 'visualization', 'connectorBehavior', 'odbAccess', 'abaqus', 'abaqusConstants',
+               'assembly', 'regionToolset')
+
+def Import_CAE():
+    import importlib
+    namespace = globals()
+    for name in CAE_MODULES:
+        module = importlib.import_module(name)
+        names = getattr(module, '__all__', None) or [n for n in vars(module) if not n.startswith('_')]
+        namespace.update((n, getattr(module, n)) for n in names)
+    namespace['mesh'] = importlib.import_module('mesh')
+
 import numpy as np
 import math
 
-#import os
-#os.chdir(r"E:\Final Research Value & model\Result data new")
-
-#Column Parameter
-myC_FlangeTop_W = 120    #Column width
-myC_FlangeTop_T = 12     #Column Thickness
-myC_FlangeBottom_W = 120    
-myC_FlangeBotom_T = 12
-myC_Depth = 240
-myC_Web_H = myC_Depth - (myC_FlangeTop_T + myC_FlangeBotom_T)  #just web height not in total
-myC_Web_T = 10
-myC_H = 1500     #Column Height
-
-#Beam Paraeter
-myB_FlangeTop_W = 120    #Beam width
-myB_FlangeTop_T = 12     #Beam flange Thickness
-myB_FlangeBottom_W = 120    
-myB_FlangeBotom_T = 12
-myB_Depth = 240
-myB_Web_H = myB_Depth-(myB_FlangeTop_T + myB_FlangeBotom_T)    #Just web height not in total
-myB_Web_H_cc = (myB_Web_H+(myB_FlangeTop_T+myB_FlangeBotom_T)/2)  ##Just top to bottom flange CC distance
-myB_Web_T = 10
-myB_H = 1500     #Beam Height
-
-
-myBolt_k = 10.0 #outer thickness
-MyBolt_S = 24.0 #outer dia of T & B
-MyBolt_D = 16.0
-MyBoltClear = 2.0
-
-#Bolt Parameter
-myBolt_T_Dia = MyBolt_S
-myBolt_T_T = myBolt_k           #top thickness
-myBolt_M_Dia = MyBolt_D
-myBolt_B_Dia = MyBolt_S
-myBolt_B_T = myBolt_k              #Bottom Thickness
-
-#End Plate Parameter
-
-##################################### For Z Varies##################################################
-##################################### For Z Varies##################################################
-
-myEndPlate_W = 120    #width ep_w
-myEndPlate_H = 260     #Height ep_h
-myEndPlate_T = 8      #Thickness ept
-myEndPlate_H_CC_T = 70   # Horigontal dstanc of two bolt hole center to certer in top ep_cc_t
-myEndPlate_H_CC_B = 70   # Horigontal dstanc of two bolt hole center to certer in Bottom
-Z_origonal = 179
-New_Z = 179
-Z_vary = New_Z-Z_origonal
-myEndPlate_T_C = 65-Z_vary       # Plate top to bolt hole center ep_tc
-myEndPlate_B_C = 65       # Plate Bottom to bolt hole center ep_tc_1
-myBoltHoleDia = myBolt_M_Dia+MyBoltClear     # bh_d
-myBolt_M_T =  myEndPlate_T +  myC_FlangeTop_T    #Middle Thickness
-myEP_V_D_second_Row = 65+Z_vary  #1st row to second row ep_vccb_1
-myEP_V_D_Third_Row = 130+Z_vary #1st row to Third row ep_vccb_2
-Cc_V = (myEP_V_D_Third_Row-myEP_V_D_second_Row)   #2nd to 3rd row 
-
-##################################### For Z Varies##################################################
-##################################### For Z Varies##################################################
-
-#Loading
-myLoad_D = 1470    #with loading point to column edge surface 
-
-#Material
-myE = 200000
-myPoiratio = 0.3
-myDensity = 8.5e-09
-myFy = 355
-myFu = 470   
-mySry = 0.0
-mySru = 0.18
-
-
+import os
+import sys
+import inspect
+import contextlib
+
+myRootDir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+sys.path.insert(0, os.path.join(myRootDir, 'src'))
+from fep import spec
+from fep import doe
+from fep import partcache
+from fep import outputs
+from fep.selection import PartIndex, TOL
+from fep.inp_writer import HALF_REACTION_SCALE, bolt_positions, i_section
+from fep import bolt_connector
+from fep import casedb
+from fep import profiler
+
+#------------------------------------------------------------------------------
+# User Parameter Section
+#------------------------------------------------------------------------------
+# Dimensions, loading, material constants and mesh sizes default to the
+# values in src/fep/params.py (DEFAULTS).  Override them for a single run in
+# myCase, or point mySweepFile at a JSON sweep spec (src/fep/doe.py) to build
+# one model and job per case in this CAE session:
+#
+#     abaqus cae noGUI=P1_FEP_ParametricStudy.py -- sweep.json
+#
+myCase = {}         # e.g. {'New_Z': 200, 'myEndPlate_T': 10}
+mySweepFile = None
+myCpusPerJob = 1     # cores per solver job, see src/fep/scheduler.py for concurrent runs
+myOutputProfile = 'standard'    # 'screening', 'standard' or 'full', see src/fep/outputs.py
+myOutputFrames = 20             # field frames of the standard profile
+myRestartIntervals = 10         # restart points in Loading (last one kept), see src/fep/resume.py; 0 for none
+myFireMaterials = False         # EN 1993-1-2 temperature-dependent tables, see src/fep/fire_materials.py
+myFireThermalOdb = None         # heat-transfer ODB (src/fep/fire.py) read in a Fire step after Loading
+myFireDuration = 3600.0         # s of ISO 834 exposure in that ODB
+myProtocol = None               # 'aisc341' or 'eccs': cyclic steps after Loading, see src/fep/protocols.py
+myMaxRotation = 0.04            # rad, last cycles of the protocol
+myYieldRotation = None          # rad, ECCS e_y (default Mj,Rd / Sj,ini of src/fep/ec3.py)
+myHalfModel = False             # x >= 0 half about the web plane with XSYMM, reactions scaled by 2 on extraction
+myContact = 'general'           # 'general' (all exterior faces) or 'pairs' (bolts, holes, plate and flange only)
+myBoltModel = 'solid'           # 'solid' (meshed bolts) or 'connector' (screening, see src/fep/bolt_connector.py)
+myDetailLength = None           # mm of column and beam meshed near the joint, B31 lines beyond; None for whole members
+myModelDir = os.path.join(myRootDir, 'models')
+myCaseDatabase = os.path.join(myRootDir, 'results', casedb.DB_FILE)   # every case by model hash, see src/fep/casedb.py; None for none
+myProfileDir = None             # stage timings and entity counts of each case here, see src/fep/profiler.py; None for none
+myViewport = False              # show parts and steps in 'Viewport: 1' while building (interactive CAE); noGUI skips it
+
+if profiler.STANDIN_OUT:        # python -m fep.profiler: fep.cae_standin in place of CAE
+    myModelDir = myProfileDir = profiler.STANDIN_OUT
+    myCaseDatabase = None
+    globals().update(profiler.STANDIN_SETTINGS)     # --set NAME=VALUE
+myProfiler = profiler.Profiler() if myProfileDir else None
 
 myJobmodelname = "Column_Trial_5"
 myPart_1 = "Steel Column"
@@ -198,22 +176,10 @@ myInstance_2 = "Steel Beam"
 myInstance_3 = "End Plate"
 myInstance_4 = "Bolt"
 
-
-myString = myJobmodelname
-mdb.Model(name=myString)
-myJobName= myJobmodelname
-
 #My Material 
-myDensity = 7.85e-9
-MyBoltEM = 191500
-MyFlangeEM = 200000
-MyWebEM = 200000
-MyEPEM = 198000
-
-MyBoltPlastic = (588.480037, 0.0), (620.221932, 0.001969588), (639.92125, 0.003119448), (660.066409, 0.004869265), (680.884675, 0.007497904), (702.708338, 0.011397498), (726.018148, 0.017111364), (751.50272, 0.025380009), (780.139135, 0.037193653), (813.301382, 0.053846562), (852.905183, 0.076983358), (901.6, 0.108620591), (1610.0, 0.68473987)
-MyFlangePlastic = (324.883797, 0.0), (342.263405, 0.001986836), (372.640806, 0.004168264), (403.927543, 0.008251454), (436.871142, 0.015530915), (472.714356, 0.027949365), (513.453487, 0.048276771), (562.200436, 0.080231161), (623.679429, 0.128434998), (704.895798, 0.198070686), (816.021472, 0.294140858), (971.55, 0.420409985), (1270.0, 0.686797181)
-MyWebPlastic = (324.883797, 0.0), (342.263405, 0.001986836), (372.640806, 0.004168264), (403.927543, 0.008251454), (436.871142, 0.015530915), (472.714356, 0.027949365), (513.453487, 0.048276771), (562.200436, 0.080231161), (623.679429, 0.128434998), (704.895798, 0.198070686), (816.021472, 0.294140858), (971.55, 0.420409985), (1270.0, 0.686797181)
-MyEPPlastic = (319.160569, 0.0), (336.231125, 0.001987108), (366.703443, 0.004193395), (398.090211, 0.00833728), (431.147856, 0.015741831), (467.135196, 0.028390912), (508.07507, 0.049107916), (557.120339, 0.081671038), (619.054958, 0.130755713), (700.967089, 0.201566892), (813.138202, 0.299072753), (970.2, 0.426931416), (1260.0, 0.686847181)
+from fep.materials import MyBoltPlastic, MyFlangePlastic, MyWebPlastic, MyEPPlastic
+from fep import fire_materials
+from fep import protocols
 
 def Create_Material(model,mats,density,elastic,plastic):
     mdb.models[model].Material(name=mats)
@@ -221,10 +187,26 @@ def Create_Material(model,mats,density,elastic,plastic):
     mdb.models[model].materials[mats].Elastic(table=((elastic, 0.3), ))
     mdb.models[model].materials[mats].Plastic(scaleStress=None, table=(plastic))
 
-Create_Material(myString,myMaterial_1,myDensity,MyFlangeEM,MyFlangePlastic)
-Create_Material(myString,myMaterial_2,myDensity,MyWebEM,MyWebPlastic)
-Create_Material(myString,myMaterial_3,myDensity,MyEPEM,MyEPPlastic)
-Create_Material(myString,myMaterial_4,myDensity,MyBoltEM,MyBoltPlastic)
+# Temperature-dependent tables (fire_materials.tables()), computed once per
+# material and temperature grid and shared by every model of the session.
+# The cache (and its directory) is made on first use, not on import.
+myMaterialCache = None
+
+def Material_Cache():
+    global myMaterialCache
+    if myMaterialCache is None:
+        myMaterialCache = fire_materials.material_cache(os.path.join(myModelDir, '.materialcache'))
+    return myMaterialCache
+
+def Create_Fire_Material(model,mats,tables):
+    mdb.models[model].Material(name=mats)
+    mdb.models[model].materials[mats].Density(table=tables['density'])
+    mdb.models[model].materials[mats].Elastic(temperatureDependency=ON, table=tables['elastic'])
+    mdb.models[model].materials[mats].Plastic(scaleStress=None, temperatureDependency=ON, table=tables['plastic'])
+    mdb.models[model].materials[mats].Expansion(zero=20.0, temperatureDependency=ON, table=tables['expansion'])
+    mdb.models[model].materials[mats].Conductivity(temperatureDependency=ON, table=tables['conductivity'])
+    mdb.models[model].materials[mats].SpecificHeat(temperatureDependency=ON, table=tables['specific_heat'])
+
 
 
 
@@ -268,22 +250,33 @@ def Create_Column(model,part,flangetw,fwdepth,webh,webt,flangebw,height):
     s1.VerticalConstraint(entity=g[2], addUndoState=False)
     s1.Line(point1=(-flangetw/2, webh/2), point2=(-webt/2, webh/2))
     s1.VerticalConstraint(entity=g[2], addUndoState=False)
-    p = mdb.models[myString].Part(name=part, dimensionality=THREE_D, 
+    p = mdb.models[model].Part(name=part, dimensionality=THREE_D, 
     type=DEFORMABLE_BODY)
-    p = mdb.models[myString].parts[part]
+    p = mdb.models[model].parts[part]
     p.BaseSolidExtrude(sketch=s1, depth=height)
     s1.unsetPrimaryObject()
 
 
-Create_Column(myString,myPart_1,myC_FlangeTop_W,myC_Depth,myC_Web_H,myC_Web_T,myC_FlangeBottom_W,myC_H)
-#Create_Column(myString,myPart_2,myB_FlangeTop_W,myB_Depth,myB_Web_H,myB_Web_T,myB_FlangeBottom_W,myB_H)
 
 
-def Create_Beam(model,part,flanget_w,web_h,flanget_t,flangeb_w,flangeb_t,beam_h):
+def Create_Beam(model,part,flanget_w,web_h,flanget_t,flangeb_w,flangeb_t,beam_h,half=False):
     s1 = mdb.models[model].ConstrainedSketch(name='__profile__', 
         sheetSize=300.0)
     g, v, d, c = s1.geometry, s1.vertices, s1.dimensions, s1.constraints
     s1.setPrimaryObject(option=STANDALONE)
+    if half:
+        # x >= 0 half: web on the symmetry plane, one half of each flange
+        s1.Line(point1=(0.0, (web_h+flanget_t)/2), point2=(flanget_w/2, (web_h+flanget_t)/2))
+        s1.HorizontalConstraint(entity=g[2], addUndoState=False)
+        s1.Line(point1=(0.0, (web_h+flanget_t)/2), point2=(0.0, -(web_h+flangeb_t)/2))
+        s1.VerticalConstraint(entity=g[3], addUndoState=False)
+        s1.Line(point1=(0.0, -(web_h+flangeb_t)/2), point2=(flangeb_w/2, -(web_h+flangeb_t)/2))
+        s1.HorizontalConstraint(entity=g[4], addUndoState=False)
+        p = mdb.models[model].Part(name=part, dimensionality=THREE_D, 
+            type=DEFORMABLE_BODY)
+        p.BaseShellExtrude(sketch=s1, depth=beam_h)
+        s1.unsetPrimaryObject()
+        return
     s1.Spot(point=(-flanget_w/2, (web_h+flanget_t)/2))
     s1.Spot(point=(0.0, (web_h+flanget_t)/2))
     s1.Spot(point=(flanget_w/2, (web_h+flanget_t)/2))
@@ -308,7 +301,6 @@ def Create_Beam(model,part,flanget_w,web_h,flanget_t,flangeb_w,flangeb_t,beam_h)
     s1.unsetPrimaryObject()
 
 
-Create_Beam(myString,myPart_2,myB_FlangeTop_W,myB_Web_H,myB_FlangeTop_T,myB_FlangeBottom_W,myB_FlangeBotom_T,myB_H)
 
 #del mdb.models['Model-1']
 
@@ -347,7 +339,6 @@ def Create_End_Plate(model,part,ep_w,ep_h,ep_cc_t,ep_tc,bh_d,ep_vccb_1,ep_vccb_2
     s1.unsetPrimaryObject()
 
 
-Create_End_Plate(myString,myPart_3,myEndPlate_W,myEndPlate_H,myEndPlate_H_CC_T,myEndPlate_T_C,myBoltHoleDia,myEP_V_D_second_Row,myEP_V_D_Third_Row,myEndPlate_T,myEndPlate_B_C)
 
 
 
@@ -364,7 +355,7 @@ def Create_Bolt(model,part,m_d,m_t,bt_d,bb_d,b_t_t,b_b_t):
     s1.unsetPrimaryObject()
     f, e = p.faces, p.edges
     t = p.MakeSketchTransform(sketchPlane=f[1], sketchUpEdge=e[0], 
-        sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, origin=(0.0, 0.0, myBolt_M_T))
+        sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, origin=(0.0, 0.0, m_t))
     s1 = mdb.models[model].ConstrainedSketch(name='__profile__', 
         sheetSize=103.86, gridSpacing=2.59, transform=t)
     g, v, d, c = s1.geometry, s1.vertices, s1.dimensions, s1.constraints
@@ -388,7 +379,6 @@ def Create_Bolt(model,part,m_d,m_t,bt_d,bb_d,b_t_t,b_b_t):
     s1.unsetPrimaryObject()
 
 
-Create_Bolt(myString,myPart_4,myBolt_M_Dia,myBolt_M_T,myBolt_T_Dia,myBolt_B_Dia,myBolt_T_T,myBolt_B_T)
 
 
 #------------------------------------------------------------------------------
@@ -412,96 +402,165 @@ def Create_Partion(model,part,id_plane):
 #------------------------------------------------------------------------------
 #------------------------------------------------------------------------------
 
-myID_0 = Create_Datum_Plane(XYPLANE,myPart_4,myString,0.0)
-myID_1 = Create_Datum_Plane(XYPLANE,myPart_4,myString,myBolt_M_T)
-myID_2 = Create_Datum_Plane(YZPLANE,myPart_4,myString,0.0)
-myID_3 = Create_Datum_Plane(XZPLANE,myPart_4,myString,0.0)
-myID_4 = Create_Datum_Plane(XZPLANE,myPart_1,myString,((myC_Web_H/2)))
-myID_5 = Create_Datum_Plane(XZPLANE,myPart_1,myString,-((myC_Web_H/2)))
-myID_6 = Create_Datum_Plane(XYPLANE,myPart_1,myString,myC_H/2)
-myID_7 = Create_Datum_Plane(XYPLANE,myPart_1,myString,((myC_H/2-myEP_V_D_second_Row)))
-myID_8 = Create_Datum_Plane(YZPLANE,myPart_3,myString,myEndPlate_H_CC_B/2)
-myID_9 = Create_Datum_Plane(YZPLANE,myPart_3,myString,-myEndPlate_H_CC_B/2)
-myID_10 = Create_Datum_Plane(XZPLANE,myPart_3,myString,myEP_V_D_second_Row)
-myID_11 = Create_Datum_Plane(XZPLANE,myPart_3,myString,-Cc_V)
-myID_12 = Create_Datum_Plane(YZPLANE,myPart_3,myString,0.0)
-myID_13 = Create_Datum_Plane(XZPLANE,myPart_3,myString,0.0)
-myID_14 = Create_Datum_Plane(XYPLANE,myPart_1,myString,((myC_H/2+Cc_V)))
-myID_15 = Create_Datum_Plane(XYPLANE,myPart_1,myString,(((myC_H/2)+(myEndPlate_H/2))))
-myID_16 = Create_Datum_Plane(XYPLANE,myPart_1,myString,(((myC_H/2)-(myEndPlate_H/2))))
-myID_17 = Create_Datum_Plane(YZPLANE,myPart_1,myString,((myEndPlate_H_CC_B/2)))
-myID_18 = Create_Datum_Plane(YZPLANE,myPart_1,myString,(-(myEndPlate_H_CC_B/2)))
-myID_19 = Create_Datum_Plane(XYPLANE,myPart_2,myString,((myB_H/6)))
-myID_20 = Create_Datum_Plane(XYPLANE,myPart_2,myString,((myLoad_D-myEndPlate_T)))
-#myID_12 = Create_Datum_Plane(XZPLANE,myPart_3,myString,myEndPlate_Forth_Row/2)
-#myID_13 = Create_Datum_Plane(XZPLANE,myPart_3,myString,-myEndPlate_Forth_Row/2)
-
-
-#------------------------------------------------------------------------------
-
-#Create_Partion
-Create_Partion(myString,myPart_4,myID_0)
-Create_Partion(myString,myPart_4,myID_1)
-Create_Partion(myString,myPart_4,myID_2)
-Create_Partion(myString,myPart_4,myID_3)
-Create_Partion(myString,myPart_1,myID_4)
-Create_Partion(myString,myPart_1,myID_5)
-Create_Partion(myString,myPart_1,myID_6)
-Create_Partion(myString,myPart_1,myID_7)
-Create_Partion(myString,myPart_3,myID_8)
-Create_Partion(myString,myPart_3,myID_9)
-Create_Partion(myString,myPart_3,myID_10)
-Create_Partion(myString,myPart_3,myID_11)
-Create_Partion(myString,myPart_3,myID_12)
-Create_Partion(myString,myPart_3,myID_13)
-Create_Partion(myString,myPart_1,myID_14)
-Create_Partion(myString,myPart_1,myID_15)
-Create_Partion(myString,myPart_1,myID_16)
-Create_Partion(myString,myPart_1,myID_17)
-Create_Partion(myString,myPart_1,myID_18)
-#Create_Partion(myString,myPart_3,myID_12)
-#Create_Partion(myString,myPart_3,myID_13)
+
+
+#------------------------------------------------------------------------------
+
 
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+# Half model: cut away the x < 0 side of a solid part extruded along its z
+# axis from z = 0 (column and end plate; local x is global x for both).
+#------------------------------------------------------------------------------
+def Cut_Half(model,part,size):
+    p = mdb.models[model].parts[part]
+    d = p.datums
+    id_plane = p.DatumPlaneByPrincipalPlane(principalPlane=XYPLANE, offset=0.0).id
+    id_axis = p.DatumAxisByPrincipalAxis(principalAxis=YAXIS).id
+    t = p.MakeSketchTransform(sketchPlane=d[id_plane], sketchUpEdge=d[id_axis], 
+        sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, origin=(0.0, 0.0, 0.0))
+    s1 = mdb.models[model].ConstrainedSketch(name='__profile__', 
+        sheetSize=2*size, transform=t)
+    s1.setPrimaryObject(option=SUPERIMPOSE)
+    s1.rectangle(point1=(-size, -size), point2=(0.0, size))
+    p.CutExtrude(sketchPlane=d[id_plane], sketchUpEdge=d[id_axis], sketchPlaneSide=SIDE1, 
+        sketchOrientation=RIGHT, sketch=s1, flipExtrudeDirection=OFF)
+    s1.unsetPrimaryObject()
+
+# findAt points of a set or surface kept by the half model; points on x = 0
+# move to x = shift when the face there is split by the cut
+def Half_Points(points,shift=0.0):
+    if not myHalfModel:
+        return points
+    kept = [pt for pt in points if pt[0][0] > -TOL]
+    return tuple(((shift if abs(pt[0][0]) < TOL else pt[0][0],) + tuple(pt[0][1:]),) for pt in kept)
+
+#------------------------------------------------------------------------------
+# Multi-fidelity members (myDetailLength, see detail_parts() in
+# src/fep/inp_writer.py): the column beyond myDetailLength from the beam axis
+# and the beam beyond myDetailLength from the end plate are B31 lines of the
+# same I-section, kinematically coupled to the cut sections.
+#------------------------------------------------------------------------------
+# (column cut below, column cut above, beam length) in global y and beam z,
+# None where the member is kept whole
+def Detail_Cuts(p):
+    if not myDetailLength:
+        return None, None, None
+    if myDetailLength < p.myEndPlate_H/2:
+        raise ValueError('myDetailLength %g mm does not cover the end plate (%g mm each side of the beam axis)' 
+            % (myDetailLength, p.myEndPlate_H/2))
+    bottom, top = p.myC_H/2-myDetailLength, p.myC_H/2+myDetailLength
+    return (bottom if bottom > TOL else None, top if top < p.myC_H-TOL else None, 
+        myDetailLength if myDetailLength < p.myB_H-TOL else None)
+
+# Cut away z0 .. z1 of a solid part extruded along its z axis
+def Cut_Length(model,part,z0,z1,size):
+    p = mdb.models[model].parts[part]
+    d = p.datums
+    id_plane = p.DatumPlaneByPrincipalPlane(principalPlane=XYPLANE, offset=z0).id
+    id_axis = p.DatumAxisByPrincipalAxis(principalAxis=YAXIS).id
+    t = p.MakeSketchTransform(sketchPlane=d[id_plane], sketchUpEdge=d[id_axis], 
+        sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, origin=(0.0, 0.0, z0))
+    s1 = mdb.models[model].ConstrainedSketch(name='__profile__', 
+        sheetSize=2*size, transform=t)
+    s1.setPrimaryObject(option=SUPERIMPOSE)
+    s1.rectangle(point1=(-size, -size), point2=(size, size))
+    p.CutExtrude(sketchPlane=d[id_plane], sketchUpEdge=d[id_axis], sketchPlaneSide=SIDE1, 
+        sketchOrientation=RIGHT, sketch=s1, depth=z1-z0, flipExtrudeDirection=OFF)
+    s1.unsetPrimaryObject()
+
+# B31 wire part in global coordinates, one edge per (start, end) segment
+def Create_Line_Part(model,part,segments,dims,material,n1,size):
+    m = mdb.models[model]
+    p = m.Part(name=part, dimensionality=THREE_D, type=DEFORMABLE_BODY)
+    p.WirePolyLine(points=tuple(segments), mergeType=SEPARATE, meshable=ON)
+    l, h, b1, b2, t1, t2, t3 = dims
+    m.IProfile(name=part, l=l, h=h, b1=b1, b2=b2, t1=t1, t2=t2, t3=t3)
+    m.BeamSection(name=part, integration=DURING_ANALYSIS, profile=part, material=material, 
+        poissonRatio=0.3, temperatureVar=LINEAR, consistentMassMatrix=False)
+    region = p.Set(edges=p.edges[:], name=part)
+    p.SectionAssignment(region=region, sectionName=part, offset=0.0, 
+        offsetType=MIDDLE_SURFACE, offsetField='', thicknessAssignment=FROM_SECTION)
+    p.assignBeamSectionOrientation(region=region, method=N1_COSINES, n1=n1)
+    p.setElementType(regions=region, elemTypes=(ElemType(elemCode=B31, elemLibrary=STANDARD), ))
+    p.seedPart(size=size, deviationFactor=0.1, minSizeFactor=0.1)
+    p.generateMesh()
+    a = mdb.models[model].rootAssembly
+    a.Instance(name=part, part=p, dependent=ON)
+
+# Kinematic coupling of a line vertex to the cut section of a member
+# (faces of the solid column, edges of the shell beam) inside a box
+def Create_Interface_Coupling(model,name,line,point,member,box):
+    a = mdb.models[model].rootAssembly
+    a.Set(vertices=a.instances[line].vertices.findAt((point, )), name=name+'_Node')
+    lo, hi = box
+    found = dict(xMin=lo[0], yMin=lo[1], zMin=lo[2], xMax=hi[0], yMax=hi[1], zMax=hi[2])
+    if a.instances[member].cells:
+        a.Surface(side1Faces=a.instances[member].faces.getByBoundingBox(**found), name=name+'_Section')
+    else:
+        a.Surface(side1Edges=a.instances[member].edges.getByBoundingBox(**found), name=name+'_Section')
+    mdb.models[model].Coupling(name=name, controlPoint=a.sets[name+'_Node'], 
+        surface=a.surfaces[name+'_Section'], influenceRadius=WHOLE_SURFACE, couplingType=KINEMATIC, 
+        localCsys=None, u1=ON, u2=ON, u3=ON, ur1=ON, ur2=ON, ur3=ON)
+
+def Create_Detail_Lines(model,p,column,beam):
+    bottom, top, length = Detail_Cuts(p)
+    depth = max(p.myC_FlangeTop_W, p.myC_Depth, p.myB_FlangeTop_W, p.myB_Depth)
+    segments = []
+    if bottom is not None:
+        segments.append(((0.0, 0.0, 0.0), (0.0, bottom, 0.0)))
+    if top is not None:
+        segments.append(((0.0, top, 0.0), (0.0, p.myC_H, 0.0)))
+    if segments:
+        Create_Line_Part(model,'Column Line',segments,i_section(vars(p),'C',myHalfModel),myMaterial_1,(-1.0, 0.0, 0.0),p.myColumnMesh_Size)
+        for name, y in (('Column_Bottom', bottom), ('Column_Top', top)):
+            if y is not None:
+                Create_Interface_Coupling(model,name,'Column Line',(0.0, y, 0.0),column,
+                    ((-depth, y-TOL, -depth), (depth, y+TOL, depth)))
+    if length is not None:
+        z_end = p.myC_Depth/2+p.myEndPlate_T
+        z = [z_end+length] + ([z_end+p.myLoad_D-p.myEndPlate_T] if p.myLoad_D-p.myEndPlate_T > length+TOL else []) + [z_end+p.myB_H]
+        Create_Line_Part(model,'Beam Line',[((0.0, p.myC_H/2, z0), (0.0, p.myC_H/2, z1)) for z0, z1 in zip(z[:-1], z[1:])],
+            i_section(vars(p),'B',myHalfModel),myMaterial_1,(1.0, 0.0, 0.0),p.myBeamMesh_Size)
+        Create_Interface_Coupling(model,'Beam_End','Beam Line',(0.0, p.myC_H/2, z[0]),beam,
+            ((-depth, p.myC_H/2-depth, z[0]-TOL), (depth, p.myC_H/2+depth, z[0]+TOL)))
+
 #------------------------------------------------------------------------------
 #def Cut_Extrude_Column(model,part,ep_w,c_h,eph_cc_b,bh_d,cft_t,cc_v)
 def Cut_Extrude_Column(model,part,ep_w,c_h,eph_cc_b,bh_d,cft_t,cc_v,cc_v_1):
     p = mdb.models[model].parts[part]
-    session.viewports['Viewport: 1'].setValues(displayedObject=p)
-    f, e = p.faces, p.edges
-    f1, e1 = p.faces, p.edges
-    p.HoleBlindFromEdges(plane=f[167], edge1=e[163], edge2=e[81], planeSide=SIDE1, 
-        diameter=bh_d, distance1=c_h/2, distance2=(ep_w-eph_cc_b)/2, depth=cft_t+10)
-    p.HoleBlindFromEdges(plane=f1[173], edge1=e1[179], edge2=e1[98], 
-        planeSide=SIDE1, diameter=bh_d, distance1=c_h/2, distance2=eph_cc_b+(ep_w-eph_cc_b)/2, 
-        depth=cft_t+10)
-    p.HoleBlindFromEdges(plane=f[179], edge1=e[197], edge2=e[119], planeSide=SIDE1, 
-        diameter=bh_d, distance1=c_h/2-cc_v_1, distance2=(ep_w-eph_cc_b)/2, depth=cft_t+10)
-    p.HoleBlindFromEdges(plane=f1[183], edge1=e1[211], edge2=e1[133], 
-        planeSide=SIDE1, diameter=bh_d, distance1=c_h/2-cc_v_1, distance2=eph_cc_b+(ep_w-eph_cc_b)/2, 
-        depth=cft_t+10)
-    p.HoleBlindFromEdges(plane=f[188], edge1=e[226], edge2=e[151], planeSide=SIDE1, 
-        diameter=bh_d, distance1=c_h/2+cc_v, distance2=(ep_w-eph_cc_b)/2, depth=cft_t+10)
-    p.HoleBlindFromEdges(plane=f1[193], edge1=e1[243], edge2=e1[169], 
-        planeSide=SIDE1, diameter=bh_d, distance1=c_h/2+cc_v, distance2=eph_cc_b+(ep_w-eph_cc_b)/2, 
-        depth=cft_t+10)
-
-Cut_Extrude_Column(myString,myPart_1,myEndPlate_W,myC_H,myEndPlate_H_CC_T,myBoltHoleDia,myC_FlangeTop_T,Cc_V,myEP_V_D_second_Row)
-#------------------------------------------------------------------------------
-
-#------------------------------------------------------------------------------
-def Create_Shell_Beam_Partition(model,part):
+    if myViewport:
+        session.viewports['Viewport: 1'].setValues(displayedObject=p)
+    # Holes in the front flange (outer face at the largest y), placed from the
+    # column end edge z = 0 (distance1) and the flange tip x = min (distance2).
+    for distance1 in (c_h/2, c_h/2-cc_v_1, c_h/2+cc_v):
+        for distance2 in ((ep_w-eph_cc_b)/2, eph_cc_b+(ep_w-eph_cc_b)/2):
+            index = PartIndex(p, kinds=('faces', 'edges'))
+            lo, hi = index.bounds
+            centre = (lo[0]+distance2, hi[1], lo[2]+distance1)
+            plane = np.intersect1d(index.on_plane('faces', 1, hi[1]), index.containing('faces', centre))
+            outer_edges = index.on_plane('edges', 1, hi[1])
+            edge1 = index.nearest('edges', (centre[0], hi[1], lo[2]), among=np.intersect1d(outer_edges, index.on_plane('edges', 2, lo[2])))
+            edge2 = index.nearest('edges', (lo[0], hi[1], centre[2]), among=np.intersect1d(outer_edges, index.on_plane('edges', 0, lo[0])))
+            p.HoleBlindFromEdges(plane=index.entity('faces', plane[0]), edge1=index.entity('edges', edge1[0]), 
+                edge2=index.entity('edges', edge2[0]), planeSide=SIDE1, diameter=bh_d, 
+                distance1=distance1, distance2=distance2, depth=cft_t+10)
+
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+def Create_Shell_Beam_Partition(model,part,id_load,z_load,id_joint,z_joint):
+    # Split every beam face crossed by the load datum, then by the joint datum
     p = mdb.models[model].parts[part]
-    f = p.faces
-    pickedFaces = f.getSequenceFromMask(mask=('[#1f ]', ), )
-    d1 = p.datums
-    p.PartitionFaceByDatumPlane(datumPlane=d1[3], faces=pickedFaces)
-    pickedFaces = f.getSequenceFromMask(mask=('[#3d0 ]', ), )
     d = p.datums
-    p.PartitionFaceByDatumPlane(datumPlane=d[2], faces=pickedFaces)
+    for id_plane, z in ((id_load, z_load), (id_joint, z_joint)):
+        index = PartIndex(p, kinds=('faces',))
+        crossing = index.where('faces', lambda lo, hi: (lo[:, 2] < z-TOL) & (hi[:, 2] > z+TOL))
+        if not len(crossing):     # datum beyond a beam cut short by myDetailLength
+            continue
+        p.PartitionFaceByDatumPlane(datumPlane=d[id_plane], faces=index.sequence('faces', crossing))
 
-Create_Shell_Beam_Partition(myString,myPart_2)
 #------------------------------------------------------------------------------
 
 
@@ -511,11 +570,6 @@ def Create_Section(model,crosssection,material):
 #------------------------------------------------------------------------------
 #------------------------------------------------------------------------------
 
-#Create Section
-Create_Section(myString,myCS_1_1,myMaterial_1)
-Create_Section(myString,myCS_1_2,myMaterial_2)
-Create_Section(myString,myCS_3,myMaterial_3)
-Create_Section(myString,myCS_4,myMaterial_4)
 
 #------------------------------------------------------------------------------
 
@@ -546,8 +600,6 @@ def Create_Shell_CS_Beam(model,cs_name,materials,thick_t):
         useDensity=OFF, integrationRule=SIMPSON, numIntPts=5)
 
 
-Create_Shell_CS_Beam(myString,myCS_2,myMaterial_2,myB_Web_T)
-Create_Shell_CS_Beam(myString,myCS_2_1,myMaterial_1,myB_FlangeTop_T)
 
 #------------------------------------------------------------------------------
 
@@ -562,41 +614,35 @@ def Section_Assignment(model,part,set_name,section_name):
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-#Section Assignment
-Section_Assignment(myString,myPart_3,"E Plate",myCS_3)
-Section_Assignment(myString,myPart_4,"Bolt",myCS_4)
 
 #------------------------------------------------------------------------------
 
 def Web_Assignment(model,part,set_name,web_section):
     p = mdb.models[model].parts[part]
-    f = p.faces
-    faces = f.getSequenceFromMask(mask=('[#908 ]', ), )
+    index = PartIndex(p, kinds=('faces',))
+    faces = index.sequence('faces', index.on_plane('faces', 0, 0.0))
     region = p.Set(faces=faces, name=set_name)
     p.SectionAssignment(region=region, sectionName=web_section, offset=0.0, 
         offsetType=MIDDLE_SURFACE, offsetField='', 
         thicknessAssignment=FROM_SECTION)
 
-Web_Assignment(myString,myPart_2,"Web",myCS_2)
 #------------------------------------------------------------------------------
 def Flange_Assignment(model,part,set_name,flange_section):
     p = mdb.models[model].parts[part]
-    f = p.faces
-    faces = f.getSequenceFromMask(mask=('[#76f7 ]', ), )
+    index = PartIndex(p, kinds=('faces',))
+    faces = index.sequence('faces', index.minus('faces', index.on_plane('faces', 0, 0.0)))
     region = p.Set(faces=faces, name=set_name)
     p.SectionAssignment(region=region, sectionName=flange_section, offset=0.0, 
         offsetType=MIDDLE_SURFACE, offsetField='', 
         thicknessAssignment=FROM_SECTION)
 
-Flange_Assignment(myString,myPart_2,"Flange",myCS_2_1)
 #------------------------------------------------------------------------------
-def Create_Column_Web_Flange_Assignment(model,part,column_flange, column_web, column_fl_cs,column_web_cs):
+def Create_Column_Web_Flange_Assignment(model,part,column_flange, column_web, column_fl_cs,column_web_cs,web_h):
     p = mdb.models[model].parts[part]
-    c = p.cells
-    cells = c.getSequenceFromMask(mask=('[#ffffffff #27 ]', ), )
-    p.Set(cells=cells, name=column_flange)
-    cells = c.getSequenceFromMask(mask=('[#0 #3d8 ]', ), )
-    p.Set(cells=cells, name=column_web)
+    index = PartIndex(p, kinds=('cells',))
+    web = index.inside('cells', (None, -web_h/2, None), (None, web_h/2, None))
+    p.Set(cells=index.sequence('cells', index.minus('cells', web)), name=column_flange)
+    p.Set(cells=index.sequence('cells', web), name=column_web)
     region = p.sets[column_flange]
     p.SectionAssignment(region=region, sectionName=column_fl_cs, offset=0.0, 
         offsetType=MIDDLE_SURFACE, offsetField='', 
@@ -606,10 +652,7 @@ def Create_Column_Web_Flange_Assignment(model,part,column_flange, column_web, co
         offsetType=MIDDLE_SURFACE, offsetField='', 
         thicknessAssignment=FROM_SECTION)
 
-Create_Column_Web_Flange_Assignment(myString,myPart_1,'Column Flange','Column Web', myCS_1_1,myCS_1_1)
 #------------------------------------------------------------------------------
-from abaqus import *
-from abaqusConstants import *
 def Create_Csys(model):
 # Create a new datum coordinate system
     csys = mdb.models[model].rootAssembly.DatumCsysByThreePoints(
@@ -618,7 +661,6 @@ def Create_Csys(model):
         point1=(1.0, 0.0, 0.0),
         point2=(0.0, 1.0, 0.0))
 
-Create_Csys(myString)
 
 #------------------------------------------------------------------------------
 
@@ -632,11 +674,6 @@ def Assemply(model,part,instance,x,y,z):
     p.translate(vector=(x,y,z))
 
 
-# Assemply
-Assemply(myString,myPart_1,myInstance_1,0,0,0)
-Assemply(myString,myPart_2,myInstance_2,0,0,0)
-Assemply(myString,myPart_3,myInstance_3,0,0,0)
-Assemply(myString,myPart_4,myInstance_4,0,0,0)
 
 #------------------------------------------------------------------------------
 
@@ -646,7 +683,6 @@ def Create_Beam_Rotation(model,instance,angles,Cx, Cy, Cz):
     a1.rotate(instanceList=(instance, ), axisPoint=(0, 0, 0), 
         axisDirection=(Cx, Cy, Cz), angle=angles)
 
-Create_Beam_Rotation(myString,myInstance_1,90.0,myC_Web_T/3, 0.0,0.0)
 
 #------------------------------------------------------------------------------
 
@@ -655,10 +691,6 @@ def Translet_And_Setup(model,instance,Tx, Ty, Tz):
     a = mdb.models[model].rootAssembly
     a.translate(instanceList=(instance, ), vector=(Tx, Ty, Tz))
 
-Translet_And_Setup(myString,myInstance_1,0.0,myC_H,0.0)
-Translet_And_Setup(myString,myInstance_2,0.0,myC_H/2,(myC_Depth/2)+myEndPlate_T)
-Translet_And_Setup(myString,myInstance_3,0.0,myC_H/2,(myC_Depth/2))
-Translet_And_Setup(myString,myInstance_4,myEndPlate_H_CC_B/2,myC_H/2-Cc_V,myC_Web_H/2)
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -667,36 +699,82 @@ def Create_Bar_Instance_By_Lenear_Pattern(model,instance,spacing,dx,dy, dz,num):
     a1.LinearInstancePattern(instanceList=(instance , ), direction1=(dx,dy, dz), direction2=(0.0, 1.0, 0.0), number1=num, number2=1, spacing1=spacing, spacing2=1.0)
 
 
-Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,myEndPlate_H_CC_T,-1.0,0.0,0.0, 2)
-#Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,myEndPlate_Forth_Row,0.0,1.0,0.0, 2)
-#Create_Bar_Instance_By_Lenear_Pattern(myString,"Bolt-lin-2-1",myEndPlate_Forth_Row,0.0,1.0,0.0, 2)
-Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,Cc_V,0.0,1.0,0.0, 2)
-Create_Bar_Instance_By_Lenear_Pattern(myString,"Bolt-lin-2-1",Cc_V,0.0,1.0,0.0, 2)
-Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,myEP_V_D_Third_Row ,0.0,1.0,0.0, 2)
-Create_Bar_Instance_By_Lenear_Pattern(myString,"Bolt-lin-2-1",myEP_V_D_Third_Row,0.0,1.0,0.0, 2)
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
 
 
-session.viewports['Viewport: 1'].assemblyDisplay.geometryOptions.setValues(
-    datumAxes=OFF, datumPlanes=OFF)
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
-myFieldOutName = "F-Output-1"
 myStepName_1 = 'Loading'
 
-def Create_Step(model,step_name,fieldname,ini,max_in,min_in,total_t,pre_step):
+def Create_Step(model,step_name,ini,max_in,min_in,total_t,pre_step):
     mdb.models[model].StaticStep(name=step_name, 
         previous=pre_step, timePeriod=total_t, maxNumInc=100000, initialInc=ini, minInc=min_in, 
         maxInc=max_in, nlgeom=ON)
-    session.viewports['Viewport: 1'].assemblyDisplay.setValues(step=step_name)
-    mdb.models[model].FieldOutputRequest(name=fieldname, 
-        createStepName=step_name, variables=('S', 'PE', 'PEEQ', 'U', 'RF', 'CF',  
-    'EVOL', 'STATUS'), frequency=1)
+    if myViewport:
+        session.viewports['Viewport: 1'].assemblyDisplay.setValues(step=step_name)
+
+#------------------------------------------------------------------------------
+# Output requests of a profile (src/fep/outputs.py): RP history every
+# increment, field output of the whole model or of the bolt / end plate sets.
+#------------------------------------------------------------------------------
+def Create_Output_Sets(model,bolt_part,ep_instance):
+    a = mdb.models[model].rootAssembly
+    cells = None
+    for inst in a.instances.values():
+        if inst.partName == bolt_part:
+            cells = inst.cells[:] if cells is None else cells + inst.cells[:]
+    if cells is not None:       # connector bolts have their own set
+        a.Set(cells=cells, name=outputs.BOLT_SET)
+    a.Set(cells=a.instances[ep_instance].cells[:], name=outputs.END_PLATE_SET)
+
+def Create_Output_Requests(model,step_name,profile,frames):
+    a = mdb.models[model].rootAssembly
+    for rp in outputs.RP_SETS:
+        mdb.models[model].HistoryOutputRequest(name=outputs.history_name(rp), 
+            createStepName=step_name, variables=outputs.RP_HISTORY, region=a.sets[rp], 
+            sectionPoints=DEFAULT, rebar=EXCLUDE, frequency=1)
+    requests = outputs.profile(profile, frames)
+    if myBoltModel == 'connector':
+        requests = bolt_connector.requests(requests)
+    for request in requests:
+        where = {}
+        if request.region:
+            where['region'] = a.sets[request.region]
+        if request.frames is None:
+            where['frequency'] = 1
+        else:
+            where['numIntervals'] = request.frames
+            where['timeMarks'] = ON
+        mdb.models[model].FieldOutputRequest(name=request.name, createStepName=step_name, 
+            variables=request.node_variables+request.element_variables, **where)
+
+#------------------------------------------------------------------------------
+# Fire step: the loads of Loading held while the nodal temperatures of a
+# heat-transfer run (fep.fire) are read in.  That run has its own mesh, so
+# the temperatures are interpolated onto this one.
+#------------------------------------------------------------------------------
+def Create_Fire_Step(model,step_name,pre_step,odb,duration,beam_instance):
+    mdb.models[model].StaticStep(name=step_name, 
+        previous=pre_step, timePeriod=duration, maxNumInc=100000, initialInc=1.0, minInc=1e-15, 
+        maxInc=60.0, nlgeom=ON)
+    a = mdb.models[model].rootAssembly
+    cells = None
+    for inst in a.instances.values():
+        if inst.name != beam_instance:
+            cells = inst.cells[:] if cells is None else cells + inst.cells[:]
+    a.Set(cells=cells, faces=a.instances[beam_instance].faces[:], name='Joint')
+    mdb.models[model].Temperature(name='Ambient_Temperature', createStepName='Initial', 
+        region=a.sets['Joint'], distributionType=UNIFORM, 
+        crossSectionDistribution=CONSTANT_THROUGH_THICKNESS, magnitudes=(20.0, ))
+    mdb.models[model].Temperature(name='Fire_Temperature', createStepName=step_name, 
+        distributionType=FROM_FILE, fileName=odb, beginStep=1, beginIncrement=1, endStep=1, 
+        interpolate=ON)
+    mdb.models[model].FieldOutputRequest(name='F-Output-Fire', createStepName=step_name, 
+        variables=('NT', ), timeInterval=60.0)
 
-Create_Step(myString, myStepName_1,myFieldOutName,0.01, 0.1, 1e-15,1.0,'Initial')
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -710,8 +788,6 @@ def Contact_Property(model,contactprop,frictionfactor):
 #------------------------------------------------------------------------------
 #------------------------------------------------------------------------------
 
-#Contact Property
-Contact_Property(myString,"Intprop-1",0.35)
 
 #------------------------------------------------------------------------------
 #For Surface
@@ -723,8 +799,6 @@ def Create_Surface(model, part, points, surface_name):
     side1Faces = s1.findAt(*points)  # Use multiple points here
     a.Surface(side1Faces=side1Faces, name=surface_name)
 
-# Example call with multiple points:
-Create_Surface(myString, myPart_3, (((-(myEndPlate_W/2-2.0), myC_H/2+(myEndPlate_H/2-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),),((myEndPlate_W/2-2.0, myC_H/2+(myEndPlate_H/2-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),),((-(myEndPlate_W/2-2.0), myC_H/2-(myEndPlate_H/2-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),), ((myEndPlate_W/2-2.0, myC_H/2-(myEndPlate_H/2-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),), ((-(myEndPlate_W/4-2.0), myC_H/2+(myEndPlate_H/2-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),), ((myEndPlate_W/4-2.0, myC_H/2+(myEndPlate_H/2-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),),((-(myEndPlate_W/4-2.0), myC_H/2-(myEndPlate_H/2-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),), ((myEndPlate_W/4-2.0, myC_H/2-(myEndPlate_H/2-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),), ((1.0, myC_H/2+(myEndPlate_H/4-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),), ((-1.0, myC_H/2+(myEndPlate_H/4-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),),((1.0, myC_H/2-(myEndPlate_H/4-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),), ((-1.0, myC_H/2-(myEndPlate_H/4-2.0), myC_Web_H/2+myC_FlangeBotom_T+myEndPlate_T),)), 'EPlate_Surface_For_Beam')
 #------------------------------------------------------------------------------
 #For surface
 #------------------------------------------------------------------------------
@@ -736,8 +810,6 @@ def Create_Surface_Set(model, part, points, set_name):
     # Create the surface using the selected edges
     a.Surface(side1Edges=side1Edges, name=set_name)
 
-# Modify your points and call the function to create a surface set
-Create_Surface_Set(myString, myPart_2, points=(((0.0, myC_H/2, myC_Web_H/2 + myC_FlangeBotom_T + myEndPlate_T),), ((myB_FlangeTop_W/3, myC_H/2 + myB_Web_H/2 + myB_FlangeTop_T/2, myC_Web_H/2 + myC_FlangeBotom_T + myEndPlate_T),), ((myB_FlangeTop_W/3, myC_H/2 - myB_Web_H/2 - myB_FlangeBotom_T/2, myC_Web_H/2 + myC_FlangeBotom_T + myEndPlate_T),), ((-myB_FlangeTop_W/3, myC_H/2 + myB_Web_H/2 + myB_FlangeTop_T/2, myC_Web_H/2 + myC_FlangeBotom_T + myEndPlate_T),), ((-myB_FlangeTop_W/3, myC_H/2 - myB_Web_H/2 - myB_FlangeBotom_T/2, myC_Web_H/2 + myC_FlangeBotom_T + myEndPlate_T),)), set_name='Beam_surf_EP')
 #------------------------------------------------------------------------------
 def Create_Tie_EP_To_Beam(model,ep_surf,beam_surf,tie_name):
     a = mdb.models[model].rootAssembly
@@ -747,14 +819,14 @@ def Create_Tie_EP_To_Beam(model,ep_surf,beam_surf,tie_name):
         secondary=region2, positionToleranceMethod=COMPUTED, adjust=ON, 
         tieRotations=ON, thickness=ON)
 
-Create_Tie_EP_To_Beam(myString,'EPlate_Surface_For_Beam','Beam_surf_EP','EPlate_to_Beam_Tie')
 #------------------------------------------------------------------------------
 #: The interaction "SElf_Contact" has been created.
 
 def Self_Contact(model,set_name, con_prop):
-    a = mdb.models[model].rootAssembly
-    session.viewports['Viewport: 1'].setValues(displayedObject=a)
-    session.viewports['Viewport: 1'].assemblyDisplay.setValues(step='Initial')
+    if myViewport:
+        a = mdb.models[model].rootAssembly
+        session.viewports['Viewport: 1'].setValues(displayedObject=a)
+        session.viewports['Viewport: 1'].assemblyDisplay.setValues(step='Initial')
     mdb.models[model].ContactStd(name=set_name, 
         createStepName='Initial')
     mdb.models[model].interactions[set_name].includedPairs.setValuesInStep(
@@ -762,7 +834,90 @@ def Self_Contact(model,set_name, con_prop):
     mdb.models[model].interactions[set_name].contactPropertyAssignments.appendInStep(
         stepName='Initial', assignments=((GLOBAL, SELF, con_prop), ))
 
-Self_Contact(myString,'Self Contact',"Intprop-1")
+#------------------------------------------------------------------------------
+# Targeted contact (myContact = 'pairs'): surface-to-surface pairs only where
+# the parts can touch, with the friction of Contact_Property.  Part surfaces
+# are picked by bounding box; bores and shanks are the only faces whose box
+# has an extent in all three directions.
+#------------------------------------------------------------------------------
+def Create_Contact_Surfaces(model,column,plate,bolt,p):
+    curved = lambda lo, hi: np.all(hi-lo > TOL, axis=1)
+    # Column: front flange y = web_h/2 .. depth/2, axis along z
+    c = mdb.models[model].parts[column]
+    index = PartIndex(c, kinds=('faces',))
+    zone_lo, zone_hi = p.myC_H/2-p.myEndPlate_H/2, p.myC_H/2+p.myEndPlate_H/2
+    inner = index.inside('faces', (None, p.myC_Web_H/2, zone_lo), (None, p.myC_Web_H/2, zone_hi))
+    inner = index.where('faces', lambda lo, hi: (lo[:, 0] >= p.myC_Web_T/2-TOL) | (hi[:, 0] <= -p.myC_Web_T/2+TOL), inner)
+    c.Surface(side1Faces=index.sequence('faces', index.inside('faces', (None, p.myC_Depth/2, zone_lo), (None, p.myC_Depth/2, zone_hi))), name='Flange_Outer')
+    c.Surface(side1Faces=index.sequence('faces', inner), name='Flange_Inner')
+    c.Surface(side1Faces=index.sequence('faces', index.where('faces', curved, index.inside('faces', (None, p.myC_Web_H/2, None), (None, None, None)))), name='Bores')
+    # End plate: z = 0 on the column flange
+    e = mdb.models[model].parts[plate]
+    index = PartIndex(e, kinds=('faces',))
+    e.Surface(side1Faces=index.sequence('faces', index.on_plane('faces', 2, 0.0)), name='Front')
+    e.Surface(side1Faces=index.sequence('faces', index.on_plane('faces', 2, p.myEndPlate_T)), name='Back')
+    e.Surface(side1Faces=index.sequence('faces', index.where('faces', curved)), name='Bores')
+    # Bolt: nut below z = 0, shank up to the head at z = myBolt_M_T
+    b = mdb.models[model].parts[bolt]
+    index = PartIndex(b, kinds=('faces',))
+    beyond = lambda lo, hi: np.max(np.abs(np.concatenate([lo[:, :2], hi[:, :2]], axis=1)), axis=1) > p.myBolt_M_Dia/2+TOL
+    b.Surface(side1Faces=index.sequence('faces', index.where('faces', curved, index.inside('faces', (None, None, 0.0), (None, None, p.myBolt_M_T)))), name='Shank')
+    b.Surface(side1Faces=index.sequence('faces', index.where('faces', beyond, index.on_plane('faces', 2, p.myBolt_M_T))), name='Head')
+    b.Surface(side1Faces=index.sequence('faces', index.where('faces', beyond, index.on_plane('faces', 2, 0.0))), name='Nut')
+
+def Create_Contact_Pairs(model,con_prop,column,plate,bolt):
+    a = mdb.models[model].rootAssembly
+    bolts = [inst for inst in a.instances.values() if inst.partName == bolt]
+    c, e = a.instances[column].surfaces, a.instances[plate].surfaces
+    # (name, secondary, main)
+    pairs = [('EP-Column', e['Front'], c['Flange_Outer'])]
+    if bolts:
+        for name in ('Shank', 'Head', 'Nut'):
+            a.SurfaceByBoolean(name='Bolt_'+name+'s', surfaces=tuple(inst.surfaces[name] for inst in bolts))
+        pairs += [('Head-EP', a.surfaces['Bolt_Heads'], e['Back']),
+                  ('Nut-Column', a.surfaces['Bolt_Nuts'], c['Flange_Inner']),
+                  ('Shank-EP', a.surfaces['Bolt_Shanks'], e['Bores']),
+                  ('Shank-Column', a.surfaces['Bolt_Shanks'], c['Bores'])]
+    for name, secondary, main in pairs:
+        mdb.models[model].SurfaceToSurfaceContactStd(name=name, createStepName='Initial', 
+            main=main, secondary=secondary, sliding=FINITE, thickness=ON, 
+            interactionProperty=con_prop, adjustMethod=NONE, initialClearance=OMIT, 
+            datumAxis=None, clearanceRegion=None)
+
+#------------------------------------------------------------------------------
+# Connector bolts (myBoltModel = 'connector', src/fep/bolt_connector.py): one
+# Cartesian connector per bolt from the end plate outer face to the column
+# flange inner face, each end coupled to the face within the head / nut radius.
+# Needs the Back and Flange_Inner surfaces of Create_Contact_Surfaces.
+#------------------------------------------------------------------------------
+def Create_Connector_Bolts(model,p,column,plate,positions):
+    a = mdb.models[model].rootAssembly
+    behavior = bolt_connector.behavior(vars(p))
+    options = [ConnectorElasticity(components=(1, 2, 3), table=(behavior['stiffness'], ))]
+    for component, table in behavior['hardening'].items():
+        options.append(ConnectorPlasticity(components=(component, ), isotropicTable=table))
+    mdb.models[model].ConnectorSection(name=bolt_connector.BEHAVIOR_NAME, translationalType=CARTESIAN, 
+        behaviorOptions=tuple(options))
+    head_z, nut_z = p.myC_Depth/2+p.myEndPlate_T, p.myC_Web_H/2
+    ends = (('Head', head_z, a.instances[plate].surfaces['Back'], max(p.myBolt_T_Dia, 1.1*p.myBoltHoleDia)/2),
+            ('Nut', nut_z, a.instances[column].surfaces['Flange_Inner'], max(p.myBolt_B_Dia, 1.1*p.myBoltHoleDia)/2))
+    edges = None
+    for n, x, y in positions:
+        points = []
+        for end, z, surface, radius in ends:
+            name = 'Bolt-%d_%s' % (n, end)
+            rp = a.ReferencePoint(point=(x, y, z))
+            points.append(a.referencePoints[rp.id])
+            a.Set(referencePoints=(points[-1], ), name=name)
+            mdb.models[model].Coupling(name=name, controlPoint=a.sets[name], surface=surface, 
+                influenceRadius=radius, couplingType=DISTRIBUTING, weightingMethod=UNIFORM, 
+                localCsys=None, u1=ON, u2=ON, u3=ON, ur1=ON, ur2=ON, ur3=ON)
+        a.WirePolyLine(points=(tuple(points), ), mergeType=IMPRINT, meshable=OFF)
+        wire = a.edges.findAt(((x, y, (head_z+nut_z)/2), ))
+        edges = wire if edges is None else edges + wire
+    a.Set(edges=edges, name=outputs.BOLT_SET)
+    a.SectionAssignment(sectionName=bolt_connector.BEHAVIOR_NAME, region=a.sets[outputs.BOLT_SET])
+
 #------------------------------------------------------------------------------
 def Create_Reference_Point(x,y,z,model,setname):
     a = mdb.models[model].rootAssembly
@@ -774,10 +929,6 @@ def Create_Reference_Point(x,y,z,model,setname):
     return myRP,myRP_Position
 
 #------------------------------------------------------------------------------
-# Reference point
-myRP1,myRP_Position1 = Create_Reference_Point(0,myC_H/2,myLoad_D+myB_Depth/2,myString,'RP-1')
-myRP2,myRP_Position2 = Create_Reference_Point(0,myC_H,0,myString,'RP-2')
-myRP3,myRP_Position3 = Create_Reference_Point(0,0,0,myString,'RP-3')
 #------------------------------------------------------------------------------
 def Create_Edge_Set(model, part, points, set_name):
     a = mdb.models[model].rootAssembly
@@ -785,105 +936,90 @@ def Create_Edge_Set(model, part, points, set_name):
     edgeSelection = s1.findAt(*points)  # Select edges based on the provided points
     a.Set(edges=edgeSelection, name=set_name)  # Correct keyword is 'edges'
 
-# Assuming you are defining a single point, make sure it's nested properly as a tuple
-Create_Edge_Set(myString, myPart_2, points=(((0.0, myC_H/2, myLoad_D+myC_Web_H/2 + myC_FlangeBotom_T),),((myB_FlangeTop_W/3, myC_H/2+myB_Web_H/2+myB_FlangeTop_T/2, myLoad_D+myC_Web_H/2 + myC_FlangeBotom_T),),((myB_FlangeTop_W/3, myC_H/2-myB_Web_H/2-myB_FlangeBotom_T/2, myLoad_D+myC_Web_H/2 + myC_FlangeBotom_T),),((-myB_FlangeTop_W/3, myC_H/2+myB_Web_H/2+myB_FlangeTop_T/2, myLoad_D+myC_Web_H/2 + myC_FlangeBotom_T),),((-myB_FlangeTop_W/3, myC_H/2-myB_Web_H/2-myB_FlangeBotom_T/2, myLoad_D+myC_Web_H/2 + myC_FlangeBotom_T),),), set_name='Beam_Set_RP-1')
 
 #------------------------------------------------------------------------------
-def Create_Edge_Set(model, part, points, set_name):
+def Create_Face_Set(model, part, points, set_name):
     a = mdb.models[model].rootAssembly
     s1 = a.instances[part].faces  # Access the edges for the part
     faceSelection = s1.findAt(*points)  # Select edges based on the provided points
     a.Set(faces=faceSelection, name=set_name)  # Correct keyword is 'edges'
 
-Create_Edge_Set(myString, myPart_1, points=(((0.0, 0.0, 0.0),),((0.0, 0.0, myC_Web_H/2+myC_FlangeBotom_T/2),),((0.0, 0.0, -(myC_Web_H/2+myC_FlangeBotom_T/2)),),(((myC_FlangeBottom_W/2-1), 0.0, myC_Web_H/2+myC_FlangeBotom_T/2),),(((myC_FlangeBottom_W/2-1), 0.0, -(myC_Web_H/2+myC_FlangeBotom_T/2)),),((-(myC_FlangeBottom_W/2-1), 0.0, myC_Web_H/2+myC_FlangeBotom_T/2),),((-(myC_FlangeBottom_W/2-1), 0.0, -(myC_Web_H/2+myC_FlangeBotom_T/2)),),), set_name='Beam_Set_RP-3')
-Create_Edge_Set(myString, myPart_1, points=(((0.0, myC_H, 0.0),),((0.0, myC_H, myC_Web_H/2+myC_FlangeBotom_T/2),),((0.0, myC_H, -(myC_Web_H/2+myC_FlangeBotom_T/2)),),(((myC_FlangeBottom_W/2-1), myC_H, myC_Web_H/2+myC_FlangeBotom_T/2),),(((myC_FlangeBottom_W/2-1), myC_H, -(myC_Web_H/2+myC_FlangeBotom_T/2)),),((-(myC_FlangeBottom_W/2-1), myC_H, myC_Web_H/2+myC_FlangeBotom_T/2),),((-(myC_FlangeBottom_W/2-1), myC_H, -(myC_Web_H/2+myC_FlangeBotom_T/2)),),), set_name='Beam_Set_RP-2')
 #------------------------------------------------------------------------------
 #RP to Bolt Rigid Body
 #------------------------------------------------------------------------------
-def Create_Interaction_Rigid_Column(model,rp_name, set_name,rigidbody_name):
+# tie: the set is a single B31 line vertex (myDetailLength), whose rotations
+# the rigid body takes as well
+def Create_Interaction_Rigid_Column(model,rp_name, set_name,rigidbody_name,tie=False):
     a = mdb.models[model].rootAssembly
     region1=a.sets[rp_name]
     region2=a.sets[set_name]
+    if tie:
+        mdb.models[model].RigidBody(name=rigidbody_name, 
+            refPointRegion=region1, tieRegion=region2)
+        return
     mdb.models[model].RigidBody(name=rigidbody_name, 
         refPointRegion=region1, pinRegion=region2)
 
-Create_Interaction_Rigid_Column(myString,"RP-1",'Beam_Set_RP-1',"Beam to RP-1",)
-Create_Interaction_Rigid_Column(myString,"RP-2",'Beam_Set_RP-2',"Column to RP-2",)
-Create_Interaction_Rigid_Column(myString,"RP-3",'Beam_Set_RP-3',"Column to RP-3")
 #------------------------------------------------------------------------------
-myBeamMesh_Size = 40.0
-myBeamMeshEdge_Size = 8.0
-myBolrMesh_Size = 5.0
-myEPEdge_num = 2
-myEPMesh_Size = 8.0
-myColumnMesh_Size = 40.0
-myColumnMeshEdge_Size = 8.0
-myColumnEdge_num = 2
 #------------------------------------------------------------------------------
 #Mesh Beam
-def Create_Mesh_Beam(model,part,mesh_size_b,mesh_size_b_edge):
+def Create_Mesh_Beam(model,part,mesh_size_b,mesh_size_b_edge,z_joint):
     p = mdb.models[model].parts[part]
-    f = p.faces
-    pickedRegions = f.getSequenceFromMask(mask=('[#7fff ]', ), )
+    index = PartIndex(p, kinds=('faces', 'edges'))
+    pickedRegions = index.sequence('faces', index.all('faces'))
     p.setMeshControls(regions=pickedRegions, minTransition=ON)
     p.seedPart(size=mesh_size_b, deviationFactor=0.1, minSizeFactor=0.1)
-    e = p.edges
-    pickedEdges = e.getSequenceFromMask(mask=('[#c001c000 #3f ]', ), )
+    # Fine seeds on the edges between the end plate and the joint datum
+    pickedEdges = index.sequence('edges', index.inside('edges', (None, None, None), (None, None, z_joint)))
     p.seedEdgeBySize(edges=pickedEdges, size=mesh_size_b_edge, deviationFactor=0.1, 
         constraint=FINER)
     p.generateMesh()
 
-Create_Mesh_Beam(myString,myPart_2,myBeamMesh_Size,myBeamMeshEdge_Size)
 #------------------------------------------------------------------------------
 def Create_Mesh_Bolt(model,part,bolt_size):
     p = mdb.models[model].parts[part]
-    c = p.cells
-    pickedRegions = c.getSequenceFromMask(mask=('[#fff ]', ), )
+    pickedRegions = p.cells[:]
     p.setMeshControls(regions=pickedRegions, elemShape=HEX_DOMINATED, 
         technique=SWEEP, algorithm=MEDIAL_AXIS)
     p.seedPart(size=bolt_size, deviationFactor=0.1, minSizeFactor=0.1)
     p.generateMesh()
 
-Create_Mesh_Bolt(myString, myPart_4,myBolrMesh_Size)
 #------------------------------------------------------------------------------
-def Create_Mesh_EP(model,part,ep_edge_num,ep_size):
+def Create_Mesh_EP(model,part,ep_edge_num,ep_size,ept):
     p = mdb.models[model].parts[part]
-    e = p.edges
-    c = p.cells
-    pickedRegions = c.getSequenceFromMask(mask=('[#ffff ]', ), )
+    index = PartIndex(p, kinds=('edges',))
+    pickedRegions = p.cells[:]
     p.setMeshControls(regions=pickedRegions, technique=SWEEP, 
         algorithm=MEDIAL_AXIS)
-    pickedEdges = e.getSequenceFromMask(mask=(
-        '[#1015545 #81002080 #104004a #c80a281d #dc500451 #38 ]', ), )
+    # Through-thickness edges
+    pickedEdges = index.sequence('edges', index.straight(2, length=ept))
     p.seedEdgeByNumber(edges=pickedEdges, number=ep_edge_num, constraint=FINER)
     p.seedPart(size=ep_size, deviationFactor=0.1, minSizeFactor=0.1)
     p.generateMesh()
 
-Create_Mesh_EP(myString, myPart_3,myEPEdge_num,myEPMesh_Size)
 #------------------------------------------------------------------------------
 #------------------------------------------------------------------------------
-def Create_Mesh_Column(model,part,edge_num,edge_size,mesh_size):
+def Create_Mesh_Column(model,part,edge_num,edge_size,mesh_size,web_h,web_t,zone_lo,zone_hi):
     p = mdb.models[model].parts[part]
-    c = p.cells
-    pickedRegions = c.getSequenceFromMask(mask=('[#ffffffff #3ff ]', ), )
+    index = PartIndex(p, kinds=('edges',))
+    pickedRegions = p.cells[:]
     p.setMeshControls(regions=pickedRegions, technique=SWEEP, 
         algorithm=MEDIAL_AXIS)
-    e = p.edges
-    pickedEdges = e.getSequenceFromMask(mask=(
-        '[#8000095 #20800ab #80a5 #4400042a #4aaa0a42 #1040492 #41040811', 
-        ' #92514410 #21148004 #1000000 #11020920 #132048 ]', ), )
+    # edge_num elements through the flange and web thickness
+    flanges = index.where('edges', lambda lo, hi: (lo[:, 1] >= web_h/2-TOL) | (hi[:, 1] <= -web_h/2+TOL))
+    web = index.inside('edges', (-web_t/2, -web_h/2, None), (web_t/2, web_h/2, None))
+    thickness = np.union1d(index.straight(1, among=flanges), index.straight(0, length=web_t, among=web))
+    pickedEdges = index.sequence('edges', thickness)
     p.seedEdgeByNumber(edges=pickedEdges, number=edge_num, constraint=FINER)
-    e = p.edges
-    pickedEdges = e.getSequenceFromMask(mask=(
-        '[#feffffff #bfff7fff #77ffffff #eeffffff #be01ffff #e000147 #fff98000', 
-        ' #ff00005d #10bf600b #c0fffcc0 #5c1009 #ebf491f ]', ), )
+    # edge_size on every other edge in the end plate zone
+    zone = index.inside('edges', (None, None, zone_lo), (None, None, zone_hi))
+    pickedEdges = index.sequence('edges', np.setdiff1d(zone, thickness))
     p.seedEdgeBySize(edges=pickedEdges, size=edge_size, deviationFactor=0.1, 
         constraint=FINER)
     p.seedPart(size=mesh_size, deviationFactor=0.1, minSizeFactor=0.1)
     p.generateMesh()
 
 
-Create_Mesh_Column(myString, myPart_1,myColumnEdge_num,myColumnMeshEdge_Size,myColumnMesh_Size)
 #------------------------------------------------------------------------------
 #------------------------------------------------------------------------------
 
@@ -910,8 +1046,6 @@ def Create_Amp(model,amp_name,t_1, amp_1,t_2, amp_2):
     mdb.models[model].TabularAmplitude(name=amp_name, 
         timeSpan=STEP, smooth=SOLVER_DEFAULT, data=((t_1, amp_1), (t_2, amp_2)))
 
-Create_Amp(myString,'Constant_Amp_Load',0,1,1,1)
-Create_Amp(myString,'Ramp_Amp_Def',0,0,1,1)
 
 #------------------------------------------------------------------------------
 
@@ -921,7 +1055,6 @@ def Column_Top_Load(model,rp_name,load_name,load):
     mdb.models[model].ConcentratedForce(name=load_name, createStepName='Loading', region=region, cf2=load, amplitude='Constant_Amp_Load', distributionType=UNIFORM, field='', 
     localCsys=None)
 
-Column_Top_Load(myString,'RP-3','Column_Top_Load',20000)
 
 #------------------------------------------------------------------------------
 
@@ -935,9 +1068,6 @@ def Create_Column_Bottom_Fixed(model,rp_name,bc_name,u_2):
         ur2=SET, ur3=SET, amplitude=UNSET, distributionType=UNIFORM, fieldName='', 
         localCsys=None)
 
-Create_Column_Bottom_Fixed(myString,'RP-2','Column_Top_Fixed',SET)
-Create_Column_Bottom_Fixed(myString,'RP-3','Column_Bottom_Fixed',SET)
-myBeamDisplacement = -300.0
 #------------------------------------------------------------------------------
 def Create_Beam_Def(model,rp_name,bc_name,def_y):
     a = mdb.models[model].rootAssembly
@@ -947,27 +1077,357 @@ def Create_Beam_Def(model,rp_name,bc_name,def_y):
         ur1=UNSET, ur2=0.0, ur3=0.0, amplitude='Ramp_Amp_Def', fixed=OFF, 
         distributionType=UNIFORM, fieldName='', localCsys=None)
 
-Create_Beam_Def(myString,'RP-1','Beam_Deflection',myBeamDisplacement)
+#------------------------------------------------------------------------------
+# XSYMM on the mesh nodes of the cut x = 0 inside each (instance, y and z
+# range) box, so that rigid body and tied nodes can be left out
+#------------------------------------------------------------------------------
+def Create_Symmetry_BC(model,bc_name,regions):
+    a = mdb.models[model].rootAssembly
+    nodes = None
+    for instance, (y_lo, y_hi, z_lo, z_hi) in regions:
+        found = a.instances[instance].nodes.getByBoundingBox(xMin=-TOL, yMin=y_lo, zMin=z_lo, 
+            xMax=TOL, yMax=y_hi, zMax=z_hi)
+        nodes = found if nodes is None else nodes + found
+    a.Set(nodes=nodes, name=bc_name)
+    mdb.models[model].XsymmBC(name=bc_name, createStepName='Initial', 
+        region=a.sets[bc_name], localCsys=None)
+
+#------------------------------------------------------------------------------
+# Cyclic protocol (src/fep/protocols.py): one step per group of equal cycles,
+# each with its own tabular amplitude on the beam displacement.  Restart data
+# is written at the end of every step, so a longer protocol can be restarted
+# from a shorter one.
+#------------------------------------------------------------------------------
+def Create_Cyclic_Steps(model,bc_name,pre_step,groups,sign):
+    previous = pre_step
+    for number, (amplitude, cycles) in enumerate(groups, 1):
+        step_name = protocols.STEP_NAME % number
+        amp_name = protocols.AMPLITUDE_NAME % number
+        times, values = protocols.cycle_amplitude(cycles, sign)
+        Create_Step(model,step_name,0.05,protocols.QUARTER/4.0,1e-15,float(times[-1]),previous)
+        mdb.models[model].TabularAmplitude(name=amp_name, 
+            timeSpan=STEP, smooth=SOLVER_DEFAULT, data=tuple(zip(times.tolist(), values.tolist())))
+        mdb.models[model].boundaryConditions[bc_name].setValuesInStep(stepName=step_name, 
+            u2=amplitude, amplitude=amp_name)
+        mdb.models[model].steps[step_name].Restart(numberIntervals=1, overlay=OFF, timeMarks=OFF)
+        previous = step_name
+
 
 #------------------------------------------------------------------------------
 
 #----------------------------------------------------------------------------
-def Create_Job(model,job_name):
+def Create_Job(model,job_name,cpus=1):
     mdb.Job(name=job_name, model=model, description='', type=ANALYSIS, atTime=None, waitMinutes=0, waitHours=0, queue=None, 
     memory=90, memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True, 
     explicitPrecision=SINGLE, nodalOutputPrecision=SINGLE, echoPrint=OFF, 
     modelPrint=OFF, contactPrint=OFF, historyPrint=OFF, userSubroutine='', 
     scratch='', resultsFormat=ODB, numThreadsPerMpiProcess=1, 
-    multiprocessingMode=DEFAULT, numCpus=1, numGPUs=0)
+    multiprocessingMode=DEFAULT, numCpus=cpus, numDomains=cpus, numGPUs=0)
 
-Create_Job(myString,myJobName)
 #----------------------------------------------------------------------------
 #------------------------------------------------------------------------------
 
-mdb.saveAs(
-    pathName='E:/M.Sc Thesis/Paper writting/Journal Paper-1/Parametric Study/Most Important/ID-26')
-#: The model database has been saved to "F:\Civil Engineering Tutorials\Abaqus\Tutorial\Abaqus Column Model with python Scripts\Trial_1.cae".
-#mdb.jobs[myString].submit(consistencyChecking=OFF)
-
-#E:\M.Sc Thesis\Paper writting\Journal Paper-1\Parametric Study\Most Important
-#------------------------------------------------------------------------------
\ No newline at end of file
+#------------------------------------------------------------------------------
+# Meshed part cache
+#------------------------------------------------------------------------------
+# Beam and bolt depend on a few parameters only (src/fep/partcache.py).  A
+# model whose beam or bolt parameters match an earlier model of this
+# session copies that part, partitions, sections and mesh included.
+myPartCache = partcache.PartCache(max_entries=32)
+myCachedParts = (myPart_2, myPart_4)
+
+def Copy_Cached_Parts(model, p):
+    cached = []
+    for part in myCachedParts:
+        source = myPartCache.get(partcache.part_key(part, vars(p)))
+        if source is not None and source in mdb.models.keys():
+            mdb.models[model].Part(name=part, objectToCopy=mdb.models[source].parts[part])
+            cached.append(part)
+    return cached
+
+def Store_Cached_Parts(model, p, cached):
+    for part in myCachedParts:
+        if part not in cached:
+            myPartCache.put(partcache.part_key(part, vars(p)), model)
+
+#------------------------------------------------------------------------------
+# Build one case as its own model
+#------------------------------------------------------------------------------
+def Build_Model(myString, p):
+    mdb.Model(name=myString)
+
+    #Material
+    if myFireMaterials or myFireThermalOdb:
+        for material in (myMaterial_1, myMaterial_2, myMaterial_3, myMaterial_4):
+            Create_Fire_Material(myString,material,fire_materials.tables(material,vars(p),cache=Material_Cache()))
+    else:
+        Create_Material(myString,myMaterial_1,p.myDensity,p.MyFlangeEM,MyFlangePlastic)
+        Create_Material(myString,myMaterial_2,p.myDensity,p.MyWebEM,MyWebPlastic)
+        Create_Material(myString,myMaterial_3,p.myDensity,p.MyEPEM,MyEPPlastic)
+        Create_Material(myString,myMaterial_4,p.myDensity,p.MyBoltEM,MyBoltPlastic)
+
+    #Parts (beam and bolt copied, meshed, from an earlier model with the same part parameters)
+    myCached = Copy_Cached_Parts(myString, p)
+    myBottom, myTop, myBeamLength = Detail_Cuts(p)
+    Create_Column(myString,myPart_1,p.myC_FlangeTop_W,p.myC_Depth,p.myC_Web_H,p.myC_Web_T,p.myC_FlangeBottom_W,p.myC_H)
+    if myPart_2 not in myCached:
+        Create_Beam(myString,myPart_2,p.myB_FlangeTop_W,p.myB_Web_H,p.myB_FlangeTop_T,p.myB_FlangeBottom_W,p.myB_FlangeBotom_T,myBeamLength or p.myB_H,myHalfModel)
+    Create_End_Plate(myString,myPart_3,p.myEndPlate_W,p.myEndPlate_H,p.myEndPlate_H_CC_T,p.myEndPlate_T_C,p.myBoltHoleDia,p.myEP_V_D_second_Row,p.myEP_V_D_Third_Row,p.myEndPlate_T,p.myEndPlate_B_C)
+    if myPart_4 not in myCached:
+        Create_Bolt(myString,myPart_4,p.myBolt_M_Dia,p.myBolt_M_T,p.myBolt_T_Dia,p.myBolt_B_Dia,p.myBolt_T_T,p.myBolt_B_T)
+
+    #Datum planes
+    if myPart_4 not in myCached:
+        myID_0 = Create_Datum_Plane(XYPLANE,myPart_4,myString,0.0)
+        myID_1 = Create_Datum_Plane(XYPLANE,myPart_4,myString,p.myBolt_M_T)
+        myID_2 = Create_Datum_Plane(YZPLANE,myPart_4,myString,0.0)
+        myID_3 = Create_Datum_Plane(XZPLANE,myPart_4,myString,0.0)
+    myID_4 = Create_Datum_Plane(XZPLANE,myPart_1,myString,((p.myC_Web_H/2)))
+    myID_5 = Create_Datum_Plane(XZPLANE,myPart_1,myString,-((p.myC_Web_H/2)))
+    myID_6 = Create_Datum_Plane(XYPLANE,myPart_1,myString,p.myC_H/2)
+    myID_7 = Create_Datum_Plane(XYPLANE,myPart_1,myString,((p.myC_H/2-p.myEP_V_D_second_Row)))
+    myID_8 = Create_Datum_Plane(YZPLANE,myPart_3,myString,p.myEndPlate_H_CC_B/2)
+    myID_9 = Create_Datum_Plane(YZPLANE,myPart_3,myString,-p.myEndPlate_H_CC_B/2)
+    myID_10 = Create_Datum_Plane(XZPLANE,myPart_3,myString,p.myEP_V_D_second_Row)
+    myID_11 = Create_Datum_Plane(XZPLANE,myPart_3,myString,-p.Cc_V)
+    myID_12 = Create_Datum_Plane(YZPLANE,myPart_3,myString,0.0)
+    myID_13 = Create_Datum_Plane(XZPLANE,myPart_3,myString,0.0)
+    myID_14 = Create_Datum_Plane(XYPLANE,myPart_1,myString,((p.myC_H/2+p.Cc_V)))
+    myID_15 = Create_Datum_Plane(XYPLANE,myPart_1,myString,(((p.myC_H/2)+(p.myEndPlate_H/2))))
+    myID_16 = Create_Datum_Plane(XYPLANE,myPart_1,myString,(((p.myC_H/2)-(p.myEndPlate_H/2))))
+    myID_17 = Create_Datum_Plane(YZPLANE,myPart_1,myString,((p.myEndPlate_H_CC_B/2)))
+    myID_18 = Create_Datum_Plane(YZPLANE,myPart_1,myString,(-(p.myEndPlate_H_CC_B/2)))
+    if myPart_2 not in myCached:
+        myID_19 = Create_Datum_Plane(XYPLANE,myPart_2,myString,((p.myB_H/6)))
+        myID_20 = Create_Datum_Plane(XYPLANE,myPart_2,myString,((p.myLoad_D-p.myEndPlate_T)))
+
+    #Create_Partion
+    if myPart_4 not in myCached:
+        Create_Partion(myString,myPart_4,myID_0)
+        Create_Partion(myString,myPart_4,myID_1)
+        Create_Partion(myString,myPart_4,myID_2)
+        Create_Partion(myString,myPart_4,myID_3)
+    Create_Partion(myString,myPart_1,myID_4)
+    Create_Partion(myString,myPart_1,myID_5)
+    Create_Partion(myString,myPart_1,myID_6)
+    Create_Partion(myString,myPart_1,myID_7)
+    Create_Partion(myString,myPart_3,myID_8)
+    Create_Partion(myString,myPart_3,myID_9)
+    Create_Partion(myString,myPart_3,myID_10)
+    Create_Partion(myString,myPart_3,myID_11)
+    Create_Partion(myString,myPart_3,myID_12)
+    Create_Partion(myString,myPart_3,myID_13)
+    Create_Partion(myString,myPart_1,myID_14)
+    Create_Partion(myString,myPart_1,myID_15)
+    Create_Partion(myString,myPart_1,myID_16)
+    Create_Partion(myString,myPart_1,myID_17)
+    Create_Partion(myString,myPart_1,myID_18)
+    Cut_Extrude_Column(myString,myPart_1,p.myEndPlate_W,p.myC_H,p.myEndPlate_H_CC_T,p.myBoltHoleDia,p.myC_FlangeTop_T,p.Cc_V,p.myEP_V_D_second_Row)
+    if myHalfModel:
+        Cut_Half(myString,myPart_1,2*max(p.myC_FlangeTop_W,p.myC_Depth))
+        Cut_Half(myString,myPart_3,2*max(p.myEndPlate_W,p.myEndPlate_H))
+    # column part z = myC_H - global y
+    if myTop is not None:
+        Cut_Length(myString,myPart_1,0.0,p.myC_H-myTop,2*max(p.myC_FlangeTop_W,p.myC_Depth))
+    if myBottom is not None:
+        Cut_Length(myString,myPart_1,p.myC_H-myBottom,p.myC_H,2*max(p.myC_FlangeTop_W,p.myC_Depth))
+    if myPart_2 not in myCached:
+        Create_Shell_Beam_Partition(myString,myPart_2,myID_20,p.myLoad_D-p.myEndPlate_T,myID_19,p.myB_H/6)
+
+    #Create Section
+    Create_Section(myString,myCS_1_1,myMaterial_1)
+    Create_Section(myString,myCS_1_2,myMaterial_2)
+    Create_Section(myString,myCS_3,myMaterial_3)
+    Create_Section(myString,myCS_4,myMaterial_4)
+    Create_Shell_CS_Beam(myString,myCS_2,myMaterial_2,p.myB_Web_T/2 if myHalfModel else p.myB_Web_T)
+    Create_Shell_CS_Beam(myString,myCS_2_1,myMaterial_1,p.myB_FlangeTop_T)
+
+    #Section Assignment
+    Section_Assignment(myString,myPart_3,"E Plate",myCS_3)
+    if myPart_4 not in myCached:
+        Section_Assignment(myString,myPart_4,"Bolt",myCS_4)
+    if myPart_2 not in myCached:
+        Web_Assignment(myString,myPart_2,"Web",myCS_2)
+        Flange_Assignment(myString,myPart_2,"Flange",myCS_2_1)
+    Create_Column_Web_Flange_Assignment(myString,myPart_1,'Column Flange','Column Web', myCS_1_1,myCS_1_1,p.myC_Web_H)
+
+    #Assembly
+    Create_Csys(myString)
+    Assemply(myString,myPart_1,myInstance_1,0,0,0)
+    Assemply(myString,myPart_2,myInstance_2,0,0,0)
+    Assemply(myString,myPart_3,myInstance_3,0,0,0)
+    if myBoltModel == 'solid':
+        Assemply(myString,myPart_4,myInstance_4,0,0,0)
+    Create_Beam_Rotation(myString,myInstance_1,90.0,p.myC_Web_T/3, 0.0,0.0)
+    Translet_And_Setup(myString,myInstance_1,0.0,p.myC_H,0.0)
+    Translet_And_Setup(myString,myInstance_2,0.0,p.myC_H/2,(p.myC_Depth/2)+p.myEndPlate_T)
+    Translet_And_Setup(myString,myInstance_3,0.0,p.myC_H/2,(p.myC_Depth/2))
+    if myBoltModel == 'solid':
+        Translet_And_Setup(myString,myInstance_4,p.myEndPlate_H_CC_B/2,p.myC_H/2-p.Cc_V,p.myC_Web_H/2)
+        if myHalfModel:
+            # one bolt column, x > 0
+            Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,p.Cc_V,0.0,1.0,0.0, 2)
+            Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,p.myEP_V_D_Third_Row ,0.0,1.0,0.0, 2)
+        else:
+            Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,p.myEndPlate_H_CC_T,-1.0,0.0,0.0, 2)
+            Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,p.Cc_V,0.0,1.0,0.0, 2)
+            Create_Bar_Instance_By_Lenear_Pattern(myString,"Bolt-lin-2-1",p.Cc_V,0.0,1.0,0.0, 2)
+            Create_Bar_Instance_By_Lenear_Pattern(myString,myInstance_4,p.myEP_V_D_Third_Row ,0.0,1.0,0.0, 2)
+            Create_Bar_Instance_By_Lenear_Pattern(myString,"Bolt-lin-2-1",p.myEP_V_D_Third_Row,0.0,1.0,0.0, 2)
+    if myViewport:
+        session.viewports['Viewport: 1'].assemblyDisplay.geometryOptions.setValues(
+            datumAxes=OFF, datumPlanes=OFF)
+
+    #Step and interactions
+    Create_Step(myString, myStepName_1,0.01, 0.1, 1e-15,1.0,'Initial')
+    if myRestartIntervals:
+        mdb.models[myString].steps[myStepName_1].Restart(numberIntervals=myRestartIntervals, overlay=ON, timeMarks=OFF)
+    Contact_Property(myString,"Intprop-1",0.35)
+    Create_Surface(myString, myPart_3, Half_Points((((-(p.myEndPlate_W/2-2.0), p.myC_H/2+(p.myEndPlate_H/2-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),),((p.myEndPlate_W/2-2.0, p.myC_H/2+(p.myEndPlate_H/2-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),),((-(p.myEndPlate_W/2-2.0), p.myC_H/2-(p.myEndPlate_H/2-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),), ((p.myEndPlate_W/2-2.0, p.myC_H/2-(p.myEndPlate_H/2-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),), ((-(p.myEndPlate_W/4-2.0), p.myC_H/2+(p.myEndPlate_H/2-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),), ((p.myEndPlate_W/4-2.0, p.myC_H/2+(p.myEndPlate_H/2-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),),((-(p.myEndPlate_W/4-2.0), p.myC_H/2-(p.myEndPlate_H/2-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),), ((p.myEndPlate_W/4-2.0, p.myC_H/2-(p.myEndPlate_H/2-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),), ((1.0, p.myC_H/2+(p.myEndPlate_H/4-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),), ((-1.0, p.myC_H/2+(p.myEndPlate_H/4-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),),((1.0, p.myC_H/2-(p.myEndPlate_H/4-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),), ((-1.0, p.myC_H/2-(p.myEndPlate_H/4-2.0), p.myC_Web_H/2+p.myC_FlangeBotom_T+p.myEndPlate_T),))), 'EPlate_Surface_For_Beam')
+    Create_Surface_Set(myString, myPart_2, points=Half_Points((((0.0, p.myC_H/2, p.myC_Web_H/2 + p.myC_FlangeBotom_T + p.myEndPlate_T),), ((p.myB_FlangeTop_W/3, p.myC_H/2 + p.myB_Web_H/2 + p.myB_FlangeTop_T/2, p.myC_Web_H/2 + p.myC_FlangeBotom_T + p.myEndPlate_T),), ((p.myB_FlangeTop_W/3, p.myC_H/2 - p.myB_Web_H/2 - p.myB_FlangeBotom_T/2, p.myC_Web_H/2 + p.myC_FlangeBotom_T + p.myEndPlate_T),), ((-p.myB_FlangeTop_W/3, p.myC_H/2 + p.myB_Web_H/2 + p.myB_FlangeTop_T/2, p.myC_Web_H/2 + p.myC_FlangeBotom_T + p.myEndPlate_T),), ((-p.myB_FlangeTop_W/3, p.myC_H/2 - p.myB_Web_H/2 - p.myB_FlangeBotom_T/2, p.myC_Web_H/2 + p.myC_FlangeBotom_T + p.myEndPlate_T),))), set_name='Beam_surf_EP')
+    Create_Tie_EP_To_Beam(myString,'EPlate_Surface_For_Beam','Beam_surf_EP','EPlate_to_Beam_Tie')
+    if myContact == 'pairs' or myBoltModel == 'connector':
+        Create_Contact_Surfaces(myString,myPart_1,myPart_3,myPart_4,p)
+    if myContact == 'pairs':
+        Create_Contact_Pairs(myString,"Intprop-1",myInstance_1,myInstance_3,myPart_4)
+    else:
+        Self_Contact(myString,'Self Contact',"Intprop-1")
+    if myBoltModel == 'connector':
+        Create_Connector_Bolts(myString,p,myInstance_1,myInstance_3,bolt_positions(vars(p),myHalfModel))
+
+    #Reference points, sets and rigid bodies
+    myRP1,myRP_Position1 = Create_Reference_Point(0,p.myC_H/2,p.myLoad_D+p.myB_Depth/2,myString,'RP-1')
+    myRP2,myRP_Position2 = Create_Reference_Point(0,p.myC_H,0,myString,'RP-2')
+    myRP3,myRP_Position3 = Create_Reference_Point(0,0,0,myString,'RP-3')
+    Create_Detail_Lines(myString,p,myInstance_1,myInstance_2)
+    a = mdb.models[myString].rootAssembly
+    myLoadOnLine = myBeamLength is not None and p.myLoad_D-p.myEndPlate_T > myBeamLength+TOL
+    if myLoadOnLine:
+        a.Set(vertices=a.instances['Beam Line'].vertices.findAt(((0.0, p.myC_H/2, p.myC_Depth/2+p.myLoad_D), )), name='Beam_Set_RP-1')
+    else:
+        Create_Edge_Set(myString, myPart_2, points=Half_Points((((0.0, p.myC_H/2, p.myLoad_D+p.myC_Web_H/2 + p.myC_FlangeBotom_T),),((p.myB_FlangeTop_W/3, p.myC_H/2+p.myB_Web_H/2+p.myB_FlangeTop_T/2, p.myLoad_D+p.myC_Web_H/2 + p.myC_FlangeBotom_T),),((p.myB_FlangeTop_W/3, p.myC_H/2-p.myB_Web_H/2-p.myB_FlangeBotom_T/2, p.myLoad_D+p.myC_Web_H/2 + p.myC_FlangeBotom_T),),((-p.myB_FlangeTop_W/3, p.myC_H/2+p.myB_Web_H/2+p.myB_FlangeTop_T/2, p.myLoad_D+p.myC_Web_H/2 + p.myC_FlangeBotom_T),),((-p.myB_FlangeTop_W/3, p.myC_H/2-p.myB_Web_H/2-p.myB_FlangeBotom_T/2, p.myLoad_D+p.myC_Web_H/2 + p.myC_FlangeBotom_T),),)), set_name='Beam_Set_RP-1')
+    if myBottom is not None:
+        a.Set(vertices=a.instances['Column Line'].vertices.findAt(((0.0, 0.0, 0.0), )), name='Beam_Set_RP-3')
+    else:
+        Create_Face_Set(myString, myPart_1, points=Half_Points((((0.0, 0.0, 0.0),),((0.0, 0.0, p.myC_Web_H/2+p.myC_FlangeBotom_T/2),),((0.0, 0.0, -(p.myC_Web_H/2+p.myC_FlangeBotom_T/2)),),(((p.myC_FlangeBottom_W/2-1), 0.0, p.myC_Web_H/2+p.myC_FlangeBotom_T/2),),(((p.myC_FlangeBottom_W/2-1), 0.0, -(p.myC_Web_H/2+p.myC_FlangeBotom_T/2)),),((-(p.myC_FlangeBottom_W/2-1), 0.0, p.myC_Web_H/2+p.myC_FlangeBotom_T/2),),((-(p.myC_FlangeBottom_W/2-1), 0.0, -(p.myC_Web_H/2+p.myC_FlangeBotom_T/2)),),),p.myC_Web_T/4), set_name='Beam_Set_RP-3')
+    if myTop is not None:
+        a.Set(vertices=a.instances['Column Line'].vertices.findAt(((0.0, p.myC_H, 0.0), )), name='Beam_Set_RP-2')
+    else:
+        Create_Face_Set(myString, myPart_1, points=Half_Points((((0.0, p.myC_H, 0.0),),((0.0, p.myC_H, p.myC_Web_H/2+p.myC_FlangeBotom_T/2),),((0.0, p.myC_H, -(p.myC_Web_H/2+p.myC_FlangeBotom_T/2)),),(((p.myC_FlangeBottom_W/2-1), p.myC_H, p.myC_Web_H/2+p.myC_FlangeBotom_T/2),),(((p.myC_FlangeBottom_W/2-1), p.myC_H, -(p.myC_Web_H/2+p.myC_FlangeBotom_T/2)),),((-(p.myC_FlangeBottom_W/2-1), p.myC_H, p.myC_Web_H/2+p.myC_FlangeBotom_T/2),),((-(p.myC_FlangeBottom_W/2-1), p.myC_H, -(p.myC_Web_H/2+p.myC_FlangeBotom_T/2)),),),p.myC_Web_T/4), set_name='Beam_Set_RP-2')
+    Create_Interaction_Rigid_Column(myString,"RP-1",'Beam_Set_RP-1',"Beam to RP-1",myLoadOnLine)
+    Create_Interaction_Rigid_Column(myString,"RP-2",'Beam_Set_RP-2',"Column to RP-2",myTop is not None)
+    Create_Interaction_Rigid_Column(myString,"RP-3",'Beam_Set_RP-3',"Column to RP-3",myBottom is not None)
+
+    #Output requests
+    Create_Output_Sets(myString,myPart_4,myInstance_3)
+    Create_Output_Requests(myString,myStepName_1,myOutputProfile,myOutputFrames)
+    if myFireThermalOdb:
+        Create_Fire_Step(myString,'Fire',myStepName_1,myFireThermalOdb,myFireDuration,myInstance_2)
+
+    #Mesh
+    if myPart_2 not in myCached:
+        Create_Mesh_Beam(myString,myPart_2,p.myBeamMesh_Size,p.myBeamMeshEdge_Size,p.myB_H/6)
+    if myPart_4 not in myCached and myBoltModel == 'solid':
+        Create_Mesh_Bolt(myString, myPart_4,p.myBolrMesh_Size)
+    Store_Cached_Parts(myString, p, myCached)
+    Create_Mesh_EP(myString, myPart_3,p.myEPEdge_num,p.myEPMesh_Size,p.myEndPlate_T)
+    Create_Mesh_Column(myString, myPart_1,p.myColumnEdge_num,p.myColumnMeshEdge_Size,p.myColumnMesh_Size,p.myC_Web_H,p.myC_Web_T,p.myC_H/2-p.myEndPlate_H/2,p.myC_H/2+p.myEndPlate_H/2)
+
+    #Amplitudes, loads and boundary conditions
+    Create_Amp(myString,'Constant_Amp_Load',0,1,1,1)
+    Create_Amp(myString,'Ramp_Amp_Def',0,0,1,1)
+    Column_Top_Load(myString,'RP-3','Column_Top_Load',p.myColumn_Load/HALF_REACTION_SCALE if myHalfModel else p.myColumn_Load)
+    Create_Column_Bottom_Fixed(myString,'RP-2','Column_Top_Fixed',SET)
+    Create_Column_Bottom_Fixed(myString,'RP-3','Column_Bottom_Fixed',SET)
+    if myHalfModel:
+        z_end = p.myC_Depth/2+p.myEndPlate_T
+        z_load = p.myC_Depth/2+p.myLoad_D
+        y_lo = TOL if myBottom is None else myBottom+TOL
+        y_hi = p.myC_H-TOL if myTop is None else myTop-TOL
+        z_hi = z_end+p.myB_H if myBeamLength is None else z_end+myBeamLength-TOL
+        regions = [(myInstance_1,(y_lo,y_hi,-p.myC_Depth,p.myC_Depth)),
+            (myInstance_3,(0.0,p.myC_H,0.0,z_end)),
+            (myInstance_2,(0.0,p.myC_H,z_end+TOL,min(z_load-TOL,z_hi))),
+            (myInstance_2,(0.0,p.myC_H,z_load+TOL,z_hi))]
+        # B31 line nodes, those tied to RP-1, RP-2 and RP-3 left out
+        if myBottom is not None or myTop is not None:
+            regions.append(('Column Line',(TOL,p.myC_H-TOL,-TOL,TOL)))
+        if myBeamLength is not None:
+            regions.append(('Beam Line',(0.0,p.myC_H,z_end,z_load-TOL)))
+            regions.append(('Beam Line',(0.0,p.myC_H,z_load+TOL,z_end+p.myB_H+TOL)))
+        Create_Symmetry_BC(myString,'Symmetry',[(instance, box) for instance, box in regions if box[2] < box[3]])
+    if myProtocol:
+        Create_Beam_Def(myString,'RP-1','Beam_Deflection',0.0)
+        Create_Cyclic_Steps(myString,'Beam_Deflection',myStepName_1,
+            protocols.groups(vars(p),myProtocol,myMaxRotation,myYieldRotation),np.sign(p.myBeamDisplacement) or -1.0)
+    else:
+        Create_Beam_Def(myString,'RP-1','Beam_Deflection',p.myBeamDisplacement)
+
+    #Job
+    Create_Job(myString,myString,myCpusPerJob)
+
+#------------------------------------------------------------------------------
+# Sweep driver
+#------------------------------------------------------------------------------
+def Profile_Case(name):
+    if myProfiler is None:
+        return contextlib.nullcontext()
+    return myProfiler.case(name, lambda: profiler.model_counts(mdb, name))
+
+
+def Model_Settings():
+    return dict((name, globals()[name]) for name in spec.SETTINGS)
+
+def Run_Sweep(base, cases, out_dir):
+    # One mdb.Model and one Job per distinct case (fep.spec), all in this CAE
+    # session.  Input decks are written to out_dir next to a manifest listing
+    # every case; a case that repeats an earlier model shares its deck and
+    # is marked same_as that case (not solved again, its results copied by
+    # fep.odb_extract), and a case that cannot be built is left out with its
+    # reasons.
+    entries = []
+    inps = {}
+    cwd = os.getcwd()
+    os.chdir(out_dir)   # writeInput() writes <job>.inp to the working directory
+    try:
+        for name, case_spec, same in spec.plan(cases, base, **Model_Settings()):
+            problems = case_spec.problems()
+            if problems:
+                print('%s skipped: %s' % (name, '; '.join(problems)))
+                continue
+            if same is None:
+                with Profile_Case(name):
+                    Build_Model(name, case_spec.namespace())
+                    mdb.jobs[name].writeInput(consistencyChecking=OFF)
+                inps[case_spec.key] = os.path.join(out_dir, name + '.inp')
+            entries.append({'job': name,
+                'inp': inps[case_spec.key],
+                'cpus': myCpusPerJob,
+                'params': case_spec.case})
+            if same is not None:
+                entries[-1]['same_as'] = same
+            if myHalfModel:
+                entries[-1]['reaction_scale'] = HALF_REACTION_SCALE
+    finally:
+        os.chdir(cwd)
+    manifest = doe.save_manifest(out_dir, base, entries)
+    if myCaseDatabase:
+        db = casedb.CaseDB(myCaseDatabase)
+        db.register_manifest(manifest)
+        db.close()
+    if myProfiler is not None:
+        print(myProfiler.save(myProfileDir, base))
+    return entries
+
+
+if __name__ == '__main__':
+    Import_CAE()
+    if '--' in sys.argv[:-1]:
+        mySweepFile = sys.argv[sys.argv.index('--') + 1]
+    myCases = doe.generate(doe.load_spec(mySweepFile)) if mySweepFile else [myCase]
+    Run_Sweep(myJobmodelname, myCases, myModelDir)
+    #--------------------------------------------------------------------------
+
+    mdb.saveAs(pathName=os.path.join(myModelDir, myJobmodelname + '.cae'))
+#mdb.jobs[myJobmodelname].submit(consistencyChecking=OFF)
+#------------------------------------------------------------------------------
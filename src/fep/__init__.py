@@ -0,0 +1,9 @@
+"""
+=======================================================================
+ fep – helper modules for the FEP parametric study
+=======================================================================
+ Pure-Python pieces shared by P1_FEP_ParametricStudy.py and the
+ command-line tools that run outside Abaqus/CAE.  Nothing in this
+ package imports the Abaqus scripting modules at import time.
+=======================================================================
+"""
@@ -0,0 +1,56 @@
+"""
+=======================================================================
+ fep.bolt_connector – bolts as connector elements for screening runs
+=======================================================================
+ The screening bolt model replaces each solid bolt, its mesh and its
+ contact by one Cartesian connector along the bolt axis, from the end
+ plate outer face (under the head) to the column flange inner face
+ (under the nut).  Each end is a reference node with a distributing
+ coupling to the face nodes within the head or nut radius, i.e. the
+ hole rim the bolt bears on.
+
+ Axial (component 3, the bolt axis is global z) and shear (1, 2)
+ behaviour follow the bolt material over the grip L = myBolt_M_T and
+ the tensile stress area As (fep.params.tensile_area, as in fep.ec3):
+
+     axial   k = E As / L    hardening  sigma As       at  eps_p L
+     shear   k = G As / L    hardening  sigma As / √3  at  √3 eps_p L
+
+ (von Mises, G = E / 2(1 + nu)).  Used by fep.inp_writer --bolts
+ connector and by myBoltModel = 'connector' in the CAE script.
+=======================================================================
+"""
+
+import math
+from collections import OrderedDict
+
+from fep import outputs
+from fep.materials import MyBoltPlastic
+from fep.params import tensile_area
+
+
+BOLT_MODELS = ('solid', 'connector')
+POISSON = 0.3
+BEHAVIOR_NAME = 'Bolt_Connector'
+OUTPUT_VARIABLES = ('CTF', 'CU', 'CUP')
+
+
+def stress_area(p):
+    return float(tensile_area(p['myBolt_M_Dia']))
+
+
+def behavior(p, plastic=MyBoltPlastic):
+    """{'stiffness': (k1, k2, k3), 'hardening': {component: ((force, plastic displacement), ...)}}."""
+    area, grip = stress_area(p), p['myBolt_M_T']
+    modulus = p['MyBoltEM']
+    shear = modulus/(2.0*(1.0 + POISSON))
+    axial_table = tuple((stress*area, strain*grip) for stress, strain in plastic)
+    shear_table = tuple((stress*area/math.sqrt(3.0), math.sqrt(3.0)*strain*grip) for stress, strain in plastic)
+    return {'stiffness': (shear*area/grip, shear*area/grip, modulus*area/grip),
+            'hardening': OrderedDict([(1, shear_table), (2, shear_table), (3, axial_table)])}
+
+
+def requests(field_requests):
+    """Output requests with the solid bolt variables of fep.outputs.BOLT_SET swapped for connector ones."""
+    return [r._replace(element_variables=OUTPUT_VARIABLES) if r.region == outputs.BOLT_SET else r
+            for r in field_requests]
@@ -0,0 +1,371 @@
+"""
+=======================================================================
+ fep.cae_pool – warm CAE workers writing the decks of a sweep
+=======================================================================
+ Starting `abaqus cae noGUI` costs 20-40 s per process before the first
+ mdb.Model.  Here K CAE processes are started once and kept busy:
+
+ * driver (plain Python): plans the sweep with fep.spec (derived
+   parameters, feasibility, one build per distinct model), puts one
+   task per model in a spool directory, keeps K workers running
+   (restarting any that exit while tasks remain, and putting back the
+   task a crashed worker held) and writes the sweep manifest, and
+   registers it in the case database, once every deck is written.
+   A task that took down --attempts workers is failed, and so are the
+   tasks left once every worker slot has exited --restarts times in a
+   row without writing a deck (no license, bad command);
+ * worker (inside CAE, `abaqus cae noGUI=cae_pool.py -- worker ...`):
+   imports the study script once, then claims a task, builds the model
+   with ModelSpec.build(), writes <job>.inp and drops the case's model
+   and job from the session again, keeping only the source models of
+   its part cache.  It exits on the STOP file, or after --recycle cases
+   to bound the memory of a long session.
+
+ The spool is <queue>/pending/*.json claimed by an atomic rename into
+ <queue>/claimed/<worker>/, and <queue>/done/<job>.json with the deck,
+ seconds and any error.  --standin runs the workers in plain Python
+ against fep.cae_standin:
+
+     PYTHONPATH=src python -m fep.cae_pool sweep.json --workers 8 --out models
+=======================================================================
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+
+
+CAE_COMMAND = ('abaqus', 'cae', 'noGUI={script}', '--', 'worker', '{queue}', '{worker}', '--recycle', '{recycle}')
+STANDIN_COMMAND = (sys.executable, '{script}', 'worker', '{queue}', '{worker}', '--recycle', '{recycle}',
+                   '--standin')
+STOP_FILE = 'STOP'
+MAX_ATTEMPTS = 2        # workers a task may take down before it is failed
+MAX_RESTARTS = 3        # starts in a row without a deck before a worker slot is given up
+
+
+# --------------------------------------------------------------------------
+# Spool directory
+# --------------------------------------------------------------------------
+def _write_json(path, value):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(value, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def put(queue, task):
+    """Add a task; tasks are claimed in the order of their `seq`."""
+    _write_json(os.path.join(queue, 'pending', '%06d_%s.json' % (task['seq'], task['job'])), task)
+
+
+def claim(queue, worker):
+    """Next pending task, moved to claimed/<worker>/, or None when there is none."""
+    target = os.path.join(queue, 'claimed', str(worker))
+    for path in sorted(glob.glob(os.path.join(queue, 'pending', '*.json'))):
+        claimed = os.path.join(target, os.path.basename(path))
+        try:
+            os.rename(path, claimed)        # atomic: only one worker gets it
+        except OSError:
+            continue
+        with open(claimed) as f:
+            return json.load(f)
+    return None
+
+
+def finish(queue, worker, task, result):
+    _write_json(os.path.join(queue, 'done', task['job'] + '.json'), result)
+    os.remove(os.path.join(queue, 'claimed', str(worker), '%06d_%s.json' % (task['seq'], task['job'])))
+
+
+def fail(queue, task, worker, error):
+    """Record a task as failed without a deck; returns the result."""
+    result = {'job': task['job'], 'worker': worker, 'inp': None, 'error': error, 'seconds': 0.0}
+    _write_json(os.path.join(queue, 'done', task['job'] + '.json'), result)
+    return result
+
+
+def requeue(queue, worker, max_attempts=MAX_ATTEMPTS):
+    """Put back the tasks a worker claimed but did not finish; returns the (requeued, failed) tasks.
+
+    A task that has now taken down `max_attempts` workers is failed instead.
+    """
+    requeued, failed = [], []
+    for path in glob.glob(os.path.join(queue, 'claimed', str(worker), '*.json')):
+        with open(path) as f:
+            task = json.load(f)
+        task['attempts'] = task.get('attempts', 0) + 1
+        if task['attempts'] >= max_attempts:
+            fail(queue, task, worker, 'worker %s exited while building it, %d attempts' % (worker, task['attempts']))
+            os.remove(path)
+            failed.append(task)
+        else:
+            _write_json(path, task)
+            os.rename(path, os.path.join(queue, 'pending', os.path.basename(path)))
+            requeued.append(task)
+    return requeued, failed
+
+
+# --------------------------------------------------------------------------
+# Worker (CAE)
+# --------------------------------------------------------------------------
+def reset(study):
+    """Delete the models and jobs of finished cases, except the part cache's source models."""
+    mdb = study.mdb
+    keep = set(study.myPartCache.values()) | set(['Model-1'])
+    for name in mdb.jobs.keys():
+        del mdb.jobs[name]
+    for name in mdb.models.keys():
+        if name not in keep:
+            del mdb.models[name]
+
+
+def worker(queue, name, recycle=50, poll=0.2, part_models=4):
+    """Build the tasks of the spool until STOP, or until `recycle` cases are done."""
+    from fep import spec
+
+    study = spec.study_module()
+    study.Import_CAE()
+    study.myPartCache.max_entries = part_models     # each entry keeps a whole model alive
+    os.makedirs(os.path.join(queue, 'claimed', str(name)), exist_ok=True)
+    done = 0
+    while done < recycle:
+        task = claim(queue, name)
+        if task is None:
+            if os.path.exists(os.path.join(queue, STOP_FILE)):
+                break
+            time.sleep(poll)
+            continue
+        start = time.time()
+        result = {'job': task['job'], 'worker': name, 'inp': os.path.join(task['out_dir'], task['job'] + '.inp'),
+                  'error': None}
+        cwd = os.getcwd()
+        os.chdir(task['out_dir'])      # writeInput() writes <job>.inp to the working directory
+        try:
+            spec.ModelSpec(task['params'], **task['settings']).build(task['job'])
+            study.mdb.jobs[task['job']].writeInput(consistencyChecking=study.OFF)
+        except Exception:
+            result['error'] = traceback.format_exc()
+        finally:
+            os.chdir(cwd)
+        reset(study)
+        result['seconds'] = round(time.time() - start, 3)
+        finish(queue, name, task, result)
+        done += 1
+    return done
+
+
+# --------------------------------------------------------------------------
+# Driver
+# --------------------------------------------------------------------------
+class Pool(object):
+    """K worker processes over one spool directory."""
+
+    def __init__(self, queue, workers, command=CAE_COMMAND, recycle=50, poll=1.0, log=None,
+                 max_attempts=MAX_ATTEMPTS, max_restarts=MAX_RESTARTS):
+        self.queue = queue
+        self.workers = workers
+        self.command = command
+        self.recycle = recycle
+        self.poll = poll
+        self.log = log or (lambda message: sys.stdout.write(message + '\n'))
+        self.max_attempts = max_attempts
+        self.max_restarts = max_restarts
+        self.processes = {}
+        self.fruitless = {}         # worker -> starts in a row that wrote no deck
+        self.written = {}           # worker -> decks written by its current process
+        self.starts = 0
+        for sub in ('pending', 'claimed', 'done'):
+            os.makedirs(os.path.join(queue, sub), exist_ok=True)
+        if os.path.exists(os.path.join(queue, STOP_FILE)):
+            os.remove(os.path.join(queue, STOP_FILE))
+
+    def _start(self, name):
+        argv = [part.format(script=os.path.abspath(__file__), queue=self.queue, worker=name, recycle=self.recycle)
+                for part in self.command]
+        log = open(os.path.join(self.queue, 'worker_%s.log' % name), 'a')
+        self.processes[name] = subprocess.Popen(argv, stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+        self.written[str(name)] = 0     # results name their worker as given on its command line
+        self.starts += 1
+
+    def _pending(self):
+        return sorted(glob.glob(os.path.join(self.queue, 'pending', '*.json')))
+
+    def _give_up(self):
+        """Fail the pending tasks: no worker slot can be restarted any more."""
+        for path in self._pending():
+            with open(path) as f:
+                task = json.load(f)
+            fail(self.queue, task, None, 'no worker left: every worker exited %d times in a row without a deck'
+                 % self.max_restarts)
+            os.remove(path)
+
+    def run(self, tasks):
+        """Queue the tasks and keep the workers going until every one has a result; returns {job: result}.
+
+        Tasks the workers could not build have a result with the error and no deck.
+        """
+        for task in tasks:
+            put(self.queue, task)
+        jobs = set(task['job'] for task in tasks)
+        results = {}
+        while True:
+            # exits first, so the decks a worker wrote before exiting are counted below
+            exited = [name for name, process in self.processes.items() if process.poll() is not None]
+            for path in glob.glob(os.path.join(self.queue, 'done', '*.json')):
+                job = os.path.splitext(os.path.basename(path))[0]
+                if job in jobs and job not in results:
+                    with open(path) as f:
+                        results[job] = json.load(f)
+                    if not results[job]['error'] and results[job]['worker'] in self.written:
+                        self.written[results[job]['worker']] += 1
+                    self.log('%-24s %-8s %6.1f s  worker %s' % (job, 'failed' if results[job]['error'] else 'written',
+                                                              results[job]['seconds'], results[job]['worker']))
+            if len(results) == len(jobs):
+                break
+            for name in exited:
+                self._exited(name, self.processes.pop(name).returncode)
+            running = False
+            for name in range(self.workers):
+                if name in self.processes:
+                    running = True
+                elif self.fruitless.get(name, 0) < self.max_restarts and self._pending():
+                    self._start(name)
+                    running = True
+            if not running and self._pending():
+                self._give_up()
+                continue
+            time.sleep(self.poll)
+        self.stop()
+        return results
+
+    def _exited(self, name, returncode):
+        requeued, failed = requeue(self.queue, name, self.max_attempts)
+        for task in requeued:
+            self.log('worker %s exited (%s) holding %s, put back' % (name, returncode, task['job']))
+        for task in failed:
+            self.log('worker %s exited (%s) holding %s, failed after %d attempts'
+                     % (name, returncode, task['job'], task['attempts']))
+        self.fruitless[name] = 0 if self.written.pop(str(name)) else self.fruitless.get(name, 0) + 1
+        if self.fruitless[name] >= self.max_restarts:
+            self.log('worker %s exited %d times in a row without a deck, not restarted' % (name, self.fruitless[name]))
+
+    def stop(self, timeout=60.0):
+        open(os.path.join(self.queue, STOP_FILE), 'w').close()
+        deadline = time.time() + timeout
+        for process in self.processes.values():
+            try:
+                process.wait(max(deadline - time.time(), 0.1))
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def run(cases, base, out_dir, workers, command=CAE_COMMAND, settings=None, recycle=50, queue=None, db=None,
+        log=None, max_attempts=MAX_ATTEMPTS, max_restarts=MAX_RESTARTS):
+    """Decks of every buildable case of a sweep, written by the pool; returns (manifest path, failed jobs)."""
+    from fep import doe, spec
+    from fep.inp_writer import HALF_REACTION_SCALE
+
+    log = log or (lambda message: sys.stdout.write(message + '\n'))
+    out_dir = os.path.abspath(out_dir)
+    queue = os.path.abspath(queue or os.path.join(out_dir, '.cae_queue'))
+    study = spec.study_module()
+    settings = dict(study.Model_Settings(), **(settings or {}))
+    plan = spec.plan(cases, base, **settings)
+    tasks, skipped = [], set()
+    for seq, (name, case_spec, same) in enumerate(plan):
+        problems = case_spec.problems()
+        if problems:
+            log('%-24s skipped: %s' % (name, '; '.join(problems)))
+            skipped.add(name)
+        elif same is None:
+            tasks.append({'seq': seq, 'job': name, 'params': case_spec.case, 'settings': case_spec.settings,
+                          'out_dir': out_dir})
+    start = time.time()
+    if os.path.isdir(queue):
+        shutil.rmtree(queue)
+    pool = Pool(queue, min(workers, len(tasks)) or 1, command, recycle, log=log, max_attempts=max_attempts,
+                max_restarts=max_restarts)
+    results = pool.run(tasks)
+    log('%d decks in %.1f s with %d worker starts' % (len(tasks), time.time() - start, pool.starts))
+
+    entries, failed = [], []
+    for name, case_spec, same in plan:
+        result = results.get(same or name)
+        if name in skipped or result is None or result['error']:
+            if result is not None and result['error']:
+                failed.append(name)
+                if same is None:
+                    log('%s failed:\n%s' % (name, result['error']))
+            continue
+        entries.append({'job': name, 'inp': result['inp'], 'cpus': study.myCpusPerJob, 'params': case_spec.case})
+        if same is not None:
+            entries[-1]['same_as'] = same       # same model: not solved again
+        if settings.get('myHalfModel'):
+            entries[-1]['reaction_scale'] = HALF_REACTION_SCALE
+    manifest = doe.save_manifest(out_dir, base, entries)
+    if db is not None:
+        db.register_manifest(manifest)
+    return manifest, failed
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if '--' in argv:                        # abaqus cae noGUI=cae_pool.py -- worker ...
+        argv = argv[argv.index('--') + 1:]
+    if argv[:1] == ['worker']:
+        parser = argparse.ArgumentParser(prog='cae_pool worker')
+        parser.add_argument('queue')
+        parser.add_argument('worker')
+        parser.add_argument('--recycle', type=int, default=50)
+        parser.add_argument('--standin', action='store_true')
+        args = parser.parse_args(argv[1:])
+        if args.standin:
+            from fep import cae_standin
+            cae_standin.install()
+        worker(args.queue, args.worker, args.recycle)
+        return 0
+
+    from fep import doe, spec
+
+    parser = argparse.ArgumentParser(description='Write the decks of a sweep with a pool of warm CAE workers.')
+    parser.add_argument('sweep', help='sweep spec (fep.doe)')
+    parser.add_argument('--model', default='Column_Trial_5', help='base model name')
+    parser.add_argument('--out', default='models', help='decks and <model>_sweep.json go here')
+    parser.add_argument('--workers', type=int, default=4, help='CAE processes (each takes a CAE license)')
+    parser.add_argument('--recycle', type=int, default=50, help='cases per worker process before it is restarted')
+    parser.add_argument('--attempts', type=int, default=MAX_ATTEMPTS,
+                        help='workers a case may take down before it is failed')
+    parser.add_argument('--restarts', type=int, default=MAX_RESTARTS,
+                        help='starts in a row without a deck before a worker is not restarted')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='model setting of the study script (JSON value)')
+    parser.add_argument('--abaqus', default='abaqus', help='Abaqus launcher command')
+    parser.add_argument('--standin', action='store_true', help='plain Python workers on fep.cae_standin')
+    parser.add_argument('--db', default=None, help='case database (fep.casedb), e.g. results/cases.sqlite')
+    args = parser.parse_args(argv)
+    command = STANDIN_COMMAND if args.standin else (args.abaqus,) + CAE_COMMAND[1:]
+    db = None
+    if args.db:
+        from fep import casedb
+        db = casedb.CaseDB(args.db)
+    os.makedirs(args.out, exist_ok=True)
+    cases = doe.generate(doe.load_spec(args.sweep))
+    manifest, failed = run(cases, args.model, args.out, args.workers, command,
+                           dict(spec._setting(text) for text in args.set), args.recycle, db=db,
+                           max_attempts=args.attempts, max_restarts=args.restarts)
+    if failed:
+        sys.stderr.write('no deck for: %s\n' % ', '.join(failed))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    # Run as a script by the workers: by CAE (no __file__ there) or by Python.
+    import inspect
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))))
+    sys.exit(main())
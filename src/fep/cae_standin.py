@@ -0,0 +1,919 @@
+"""
+=======================================================================
+ fep.cae_standin – recording stand-in for the Abaqus/CAE kernel
+=======================================================================
+ install() registers modules abaqus, abaqusConstants, part, mesh,
+ regionToolset, ... so that P1_FEP_ParametricStudy.py runs in plain
+ Python, without a license, e.g. under fep.profiler.  Every call the
+ script makes on mdb is appended to the journal of its model, and
+ writeInput() writes that journal as the "input deck" of the job.
+
+ The geometry is a box complex, enough for the selections of
+ fep.selection and for entity counts that grow as they do in CAE:
+
+ * a solid is a list of axis-aligned box cells (an extruded outline
+   is the rectangles it encloses, e.g. flange, web and flange of an
+   I-section; a sketch of circles only gives round cells, with a
+   curved side face and arc edges); faces, edges and vertices are the
+   distinct faces, edges and corners of the cells;
+ * sketch circles inside the outline, and HoleBlindFromEdges, add a
+   curved hole face and its rim arcs; a blind hole ends where the
+   cells it runs through end, at most at its depth;
+ * datum plane partitions split every cell, face or hole they cross,
+   CutExtrude removes what lies inside the cut;
+ * generateMesh() counts structured elements per cell from the part
+   and edge seeds.
+
+ Anything else (materials, steps, loads, session viewports) is a
+ generic recorder: calls are journalled and return another recorder.
+=======================================================================
+"""
+
+import copy
+import math
+import sys
+import types
+
+import numpy as np
+
+
+EPS = 1e-6
+CONSTANTS = ('ANALYSIS', 'B31', 'C3D8R', 'CARTESIAN', 'COMPUTED', 'CONSTANT_THROUGH_THICKNESS', 'COPLANAR_EDGES',
+             'DEFAULT', 'DEFORMABLE_BODY', 'DISTRIBUTING', 'DURING_ANALYSIS', 'EXCLUDE', 'FINER', 'FINITE',
+             'FRACTION', 'FROM_FILE', 'FROM_SECTION', 'GLOBAL', 'GRADIENT', 'HARD', 'HEX_DOMINATED', 'IMPRINT',
+             'ISOTROPIC', 'KINEMATIC', 'LEFT', 'LINEAR', 'MEDIAL_AXIS', 'MIDDLE_SURFACE', 'N1_COSINES', 'NONE',
+             'NO_IDEALIZATION', 'ODB', 'OFF', 'OMIT', 'ON', 'PENALTY', 'PERCENTAGE', 'RIGHT', 'S4R', 'SELF',
+             'SEPARATE', 'SET', 'SIDE1', 'SIDE2', 'SIMPSON', 'SINGLE', 'SOLVER_DEFAULT', 'STANDALONE', 'STANDARD',
+             'STEP', 'SUPERIMPOSE', 'SWEEP', 'THREE_D', 'UNIFORM', 'UNSET', 'WHOLE_SURFACE', 'XAXIS', 'XSYMM',
+             'XYPLANE', 'XZPLANE', 'YAXIS', 'YZPLANE', 'ZAXIS')
+# normal axis of a principal plane, direction of a principal axis
+PLANE_AXIS = {'YZPLANE': 0, 'XZPLANE': 1, 'XYPLANE': 2}
+AXIS = {'XAXIS': 0, 'YAXIS': 1, 'ZAXIS': 2}
+# sketch (u, v) axes of a plane with the given normal
+SKETCH_AXES = {0: (1, 2), 1: (0, 2), 2: (0, 1)}
+
+
+class SymbolicConstant(str):
+    pass
+
+
+def _text(value):
+    if isinstance(value, (int, float, str, type(None))):
+        return repr(value)
+    if isinstance(value, (tuple, list)) and len(value) <= 4:
+        return '(%s)' % ', '.join(_text(v) for v in value)
+    return '<%s>' % type(value).__name__
+
+
+def _call_text(path, args, kwargs):
+    return '%s(%s)' % (path, ', '.join([_text(a) for a in args] +
+                                       ['%s=%s' % (k, _text(v)) for k, v in sorted(kwargs.items())]))
+
+
+class Recorder(object):
+    """Any CAE object the stand-in has no model of: journals its calls."""
+
+    def __init__(self, journal, path, profile_name):
+        self._journal = journal
+        self._path = path
+        self.profile_name = profile_name
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Recorder(self._journal, self._path + '.' + name, self.profile_name + '.' + name)
+
+    def __getitem__(self, key):
+        return Recorder(self._journal, '%s[%r]' % (self._path, key), self.profile_name + '[]')
+
+    def __call__(self, *args, **kwargs):
+        self._journal.append(_call_text(self._path, args, kwargs))
+        return Recorder(self._journal, self._path + '()', self.profile_name + '()')
+
+    def __add__(self, other):
+        return self
+
+    def __iter__(self):
+        return iter(())
+
+
+class _Recording(object):
+    """Base of the modelled objects: unknown attributes are recorders."""
+
+    _journal = None
+    _path = ''
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return Recorder(self._journal, self._path + '.' + name, type(self).__name__ + '.' + name)
+
+    def _record(self, name, kwargs):
+        self._journal.append(_call_text(self._path + '.' + name, (), kwargs))
+
+
+class Repository(dict):
+
+    def keys(self):
+        return list(dict.keys(self))
+
+    def values(self):
+        return list(dict.values(self))
+
+
+# --------------------------------------------------------------------------
+# Entities
+# --------------------------------------------------------------------------
+class Entity(object):
+
+    def __init__(self, lo, hi, vertices=(), radius=None):
+        self.lo, self.hi = lo, hi
+        self.vertices = vertices
+        self.radius = radius
+        self.pointOn = (tuple(float(v) for v in (lo + hi)/2.0),)
+
+    def getVertices(self):
+        return self.vertices
+
+    def getRadius(self):
+        if self.radius is None:
+            raise ValueError('Not a circular edge')
+        return self.radius
+
+
+class EntityArray(object):
+    """CellArray / FaceArray / EdgeArray / VertexArray of a part or instance.
+
+    As in CAE, p.faces taken before a feature sees the faces after it:
+    `entities` is a list, or a function returning the current list.
+    An index past the end wraps around, since the stand-in's entities
+    are fewer than CAE's.
+    """
+
+    def __init__(self, entities, profile_name):
+        self._entities = entities if callable(entities) else list(entities)
+        self.profile_name = profile_name
+
+    @property
+    def entities(self):
+        return self._entities() if callable(self._entities) else self._entities
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return EntityArray(self.entities[key], self.profile_name)
+        entities = self.entities
+        return entities[key % len(entities)]
+
+    def __add__(self, other):
+        return EntityArray(self.entities + list(other), self.profile_name)
+
+    def findAt(self, *points):
+        found = []
+        for point in points:
+            if len(point) and isinstance(point[0], (tuple, list)):
+                point = point[0]
+            found.append(_nearest(self.entities, np.array(point, dtype=float)))
+        return EntityArray([e for e in found if e is not None], self.profile_name)
+
+    def getSequenceFromMask(self, mask):
+        entities = self.entities
+        found = []
+        for text in mask:
+            for n, word in enumerate(text.strip('[] ').split()):
+                bits = int(word.lstrip('#'), 16)
+                found += [entities[(32*n + b) % len(entities)] for b in range(32) if bits >> b & 1]
+        return EntityArray(found, self.profile_name)
+
+    def getByBoundingBox(self, xMin=-np.inf, yMin=-np.inf, zMin=-np.inf, xMax=np.inf, yMax=np.inf, zMax=np.inf):
+        lo, hi = np.array([xMin, yMin, zMin]) - EPS, np.array([xMax, yMax, zMax]) + EPS
+        return EntityArray([e for e in self.entities if np.all(e.lo >= lo) and np.all(e.hi <= hi)],
+                           self.profile_name)
+
+
+def _nearest(entities, point):
+    """The smallest entity whose box contains point, else the one with the nearest centre."""
+    best, best_key = None, None
+    for entity in entities:
+        outside = np.maximum(entity.lo - point, 0.0) + np.maximum(point - entity.hi, 0.0)
+        key = (float(outside.sum()), float(np.prod(np.maximum(entity.hi - entity.lo, EPS))))
+        if best_key is None or key < best_key:
+            best, best_key = entity, key
+    return best
+
+
+class MeshArray(object):
+    """Nodes or elements of a mesh, by count only."""
+
+    def __init__(self, count, journal, profile_name):
+        self.count = count
+        self._journal = journal
+        self.profile_name = profile_name
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, key):
+        return self
+
+    def getByBoundingBox(self, **box):
+        return Recorder(self._journal, self.profile_name + '.getByBoundingBox()', self.profile_name)
+
+
+# --------------------------------------------------------------------------
+# Box geometry
+# --------------------------------------------------------------------------
+def _box(lo, hi):
+    lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+    return np.minimum(lo, hi), np.maximum(lo, hi)
+
+
+def _key(lo, hi, tag=None):
+    return (tuple(np.round(lo, 6)), tuple(np.round(hi, 6)), tag)
+
+
+def _split(items, axis, value):
+    """Items ((lo, hi, ...) dicts) cut by the plane coordinate[axis] == value."""
+    out = []
+    for item in items:
+        lo, hi = item['lo'], item['hi']
+        if lo[axis] < value - EPS and hi[axis] > value + EPS:
+            below, above = copy.deepcopy(item), copy.deepcopy(item)
+            below['hi'] = hi.copy()
+            below['hi'][axis] = value
+            above['lo'] = lo.copy()
+            above['lo'][axis] = value
+            if item.get('round') is not None and item['round'] != axis:
+                below['flats'] = item['flats'] | set([(axis, 1)])
+                above['flats'] = item['flats'] | set([(axis, 0)])
+            out += [below, above]
+        else:
+            out.append(item)
+    return out
+
+
+def _face_boxes(lo, hi):
+    """The six faces of a box, by axis and side."""
+    faces = []
+    for axis in range(3):
+        for side, value in ((0, lo[axis]), (1, hi[axis])):
+            f_lo, f_hi = lo.copy(), hi.copy()
+            f_lo[axis] = f_hi[axis] = value
+            faces.append((axis, side, f_lo, f_hi))
+    return faces
+
+
+def _edge_boxes(lo, hi):
+    """The edges of a box or of a planar rectangle (one axis of zero extent)."""
+    edges = []
+    for axis in range(3):
+        others = [a for a in range(3) if a != axis]
+        for c0 in set([lo[others[0]], hi[others[0]]]):
+            for c1 in set([lo[others[1]], hi[others[1]]]):
+                e_lo, e_hi = lo.copy(), hi.copy()
+                e_lo[others[0]] = e_hi[others[0]] = c0
+                e_lo[others[1]] = e_hi[others[1]] = c1
+                if e_hi[axis] - e_lo[axis] > EPS:
+                    edges.append((e_lo, e_hi))
+    return edges
+
+
+def _rotation(direction, angle):
+    axis = np.asarray(direction, dtype=float)
+    axis = axis/np.linalg.norm(axis)
+    k = np.array([[0.0, -axis[2], axis[1]], [axis[2], 0.0, -axis[0]], [-axis[1], axis[0], 0.0]])
+    a = math.radians(angle)
+    return np.eye(3) + math.sin(a)*k + (1.0 - math.cos(a))*k.dot(k)
+
+
+# --------------------------------------------------------------------------
+# Sketch
+# --------------------------------------------------------------------------
+class Sketch(_Recording):
+
+    def __init__(self, journal, path, transform=None):
+        self._journal = journal
+        self._path = path
+        self.transform = transform
+        self.geometry = {}
+
+    def _add(self, kind, points, radius=None):
+        self.geometry[len(self.geometry) + 2] = (kind, np.array(points, dtype=float), radius)
+
+    def Line(self, point1, point2, **kwargs):
+        self._record('Line', dict(kwargs, point1=point1, point2=point2))
+        self._add('line', (point1, point2))
+
+    def rectangle(self, point1, point2):
+        self._record('rectangle', dict(point1=point1, point2=point2))
+        (x0, y0), (x1, y1) = point1, point2
+        for a, b in (((x0, y0), (x1, y0)), ((x1, y0), (x1, y1)), ((x1, y1), (x0, y1)), ((x0, y1), (x0, y0))):
+            self._add('line', (a, b))
+
+    def CircleByCenterPerimeter(self, center, point1):
+        self._record('CircleByCenterPerimeter', dict(center=center, point1=point1))
+        self._add('circle', (center,), math.hypot(point1[0]-center[0], point1[1]-center[1]))
+
+    def linearPattern(self, geomList, vertexList=(), number1=1, spacing1=0.0, angle1=0.0, number2=1,
+                      spacing2=0.0, angle2=90.0):
+        self._record('linearPattern', dict(number1=number1, spacing1=spacing1, angle1=angle1, number2=number2,
+                                           spacing2=spacing2, angle2=angle2))
+        d1 = spacing1*np.array([math.cos(math.radians(angle1)), math.sin(math.radians(angle1))])
+        d2 = spacing2*np.array([math.cos(math.radians(angle2)), math.sin(math.radians(angle2))])
+        for kind, points, radius in list(geomList):
+            for i in range(number1):
+                for j in range(number2):
+                    if i or j:
+                        self._add(kind, points + i*d1 + j*d2, radius)
+
+    def items(self, kind):
+        return [(points, radius) for k, points, radius in self.geometry.values() if k == kind]
+
+    def rectangles(self):
+        """[(lo, hi), ...] covering the region the lines enclose, one per run of grid cells in a row.
+
+        The grid is that of the line end points; a grid cell is inside
+        when a ray from its centre crosses the outline an odd number of
+        times.  An open outline is its bounding box.
+        """
+        lines = [points for points, _ in self.items('line')]
+        us = np.unique(np.round([p[0] for points in lines for p in points], 9))
+        vs = np.unique(np.round([p[1] for points in lines for p in points], 9))
+        out = []
+        for v0, v1 in zip(vs[:-1], vs[1:]):
+            run = None
+            for u0, u1 in zip(us[:-1], us[1:]):
+                u, v = (u0 + u1)/2.0, (v0 + v1)/2.0
+                crossings = sum(1 for a, b in lines
+                                if (a[1] > v) != (b[1] > v) and u < a[0] + (v - a[1])*(b[0] - a[0])/(b[1] - a[1]))
+                if crossings % 2:
+                    run = (run[0], u1) if run else (u0, u1)
+                    continue
+                if run:
+                    out.append((np.array([run[0], v0]), np.array([run[1], v1])))
+                run = None
+            if run:
+                out.append((np.array([run[0], v0]), np.array([run[1], v1])))
+        return out or [self.bounds()]
+
+    def bounds(self):
+        """(lo, hi) of the sketch in its own (u, v) coordinates."""
+        points = [p for points, _ in self.items('line') for p in points]
+        points += [p + s*r for (c,), r in self.items('circle') for p in (c,) for s in (-1.0, 1.0)]
+        points = np.array(points, dtype=float)
+        return points.min(axis=0), points.max(axis=0)
+
+
+class Transform(object):
+
+    def __init__(self, normal, origin):
+        self.normal = normal
+        self.origin = np.array(origin, dtype=float)
+
+    def box(self, lo2, hi2, n0, n1):
+        """3-D box of the sketch rectangle lo2..hi2 from n0 to n1 along the normal."""
+        u, v = SKETCH_AXES[self.normal]
+        lo, hi = self.origin.copy(), self.origin.copy()
+        lo[u], lo[v], hi[u], hi[v] = self.origin[u] + lo2[0], self.origin[v] + lo2[1], \
+            self.origin[u] + hi2[0], self.origin[v] + hi2[1]
+        lo[self.normal], hi[self.normal] = n0, n1
+        return _box(lo, hi)
+
+
+# --------------------------------------------------------------------------
+# Part
+# --------------------------------------------------------------------------
+class Datum(object):
+
+    def __init__(self, id, axis, value=None):
+        self.id = id
+        self.axis = axis
+        self.value = value
+
+
+class Part(_Recording):
+
+    def __init__(self, model, name):
+        self._model = model
+        self._journal = model._journal
+        self._path = 'mdb.models[%r].parts[%r]' % (model.name, name)
+        self.name = name
+        self.cells_ = []        # {'lo', 'hi', 'round': axis or None, 'flats': {(axis, side)}}
+        self.sheets = []        # shell faces {'lo', 'hi'}
+        self.wires = []         # {'lo', 'hi'}
+        self.holes = []         # curved faces and rim arcs {'lo', 'hi', 'kind', 'radius'}
+        self.datums = {}
+        self._features = 0
+        self.seed_size = None
+        self.edge_seeds = {}
+        self.mesh = (0, 0)
+        self._derived = None
+
+    def _changed(self):
+        self._derived = None
+        self.mesh = (0, 0)
+
+    def copy_from(self, other):
+        for name in ('cells_', 'sheets', 'wires', 'holes', 'datums', '_features', 'seed_size', 'edge_seeds',
+                     'mesh'):
+            setattr(self, name, copy.deepcopy(getattr(other, name)))
+        self._derived = None
+
+    # -- derived entities -------------------------------------------------
+    def derived(self):
+        if self._derived is None:
+            self._derived = self._derive()
+        return self._derived
+
+    def _derive(self):
+        faces, edges = [], []
+        cells = []
+        for cell in self.cells_:
+            lo, hi = cell['lo'], cell['hi']
+            cells.append((lo, hi, None))
+            if cell['round'] is None:
+                boxes = _face_boxes(lo, hi)
+                faces += [(f_lo, f_hi, None) for _, _, f_lo, f_hi in boxes]
+                edges += [(e_lo, e_hi, None) for e_lo, e_hi in _edge_boxes(lo, hi)]
+                continue
+            radius = max(hi - lo)/2.0
+            faces.append((lo, hi, 'curved'))
+            for axis, side, f_lo, f_hi in _face_boxes(lo, hi):
+                if axis == cell['round']:
+                    faces.append((f_lo, f_hi, None))
+                    edges.append((f_lo, f_hi, radius))
+                elif (axis, side) in cell['flats']:
+                    faces.append((f_lo, f_hi, None))
+                    edges += [(e_lo, e_hi, None) for e_lo, e_hi in _edge_boxes(f_lo, f_hi)]
+        for sheet in self.sheets:
+            faces.append((sheet['lo'], sheet['hi'], None))
+            edges += [(e_lo, e_hi, None) for e_lo, e_hi in _edge_boxes(sheet['lo'], sheet['hi'])]
+        edges += [(wire['lo'], wire['hi'], None) for wire in self.wires]
+        for hole in self.holes:
+            if hole['kind'] == 'face':
+                faces.append((hole['lo'], hole['hi'], 'curved' if hole['radius'] else None))
+            else:
+                edges.append((hole['lo'], hole['hi'], hole['radius']))
+
+        vertices, points = {}, []
+
+        def corners(lo, hi):
+            ids = []
+            for point in (lo, hi):
+                key = tuple(np.round(point, 6))
+                if key not in vertices:
+                    vertices[key] = len(points)
+                    points.append(point)
+                ids.append(vertices[key])
+            return tuple(ids)
+
+        out = {}
+        for kind, items in (('cells', cells), ('faces', faces), ('edges', edges)):
+            seen, entities = set(), []
+            for lo, hi, tag in items:
+                key = _key(lo, hi, tag if kind != 'edges' else tag is not None)
+                if key in seen:
+                    continue
+                seen.add(key)
+                entities.append(Entity(lo, hi, corners(lo, hi), tag if kind == 'edges' else None))
+            out[kind] = entities
+        out['vertices'] = [Entity(p, p) for p in points]
+        return out
+
+    def _array(self, kind):
+        return EntityArray(lambda: self.derived()[kind], kind[:-1].capitalize() + 'Array')
+
+    @property
+    def cells(self):
+        return self._array('cells')
+
+    @property
+    def faces(self):
+        return self._array('faces')
+
+    @property
+    def edges(self):
+        return self._array('edges')
+
+    @property
+    def vertices(self):
+        return self._array('vertices')
+
+    @property
+    def elements(self):
+        return MeshArray(self.mesh[0], self._journal, 'MeshElementArray')
+
+    @property
+    def nodes(self):
+        return MeshArray(self.mesh[1], self._journal, 'MeshNodeArray')
+
+    def bounds(self):
+        boxes = [(c['lo'], c['hi']) for c in self.cells_ + self.sheets + self.wires]
+        if not boxes:
+            return np.zeros(3), np.zeros(3)
+        return np.min([b[0] for b in boxes], axis=0), np.max([b[1] for b in boxes], axis=0)
+
+    # -- features ---------------------------------------------------------
+    def _solid(self, sketch, n0, n1, transform=None):
+        """Cells (and through holes) of a sketch extruded from n0 to n1 along the sketch normal."""
+        transform = transform or Transform(2, (0.0, 0.0, 0.0))
+        circles = sketch.items('circle')
+        if sketch.items('line'):
+            for lo2, hi2 in sketch.rectangles():
+                lo, hi = transform.box(lo2, hi2, n0, n1)
+                self.cells_.append({'lo': lo, 'hi': hi, 'round': None, 'flats': set()})
+            for (c,), r in circles:
+                self._hole(transform.box(c - r, c + r, n0, n1), r, transform.normal, ends=(n0, n1))
+        else:
+            for (c,), r in circles:
+                lo, hi = transform.box(c - r, c + r, n0, n1)
+                self.cells_.append({'lo': lo, 'hi': hi, 'round': transform.normal, 'flats': set()})
+        self._changed()
+
+    def _hole(self, box, radius, axis, ends, bottom=None):
+        lo, hi = box
+        self.holes.append({'lo': lo, 'hi': hi, 'kind': 'face', 'radius': radius})
+        for end in ends:
+            r_lo, r_hi = lo.copy(), hi.copy()
+            r_lo[axis] = r_hi[axis] = end
+            self.holes.append({'lo': r_lo, 'hi': r_hi, 'kind': 'edge', 'radius': radius})
+            if end == bottom:
+                self.holes.append({'lo': r_lo, 'hi': r_hi, 'kind': 'face', 'radius': None})
+
+    def BaseSolidExtrude(self, sketch, depth, **kwargs):
+        self._record('BaseSolidExtrude', dict(kwargs, depth=depth))
+        self._solid(sketch, 0.0, depth)
+
+    def BaseShellExtrude(self, sketch, depth, **kwargs):
+        self._record('BaseShellExtrude', dict(kwargs, depth=depth))
+        for (a, b), _ in sketch.items('line'):
+            lo, hi = _box((a[0], a[1], 0.0), (b[0], b[1], depth))
+            self.sheets.append({'lo': lo, 'hi': hi})
+        self._changed()
+
+    def WirePolyLine(self, points, **kwargs):
+        self._record('WirePolyLine', kwargs)
+        for a, b in points:
+            lo, hi = _box(a, b)
+            self.wires.append({'lo': lo, 'hi': hi})
+        self._changed()
+
+    def _direction(self, transform, flip):
+        """+1 or -1 along the sketch normal: away from the part, or into it for a cut.
+
+        A sketch plane inside the part (a datum plane) cuts along its
+        normal, as the lower end of the part does.
+        """
+        lo, hi = self.bounds()
+        n, o = transform.normal, transform.origin[transform.normal]
+        sign = 1.0 if o >= hi[n] - EPS and o > lo[n] + EPS else -1.0
+        return -sign if flip == 'ON' else sign
+
+    def SolidExtrude(self, sketch, depth, flipExtrudeDirection='OFF', **kwargs):
+        self._record('SolidExtrude', dict(kwargs, depth=depth))
+        t = sketch.transform
+        o = t.origin[t.normal]
+        self._solid(sketch, o, o + self._direction(t, flipExtrudeDirection)*depth, t)
+
+    def CutExtrude(self, sketch, depth=None, flipExtrudeDirection='OFF', **kwargs):
+        self._record('CutExtrude', dict(kwargs, depth=depth))
+        t = sketch.transform
+        o = t.origin[t.normal]
+        if depth is None:
+            n0, n1 = -np.inf, np.inf
+        else:
+            n0, n1 = sorted((o, o - self._direction(t, flipExtrudeDirection)*depth))
+        lo, hi = t.box(*(sketch.bounds() + (n0, n1)))
+        for axis in range(3):
+            for value in (lo[axis], hi[axis]):
+                if np.isfinite(value):
+                    self._partition(axis, value)
+        inside = lambda item: np.all(item['lo'] >= lo - EPS) and np.all(item['hi'] <= hi + EPS)
+        for name in ('cells_', 'sheets', 'wires', 'holes'):
+            setattr(self, name, [item for item in getattr(self, name) if not inside(item)])
+        self._changed()
+
+    def HoleBlindFromEdges(self, plane, edge1, edge2, diameter, distance1, distance2, depth, **kwargs):
+        self._record('HoleBlindFromEdges', dict(kwargs, diameter=diameter, distance1=distance1,
+                                                distance2=distance2, depth=depth))
+        normal = int(np.argmin(plane.hi - plane.lo))
+        centre = (plane.lo + plane.hi)/2.0
+        for edge, distance in ((edge1, distance1), (edge2, distance2)):
+            axis = [a for a in range(3) if a != normal and edge.hi[a] - edge.lo[a] <= EPS][0]
+            centre[axis] = edge.lo[axis] + math.copysign(distance, centre[axis] - edge.lo[axis])
+        part_lo, part_hi = self.bounds()
+        inward = -1.0 if plane.lo[normal] >= part_hi[normal] - EPS else 1.0
+        top = plane.lo[normal]
+        bottom = self._material_end(centre, normal, top, inward, top + inward*depth)
+        lo, hi = centre - diameter/2.0, centre + diameter/2.0
+        lo[normal], hi[normal] = sorted((top, bottom))
+        self._hole((lo, hi), diameter/2.0, normal, ends=(top, bottom), bottom=bottom)
+        self._changed()
+
+    def _material_end(self, point, axis, start, inward, end):
+        """How far solid runs from start towards end along the line through point, as for a blind hole.
+
+        Cells on the line are followed while they touch, so a hole
+        through a flange stops at the flange's inner face.
+        """
+        others = [a for a in range(3) if a != axis]
+        spans = [(cell['lo'][axis], cell['hi'][axis]) for cell in self.cells_
+                 if all(cell['lo'][a] - EPS <= point[a] <= cell['hi'][a] + EPS for a in others)]
+        reach, grown = start, True
+        while grown:
+            grown = False
+            for lo, hi in spans:
+                if inward > 0 and lo <= reach + EPS and hi > reach + EPS:
+                    reach, grown = hi, True
+                elif inward < 0 and hi >= reach - EPS and lo < reach - EPS:
+                    reach, grown = lo, True
+        return float(min(reach, end) if inward > 0 else max(reach, end))
+
+    # -- datums and partitions --------------------------------------------
+    def _datum(self, axis, value=None):
+        self._features += 1
+        self.datums[self._features] = Datum(self._features, axis, value)
+        return self.datums[self._features]
+
+    def DatumPlaneByPrincipalPlane(self, principalPlane, offset):
+        self._record('DatumPlaneByPrincipalPlane', dict(principalPlane=principalPlane, offset=offset))
+        return self._datum(PLANE_AXIS[principalPlane], offset)
+
+    def DatumAxisByPrincipalAxis(self, principalAxis):
+        self._record('DatumAxisByPrincipalAxis', dict(principalAxis=principalAxis))
+        return self._datum(AXIS[principalAxis])
+
+    def MakeSketchTransform(self, sketchPlane, origin=(0.0, 0.0, 0.0), **kwargs):
+        self._record('MakeSketchTransform', dict(kwargs, origin=origin))
+        if isinstance(sketchPlane, Datum):
+            return Transform(sketchPlane.axis, origin)
+        extent = sketchPlane.hi - sketchPlane.lo
+        return Transform(int(np.argmin(extent)) if extent.min() <= EPS else 2, origin)
+
+    def _partition(self, axis, value, cells=None, faces=None):
+        if cells is not None:
+            keep = [c for c in self.cells_ if not any(_key(c['lo'], c['hi']) == _key(e.lo, e.hi) for e in cells)]
+            self.cells_ = keep + _split([c for c in self.cells_ if c not in keep], axis, value)
+        elif faces is not None:
+            keys = set(_key(e.lo, e.hi) for e in faces)
+            keep = [s for s in self.sheets if _key(s['lo'], s['hi']) not in keys]
+            self.sheets = keep + _split([s for s in self.sheets if _key(s['lo'], s['hi']) in keys], axis, value)
+        else:
+            self.cells_ = _split(self.cells_, axis, value)
+            self.sheets = _split(self.sheets, axis, value)
+            self.wires = _split(self.wires, axis, value)
+        self.holes = _split(self.holes, axis, value)
+        self._changed()
+
+    def PartitionCellByDatumPlane(self, datumPlane, cells):
+        self._record('PartitionCellByDatumPlane', dict(datumPlane=datumPlane.id))
+        self._partition(datumPlane.axis, datumPlane.value, cells=list(cells))
+
+    def PartitionFaceByDatumPlane(self, datumPlane, faces):
+        self._record('PartitionFaceByDatumPlane', dict(datumPlane=datumPlane.id))
+        self._partition(datumPlane.axis, datumPlane.value, faces=list(faces))
+
+    # -- mesh -------------------------------------------------------------
+    def seedPart(self, size, **kwargs):
+        self._record('seedPart', dict(kwargs, size=size))
+        self.seed_size = size
+
+    def seedEdgeBySize(self, edges, size, **kwargs):
+        self._record('seedEdgeBySize', dict(kwargs, size=size))
+        for edge in edges:
+            self.edge_seeds[_key(edge.lo, edge.hi)] = int(math.ceil(max(edge.hi - edge.lo)/size - EPS))
+
+    def seedEdgeByNumber(self, edges, number, **kwargs):
+        self._record('seedEdgeByNumber', dict(kwargs, number=number))
+        for edge in edges:
+            self.edge_seeds[_key(edge.lo, edge.hi)] = number
+
+    def _divisions(self, lo, hi, axis):
+        length = hi[axis] - lo[axis]
+        seeded = [n for e_lo, e_hi in _edge_boxes(lo, hi)
+                  if e_hi[axis] - e_lo[axis] > EPS for n in [self.edge_seeds.get(_key(e_lo, e_hi))] if n]
+        if seeded:
+            return max(seeded)
+        return max(1, int(math.ceil(length/(self.seed_size or length or 1.0) - EPS)))
+
+    def generateMesh(self, **kwargs):
+        self._record('generateMesh', kwargs)
+        elements = nodes = 0
+        for item in self.cells_ + self.sheets + self.wires:
+            n = [self._divisions(item['lo'], item['hi'], a) for a in range(3)
+                 if item['hi'][a] - item['lo'][a] > EPS]
+            elements += int(np.prod(n))
+            nodes += int(np.prod([d + 1 for d in n]))
+        self.mesh = (elements, nodes)
+
+
+# --------------------------------------------------------------------------
+# Assembly
+# --------------------------------------------------------------------------
+class Instance(_Recording):
+
+    def __init__(self, assembly, name, part):
+        self._journal = assembly._journal
+        self._path = assembly._path + '.instances[%r]' % name
+        self.name = name
+        self.part = part
+        self.partName = part.name
+        self.rotation = np.eye(3)
+        self.offset = np.zeros(3)
+
+    def copy(self, name):
+        other = Instance.__new__(Instance)
+        other.__dict__.update(self.__dict__)
+        other.name = name
+        other._path = self._path.rsplit('[', 1)[0] + '[%r]' % name
+        other.rotation, other.offset = self.rotation.copy(), self.offset.copy()
+        return other
+
+    def _array(self, kind):
+        entities = []
+        for e in self.part.derived()[kind]:
+            corners = np.array([[(e.lo, e.hi)[(i >> a) & 1][a] for a in range(3)] for i in range(8)])
+            points = corners.dot(self.rotation.T) + self.offset
+            entity = Entity(points.min(axis=0), points.max(axis=0), e.vertices, e.radius)
+            entities.append(entity)
+        return EntityArray(entities, kind[:-1].capitalize() + 'Array')
+
+    @property
+    def cells(self):
+        return self._array('cells')
+
+    @property
+    def faces(self):
+        return self._array('faces')
+
+    @property
+    def edges(self):
+        return self._array('edges')
+
+    @property
+    def vertices(self):
+        return self._array('vertices')
+
+    @property
+    def nodes(self):
+        return self.part.nodes
+
+    def translate(self, vector):
+        self._record('translate', dict(vector=vector))
+        self.offset = self.offset + np.asarray(vector, dtype=float)
+
+
+class ReferencePoint(object):
+
+    def __init__(self, id, point):
+        self.id = id
+        self.point = np.asarray(point, dtype=float)
+
+
+class ReferencePoints(dict):
+
+    def findAt(self, *points):
+        point = np.array(points[0][0] if isinstance(points[0][0], (tuple, list)) else points[0], dtype=float)
+        return min(self.values(), key=lambda rp: float(np.abs(rp.point - point).sum()))
+
+
+class Assembly(_Recording):
+
+    def __init__(self, model):
+        self._journal = model._journal
+        self._path = 'mdb.models[%r].rootAssembly' % model.name
+        self.instances = Repository()
+        self.referencePoints = ReferencePoints()
+        self._features = 0
+
+    def Instance(self, name, part, **kwargs):
+        self._record('Instance', dict(kwargs, name=name, part=part.name))
+        self.instances[name] = Instance(self, name, part)
+        return self.instances[name]
+
+    def translate(self, instanceList, vector):
+        self._record('translate', dict(instanceList=instanceList, vector=vector))
+        for name in instanceList:
+            self.instances[name].offset = self.instances[name].offset + np.asarray(vector, dtype=float)
+
+    def rotate(self, instanceList, axisPoint, axisDirection, angle):
+        self._record('rotate', dict(instanceList=instanceList, axisPoint=axisPoint, axisDirection=axisDirection,
+                                    angle=angle))
+        r, p = _rotation(axisDirection, angle), np.asarray(axisPoint, dtype=float)
+        for name in instanceList:
+            instance = self.instances[name]
+            instance.rotation = r.dot(instance.rotation)
+            instance.offset = r.dot(instance.offset - p) + p
+
+    def LinearInstancePattern(self, instanceList, direction1, direction2, number1, number2, spacing1, spacing2):
+        self._record('LinearInstancePattern', dict(instanceList=instanceList, number1=number1, number2=number2,
+                                                   spacing1=spacing1, spacing2=spacing2))
+        created = []
+        for name in instanceList:
+            for i in range(1, number1 + 1):
+                for j in range(1, number2 + 1):
+                    if i == j == 1:
+                        continue
+                    instance = self.instances[name].copy('%s-lin-%d-%d' % (name, i, j))
+                    instance.offset = instance.offset + (i - 1)*spacing1*np.asarray(direction1, dtype=float) + \
+                        (j - 1)*spacing2*np.asarray(direction2, dtype=float)
+                    self.instances[instance.name] = instance
+                    created.append(instance)
+        return tuple(created)
+
+    def ReferencePoint(self, point):
+        self._record('ReferencePoint', dict(point=point))
+        self._features += 1
+        self.referencePoints[self._features] = ReferencePoint(self._features, point)
+        return self.referencePoints[self._features]
+
+
+# --------------------------------------------------------------------------
+# Model database
+# --------------------------------------------------------------------------
+class Model(_Recording):
+
+    def __init__(self, name):
+        self.name = name
+        self._journal = []
+        self._path = 'mdb.models[%r]' % name
+        self.parts = Repository()
+        self.rootAssembly = Assembly(self)
+
+    def ConstrainedSketch(self, name, sheetSize, transform=None, **kwargs):
+        self._record('ConstrainedSketch', dict(kwargs, name=name, sheetSize=sheetSize))
+        return Sketch(self._journal, self._path + '.sketches[%r]' % name, transform)
+
+    def Part(self, name, objectToCopy=None, **kwargs):
+        self._record('Part', dict(kwargs, name=name))
+        part = Part(self, name)
+        if objectToCopy is not None:
+            part.copy_from(objectToCopy)
+        self.parts[name] = part
+        return part
+
+
+class Job(_Recording):
+
+    def __init__(self, mdb, name, model):
+        self._journal = mdb._journal
+        self._path = 'mdb.jobs[%r]' % name
+        self.name = name
+        self.model = model
+
+    def writeInput(self, **kwargs):
+        """<job>.inp in the working directory: the journal of the job's model."""
+        self._record('writeInput', kwargs)
+        with open(self.name + '.inp', 'w') as f:
+            f.write('** Stand-in CAE journal of model %s (fep.cae_standin)\n' % self.model.name)
+            for line in self.model._journal:
+                f.write(line + '\n')
+
+
+class Mdb(_Recording):
+
+    def __init__(self):
+        self._journal = []
+        self._path = 'mdb'
+        self.models = Repository()
+        self.jobs = Repository()
+
+    def Model(self, name, **kwargs):
+        self.models[name] = Model(name)
+        return self.models[name]
+
+    def Job(self, name, model, **kwargs):
+        self._record('Job', dict(kwargs, name=name, model=model))
+        self.jobs[name] = Job(self, name, self.models[model])
+        return self.jobs[name]
+
+
+def install():
+    """Register the stand-in CAE modules; returns the stand-in mdb."""
+    mdb = Mdb()
+    constants = dict((name, SymbolicConstant(name)) for name in CONSTANTS)
+    session = Recorder(mdb._journal, 'session', 'Session')
+    names = {'abaqus': {'mdb': mdb, 'session': session},
+             'abaqusConstants': constants,
+             'mesh': {'ElemType': Recorder(mdb._journal, 'mesh.ElemType', 'ElemType')},
+             'regionToolset': {'Region': Recorder(mdb._journal, 'regionToolset.Region', 'Region')},
+             'connectorBehavior': dict((name, Recorder(mdb._journal, name, name))
+                                       for name in ('ConnectorElasticity', 'ConnectorPlasticity', 'ConnectorDamage'))}
+    for module in ('part', 'material', 'section', 'assembly', 'step', 'interaction', 'load', 'optimization', 'job',
+                   'sketch', 'visualization', 'odbAccess'):
+        names.setdefault(module, {})
+    for module, attributes in names.items():
+        stub = types.ModuleType(module, 'fep.cae_standin stand-in of the Abaqus module %s' % module)
+        stub.__dict__.update(attributes)
+        sys.modules[module] = stub
+    return mdb
+
+
+def standin_active():
+    """True when the abaqus module in use is this stand-in."""
+    return isinstance(getattr(sys.modules.get('abaqus'), 'mdb', None), Mdb)
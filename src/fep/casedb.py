@@ -0,0 +1,234 @@
+"""
+=======================================================================
+ fep.casedb – SQLite store of every case of the study
+=======================================================================
+ One row per distinct model in results/cases.sqlite: the canonical hash
+ of its input deck, the case parameters (a column per fep.params
+ DEFAULTS entry, plus the manifest entry as JSON), the solver status,
+ attempts and wall time kept by fep.scheduler, and the summary results
+ of fep.odb_extract.  A second table maps job names onto these rows, so
+ a model submitted again under another name, or twice in one sweep, is
+ still one case:
+
+ * fep.scheduler --db runs only the decks whose model is neither done
+   nor queued under an earlier job;
+ * fep.odb_extract --db takes the stored results of those cases, or
+   extracts them from the ODB of the job that ran the model.
+
+ The hash is a SHA-1 of the deck without its comment lines (job name,
+ generator) and trailing blanks, combined with the hashes of the jobs
+ it reads results from (`after`, `oldjob`).  The view `study` joins
+ jobs and cases for queries over the whole study:
+
+     PYTHONPATH=src python -m fep.casedb results/cases.sqlite register models/Column_Trial_5_sweep.json
+     PYTHONPATH=src python -m fep.casedb results/cases.sqlite query \\
+         --where "myEndPlate_T >= 10 AND status = 'done'" --columns job,myEndPlate_T,peak_moment
+=======================================================================
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from fep import doe
+from fep.params import DEFAULTS
+from fep.scheduler import DONE, PENDING
+
+
+DB_FILE = 'cases.sqlite'
+RESULT_FIELDS = ('solver_status', 'frames', 'final_time', 'peak_load', 'disp_at_peak', 'peak_moment',
+                 'rotation_at_peak', 'final_rotation', 'max_temperature')
+_RESULT_TYPES = {'solver_status': 'TEXT', 'frames': 'INTEGER'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    hash TEXT PRIMARY KEY, run_job TEXT, inp TEXT, params TEXT, registered REAL,
+    %(params)s,
+    status TEXT, attempts INTEGER, exit_codes TEXT, started REAL, finished REAL, wall_time REAL,
+    extracted REAL, %(results)s);
+CREATE TABLE IF NOT EXISTS jobs (
+    job TEXT PRIMARY KEY, hash TEXT NOT NULL REFERENCES cases (hash), model TEXT, manifest TEXT, registered REAL);
+CREATE INDEX IF NOT EXISTS jobs_hash ON jobs (hash);
+CREATE INDEX IF NOT EXISTS jobs_model ON jobs (model);
+CREATE INDEX IF NOT EXISTS cases_status ON cases (status);
+CREATE VIEW IF NOT EXISTS study AS SELECT jobs.job, jobs.model, cases.* FROM jobs JOIN cases ON jobs.hash = cases.hash;
+""" % {'params': ', '.join('"%s" REAL' % name for name in DEFAULTS),
+       'results': ', '.join('%s %s' % (name, _RESULT_TYPES.get(name, 'REAL')) for name in RESULT_FIELDS)}
+
+
+def deck_hash(inp, parents=()):
+    """Canonical hash of an input deck: comment lines and trailing blanks left out, parent hashes appended."""
+    digest = hashlib.sha1()
+    with open(inp, 'rb') as f:
+        for line in f:
+            line = line.rstrip()
+            if line and not line.startswith(b'**'):
+                digest.update(line + b'\n')
+    for parent in parents:
+        digest.update(parent.encode('ascii') + b'\n')
+    return digest.hexdigest()
+
+
+class CaseDB(object):
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path) and not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')      # scheduler and extraction may write at once
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # -- registration ---------------------------------------------------
+    def register(self, case, model=None, manifest=None, parents=()):
+        """Record one manifest entry under the hash of its deck; returns the hash."""
+        digest = deck_hash(case['inp'], parents)
+        now = time.time()
+        params = case.get('params', {})
+        if self.case(digest) is None:
+            names = [name for name in DEFAULTS if name in params]
+            columns = ['hash', 'run_job', 'inp', 'params', 'registered', 'status', 'attempts'] + names
+            values = [digest, case['job'], case['inp'], json.dumps(case), now, PENDING, 0] + [params[n] for n in names]
+            self.db.execute('INSERT INTO cases (%s) VALUES (%s)' % (', '.join('"%s"' % c for c in columns),
+                                                                   ', '.join('?'*len(columns))), values)
+        self.db.execute('INSERT OR REPLACE INTO jobs (job, hash, model, manifest, registered) VALUES (?, ?, ?, ?, ?)',
+                        (case['job'], digest, model, manifest, now))
+        return digest
+
+    def register_manifest(self, path):
+        """register() every case of a sweep manifest, parents first; returns {job: hash}."""
+        manifest = doe.load_manifest(path)
+        cases = dict((case['job'], case) for case in manifest['cases'])
+        hashes = {}
+
+        def visit(job):
+            if job not in hashes:
+                case = cases[job]
+                names = set(case.get('after', ())) | set([case['oldjob']] if case.get('oldjob') else [])
+                parents = [visit(name) if name in cases else (self.job_hash(name) or name) for name in sorted(names)]
+                hashes[job] = self.register(case, manifest.get('model'), path, parents)
+            return hashes[job]
+
+        for job in cases:
+            visit(job)
+        self.db.commit()
+        return hashes
+
+    # -- lookups --------------------------------------------------------
+    def job_hash(self, job):
+        row = self.db.execute('SELECT hash FROM jobs WHERE job = ?', (job,)).fetchone()
+        return row['hash'] if row else None
+
+    def case(self, digest):
+        return self.db.execute('SELECT * FROM cases WHERE hash = ?', (digest,)).fetchone()
+
+    def results(self, digest):
+        """Summary row (fep.odb_extract fields) of an extracted case, or None."""
+        row = self.case(digest)
+        if row is None or row['extracted'] is None:
+            return None
+        out = dict((name, row[name]) for name in RESULT_FIELDS)
+        out['status'] = out.pop('solver_status')
+        return out
+
+    def query(self, where=None, columns=('*',), args=()):
+        sql = 'SELECT %s FROM study' % ', '.join(columns)
+        if where:
+            sql += ' WHERE ' + where
+        return self.db.execute(sql, args).fetchall()
+
+    # -- updates --------------------------------------------------------
+    def job_changed(self, job):
+        """fep.scheduler listener: status, attempts and times of the job's case."""
+        digest = self.job_hash(job.name)
+        if digest is None:
+            return
+        self.db.execute('UPDATE cases SET run_job = ?, status = ?, attempts = ?, exit_codes = ?, started = ?, '
+                        'finished = ?, wall_time = ? WHERE hash = ?',
+                        (job.name, job.status, job.attempts, json.dumps(job.exit_codes), job.started, job.finished,
+                         job.wall_time, digest))
+        self.db.commit()
+
+    def store_results(self, digest, row):
+        """Keep the summary row of fep.odb_extract with the case."""
+        values = [row.get('status') if name == 'solver_status' else row.get(name) for name in RESULT_FIELDS]
+        values = [None if value == '' else value for value in values]
+        self.db.execute('UPDATE cases SET %s, extracted = ? WHERE hash = ?'
+                        % ', '.join('%s = ?' % name for name in RESULT_FIELDS), values + [time.time(), digest])
+        self.db.commit()
+
+
+def plan(db, jobs, log=None):
+    """The fep.scheduler jobs still to run.
+
+    A job whose model is done under another job, or queued under an
+    earlier job of the list, is dropped; the `after` and `oldjob` of the
+    others are renamed to the job that runs (or ran) that model.  A job
+    that ran its model itself is marked done.
+    """
+    log = log or (lambda message: sys.stdout.write(message + '\n'))
+    queued, renamed, keep = {}, {}, []
+    for job in jobs:
+        digest = db.job_hash(job.name)
+        case = db.case(digest) if digest else None
+        if digest in queued:
+            renamed[job.name] = queued[digest]
+            log('same     %s (model of %s)' % (job.name, queued[digest]))
+            continue
+        if case is not None and case['status'] == DONE and case['run_job'] != job.name:
+            renamed[job.name] = case['run_job']
+            log('stored   %s (model of %s)' % (job.name, case['run_job']))
+            continue
+        if case is not None and case['status'] == DONE:
+            job.status = DONE
+        if digest:
+            queued[digest] = job.name
+        keep.append(job)
+    for job in keep:
+        job.after = tuple(renamed.get(name, name) for name in job.after)
+        job.oldjob = renamed.get(job.oldjob, job.oldjob)
+    return keep
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SQLite store of the cases of a study.')
+    parser.add_argument('db', help='database file, e.g. results/%s' % DB_FILE)
+    commands = parser.add_subparsers(dest='command')
+    register = commands.add_parser('register', help='hash and record the cases of sweep manifests')
+    register.add_argument('manifest', nargs='+')
+    query = commands.add_parser('query', help='rows of the study view as CSV')
+    query.add_argument('--where', default=None, help='SQL condition, e.g. "myEndPlate_T = 10 AND status = \'done\'"')
+    query.add_argument('--columns', default='job,hash,status,wall_time,peak_moment')
+    commands.add_parser('status', help='cases per status')
+    args = parser.parse_args(argv)
+
+    db = CaseDB(args.db)
+    if args.command == 'register':
+        for path in args.manifest:
+            hashes = db.register_manifest(path)
+            sys.stdout.write('%s: %d jobs, %d distinct models\n' % (path, len(hashes), len(set(hashes.values()))))
+    elif args.command == 'query':
+        start = time.time()
+        rows = db.query(args.where, args.columns.split(','))
+        writer = csv.writer(sys.stdout)
+        writer.writerow(rows[0].keys() if rows else args.columns.split(','))
+        writer.writerows(tuple(row) for row in rows)
+        sys.stderr.write('%d rows in %.1f ms\n' % (len(rows), 1000.0*(time.time() - start)))
+    else:
+        for row in db.db.execute('SELECT status, COUNT(*) AS n FROM cases GROUP BY status ORDER BY status'):
+            sys.stdout.write('%-8s %d\n' % (row['status'], row['n']))
+    db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
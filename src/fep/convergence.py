@@ -0,0 +1,216 @@
+"""
+=======================================================================
+ fep.convergence – mesh convergence study of one case
+=======================================================================
+ Runs a base case at successively refined seeds, level k using the
+ seed sizes of MESH_PARAMS divided by ratio**k.  The first `start`
+ levels run in parallel; after that one batch of finer levels at a
+ time.
+
+ Over the three finest levels a Richardson extrapolation gives the
+ observed order of convergence, the mesh-independent value and the
+ grid convergence index (GCI, safety factor 1.25).  Refinement stops
+ once some level has the initial stiffness Sj,ini and the peak moment
+ within `tol` of the extrapolated values (or `levels` is reached); the
+ coarsest such level is the recommended mesh to run the sweep with.
+ Without a Richardson estimate (fewer than three levels, oscillating
+ responses) no level qualifies, so `converged` implies a
+ recommendation.
+
+     PYTHONPATH=src python -m fep.convergence --case '{"New_Z": 200}' --cores 32 --cpus-per-job 4
+
+ writes the decks, ODBs and curves to results/convergence/ and the
+ report to results/convergence/<model>_convergence.json.
+=======================================================================
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import doe
+from fep import inp_writer
+from fep import odb_extract
+from fep import response
+from fep import scheduler
+from fep.params import derive, independent
+
+
+MESH_PARAMS = ('myBolrMesh_Size', 'myEPMesh_Size', 'myColumnMeshEdge_Size', 'myBeamMeshEdge_Size')
+RESPONSES = ('stiffness', 'peak_moment')
+SAFETY_FACTOR = 1.25
+
+
+def level_case(case, level, ratio):
+    """Case overrides of refinement level `level` (0 = the base seeds)."""
+    base = derive(case)
+    refined = OrderedDict(case)
+    for name in MESH_PARAMS:
+        refined[name] = base[name]/ratio**level
+    return refined
+
+
+def richardson(coarse, medium, fine, ratio):
+    """Observed order, extrapolated value and fine-grid GCI of three solutions.
+
+    A sequence that stalled (fine == medium) is its own estimate, with
+    a GCI of 0.  For oscillating or diverging sequences the order is
+    undefined: the fine value is returned with a NaN order and GCI.
+    """
+    e21, e32 = medium - coarse, fine - medium
+    if e32 == 0:
+        return {'order': np.nan, 'extrapolated': fine, 'gci': 0.0}
+    if e21 == 0 or e21*e32 < 0 or abs(e32) >= abs(e21):
+        return {'order': np.nan, 'extrapolated': fine, 'gci': np.nan}
+    order = math.log(e21/e32)/math.log(ratio)
+    extrapolated = fine + e32/(ratio**order - 1.0)
+    gci = SAFETY_FACTOR*abs(e32/fine)/(ratio**order - 1.0) if fine else np.nan
+    return {'order': order, 'extrapolated': extrapolated, 'gci': gci}
+
+
+def relative_change(a, b):
+    return abs(a - b)/abs(b) if b else np.inf
+
+
+def assess(results, ratio, tol):
+    """Richardson estimates over the finest three levels and the coarsest level within tol of them.
+
+    Sets each level's 'error', its largest relative deviation from the
+    estimates; the recommended level is None without a Richardson
+    estimate of every response.
+    """
+    estimates = OrderedDict()
+    for name in RESPONSES:
+        if len(results) >= 3:
+            estimates[name] = richardson(results[-3][name], results[-2][name], results[-1][name], ratio)
+        else:
+            estimates[name] = {'order': np.nan, 'extrapolated': results[-1][name], 'gci': np.nan}
+    reliable = not any(np.isnan(estimates[name]['gci']) for name in RESPONSES)
+
+    recommended = None
+    for result in results:
+        errors = [relative_change(result[name], estimates[name]['extrapolated']) for name in RESPONSES]
+        result['error'] = max(errors)
+        if recommended is None and reliable and result['error'] <= tol:
+            recommended = result['level']
+    return estimates, recommended
+
+
+def study(case, solve, levels=5, ratio=math.sqrt(2.0), tol=0.02, start=3, batch=1, log=None):
+    """Refine until some level is within tol of the extrapolation; solve(list of (level, case)) -> list of response dicts.
+
+    Returns the report: every level with its seeds and responses, the
+    Richardson estimates and the recommended (coarsest adequate) level.
+    """
+    log = log or (lambda message: sys.stdout.write(message + '\n'))
+    results = []
+
+    def run(first, count):
+        todo = [(k, level_case(case, k, ratio)) for k in range(first, min(first + count, levels))]
+        for (k, refined), values in zip(todo, solve(todo)):
+            results.append(OrderedDict([('level', k), ('seeds', OrderedDict((n, refined[n]) for n in MESH_PARAMS))]
+                                       + [(name, values.get(name, np.nan)) for name in RESPONSES]))
+            log('level %d: %s' % (k, ', '.join('%s %.4g' % (name, results[-1][name]) for name in RESPONSES)))
+
+    run(0, start)
+    while True:
+        estimates, recommended = assess(results, ratio, tol)
+        if recommended is not None or len(results) >= levels:
+            break
+        run(len(results), batch)
+    return OrderedDict([('case', case), ('ratio', ratio), ('tol', tol), ('converged', recommended is not None),
+                        ('levels', results), ('richardson', estimates), ('recommended', recommended)])
+
+
+# --------------------------------------------------------------------------
+# Solver round trip: decks -> scheduler -> ODB extraction -> responses
+# --------------------------------------------------------------------------
+class DeckSolver(object):
+    """solve() for study(): writes the level decks, runs them and reads their curves."""
+
+    def __init__(self, model, workdir, cores, cpus=1, tokens=None, command=scheduler.ABAQUS_COMMAND,
+                 extract_command=odb_extract.EXTRACT_COMMAND, workers=4):
+        self.model = model
+        self.workdir = os.path.abspath(workdir)
+        self.cores = cores
+        self.cpus = cpus
+        self.tokens = tokens
+        self.command = command
+        self.extract_command = extract_command
+        self.workers = workers
+
+    def __call__(self, todo):
+        model_dir = os.path.join(self.workdir, 'models')
+        if not os.path.isdir(model_dir):
+            os.makedirs(model_dir)
+        entries = []
+        for level, case in todo:
+            job = '%s_M%d' % (self.model, level)
+            params = derive(case)
+            inp = inp_writer.write_deck(os.path.join(model_dir, job + '.inp'), params, job)
+            entries.append({'job': job, 'inp': inp, 'cpus': self.cpus, 'params': independent(params)})
+        manifest = doe.save_manifest(model_dir, '%s_M%d-%d' % (self.model, todo[0][0], todo[-1][0]), entries)
+
+        jobs = [scheduler.SolverJob(e['job'], e['inp'], self.cpus) for e in entries]
+        scheduler.Scheduler(jobs, self.cores, self.tokens, command=self.command, workdir=self.workdir).run()
+        odb_extract.run(manifest, self.workdir, self.workdir, self.workers, self.extract_command)
+
+        values = []
+        for entry in entries:
+            curve_path = os.path.join(self.workdir, 'curves', entry['job'] + '_curve.csv')
+            if not os.path.exists(curve_path):
+                values.append({})
+                continue
+            params = derive(entry['params'])
+            rotation, moment = response.moment_rotation(response.read_curve(curve_path), params)
+            values.append({'stiffness': response.initial_stiffness(rotation, moment),
+                           'peak_moment': float(np.nanmax(moment)) if len(moment) else np.nan})
+        return values
+
+
+def _json_safe(value):
+    if isinstance(value, dict):
+        return OrderedDict((k, _json_safe(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mesh convergence study with Richardson extrapolation.')
+    parser.add_argument('--case', default='{}', help='JSON parameter overrides of the base case')
+    parser.add_argument('--model', default='Column_Trial_5')
+    parser.add_argument('--levels', type=int, default=5, help='most refinement levels to run')
+    parser.add_argument('--ratio', type=float, default=math.sqrt(2.0), help='seed size ratio between levels')
+    parser.add_argument('--tol', type=float, default=0.02, help='relative error to the extrapolated responses accepted')
+    parser.add_argument('--start', type=int, default=3, help='levels run in parallel at first')
+    parser.add_argument('--cores', type=int, default=os.cpu_count())
+    parser.add_argument('--tokens', type=int, default=None)
+    parser.add_argument('--cpus-per-job', type=int, default=1)
+    parser.add_argument('--workdir', default=os.path.join('results', 'convergence'))
+    args = parser.parse_args(argv)
+
+    solve = DeckSolver(args.model, args.workdir, args.cores, args.cpus_per_job, args.tokens)
+    report = study(json.loads(args.case, object_pairs_hook=OrderedDict), solve, args.levels, args.ratio,
+                   args.tol, args.start)
+    path = os.path.join(args.workdir, args.model + '_convergence.json')
+    with open(path, 'w') as f:
+        json.dump(_json_safe(report), f, indent=2)
+    if report['recommended'] is None:
+        sys.stdout.write('no level within %.1f%% of the extrapolated responses, see %s\n' % (100*args.tol, path))
+        return 1
+    level = report['levels'][report['recommended']]
+    sys.stdout.write('coarsest adequate mesh: level %d, %s\n'
+                     % (level['level'], ', '.join('%s=%.3g' % kv for kv in level['seeds'].items())))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
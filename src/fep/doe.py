@@ -0,0 +1,214 @@
+"""
+=======================================================================
+ fep.doe – design-of-experiments sweep specifications
+=======================================================================
+ A sweep spec is a small JSON document:
+
+     {
+       "method":  "full_factorial" | "latin_hypercube" | "sobol" | "cases",
+       "factors": {"New_Z": [150, 179, 200],              # levels
+                   "myEndPlate_T": {"low": 8, "high": 16}},  # range
+       "n":       200,              # sampled methods only
+       "seed":    1,                # latin_hypercube only
+       "skip":    1,                # sobol only, leading points dropped
+       "fixed":   {"MyBolt_D": 20.0}
+     }
+
+ "cases" takes an explicit list instead of factors,
+ {"method": "cases", "cases": [{"New_Z": 190, ...}, ...]}, as written
+ by fep.surrogate for the next batch of an active-learning sweep.
+
+ A factor given as a list is discrete (sampling picks one of its levels),
+ a factor given as {"low", "high"} is continuous.  full_factorial needs
+ every factor as a list.  generate() returns one override dict per case,
+ ready for fep.params.derive(); generate_arrays() returns the same cases
+ as one array per parameter, which derive() also accepts.
+=======================================================================
+"""
+
+import itertools
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from fep.params import DEFAULTS
+
+
+METHODS = ('full_factorial', 'latin_hypercube', 'sobol', 'cases')
+
+# Joe & Kuo (2008) direction numbers, new-joe-kuo-6.21201, dimensions 2..16
+# as (s, a, (m_1 .. m_s)).  Dimension 1 uses m_k = 1.
+_SOBOL_DIRECTIONS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+)
+_SOBOL_BITS = 32
+
+
+def full_factorial(levels):
+    """Every combination of the factor levels, first factor varying slowest."""
+    names = list(levels)
+    return [OrderedDict(zip(names, combo))
+            for combo in itertools.product(*[levels[name] for name in names])]
+
+
+def latin_hypercube(n, d, seed=None):
+    """n stratified points in the unit hypercube [0, 1)^d."""
+    rng = np.random.RandomState(seed)
+    strata = np.argsort(rng.random_sample((d, n)), axis=1).T
+    return (strata + rng.random_sample((n, d)))/n
+
+
+def sobol(n, d, skip=0):
+    """First n points (after skip) of the unscrambled Sobol sequence in [0, 1)^d."""
+    if d > len(_SOBOL_DIRECTIONS) + 1:
+        raise ValueError('Sobol sequence supports at most %d factors' % (len(_SOBOL_DIRECTIONS) + 1))
+    v = np.zeros((d, _SOBOL_BITS), dtype=np.uint64)
+    v[0] = [1 << (_SOBOL_BITS - k - 1) for k in range(_SOBOL_BITS)]
+    for j in range(1, d):
+        s, a, m = _SOBOL_DIRECTIONS[j - 1]
+        for k in range(_SOBOL_BITS):
+            if k < s:
+                v[j, k] = m[k] << (_SOBOL_BITS - k - 1)
+            else:
+                value = int(v[j, k - s]) ^ (int(v[j, k - s]) >> s)
+                for i in range(1, s):
+                    if (a >> (s - 1 - i)) & 1:
+                        value ^= int(v[j, k - i])
+                v[j, k] = value
+
+    points = np.zeros((n, d))
+    x = np.zeros(d, dtype=np.uint64)
+    for i in range(n + skip):
+        if i >= skip:
+            points[i - skip] = x
+        # Gray-code update: flip the direction number of the lowest zero bit of i
+        c = 0
+        while (i >> c) & 1:
+            c += 1
+        x ^= v[:, c]
+    return points/float(1 << _SOBOL_BITS)
+
+
+def scale(unit, factors):
+    """Map unit-cube samples onto factor ranges (continuous) or levels (discrete)."""
+    cases = []
+    for row in unit:
+        case = OrderedDict()
+        for u, (name, factor) in zip(row, factors.items()):
+            if isinstance(factor, dict):
+                case[name] = factor['low'] + u*(factor['high'] - factor['low'])
+            else:
+                case[name] = factor[min(int(u*len(factor)), len(factor) - 1)]
+        cases.append(case)
+    return cases
+
+
+def generate(spec):
+    """Expand a sweep spec into a list of parameter override dicts."""
+    method = spec.get('method', 'full_factorial')
+    factors = OrderedDict(spec.get('factors', {}))
+    fixed = spec.get('fixed', {})
+    if method == 'full_factorial':
+        for name, factor in factors.items():
+            if isinstance(factor, dict):
+                raise ValueError('full_factorial needs a list of levels for %s' % name)
+        cases = full_factorial(factors)
+    elif method == 'latin_hypercube':
+        cases = scale(latin_hypercube(spec['n'], len(factors), spec.get('seed')), factors)
+    elif method == 'sobol':
+        cases = scale(sobol(spec['n'], len(factors), spec.get('skip', 1)), factors)
+    elif method == 'cases':
+        cases = [OrderedDict(case) for case in spec['cases']]
+    else:
+        raise ValueError('Unknown sweep method %r, expected one of %s' % (method, ', '.join(METHODS)))
+    for case in cases:
+        for name, value in fixed.items():
+            case[name] = value
+        for name, value in case.items():
+            if isinstance(value, np.generic):
+                case[name] = value.item()
+    return cases
+
+
+def generate_arrays(spec):
+    """generate() as one float array per parameter, for sweeps too large for a dict per case."""
+    method = spec.get('method', 'full_factorial')
+    factors = OrderedDict(spec.get('factors', {}))
+    if method == 'full_factorial':
+        for name, factor in factors.items():
+            if isinstance(factor, dict):
+                raise ValueError('full_factorial needs a list of levels for %s' % name)
+        grids = np.meshgrid(*[np.asarray(factor, dtype=float) for factor in factors.values()], indexing='ij')
+        arrays = OrderedDict((name, grid.ravel()) for name, grid in zip(factors, grids))
+    elif method in ('latin_hypercube', 'sobol'):
+        if method == 'latin_hypercube':
+            unit = latin_hypercube(spec['n'], len(factors), spec.get('seed'))
+        else:
+            unit = sobol(spec['n'], len(factors), spec.get('skip', 1))
+        arrays = OrderedDict()
+        for u, (name, factor) in zip(unit.T, factors.items()):
+            if isinstance(factor, dict):
+                arrays[name] = factor['low'] + u*(factor['high'] - factor['low'])
+            else:
+                arrays[name] = np.asarray(factor, dtype=float)[np.minimum((u*len(factor)).astype(int), len(factor) - 1)]
+    elif method == 'cases':
+        cases = spec['cases']
+        names = list(OrderedDict.fromkeys(name for case in cases for name in case))
+        unknown = [name for name in names if name not in DEFAULTS]
+        if unknown:
+            raise KeyError('Unknown case parameter: %s' % ', '.join(unknown))
+        # a case that leaves a parameter out takes its default, as derive() does
+        arrays = OrderedDict((name, np.array([case.get(name, DEFAULTS[name]) for case in cases], dtype=float))
+                             for name in names)
+    else:
+        raise ValueError('Unknown sweep method %r, expected one of %s' % (method, ', '.join(METHODS)))
+    n = len(next(iter(arrays.values()))) if arrays else 1
+    for name, value in spec.get('fixed', {}).items():
+        arrays[name] = np.full(n, float(value))
+    return arrays
+
+
+def cases_of(arrays, index):
+    """Override dicts of the cases `index` of generate_arrays()."""
+    return [OrderedDict((name, values[i].item()) for name, values in arrays.items()) for i in index]
+
+
+def load_spec(path):
+    with open(path) as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def case_names(base, n):
+    """Job/model names of a sweep: the base name alone for a single case."""
+    if n == 1:
+        return [base]
+    return ['%s_C%03d' % (base, i + 1) for i in range(n)]
+
+
+def save_manifest(out_dir, base, entries):
+    """Write <out_dir>/<base>_sweep.json listing job, input deck, cpus and parameters per case."""
+    path = os.path.join(out_dir, base + '_sweep.json')
+    with open(path, 'w') as f:
+        json.dump({'model': base, 'cases': entries}, f, indent=2)
+    return path
+
+
+def load_manifest(path):
+    with open(path) as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
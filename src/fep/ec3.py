@@ -0,0 +1,273 @@
+"""
+=======================================================================
+ fep.ec3 – EN 1993-1-8 component method for the flush end-plate joint
+=======================================================================
+ Design moment resistance Mj,Rd (6.2.7.2) and initial rotational
+ stiffness Sj,ini (6.3.1) of the joint as modelled: unstiffened welded
+ I column without root radius, flush end plate with three bolt rows of
+ two bolts, beam loaded in hogging so that its top flange pulls the
+ rows.  Components:
+
+     column web panel in shear         column web in transverse
+     column web in compression          tension, column flange in
+     beam flange and web in compression bending, end plate in bending,
+                                        beam web in tension, bolts in
+                                        tension (incl. punching)
+
+ Every function works on NumPy arrays: derive() accepts arrays as
+ overrides, so a whole candidate set is one call,
+
+     p = derive({'New_Z': z, 'myEndPlate_T': t})     # arrays of N cases
+     joint = resistance(p)                          # arrays of N
+
+ Bolt rows, gauge and plate position are those of fep.inp_writer.
+ Material partial factors are gamma_M0 = gamma_M1 = 1.0, gamma_M2 =
+ 1.25; bolts are grade 8.8 unless fub is given.  The end-plate row next
+ to the tension flange takes alpha = 4 + 1.25 e/m (the inner-row value,
+ a lower bound of Figure 6.11) unless alpha is given.
+
+     PYTHONPATH=src python -m fep.ec3 sweep.json --min-moment 40 --next models/to_run.json
+
+ screens a sweep spec and writes the cases that pass as a "cases" spec.
+=======================================================================
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import doe
+from fep.inp_writer import bolt_columns, bolt_rows
+from fep.params import DEFAULTS, derive, tensile_area
+
+
+GAMMA_M0 = 1.0
+GAMMA_M1 = 1.0
+GAMMA_M2 = 1.25
+BOLT_FUB = 800.0        # grade 8.8
+K2 = 0.9                # Table 3.4, non-countersunk bolts
+
+COMPONENTS = ('column flange', 'column web tension', 'end plate', 'beam web tension',
+              'group column flange', 'group end plate', 'compression/shear', 'triangular limit')
+
+
+def t_stub(leff_1, leff_2, t, m, n, fy, ft_sum, no_prying):
+    """Design resistance of an equivalent T-stub flange (Table 6.2, method 1) and its mode (1, 2, 3)."""
+    mpl_1 = 0.25*leff_1*t**2*fy/GAMMA_M0
+    mpl_2 = 0.25*leff_2*t**2*fy/GAMMA_M0
+    modes = np.array(np.broadcast_arrays(np.where(no_prying, 2.0*mpl_1/m, 4.0*mpl_1/m),
+                                         np.where(no_prying, np.inf, (2.0*mpl_2 + n*ft_sum)/(m + n)),
+                                         ft_sum*np.ones_like(m)))
+    return modes.min(axis=0), modes.argmin(axis=0) + 1
+
+
+def _omega(beff, twc, avc):
+    """Web panel interaction factor for beta = 1 (Table 6.3)."""
+    return 1.0/np.sqrt(1.0 + 1.3*(beff*twc/avc)**2)
+
+
+def _leff(m, e, p_above, p_below, first=False, alpha=None):
+    """(circular, non-circular) effective length of a bolt row in a group.
+
+    p_above / p_below are the distances to the neighbouring rows of the
+    group, None where the row ends the group.  Tables 6.4 and 6.6 with
+    e1 unlimited (the column runs on past the joint); `first` is the
+    end-plate row next to the tension flange.
+    """
+    if p_above is None and p_below is None:
+        return 2.0*np.pi*m, (alpha*m if first else 4.0*m + 1.25*e)
+    if p_above is not None and p_below is not None:
+        p = (p_above + p_below)/2.0
+        return 2.0*p, p
+    p = p_above if p_above is not None else p_below
+    if first:
+        return np.pi*m + p, 0.5*p + alpha*m - (2.0*m + 0.625*e)
+    return np.pi*m + p, 2.0*m + 0.625*e + 0.5*p
+
+
+def geometry(p):
+    """Row lever arms and the m, e, n distances of the column flange and end plate T-stubs."""
+    g = OrderedDict()
+    rows = [np.asarray(y, dtype=float) for y in reversed(bolt_rows(p))]     # top (farthest) first
+    hb, tfb = p['myB_Depth'], p['myB_FlangeTop_T']
+    y_c = -(hb/2.0 - p['myB_FlangeBotom_T']/2.0)          # centre of compression
+    g['y'] = np.broadcast_arrays(*rows)
+    g['h'] = [y - y_c for y in g['y']]
+    g['spacing'] = [g['y'][i] - g['y'][i + 1] for i in range(len(rows) - 1)]
+
+    x = np.abs(np.array(np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in bolt_columns(p)])))
+    x_out = x.max(axis=0)
+    g['m_c'] = x_out - p['myC_Web_T']/2.0
+    g['e_c'] = p['myC_FlangeTop_W']/2.0 - x_out
+    g['m_p'] = x_out - p['myB_Web_T']/2.0
+    g['e_p'] = p['myEndPlate_W']/2.0 - x_out
+    g['n_c'] = np.minimum(g['e_c'], 1.25*g['m_c'])
+    g['n_p'] = np.minimum(g['e_p'], 1.25*g['m_p'])
+    g['z_flanges'] = hb - tfb
+    return g
+
+
+def resistance(p, fub=BOLT_FUB, alpha=None):
+    """Component method of the joint; every value an array over the cases of p.
+
+    Returns F_tr (N, one array per row, top row first), the governing
+    component of each row (index into COMPONENTS), the lever arms h,
+    M_j_Rd (kN·m), S_j_ini (kN·m/rad), z_eq (mm) and the compression /
+    shear cap F_cap (N).
+    """
+    g = geometry(p)
+    fy, fu, E = p['myFy'], p['myFu'], p['myE']
+    twc, tfc, tp = p['myC_Web_T'], p['myC_FlangeTop_T'], p['myEndPlate_T']
+    m_c, e_c, n_c, m_p, e_p, n_p = g['m_c'], g['e_c'], g['n_c'], g['m_p'], g['e_p'], g['n_p']
+    alpha = 4.0 + 1.25*e_p/m_p if alpha is None else alpha
+    n_rows = len(g['h'])
+
+    # Bolts: tension, punching through either plate, elongation length
+    a_s = tensile_area(p['MyBolt_D'])
+    ft_rd = K2*fub*a_s/GAMMA_M2
+    dm = p['MyBolt_S']
+    ft_c = np.minimum(ft_rd, 0.6*np.pi*dm*tfc*fu/GAMMA_M2)
+    ft_p = np.minimum(ft_rd, 0.6*np.pi*dm*tp*fu/GAMMA_M2)
+    l_b = p['myBolt_M_T'] + p['myBolt_k']
+
+    # Column web panel in shear and in compression, beam flange in compression
+    hw = p['myC_Web_H']
+    area = p['myC_FlangeTop_W']*tfc + p['myC_FlangeBottom_W']*p['myC_FlangeBotom_T'] + hw*twc
+    avc = np.maximum(area - 2.0*p['myC_FlangeTop_W']*tfc + twc*tfc, hw*twc)
+    v_wp = 0.9*fy*avc/(np.sqrt(3.0)*GAMMA_M0)
+    overhang = np.maximum(p['myEndPlate_H']/2.0 - p['myB_Depth']/2.0, 0.0)
+    beff_c = p['myB_FlangeBotom_T'] + 5.0*tfc + tp + np.minimum(tp, overhang)
+    lam = 0.932*np.sqrt(beff_c*hw*fy/(E*twc**2))
+    rho = np.where(lam <= 0.72, 1.0, (lam - 0.2)/lam**2)
+    sigma = np.abs(p['myColumn_Load'])/area
+    k_wc = np.where(sigma <= 0.7*fy, 1.0, 1.7 - sigma/fy)
+    f_c_wc = _omega(beff_c, twc, avc)*k_wc*np.minimum(beff_c*twc*fy/GAMMA_M0, rho*beff_c*twc*fy/GAMMA_M1)
+    hb, tfb, twb = p['myB_Depth'], p['myB_FlangeTop_T'], p['myB_Web_T']
+    w_pl = (p['myB_FlangeTop_W']*tfb*(hb - tfb)/2.0
+            + p['myB_FlangeBottom_W']*p['myB_FlangeBotom_T']*(hb - p['myB_FlangeBotom_T'])/2.0
+            + twb*p['myB_Web_H']**2/4.0)
+    f_c_fb = w_pl*fy/GAMMA_M0/g['z_flanges']
+    f_cap = np.minimum(np.minimum(v_wp, f_c_wc), f_c_fb)
+
+    def group(first, last):
+        """Resistances of rows first..last acting together, and their per-row effective lengths."""
+        nb = last - first + 1
+        cp_c = nc_c = cp_p = nc_p = 0.0
+        per_row = []
+        for r in range(first, last + 1):
+            above = g['spacing'][r - 1] if r > first else None
+            below = g['spacing'][r] if r < last else None
+            c = _leff(m_c, e_c, above, below)
+            e = _leff(m_p, e_p, above, below, first=(r == 0), alpha=alpha)
+            cp_c, nc_c, cp_p, nc_p = cp_c + c[0], nc_c + c[1], cp_p + e[0], nc_p + e[1]
+            per_row.append((np.minimum(*c), np.minimum(*e)))
+        l1_c, l1_p = np.minimum(cp_c, nc_c), np.minimum(cp_p, nc_p)
+        free_c = l_b > 8.8*m_c**3*a_s*nb/(l1_c*tfc**3)
+        free_p = l_b > 8.8*m_p**3*a_s*nb/(l1_p*tp**3)
+        flange_c, _ = t_stub(l1_c, nc_c, tfc, m_c, n_c, fy, 2*nb*ft_c, free_c)
+        plate, _ = t_stub(l1_p, nc_p, tp, m_p, n_p, fy, 2*nb*ft_p, free_p)
+        web_c = _omega(l1_c, twc, avc)*l1_c*twc*fy/GAMMA_M0
+        web_b = l1_p*twb*fy/GAMMA_M0
+        return (flange_c, web_c, plate, web_b), per_row
+
+    groups = dict(((first, last), group(first, last)) for first in range(n_rows) for last in range(first, n_rows))
+    # smallest effective length of each row, individually or in any group (Table 6.11)
+    def smallest(r, side):
+        return np.minimum.reduce(np.broadcast_arrays(*[per_row[r - first][side]
+                                                       for (first, last), (_, per_row) in groups.items()
+                                                       if first <= r <= last]))
+    leff_c = [smallest(r, 0) for r in range(n_rows)]
+    leff_p = [smallest(r, 1) for r in range(n_rows)]
+
+    # Effective row resistances, row by row from the top (6.2.7.2)
+    f_tr, governing = [], []
+    for r in range(n_rows):
+        candidates = list(groups[r, r][0])
+        group_c, group_p = np.inf, np.inf
+        for first in range(r):
+            flange_c, web_c, plate, web_b = groups[first, r][0]
+            above = sum(f_tr[first:r])
+            group_c = np.minimum(group_c, np.minimum(flange_c, web_c) - above)
+            group_p = np.minimum(group_p, np.minimum(plate, web_b) - above)
+        candidates += [group_c*np.ones_like(m_c), group_p*np.ones_like(m_c),
+                       f_cap - sum(f_tr[:r]) if r else f_cap]
+        limit = np.inf*np.ones_like(m_c)
+        for x in range(r):
+            limit = np.where(f_tr[x] > 1.9*ft_rd, np.minimum(limit, f_tr[x]*g['h'][r]/g['h'][x]), limit)
+        candidates.append(limit)
+        stack = np.array(np.broadcast_arrays(*candidates))
+        f = np.maximum(stack.min(axis=0), 0.0)
+        f_tr.append(np.where(g['h'][r] > 0, f, 0.0))
+        governing.append(stack.argmin(axis=0))
+
+    m_j_rd = sum(f*h for f, h in zip(f_tr, g['h']))/1e6
+
+    # Initial stiffness (6.3): springs of each tension row in series, rows in parallel
+    k_eff = []
+    for r in range(n_rows):
+        k3 = 0.7*leff_c[r]*twc/hw
+        k4 = 0.9*leff_c[r]*tfc**3/m_c**3
+        k5 = 0.9*leff_p[r]*tp**3/m_p**3
+        k10 = 1.6*a_s/l_b
+        k_eff.append(np.where(g['h'][r] > 0, 1.0/(1.0/k3 + 1.0/k4 + 1.0/k5 + 1.0/k10), 0.0))
+    z_eq = sum(k*h**2 for k, h in zip(k_eff, g['h']))/sum(k*h for k, h in zip(k_eff, g['h']))
+    k_eq = sum(k*h for k, h in zip(k_eff, g['h']))/z_eq
+    k1 = 0.38*avc/z_eq
+    k2 = 0.7*beff_c*twc/hw
+    s_j_ini = E*z_eq**2/(1.0/k1 + 1.0/k2 + 1.0/k_eq)/1e6
+
+    return OrderedDict([('F_tr', f_tr), ('governing', governing), ('h', g['h']), ('M_j_Rd', m_j_rd),
+                        ('S_j_ini', s_j_ini), ('z_eq', z_eq), ('F_cap', f_cap)])
+
+
+def case_arrays(cases):
+    """derive() of a list of override dicts, as one dict of arrays.
+
+    A case that leaves out a parameter another case overrides takes its
+    default, as in doe.generate_arrays().
+    """
+    names = list(OrderedDict.fromkeys(name for case in cases for name in case))
+    unknown = [name for name in names if name not in DEFAULTS]
+    if unknown:
+        raise KeyError('Unknown case parameter: %s' % ', '.join(unknown))
+    return derive(OrderedDict((name, np.array([case.get(name, DEFAULTS[name]) for case in cases], dtype=float))
+                              for name in names))
+
+
+def screen(cases, fub=BOLT_FUB, alpha=None):
+    """resistance() of a list of override dicts."""
+    return resistance(case_arrays(cases), fub, alpha)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='EN 1993-1-8 component-method screening of a sweep spec.')
+    parser.add_argument('spec', help='sweep spec (JSON)')
+    parser.add_argument('--fub', type=float, default=BOLT_FUB, help='bolt ultimate strength (N/mm2)')
+    parser.add_argument('--alpha', type=float, default=None, help='alpha of Figure 6.11 for the first row')
+    parser.add_argument('--min-moment', type=float, default=0.0, help='kN·m')
+    parser.add_argument('--max-moment', type=float, default=np.inf, help='kN·m')
+    parser.add_argument('--min-stiffness', type=float, default=0.0, help='kN·m/rad')
+    parser.add_argument('--max-stiffness', type=float, default=np.inf, help='kN·m/rad')
+    parser.add_argument('--next', default=None, help='write the cases that pass here as a "cases" sweep spec')
+    args = parser.parse_args(argv)
+
+    cases = doe.generate(doe.load_spec(args.spec))
+    start = time.time()
+    joint = screen(cases, args.fub, args.alpha)
+    seconds = time.time() - start
+    m, s = np.broadcast_to(joint['M_j_Rd'], (len(cases),)), np.broadcast_to(joint['S_j_ini'], (len(cases),))
+    keep = (m >= args.min_moment) & (m <= args.max_moment) & (s >= args.min_stiffness) & (s <= args.max_stiffness)
+    sys.stdout.write('%d cases in %.3f s: Mj,Rd %.1f .. %.1f kN·m, Sj,ini %.0f .. %.0f kN·m/rad, %d kept\n'
+                     % (len(cases), seconds, m.min(), m.max(), s.min(), s.max(), keep.sum()))
+    if args.next:
+        with open(args.next, 'w') as f:
+            json.dump({'method': 'cases', 'cases': [case for case, k in zip(cases, keep) if k]}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
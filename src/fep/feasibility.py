@@ -0,0 +1,185 @@
+"""
+=======================================================================
+ fep.feasibility – geometric pre-flight of a sweep
+=======================================================================
+ Checks the bolt layout of every case against the plates and sections
+ around it before any model is built.  Bolt rows, gauge and hole
+ diameter d0 = myBoltHoleDia are those of fep.inp_writer (and fep.ec3);
+ spacing and edge limits are EN 1993-1-8 Table 3.3:
+
+     section       column and beam webs have a positive height
+     plate_cover   end plate at least as wide and deep as the beam
+     rows_in_plate every hole fully inside the end plate
+     edge_top      e1 = myEndPlate_T_C >= 1.2 d0 (shrinks as New_Z grows)
+     edge_bottom   e1 below the last row >= 1.2 d0
+     edge_side     e2 of end plate and column flange >= 1.2 d0
+     pitch         p1 between rows >= 2.2 d0
+     pitch_max     p1 <= min(14 t, 200 mm), t the thinner plate
+     gauge         p2 = myEndPlate_H_CC_T >= 2.4 d0
+     web_hole      holes clear of column and beam webs and their welds
+     flange_hole   holes between the beam flanges and their welds
+     head_overlap  bolt heads (MyBolt_S) of neighbouring bolts apart
+     wrench        a socket (radius SOCKET * MyBolt_S) fits around each
+                   head: clear of webs, flanges and neighbouring heads
+     alignment     bolts (myEndPlate_H_CC_B), plate holes (_H_CC_T) and
+                   column holes (myEndPlate_W on myC_FlangeTop_W) line
+                   up within the hole clearance MyBoltClear / 2
+
+ margins() returns, per constraint, how far each case is inside (>= 0)
+ or outside (< 0) its limit in mm, all cases at once: derive() and the
+ checks take arrays, and a sweep spec is expanded by
+ doe.generate_arrays() without a dict per case.  A grid of a million
+ cases is screened in about a second:
+
+     PYTHONPATH=src python -m fep.feasibility sweep.json --next models/feasible.json --rejected rejected.csv
+=======================================================================
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import doe
+from fep.inp_writer import bolt_columns, bolt_rows
+from fep.params import derive
+
+
+SOCKET = 0.8        # socket radius / MyBolt_S (impact socket, about 1.6 x across flats)
+TOL = 1e-9
+
+CONSTRAINTS = OrderedDict([
+    ('section', 'web height of column or beam not positive'),
+    ('plate_cover', 'end plate narrower or shallower than the beam'),
+    ('rows_in_plate', 'bolt hole outside myEndPlate_H'),
+    ('edge_top', 'end plate top edge distance myEndPlate_T_C below 1.2 d0'),
+    ('edge_bottom', 'end plate bottom edge distance below 1.2 d0'),
+    ('edge_side', 'side edge distance of end plate or column flange below 1.2 d0'),
+    ('pitch', 'row spacing below 2.2 d0'),
+    ('pitch_max', 'row spacing above min(14 t, 200 mm)'),
+    ('gauge', 'gauge myEndPlate_H_CC_T below 2.4 d0'),
+    ('web_hole', 'hole cuts a column or beam web or its weld'),
+    ('flange_hole', 'hole cuts a beam flange or its weld'),
+    ('head_overlap', 'bolt heads MyBolt_S overlap'),
+    ('wrench', 'no socket clearance around a bolt head'),
+    ('alignment', 'bolts, end plate holes and column holes do not line up'),
+])
+
+
+def margins(p, weld=0.0):
+    """{constraint: mm inside its limit, negative when violated}, arrays over the cases of p.
+
+    weld is the throat of the fillet welds of the beam to the end plate
+    (and of a welded column), kept clear of the holes and sockets.
+    """
+    d0, s = p['myBoltHoleDia'], p['MyBolt_S']
+    leg = np.sqrt(2.0)*weld
+    rows = np.array(np.broadcast_arrays(*[np.asarray(y, dtype=float) for y in bolt_rows(p)]))
+    xs = np.abs(np.array(np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in bolt_columns(p)])))
+    top, bottom = rows.max(axis=0), rows.min(axis=0)
+    p1 = np.diff(np.sort(rows, axis=0), axis=0)
+    p2 = p['myEndPlate_H_CC_T']
+    x_in = xs.min(axis=0)
+    web = np.maximum(p['myC_Web_T'], p['myB_Web_T'])/2.0 + leg
+    flange = p['myB_Web_H']/2.0 - leg       # inner faces of the beam flanges about the beam axis
+    spacing = np.minimum(p1.min(axis=0), p2)
+    t = np.minimum(p['myEndPlate_T'], p['myC_FlangeTop_T'])
+    clearance = p['MyBoltClear']/2.0
+
+    m = OrderedDict()
+    m['section'] = np.minimum(p['myC_Web_H'], p['myB_Web_H'])
+    m['plate_cover'] = np.minimum(p['myEndPlate_W'] - np.maximum(p['myB_FlangeTop_W'], p['myB_FlangeBottom_W']),
+                                  p['myEndPlate_H'] - p['myB_Depth'])
+    m['rows_in_plate'] = p['myEndPlate_H']/2.0 - np.maximum(top, -bottom) - d0/2.0
+    m['edge_top'] = p['myEndPlate_H']/2.0 - top - 1.2*d0
+    m['edge_bottom'] = p['myEndPlate_H']/2.0 + bottom - 1.2*d0
+    m['edge_side'] = np.minimum((p['myEndPlate_W'] - p2)/2.0, p['myC_FlangeTop_W']/2.0 - xs.max(axis=0)) - 1.2*d0
+    m['pitch'] = p1.min(axis=0) - 2.2*d0
+    m['pitch_max'] = np.minimum(14.0*t, 200.0) - p1.max(axis=0)
+    m['gauge'] = p2 - 2.4*d0
+    m['web_hole'] = x_in - d0/2.0 - web
+    m['flange_hole'] = flange - np.maximum(top, -bottom) - d0/2.0
+    m['head_overlap'] = spacing - s
+    m['wrench'] = np.minimum(np.minimum(x_in - web, flange - np.maximum(top, -bottom)) - SOCKET*s,
+                             spacing - (0.5 + SOCKET)*s)
+    m['alignment'] = clearance - np.maximum(np.abs(p['myEndPlate_H_CC_B'] - p2),
+                                            np.abs(p['myEndPlate_W'] - p['myC_FlangeTop_W']))/2.0
+    return m
+
+
+def violations(m):
+    """Bit mask per case, bit i set when constraint i of CONSTRAINTS is violated."""
+    shape = np.broadcast(*m.values()).shape
+    mask = np.zeros(shape, dtype=np.uint32)
+    for bit, name in enumerate(CONSTRAINTS):
+        mask |= (np.asarray(m[name]) < -TOL).astype(np.uint32) << bit
+    return mask
+
+
+def reasons(m, i=None):
+    """Violated constraints of case i (or of a single case) as 'name: description (x mm short)'."""
+    out = []
+    for name, description in CONSTRAINTS.items():
+        value = np.asarray(m[name])
+        value = value[i] if i is not None and value.ndim else value
+        if value < -TOL:
+            out.append('%s: %s (%.1f mm short)' % (name, description, -value))
+    return out
+
+
+def check(params, weld=0.0):
+    """Reasons a single case (fep.params.derive() dict) cannot be built, empty when feasible."""
+    return reasons(margins(params, weld))
+
+
+def screen(arrays, weld=0.0):
+    """margins() and violations() of the cases given as one array per overridden parameter."""
+    m = margins(derive(arrays), weld)
+    return m, violations(m)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Geometric feasibility of every case of a sweep spec.')
+    parser.add_argument('spec', help='sweep spec (JSON)')
+    parser.add_argument('--weld', type=float, default=0.0, help='fillet weld throat a (mm) kept clear of holes')
+    parser.add_argument('--next', default=None, help='write the feasible cases here as a "cases" sweep spec')
+    parser.add_argument('--rejected', default=None, help='CSV of the rejected cases with their reasons')
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    arrays = doe.generate_arrays(doe.load_spec(args.spec))
+    m, mask = screen(arrays, args.weld)
+    mask = np.broadcast_to(mask, (len(next(iter(arrays.values()))),))
+    seconds = time.time() - start
+    rejected = np.flatnonzero(mask)
+    sys.stdout.write('%d cases in %.3f s: %d feasible, %d rejected\n'
+                     % (len(mask), seconds, len(mask) - len(rejected), len(rejected)))
+    for bit, (name, description) in enumerate(CONSTRAINTS.items()):
+        count = int(np.count_nonzero(mask & (1 << bit)))
+        if count:
+            sys.stdout.write('  %-13s %9d  %s\n' % (name, count, description))
+    if args.next:
+        with open(args.next, 'w') as f:
+            json.dump({'method': 'cases', 'cases': doe.cases_of(arrays, np.flatnonzero(mask == 0))}, f, indent=2)
+    if args.rejected:
+        # One line per rejected case: the violated constraints by name (one
+        # string per distinct mask) and the largest shortfall among them.
+        names = dict((code, ';'.join(name for bit, name in enumerate(CONSTRAINTS) if code & (1 << bit)))
+                     for code in np.unique(mask[rejected]).tolist())
+        shortfall = np.max([np.broadcast_to(-np.asarray(m[name]), mask.shape)[rejected] for name in CONSTRAINTS],
+                           axis=0)
+        columns = [rejected + 1] + [values[rejected] for values in arrays.values()] + [np.round(shortfall, 2)]
+        with open(args.rejected, 'w') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['case'] + list(arrays) + ['shortfall_mm', 'reasons'])
+            for row, code in zip(zip(*[column.tolist() for column in columns]), mask[rejected].tolist()):
+                writer.writerow(row + (names[code],))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
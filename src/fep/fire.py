@@ -0,0 +1,223 @@
+"""
+=======================================================================
+ fep.fire – ISO 834 fire cases: one heat transfer, many load cases
+=======================================================================
+ A fire case is solved sequentially.  A heat-transfer run of the joint
+ (same mesh as the mechanical deck, DC3D8 / DS4 elements, EN 1993-1-2
+ thermal properties) exposes every free face to the ISO 834 standard
+ fire by convection and radiation and stores the nodal temperatures.
+ The mechanical deck then applies the loads in Loading and holds them
+ through a Fire step that reads those temperatures (*Temperature,
+ file=...), with temperature-dependent materials.
+
+ The heat-transfer solution depends on the geometry, mesh, materials
+ and fire duration only.  Cases that differ in the mechanical loading
+ alone (MECHANICAL_PARAMS, or a "load_ratio" factor that sets the
+ column load as a fraction of its squash load) share one thermal job,
+ named by a hash of everything else, and a thermal ODB already solved
+ in the work directory is reused by later sweeps.
+
+     PYTHONPATH=src python -m fep.fire fire.json --model Fire --duration 60 --cores 32 --cpus-per-job 4
+
+ writes models/Thermal_<hash>.inp, models/<model>_C###.inp and the two
+ manifests, then runs every job with the mechanical cases waiting for
+ their thermal run (fep.scheduler `after`).
+
+ Exposure: film coefficient 25 W/(m2 K), emissivity 0.7 (EN 1991-1-2
+ 3.2.1 and EN 1993-1-2 2.2), gap conductance between touching parts.
+ Bolt heads, nuts and shanks are free faces of the mesh and so are
+ exposed too, which makes the bolt temperatures an upper bound.
+=======================================================================
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import doe
+from fep import fire_materials
+from fep import inp_writer
+from fep import outputs
+from fep import partcache
+from fep import scheduler
+from fep.odb_extract import solver_status
+from fep.params import derive, independent
+
+
+MECHANICAL_PARAMS = ('myBeamDisplacement', 'myColumn_Load')
+THERMAL_VERSION = 1
+
+FILM = 0.025                # 25 W/(m2 K) in N/(mm s K)
+EMISSIVITY = 0.7
+STEFAN_BOLTZMANN = 5.67e-11     # N/(mm s K4)
+GAP_CONDUCTANCE = 1.0       # N/(mm s K) at contact, none from GAP_CLEARANCE on
+GAP_CLEARANCE = 0.1
+DURATION = 3600.0           # s
+FRAME_INTERVAL = 60.0       # s between stored temperature fields
+
+THERMAL_ELEMENTS = {inp_writer.SOLID_ELEMENT: 'DC3D8', inp_writer.SHELL_ELEMENT: 'DS4'}
+SOLID_SET, SHELL_SET = 'Joint_Solid', 'Joint_Shell'
+EXPOSED = 'Exposed'
+
+
+def iso834(t):
+    """Gas temperature (°C) of the ISO 834 / EN 1991-1-2 standard fire at t seconds."""
+    return 20.0 + 345.0*np.log10(8.0*np.asarray(t, dtype=float)/60.0 + 1.0)
+
+
+def squash_load(p):
+    """A fy of the column (N)."""
+    area = (p['myC_FlangeTop_W']*p['myC_FlangeTop_T'] + p['myC_FlangeBottom_W']*p['myC_FlangeBotom_T']
+            + p['myC_Web_H']*p['myC_Web_T'])
+    return area*p['myFy']
+
+
+def case_params(case):
+    """derive() of a fire case, turning a load_ratio entry into myColumn_Load."""
+    case = OrderedDict(case)
+    ratio = case.pop('load_ratio', None)
+    p = derive(case)
+    if ratio is not None:
+        case['myColumn_Load'] = ratio*squash_load(p)
+        p = derive(case)
+    return p
+
+
+def thermal_key(p, duration):
+    values = [(name, float(value)) for name, value in independent(p).items() if name not in MECHANICAL_PARAMS]
+    text = json.dumps([THERMAL_VERSION, float(duration), FILM, EMISSIVITY, GAP_CONDUCTANCE, values])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def thermal_job(p, duration):
+    return 'Thermal_' + thermal_key(p, duration)[:12]
+
+
+# --------------------------------------------------------------------------
+# Heat-transfer deck
+# --------------------------------------------------------------------------
+def thermal_deck_lines(p, job, cache=None, materials=None, duration=DURATION):
+    """Heat-transfer input deck of the joint, node and element numbering as in deck_lines()."""
+    materials = materials or fire_materials.joint_tables(p)
+    parts, instances = inp_writer.assemble(p, cache)
+    plate, beam = instances[2], instances[1]
+    solids = [i for i in instances if i.part.element_type == inp_writer.SOLID_ELEMENT]
+    shells = [i for i in instances if i.part.element_type == inp_writer.SHELL_ELEMENT]
+
+    lines = ['*Heading', '** Job name: %s Model name: %s' % (job, job),
+             '** Generated by fep.fire (heat transfer)', '*Preprint, echo=NO, model=NO, history=NO, contact=NO']
+    for part in parts:
+        thermal = copy.copy(part)       # cached parts are shared, only the element type differs
+        thermal.element_type = THERMAL_ELEMENTS[part.element_type]
+        lines += inp_writer._part_lines(thermal)
+    lines += ['*Assembly, name=Assembly']
+    for instance in instances:
+        lines += inp_writer._instance_lines(instance)
+    lines += inp_writer.tie_lines(p, plate, beam)
+    lines += inp_writer._set_lines(inp_writer.JOINT_SET, instances)
+    lines += inp_writer._set_lines(SOLID_SET, solids)
+    lines += inp_writer._set_lines(SHELL_SET, shells)
+    # no face identifier: every free face of the solid elements
+    lines += ['*Surface, type=ELEMENT, name=%s' % EXPOSED, '%s,' % SOLID_SET,
+              '%s, SPOS' % SHELL_SET, '%s, SNEG' % SHELL_SET]
+    lines.append('*End Assembly')
+
+    times = np.arange(0.0, duration + FRAME_INTERVAL/2.0, FRAME_INTERVAL)
+    lines += ['*Physical Constants, absolute zero=-273.15, stefan boltzmann=%s' % inp_writer._num(STEFAN_BOLTZMANN),
+              '*Amplitude, name=ISO834']
+    pairs = ['%s, %s' % (inp_writer._num(t), inp_writer._num(g)) for t, g in zip(times, iso834(times))]
+    lines += [', '.join(pairs[k:k + 4]) for k in range(0, len(pairs), 4)]
+    for name in ('Bolt', 'End Plate', 'Flange', 'Web'):
+        lines += inp_writer._fire_material_lines(name, materials[name])
+    lines += ['*Surface Interaction, name=Thermal-Contact', '*Gap Conductance',
+              '%s, 0.' % inp_writer._num(GAP_CONDUCTANCE), '0., %s' % inp_writer._num(GAP_CLEARANCE),
+              '*Contact, op=NEW', '*Contact Inclusions, ALL EXTERIOR',
+              '*Contact Property Assignment', ' ,  , Thermal-Contact',
+              '*Initial Conditions, type=TEMPERATURE',
+              '%s, %s' % (inp_writer.JOINT_SET, inp_writer._num(inp_writer.AMBIENT))]
+
+    lines += ['** STEP: Heating', '*Step, name=Heating, inc=100000',
+              '*Heat Transfer, end=PERIOD, deltmx=50.',
+              '1., %s, 1e-05, %s' % (inp_writer._num(duration), inp_writer._num(FRAME_INTERVAL)),
+              '*Sfilm, amplitude=ISO834', '%s, F, 1., %s' % (EXPOSED, inp_writer._num(FILM)),
+              '*Sradiate, amplitude=ISO834', '%s, R, 1., %s' % (EXPOSED, inp_writer._num(EMISSIVITY)),
+              '*Output, field, number interval=%d' % max(1, int(round(duration/FRAME_INTERVAL))),
+              '*Node Output', 'NT',
+              '*Output, history, variable=PRESELECT',
+              '*End Step']
+    return lines
+
+
+# --------------------------------------------------------------------------
+# Sweep
+# --------------------------------------------------------------------------
+def write_sweep(base, cases, out_dir, workdir, duration=DURATION, cpus=1, cache=None, material_cache=None,
+                requests=None):
+    """Thermal and mechanical decks of the fire cases; returns (thermal entries, mechanical entries).
+
+    Thermal jobs whose ODB in workdir has completed are not written
+    again; the mechanical decks read that ODB.
+    """
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    thermal, entries = OrderedDict(), []
+    for name, case in zip(doe.case_names(base, len(cases)), cases):
+        params = case_params(case)
+        materials = fire_materials.joint_tables(params, cache=material_cache)
+        heat = thermal_job(params, duration)
+        odb = os.path.abspath(os.path.join(workdir, heat + '.odb'))
+        if heat not in thermal and solver_status(odb) != 'completed':
+            inp = os.path.join(out_dir, heat + '.inp')
+            with open(inp, 'w') as f:
+                f.write('\n'.join(thermal_deck_lines(params, heat, cache, materials, duration)) + '\n')
+            thermal[heat] = {'job': heat, 'inp': os.path.abspath(inp), 'cpus': cpus, 'params': independent(params)}
+        inp = inp_writer.write_deck(os.path.join(out_dir, name + '.inp'), params, name, cache, requests,
+                                    materials, (odb, duration))
+        entries.append({'job': name, 'inp': os.path.abspath(inp), 'cpus': cpus, 'after': [heat],
+                        'params': independent(params)})
+    doe.save_manifest(out_dir, base + '_thermal', list(thermal.values()))
+    doe.save_manifest(out_dir, base, entries)
+    return list(thermal.values()), entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ISO 834 fire cases: shared heat transfer, then mechanical runs.')
+    parser.add_argument('spec', nargs='?', help='sweep spec (JSON), may vary load_ratio; omit for the default case')
+    parser.add_argument('--model', default='Fire', help='base job / model name')
+    parser.add_argument('--duration', type=float, default=DURATION/60.0, help='fire exposure (min)')
+    parser.add_argument('--out', default='models')
+    parser.add_argument('--workdir', default='results', help='where the solver runs and the ODBs go')
+    parser.add_argument('--cores', type=int, default=os.cpu_count())
+    parser.add_argument('--tokens', type=int, default=None)
+    parser.add_argument('--cpus-per-job', type=int, default=1)
+    parser.add_argument('--profile', default=outputs.DEFAULT_PROFILE, choices=list(outputs.PROFILES))
+    parser.add_argument('--write-only', action='store_true', help='write the decks and manifests, do not solve')
+    parser.add_argument('--standin', action='store_true', help='run fep/standin_solver.py instead of abaqus')
+    args = parser.parse_args(argv)
+
+    cases = doe.generate(doe.load_spec(args.spec)) if args.spec else [{}]
+    cache = partcache.PartCache(os.path.join(args.out, '.partcache'))
+    material_cache = fire_materials.material_cache(os.path.join(args.out, '.materialcache'))
+    thermal, entries = write_sweep(args.model, cases, args.out, args.workdir, 60.0*args.duration,
+                                   args.cpus_per_job, cache, material_cache, outputs.profile(args.profile))
+    sys.stdout.write('%d fire cases, %d heat-transfer runs to solve (%d shared or already solved)\n'
+                     % (len(entries), len(thermal), len(entries) - len(thermal)))
+    if args.write_only:
+        return 0
+    jobs = [scheduler.SolverJob(e['job'], e['inp'], e['cpus'], e.get('after', ())) for e in thermal + entries]
+    command = scheduler.STANDIN_COMMAND if args.standin else scheduler.ABAQUS_COMMAND
+    done = scheduler.Scheduler(jobs, args.cores, args.tokens, command=command, workdir=args.workdir).run()
+    failed = [job.name for job in done if job.status == scheduler.FAILED]
+    if failed:
+        sys.stderr.write('failed: %s\n' % ', '.join(failed))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
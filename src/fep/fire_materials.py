@@ -0,0 +1,209 @@
+"""
+=======================================================================
+ fep.fire_materials – EN 1993-1-2 temperature-dependent steel tables
+=======================================================================
+ Elevated-temperature material tables of the four joint materials,
+ computed over a temperature grid in one set of array operations:
+
+     Flange, Web, End Plate   carbon steel stress-strain relationship
+                              of EN 1993-1-2 3.2.1 (Table 3.1, Fig.
+                              3.1): linear to f_p, elliptic to f_y at
+                              2 % strain, plateau to 15 % (the
+                              descending branch is left out), with
+                              f_y the yield stress of the room-
+                              temperature table (fep.materials) and
+                              the reduction factors k_y, k_p, k_E
+     Bolt                     room-temperature table scaled by k_b of
+                              Annex D (Table D.1), modulus by k_E
+
+ Engineering stress and strain are converted to true stress and
+ logarithmic plastic strain, the form *Plastic expects.  Thermal
+ expansion (secant coefficient from 20 °C), conductivity and specific
+ heat follow 3.4.1; in the model's N-mm-t-s units conductivity keeps
+ its W/(m K) value and specific heat is J/(kg K) x 1e6.
+
+ tables() returns Abaqus-ready tuples, (value, ..., temperature) per
+ row, memoized in memory and on disk (a fep.partcache.PartCache) per
+ material, room-temperature inputs and temperature grid, so every fire
+ case of a sweep shares one computation.
+=======================================================================
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import materials
+from fep.partcache import PartCache
+
+
+TABLE_VERSION = 1
+POISSON = 0.3
+TEMPERATURES = (20.0, 100.0, 200.0, 300.0, 400.0, 500.0, 600.0, 700.0, 800.0, 900.0, 1000.0, 1100.0)
+K_RESIDUAL = 1e-3       # floor of the reduction factors, Abaqus rejects zero stress or modulus
+
+# EN 1993-1-2 Table 3.1: temperature, k_y, k_p, k_E
+_TABLE_3_1 = np.array([
+    (20.0, 1.00, 1.0000, 1.0000),
+    (100.0, 1.00, 1.0000, 1.0000),
+    (200.0, 1.00, 0.8070, 0.9000),
+    (300.0, 1.00, 0.6130, 0.8000),
+    (400.0, 1.00, 0.4200, 0.7000),
+    (500.0, 0.78, 0.3600, 0.6000),
+    (600.0, 0.47, 0.1800, 0.3100),
+    (700.0, 0.23, 0.0750, 0.1300),
+    (800.0, 0.11, 0.0500, 0.0900),
+    (900.0, 0.06, 0.0375, 0.0675),
+    (1000.0, 0.04, 0.0250, 0.0450),
+    (1100.0, 0.02, 0.0125, 0.0225),
+    (1200.0, 0.00, 0.0000, 0.0000),
+])
+# EN 1993-1-2 Table D.1: temperature, k_b
+_TABLE_D_1 = np.array([
+    (20.0, 1.000), (100.0, 0.968), (150.0, 0.952), (200.0, 0.935), (300.0, 0.903), (400.0, 0.775),
+    (500.0, 0.550), (600.0, 0.220), (700.0, 0.100), (800.0, 0.067), (900.0, 0.033), (1000.0, 0.000),
+])
+
+EPS_Y = 0.02            # yield strain
+EPS_T = 0.15            # end of the plateau
+ELLIPSE_POINTS = 12     # plastic table rows between f_p and f_y
+
+# Joint materials: room-temperature table, modulus parameter, curve kind
+MATERIALS = OrderedDict([
+    ('Flange', (materials.MyFlangePlastic, 'MyFlangeEM', 'steel')),
+    ('Web', (materials.MyWebPlastic, 'MyWebEM', 'steel')),
+    ('End Plate', (materials.MyEPPlastic, 'MyEPEM', 'steel')),
+    ('Bolt', (materials.MyBoltPlastic, 'MyBoltEM', 'bolt')),
+])
+
+
+# --------------------------------------------------------------------------
+# Properties over a temperature array
+# --------------------------------------------------------------------------
+def reduction_factors(theta):
+    """(k_y, k_p, k_E) of carbon steel at temperatures theta (°C)."""
+    theta = np.asarray(theta, dtype=float)
+    return tuple(np.maximum(np.interp(theta, _TABLE_3_1[:, 0], _TABLE_3_1[:, i]), K_RESIDUAL) for i in (1, 2, 3))
+
+
+def bolt_reduction(theta):
+    """k_b of bolts at temperatures theta (°C)."""
+    return np.maximum(np.interp(np.asarray(theta, dtype=float), _TABLE_D_1[:, 0], _TABLE_D_1[:, 1]), K_RESIDUAL)
+
+
+def thermal_strain(theta):
+    """Delta l / l from 20 °C (3.4.1.1)."""
+    theta = np.asarray(theta, dtype=float)
+    return np.where(theta < 750.0, 1.2e-5*theta + 0.4e-8*theta**2 - 2.416e-4,
+                    np.where(theta <= 860.0, 1.1e-2, 2e-5*theta - 6.2e-3))
+
+
+def expansion(theta):
+    """Secant expansion coefficient from 20 °C, for *Expansion with zero=20."""
+    theta = np.asarray(theta, dtype=float)
+    delta = np.where(np.abs(theta - 20.0) < 1e-9, 1.0, theta - 20.0)
+    return np.where(np.abs(theta - 20.0) < 1e-9, 1.2e-5 + 0.8e-8*20.0, thermal_strain(theta)/delta)
+
+
+def conductivity(theta):
+    """lambda_a, W/(m K) = mW/(mm K) (3.4.1.3)."""
+    theta = np.asarray(theta, dtype=float)
+    return np.where(theta < 800.0, 54.0 - 3.33e-2*theta, 27.3)
+
+
+def specific_heat(theta):
+    """c_a in J/(kg K) (3.4.1.2); multiply by 1e6 for mJ/(t K)."""
+    theta = np.asarray(theta, dtype=float)
+    return np.select([theta < 600.0, theta < 735.0, theta < 900.0],
+                     [425.0 + 7.73e-1*theta - 1.69e-3*theta**2 + 2.22e-6*theta**3,
+                      666.0 + 13002.0/(738.0 - np.minimum(theta, 737.0)),
+                      545.0 + 17820.0/(np.maximum(theta, 732.0) - 731.0)], 650.0)
+
+
+def steel_curve(fy, modulus, theta, points=ELLIPSE_POINTS):
+    """Engineering (strain, stress) of Fig. 3.1 up to EPS_T, arrays of shape (len(theta), points + 2)."""
+    ky, kp, ke = reduction_factors(theta)
+    fy_t, fp_t, e_t = (ky*fy)[:, None], (kp*fy)[:, None], (ke*modulus)[:, None]
+    eps_p = fp_t/e_t
+    c = (fy_t - fp_t)**2/((EPS_Y - eps_p)*e_t - 2.0*(fy_t - fp_t))
+    a = np.sqrt((EPS_Y - eps_p)*(EPS_Y - eps_p + c/e_t))
+    b = np.sqrt(c*(EPS_Y - eps_p)*e_t + c**2)
+    s = np.linspace(0.0, 1.0, points + 1)[None, :]
+    eps = eps_p + s*(EPS_Y - eps_p)
+    sigma = fp_t - c + b/a*np.sqrt(np.maximum(a**2 - (EPS_Y - eps)**2, 0.0))
+    strain = np.hstack([eps, np.full_like(eps_p, EPS_T)])
+    stress = np.hstack([sigma, fy_t])
+    return strain, stress
+
+
+def true_plastic(strain, stress, modulus):
+    """Engineering curve to (true stress, logarithmic plastic strain), row-wise."""
+    true_stress = stress*(1.0 + strain)
+    plastic = np.log1p(strain) - true_stress/modulus
+    plastic = np.maximum(plastic - plastic[:, :1], 0.0)      # the first point starts yielding
+    return true_stress, plastic
+
+
+# --------------------------------------------------------------------------
+# Abaqus tables
+# --------------------------------------------------------------------------
+def _rows(*columns):
+    return tuple(tuple(float(v) for v in row) for row in zip(*[np.ravel(c) for c in columns]))
+
+
+def compute(name, params, temperatures=TEMPERATURES):
+    """Temperature-dependent tables of a joint material (no caching)."""
+    room, modulus_name, kind = MATERIALS[name]
+    theta = np.asarray(temperatures, dtype=float)
+    modulus = float(params[modulus_name])
+    _, _, ke = reduction_factors(theta)
+    e_theta = ke*modulus
+    room = np.asarray(room, dtype=float)
+    if kind == 'bolt':
+        stress = room[None, :, 0]*bolt_reduction(theta)[:, None]
+        plastic = np.repeat(room[None, :, 1], len(theta), axis=0)
+    else:
+        stress, plastic = true_plastic(*steel_curve(room[0, 0], modulus, theta), modulus=e_theta[:, None])
+    keep = np.ones(plastic.shape[1], dtype=bool)
+    keep[1:] = np.any(np.diff(plastic, axis=1) > 1e-9, axis=0)     # Abaqus wants rising plastic strain
+    stress, plastic = stress[:, keep], plastic[:, keep]
+    temperature = np.repeat(theta[:, None], stress.shape[1], axis=1)
+    return OrderedDict([
+        ('density', ((float(params['myDensity']),),)),
+        ('elastic', _rows(e_theta, np.full_like(theta, POISSON), theta)),
+        ('plastic', _rows(stress, plastic, temperature)),
+        ('expansion', _rows(expansion(theta), theta)),
+        ('conductivity', _rows(conductivity(theta), theta)),
+        ('specific_heat', _rows(specific_heat(theta)*1e6, theta)),
+    ])
+
+
+def table_key(name, params, temperatures):
+    room, modulus_name, kind = MATERIALS[name]
+    text = json.dumps([TABLE_VERSION, name, kind, [list(map(float, r)) for r in room], float(params[modulus_name]),
+                       float(params['myDensity']), [float(t) for t in temperatures]])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def tables(name, params, temperatures=TEMPERATURES, cache=None):
+    """compute(), memoized in `cache` (a PartCache, typically on disk) when given."""
+    if cache is None:
+        return compute(name, params, temperatures)
+    key = table_key(name, params, temperatures)
+    value = cache.get(key)
+    if value is None:
+        value = compute(name, params, temperatures)
+        cache.put(key, value)
+    return value
+
+
+def joint_tables(params, temperatures=TEMPERATURES, cache=None):
+    """tables() of every joint material, by material name."""
+    return OrderedDict((name, tables(name, params, temperatures, cache)) for name in MATERIALS)
+
+
+def material_cache(directory):
+    """Disk-backed table cache; every (material, grid) pair is one small pickle."""
+    return PartCache(directory, max_entries=64)
@@ -0,0 +1,282 @@
+"""
+=======================================================================
+ fep.hexmesh – structured quad / hex mesh primitives in NumPy
+=======================================================================
+ Small building blocks for meshing the FEP joint without the CAE
+ geometry kernel: seeded axes, tensor-product grids, O-grid rings
+ around bolt holes and bolt shanks, extrusion of 2D quad meshes into
+ hexahedra, two-node line elements along polylines, and coordinate-
+ based node merging between blocks.
+
+ A mesh is a (nodes, elements) pair of arrays: nodes (N, dim) floats,
+ elements (M, 2), (M, 4) or (M, 8) zero-based node indices.
+=======================================================================
+"""
+
+import math
+
+import numpy as np
+
+
+MERGE_TOL = 1e-6
+
+# Face node positions of C3D8 elements (S1..S6), zero based.
+HEX_FACES = (
+    (0, 1, 2, 3),
+    (4, 7, 6, 5),
+    (0, 4, 5, 1),
+    (1, 5, 6, 2),
+    (2, 6, 7, 3),
+    (3, 7, 4, 0),
+)
+
+
+def divisions(length, size, minimum=1):
+    """Number of elements along `length` for a target element size."""
+    return max(minimum, int(math.ceil(abs(length)/size - 1e-9)))
+
+
+def seeded_axis(breaks, counts):
+    """Node coordinates along an axis: each break interval split in counts[i] equal parts."""
+    coords = [breaks[0]]
+    for (a, b), n in zip(zip(breaks[:-1], breaks[1:]), counts):
+        coords.extend(a + (b - a)*(k + 1)/float(n) for k in range(n))
+    return np.array(coords, dtype=float)
+
+
+def sized_axis(breaks, size_of):
+    """seeded_axis() with the division count taken from an element size per interval.
+
+    size_of(a, b) returns the target element size for the interval [a, b].
+    """
+    breaks = unique_breaks(breaks)
+    counts = [divisions(b - a, size_of(a, b)) for a, b in zip(breaks[:-1], breaks[1:])]
+    return seeded_axis(breaks, counts)
+
+
+def unique_breaks(breaks, tol=MERGE_TOL):
+    out = []
+    for value in sorted(breaks):
+        if not out or value - out[-1] > tol:
+            out.append(float(value))
+    return out
+
+
+def index_of(coords, value, tol=1e-6):
+    """Index of `value` in a seeded axis (it must be one of the nodes)."""
+    i = int(np.argmin(np.abs(coords - value)))
+    if abs(coords[i] - value) > tol:
+        raise ValueError('%g is not a node of the axis' % value)
+    return i
+
+
+# --------------------------------------------------------------------------
+# 2D meshes
+# --------------------------------------------------------------------------
+def grid(xs, ys, skip=None):
+    """Tensor-product quad grid; skip(i, j) -> True leaves cell (i, j) out."""
+    nx, ny = len(xs), len(ys)
+    X, Y = np.meshgrid(xs, ys, indexing='ij')
+    nodes = np.column_stack([X.ravel(), Y.ravel()])
+    quads = []
+    for i in range(nx - 1):
+        for j in range(ny - 1):
+            if skip is not None and skip(i, j):
+                continue
+            quads.append((i*ny + j, (i + 1)*ny + j, (i + 1)*ny + j + 1, i*ny + j + 1))
+    return nodes, np.array(quads, dtype=np.int64).reshape(-1, 4)
+
+
+def cell_loop(xs, ys, i0, i1, j0, j1):
+    """Grid nodes around cell block [xs[i0], xs[i1]] x [ys[j0], ys[j1]], counter-clockwise."""
+    loop = [(xs[i1], ys[j]) for j in range(j0, j1)]
+    loop += [(xs[i], ys[j1]) for i in range(i1, i0, -1)]
+    loop += [(xs[i0], ys[j]) for j in range(j1, j0, -1)]
+    loop += [(xs[i], ys[j0]) for i in range(i0, i1)]
+    return np.array(loop, dtype=float)
+
+
+def project_on_circle(loop, center, radius):
+    """Radial projection of loop points onto a circle around `center`."""
+    d = loop - np.asarray(center, dtype=float)
+    theta = np.arctan2(d[:, 1], d[:, 0])
+    return np.asarray(center) + radius*np.column_stack([np.cos(theta), np.sin(theta)])
+
+
+def ring(inner, outer, layers):
+    """Quads between two closed loops with the same number of points."""
+    n = len(inner)
+    t = np.linspace(0.0, 1.0, layers + 1)
+    nodes = (inner[None, :, :] + t[:, None, None]*(outer - inner)[None, :, :]).reshape(-1, 2)
+    quads = []
+    for m in range(layers):
+        for k in range(n):
+            k1 = (k + 1) % n
+            quads.append((m*n + k, m*n + k1, (m + 1)*n + k1, (m + 1)*n + k))
+    return nodes, np.array(quads, dtype=np.int64)
+
+
+def plate_with_holes(xs, ys, holes, radius, layers):
+    """Quad mesh of a rectangle with circular holes.
+
+    holes is a list of (i0, i1, j0, j1) index ranges into the seeded axes;
+    each such cell block is replaced by an O-grid ring of `layers`
+    elements from a concentric hole of `radius` out to the block edges.
+    """
+    def in_hole(i, j):
+        return any(i0 <= i < i1 and j0 <= j < j1 for i0, i1, j0, j1 in holes)
+
+    meshes = [grid(xs, ys, in_hole)]
+    for i0, i1, j0, j1 in holes:
+        loop = cell_loop(xs, ys, i0, i1, j0, j1)
+        center = ((xs[i0] + xs[i1])/2.0, (ys[j0] + ys[j1])/2.0)
+        meshes.append(ring(project_on_circle(loop, center, radius), loop, layers))
+    return orient_quads(*merge(meshes))
+
+
+def disk(radius, per_quarter, layers, core=0.45):
+    """O-grid disk: a square core of per_quarter^2 cells plus a ring out to the circle.
+
+    Returns the mesh and the outer loop, so rings (bolt heads) can be added
+    around it with matching nodes.
+    """
+    s = core*radius
+    axis = np.linspace(-s, s, per_quarter + 1)
+    core_mesh = grid(axis, axis)
+    loop = cell_loop(axis, axis, 0, per_quarter, 0, per_quarter)
+    circle = project_on_circle(loop, (0.0, 0.0), radius)
+    mesh = orient_quads(*merge([core_mesh, ring(loop, circle, layers)]))
+    return mesh, circle
+
+
+def annulus(inner_loop, radius, layers):
+    """Ring from a circular loop out to a concentric circle of `radius`."""
+    outer = project_on_circle(inner_loop, (0.0, 0.0), radius)
+    return orient_quads(*ring(inner_loop, outer, layers))
+
+
+def orient_quads(nodes, quads):
+    """Make every quad counter-clockwise in the 2D plane."""
+    p = nodes[quads]
+    area = ((p[:, 2, 0] - p[:, 0, 0])*(p[:, 3, 1] - p[:, 1, 1])
+            - (p[:, 3, 0] - p[:, 1, 0])*(p[:, 2, 1] - p[:, 0, 1]))
+    quads = quads.copy()
+    flip = area < 0
+    quads[flip] = quads[flip][:, ::-1]
+    return nodes, quads
+
+
+# --------------------------------------------------------------------------
+# 3D meshes
+# --------------------------------------------------------------------------
+def extrude(mesh2d, levels, axes=(0, 1, 2)):
+    """Sweep a 2D quad mesh through `levels` into hexahedra.
+
+    axes maps (first 2D coordinate, second 2D coordinate, sweep coordinate)
+    onto global x/y/z indices.
+    """
+    nodes2d, quads = mesh2d
+    n, nl = len(nodes2d), len(levels)
+    nodes = np.zeros((n*nl, 3))
+    for l, level in enumerate(levels):
+        nodes[l*n:(l + 1)*n, axes[0]] = nodes2d[:, 0]
+        nodes[l*n:(l + 1)*n, axes[1]] = nodes2d[:, 1]
+        nodes[l*n:(l + 1)*n, axes[2]] = level
+    hexes = np.concatenate([np.hstack([quads + l*n, quads + (l + 1)*n]) for l in range(nl - 1)])
+    return orient_hexes(nodes, hexes)
+
+
+def box(xs, ys, zs):
+    """Structured hex block on three seeded axes."""
+    mesh2d = grid(xs, ys)
+    return extrude(mesh2d, zs)
+
+
+def orient_hexes(nodes, hexes):
+    """Reorder hexahedra with a negative Jacobian at node 1."""
+    p = nodes[hexes]
+    jac = np.einsum('ij,ij->i', np.cross(p[:, 1] - p[:, 0], p[:, 3] - p[:, 0]), p[:, 4] - p[:, 0])
+    hexes = hexes.copy()
+    flip = jac < 0
+    hexes[flip] = hexes[flip][:, [0, 3, 2, 1, 4, 7, 6, 5]]
+    return nodes, hexes
+
+
+def polyline(points, size):
+    """Two-node line elements through `points`, each segment split at a target element size."""
+    points = np.asarray(points, dtype=float)
+    nodes = [points[0]]
+    for a, b in zip(points[:-1], points[1:]):
+        n = divisions(np.linalg.norm(b - a), size)
+        nodes.extend(a + (b - a)*(k + 1)/float(n) for k in range(n))
+    lines = np.column_stack([np.arange(len(nodes) - 1), np.arange(1, len(nodes))])
+    return np.array(nodes), lines.astype(np.int64)
+
+
+def merge(meshes, tol=MERGE_TOL):
+    """Concatenate meshes, fuse nodes closer than `tol` and drop unreferenced nodes."""
+    nodes = np.concatenate([m[0] for m in meshes])
+    offsets = np.cumsum([0] + [len(m[0]) for m in meshes[:-1]])
+    elems = np.concatenate([m[1] + off for m, off in zip(meshes, offsets)])
+    key = np.round(nodes/tol).astype(np.int64)
+    _, first, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+    elems = inverse.reshape(-1)[elems]
+    used, elems = np.unique(elems, return_inverse=True)
+    return nodes[first][used], elems.reshape(-1, meshes[0][1].shape[1])
+
+
+def subset(nodes, elems, keep):
+    """Elements where `keep` (boolean mask) is true, without the nodes they no longer use.
+
+    Returns (nodes, elems, new) where new[i] is the new index of old
+    element i (-1 when dropped).
+    """
+    kept = elems[keep]
+    used, kept = np.unique(kept, return_inverse=True)
+    new = np.full(len(elems), -1, dtype=np.int64)
+    new[keep] = np.arange(int(np.count_nonzero(keep)))
+    return nodes[used], kept.reshape(-1, elems.shape[1]), new
+
+
+def nodes_where(nodes, predicate):
+    """Zero-based indices of nodes for which predicate(x, y, z) is true (vectorized)."""
+    return np.nonzero(predicate(*nodes.T))[0]
+
+
+def free_hex_faces(hexes):
+    """(M, 6) boolean array: face S1..S6 of each hex is not shared with another hex."""
+    faces = np.sort(hexes[:, HEX_FACES], axis=2).reshape(-1, 4)
+    _, inverse, counts = np.unique(faces, axis=0, return_inverse=True, return_counts=True)
+    return (counts[inverse.reshape(-1)] == 1).reshape(-1, len(HEX_FACES))
+
+
+def hex_faces_where(nodes, hexes, predicate, free=False):
+    """{face number 1..6: element indices} of hex faces whose nodes all satisfy predicate.
+
+    free leaves out the faces shared by two hexes (inside the mesh).
+    """
+    inside = predicate(*nodes.T)
+    outer = free_hex_faces(hexes) if free else None
+    faces = {}
+    for number, face in enumerate(HEX_FACES, 1):
+        keep = inside[hexes[:, face]].all(axis=1)
+        if free:
+            keep &= outer[:, number - 1]
+        hit = np.nonzero(keep)[0]
+        if len(hit):
+            faces[number] = hit
+    return faces
+
+
+def element_centroids(nodes, elems):
+    return nodes[elems].mean(axis=1)
+
+
+def planar(mesh2d, axes, level):
+    """Place a 2D quad mesh in the 3D plane where coordinate axes[2] == level."""
+    nodes2d, quads = mesh2d
+    nodes = np.zeros((len(nodes2d), 3))
+    nodes[:, axes[0]] = nodes2d[:, 0]
+    nodes[:, axes[1]] = nodes2d[:, 1]
+    nodes[:, axes[2]] = level
+    return nodes, quads
@@ -0,0 +1,879 @@
+"""
+=======================================================================
+ fep.inp_writer – Abaqus input decks without CAE
+=======================================================================
+ Writes the same model that Build_Model() creates in the main script
+ straight to an .inp file: structured hex meshes (C3D8R) of the column,
+ end plate and bolts, an S4R shell mesh of the beam, the RP sets and
+ rigid bodies, the end plate / beam tie, general contact, amplitudes,
+ boundary conditions and the Loading step.  Only NumPy is needed, so
+ a whole sweep can be meshed on any machine in seconds.
+
+     PYTHONPATH=src python -m fep.inp_writer sweep.json --model Column_Trial_5 --out models
+
+ writes models/<job>.inp per case plus models/<model>_sweep.json, the
+ same manifest the CAE sweep writes for fep.scheduler.
+
+ --contact pairs replaces the general (all with self) contact by
+ surface-to-surface pairs where the parts can touch: end plate on the
+ column flange, bolt heads on the end plate, nuts on the inside of the
+ column flange and the shanks in the plate and flange holes, with the
+ same friction.  The 1500 mm column and beam are left out of the
+ contact search.
+
+ --bolts connector is the screening bolt model of fep.bolt_connector:
+ one connector per bolt, coupled to the end plate and column flange
+ around the hole, instead of the meshed bolts and their contact.
+
+ --detail LENGTH models only the part of each member near the joint in
+ detail: the column within LENGTH of the beam axis and the beam up to
+ LENGTH from the end plate (rounded out to the next node plane).  The
+ rest of each member is a line of B31 elements with the same I-section,
+ joined to the cut section of the detailed mesh by kinematic coupling;
+ the column end and load rigid bodies then tie the RPs to the line
+ ends.
+
+ --half writes the x >= 0 half of the joint instead: the joint and its
+ loading are symmetric about the web plane x = 0, so the column, end
+ plate and beam are cut there, one bolt column is kept, the cut faces
+ get XSYMM and the beam web and the column load are halved.  The
+ manifest records reaction_scale = 2, by which fep.odb_extract scales
+ the reactions back to the whole joint.
+=======================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import bolt_connector
+from fep import doe
+from fep import fire_materials
+from fep import hexmesh as hm
+from fep import outputs
+from fep import partcache
+from fep.materials import MyBoltPlastic, MyFlangePlastic, MyWebPlastic, MyEPPlastic
+from fep.params import derive, independent
+
+
+SOLID_ELEMENT = 'C3D8R'
+SHELL_ELEMENT = 'S4R'
+BEAM_ELEMENT = 'B31'
+FRICTION = 0.35
+STEP_NAME = 'Loading'
+FIRE_STEP_NAME = 'Fire'
+JOINT_SET = 'Joint'
+AMBIENT = 20.0
+RESTART_INTERVALS = 10      # restart points per step written by the command line, see fep.resume
+SYMMETRY_SET = 'Symmetry'
+CONTACT_MODES = ('general', 'pairs')
+HALF_REACTION_SCALE = 2.0   # reactions of a half model times this are those of the whole joint
+
+# Names used by the CAE script, so sets and instances read the same in both decks.
+COLUMN, BEAM, END_PLATE, BOLT = 'Steel Column', 'Steel Beam', 'End Plate', 'Bolt'
+COLUMN_LINE, BEAM_LINE = 'Column Line', 'Beam Line'
+
+
+class MeshPart(object):
+    """Mesh of one part in its own coordinates, with element sets and sections."""
+
+    def __init__(self, name, nodes, elements, element_type):
+        self.name = name
+        self.nodes = nodes
+        self.elements = elements
+        self.element_type = element_type
+        self.elsets = OrderedDict()
+        self.sections = []
+
+    def solid_section(self, elset, material):
+        self.sections.append(('*Solid Section, elset=%s, material=%s' % (_name(elset), _name(material)), ','))
+
+    def shell_section(self, elset, material, thickness):
+        self.sections.append(('*Shell Section, elset=%s, material=%s' % (_name(elset), _name(material)),
+                              '%s, 5' % _num(thickness)))
+
+    def beam_section(self, elset, material, dimensions, n1):
+        """I-section of the line elements, dimensions as i_section(), n1 the first section axis."""
+        self.sections.append(('*Beam Section, elset=%s, material=%s, section=I' % (_name(elset), _name(material)),
+                              ', '.join(_num(v) for v in dimensions), ', '.join(_num(v) for v in n1)))
+
+
+class Instance(object):
+
+    def __init__(self, name, part, translation=(0.0, 0.0, 0.0)):
+        self.name = name
+        self.part = part
+        self.translation = np.asarray(translation, dtype=float)
+
+    @property
+    def nodes(self):
+        return self.part.nodes + self.translation
+
+
+# --------------------------------------------------------------------------
+# Joint layout
+# --------------------------------------------------------------------------
+def bolt_rows(p):
+    """Bolt row heights relative to the beam axis (y = myC_H/2), bottom to top.
+
+    These are the rows of the bolt instances and the column holes in the
+    CAE script.  The end plate sketch there shifts its rows by New_Z -
+    Z_origonal on its own; the deck keeps all three parts on the bolt rows.
+    """
+    return [-p['Cc_V'], 0.0, p['myEP_V_D_Third_Row'] - p['Cc_V']]
+
+
+def bolt_columns(p):
+    return [p['myEndPlate_H_CC_B']/2.0 - p['myEndPlate_H_CC_T'], p['myEndPlate_H_CC_B']/2.0]
+
+
+def bolt_positions(p, half=False):
+    """(number, x, y) of the bolt axes, numbered row by row as the bolt instances; half: x > 0 only."""
+    axes = [(y, x) for y in bolt_rows(p) for x in bolt_columns(p)]
+    return [(n, x, p['myC_H']/2.0 + y) for n, (y, x) in enumerate(axes, 1) if x > 0.0 or not half]
+
+
+def _hole_cell(radius, limits, what):
+    """Half size of the square cell block meshed as an O-grid around a hole."""
+    a = min([2.0*radius] + list(limits))
+    if a < 1.1*radius:
+        raise ValueError('Bolt hole (r = %g) does not fit in the %s: %g mm to the nearest edge or hole'
+                         % (radius, what, a))
+    return a
+
+
+def _gaps(values):
+    values = sorted(values)
+    return [(b - a)/2.0 for a, b in zip(values[:-1], values[1:])]
+
+
+def _holes(xs, ys, centres, a):
+    return [(hm.index_of(xs, cx - a), hm.index_of(xs, cx + a), hm.index_of(ys, cy - a), hm.index_of(ys, cy + a))
+            for cx, cy in centres]
+
+
+# --------------------------------------------------------------------------
+# Parts
+# --------------------------------------------------------------------------
+def column_part(p):
+    """Column in global coordinates: axis along y, flanges normal to z, holes in the front flange."""
+    w_f, t_f = p['myC_FlangeTop_W'], p['myC_FlangeTop_T']
+    w_b, t_b = p['myC_FlangeBottom_W'], p['myC_FlangeBotom_T']
+    t_w, h_w, height = p['myC_Web_T'], p['myC_Web_H'], p['myC_H']
+    fine, coarse, n_t = p['myColumnMeshEdge_Size'], p['myColumnMesh_Size'], p['myColumnEdge_num']
+    r = p['myBoltHoleDia']/2.0
+    rows = [height/2.0 + y for y in bolt_rows(p)]
+    cols = bolt_columns(p)
+    zone = (height/2.0 - p['myEndPlate_H']/2.0, height/2.0 + p['myEndPlate_H']/2.0)
+
+    limits = [w_f/2.0 - abs(cx) for cx in cols] + [abs(cx) - t_w/2.0 for cx in cols] + _gaps(rows)
+    a = _hole_cell(r, limits, 'column flange')
+
+    def x_size(lo, hi):
+        return t_w/n_t if -t_w/2.0 - 1e-6 <= lo and hi <= t_w/2.0 + 1e-6 else fine
+
+    def y_size(lo, hi):
+        return fine if zone[0] - 1e-6 <= lo and hi <= zone[1] + 1e-6 else coarse
+
+    xs_f = hm.sized_axis([-w_f/2.0, -t_w/2.0, 0.0, t_w/2.0, w_f/2.0]
+                         + [cx + s*a for cx in cols for s in (-1, 1)], x_size)
+    xs_b = hm.sized_axis([-w_b/2.0, -t_w/2.0, 0.0, t_w/2.0, w_b/2.0], x_size)
+    ys = hm.sized_axis([0.0, zone[0], zone[1], height] + [cy + s*a for cy in rows for s in (-1, 1)], y_size)
+    centres = [(cx, cy) for cy in rows for cx in cols]
+
+    front2d = hm.plate_with_holes(xs_f, ys, _holes(xs_f, ys, centres, a), r, hm.divisions(a - r, fine))
+    front = hm.extrude(front2d, hm.seeded_axis([h_w/2.0, h_w/2.0 + t_f], [n_t]))
+    back = hm.extrude(hm.orient_quads(*hm.grid(xs_b, ys)), hm.seeded_axis([-h_w/2.0 - t_b, -h_w/2.0], [n_t]))
+    xs_w = xs_f[np.abs(xs_f) <= t_w/2.0 + 1e-6]
+    web = hm.box(xs_w, ys, hm.sized_axis([-h_w/2.0, h_w/2.0], lambda lo, hi: fine))
+
+    nodes, hexes = hm.merge([front, back, web])
+    part = MeshPart(COLUMN, nodes, hexes, SOLID_ELEMENT)
+    n_flange = len(front[1]) + len(back[1])
+    part.elsets['Column Flange'] = np.arange(n_flange)
+    part.elsets['Column Web'] = np.arange(n_flange, len(hexes))
+    # Build_Model assigns the flange section to the web as well.
+    part.solid_section('Column Flange', 'Flange')
+    part.solid_section('Column Web', 'Flange')
+    return part
+
+
+def end_plate_part(p):
+    """End plate in its own coordinates: x across, y up, z 0 (column side) .. myEndPlate_T."""
+    w, h, t = p['myEndPlate_W'], p['myEndPlate_H'], p['myEndPlate_T']
+    size = p['myEPMesh_Size']
+    r = p['myBoltHoleDia']/2.0
+    rows, cols = bolt_rows(p), bolt_columns(p)
+
+    limits = ([w/2.0 - abs(cx) for cx in cols] + _gaps(cols) + _gaps(rows)
+              + [h/2.0 - max(rows), min(rows) + h/2.0])
+    a = _hole_cell(r, limits, 'end plate')
+    xs = hm.sized_axis([-w/2.0, 0.0, w/2.0] + [cx + s*a for cx in cols for s in (-1, 1)], lambda lo, hi: size)
+    ys = hm.sized_axis([-h/2.0, h/2.0] + [cy + s*a for cy in rows for s in (-1, 1)], lambda lo, hi: size)
+    centres = [(cx, cy) for cy in rows for cx in cols]
+
+    mesh2d = hm.plate_with_holes(xs, ys, _holes(xs, ys, centres, a), r, hm.divisions(a - r, size))
+    nodes, hexes = hm.extrude(mesh2d, hm.seeded_axis([0.0, t], [p['myEPEdge_num']]))
+    part = MeshPart(END_PLATE, nodes, hexes, SOLID_ELEMENT)
+    part.elsets['E Plate'] = np.arange(len(hexes))
+    part.solid_section('E Plate', 'End Plate')
+    return part
+
+
+def bolt_part(p):
+    """Bolt in its own coordinates: shank z 0 .. myBolt_M_T, head above, nut below."""
+    r, r_head = p['myBolt_M_Dia']/2.0, p['myBolt_T_Dia']/2.0
+    k, shank = p['myBolt_k'], p['myBolt_M_T']
+    size = p['myBolrMesh_Size']
+    core = 0.45
+
+    per_quarter = max(3, hm.divisions(np.pi*r/2.0, size))
+    disk2d, circle = hm.disk(r, per_quarter, hm.divisions((1.0 - core)*r, size), core)
+    levels = hm.sized_axis([-k, 0.0, shank, shank + k], lambda lo, hi: size)
+    meshes = [hm.extrude(disk2d, levels)]
+    if r_head > r:
+        ring2d = hm.annulus(circle, r_head, hm.divisions(r_head - r, size))
+        meshes.append(hm.extrude(ring2d, levels[levels <= 1e-6]))
+        meshes.append(hm.extrude(ring2d, levels[levels >= shank - 1e-6]))
+
+    nodes, hexes = hm.merge(meshes)
+    part = MeshPart(BOLT, nodes, hexes, SOLID_ELEMENT)
+    part.elsets['Bolt'] = np.arange(len(hexes))
+    part.solid_section('Bolt', 'Bolt')
+    return part
+
+
+def beam_part(p):
+    """Beam mid-surface shells in its own coordinates: axis along z from the end plate."""
+    w_t, t_t = p['myB_FlangeTop_W'], p['myB_FlangeTop_T']
+    w_b, t_b = p['myB_FlangeBottom_W'], p['myB_FlangeBotom_T']
+    h_w, length = p['myB_Web_H'], p['myB_H']
+    fine, coarse = p['myBeamMeshEdge_Size'], p['myBeamMesh_Size']
+    y_top, y_bottom = (h_w + t_t)/2.0, -(h_w + t_b)/2.0
+
+    zs = hm.sized_axis([0.0, length/6.0, p['myLoad_D'] - p['myEndPlate_T'], length],
+                       lambda lo, hi: fine if hi <= length/6.0 + 1e-6 else coarse)
+    top = hm.planar(hm.grid(hm.sized_axis([-w_t/2.0, 0.0, w_t/2.0], lambda lo, hi: fine), zs), (0, 2, 1), y_top)
+    bottom = hm.planar(hm.grid(hm.sized_axis([-w_b/2.0, 0.0, w_b/2.0], lambda lo, hi: fine), zs), (0, 2, 1), y_bottom)
+    web = hm.planar(hm.grid(hm.sized_axis([y_bottom, y_top], lambda lo, hi: fine), zs), (1, 2, 0), 0.0)
+
+    nodes, quads = hm.merge([top, bottom, web])
+    part = MeshPart(BEAM, nodes, quads, SHELL_ELEMENT)
+    n_flange = len(top[1]) + len(bottom[1])
+    part.elsets['Flange'] = np.arange(n_flange)
+    part.elsets['Web'] = np.arange(n_flange, len(quads))
+    _beam_sections(part, p, p['myB_Web_T'])
+    return part
+
+
+def _beam_sections(part, p, web_t):
+    part.sections = []
+    part.shell_section('Web', 'Web', web_t)
+    part.shell_section('Flange', 'Flange', p['myB_FlangeTop_T'])
+
+
+def trim_part(part, keep):
+    """The elements of a part where `keep` (boolean mask) is true, element sets renumbered."""
+    nodes, elements, new = hm.subset(part.nodes, part.elements, keep)
+    trimmed = MeshPart(part.name, nodes, elements, part.element_type)
+    for name, ids in part.elsets.items():
+        trimmed.elsets[name] = new[ids[keep[ids]]]
+    trimmed.sections = list(part.sections)
+    return trimmed
+
+
+def half_part(part, tol=1e-6):
+    """The x >= 0 half of a part: elements whose centroid is there."""
+    return trim_part(part, hm.element_centroids(part.nodes, part.elements)[:, 0] > -tol)
+
+
+def i_section(p, member, half=False):
+    """(l, h, b1, b2, t1, t2, t3) of the *Beam Section, section=I of member 'C' (column) or 'B' (beam).
+
+    The section origin is the middle of the clear web, as in the solid
+    column and the shell beam; the bottom flange (b1, t1) is the back
+    flange of the column and the lower flange of the beam.  half halves
+    the flange widths and the web (half model).
+    """
+    h_w, t_top, t_bottom = p['my%s_Web_H' % member], p['my%s_FlangeTop_T' % member], p['my%s_FlangeBotom_T' % member]
+    f = 0.5 if half else 1.0
+    return (h_w/2.0 + t_bottom, h_w + t_top + t_bottom, f*p['my%s_FlangeBottom_W' % member],
+            f*p['my%s_FlangeTop_W' % member], t_bottom, t_top, f*p['my%s_Web_T' % member])
+
+
+def _node_plane(coords, value, upper, tol=1e-6):
+    """First node plane of a mesh axis at or beyond `value`, away from the joint; None at the member end."""
+    if upper:
+        beyond = coords[coords >= value - tol]
+        return beyond.min() if len(beyond) and beyond.min() < coords.max() - tol else None
+    beyond = coords[coords <= value + tol]
+    return beyond.max() if len(beyond) and beyond.max() > coords.min() + tol else None
+
+
+def _line_part(name, segments, size, p, member, n1, half):
+    mesh = hm.merge([hm.polyline(points, size) for points in segments])
+    part = MeshPart(name, mesh[0], mesh[1], BEAM_ELEMENT)
+    part.elsets[name] = np.arange(len(mesh[1]))
+    # Web and flange steel are the same material (fep.materials).
+    part.beam_section(name, 'Flange', i_section(p, member, half), n1)
+    return part
+
+
+def detail_parts(p, column, beam, length, half=False, tol=1e-6):
+    """Column and beam cut to the detailed region, and the B31 line parts of the rest.
+
+    The column keeps the elements within `length` of the beam axis, the
+    beam those up to `length` from the end plate, both rounded out to
+    the next node plane.  The lines run along the section origins of
+    i_section() from each cut to the member end, the beam line through
+    the load section.  Returns (column, beam, line parts).
+    """
+    if length < p['myEndPlate_H']/2.0:
+        raise ValueError('Detail length %g mm does not cover the end plate (%g mm each side of the beam axis)'
+                         % (length, p['myEndPlate_H']/2.0))
+    mid = p['myC_H']/2.0
+    bottom = _node_plane(column.nodes[:, 1], mid - length, False)
+    top = _node_plane(column.nodes[:, 1], mid + length, True)
+    end = _node_plane(beam.nodes[:, 2], length, True)
+    lines = []
+
+    y = hm.element_centroids(column.nodes, column.elements)[:, 1]
+    segments = []
+    if bottom is not None:
+        segments.append([(0.0, 0.0, 0.0), (0.0, bottom, 0.0)])
+    if top is not None:
+        segments.append([(0.0, top, 0.0), (0.0, p['myC_H'], 0.0)])
+    if segments:
+        column = trim_part(column, (y > (bottom if bottom is not None else -np.inf))
+                           & (y < (top if top is not None else np.inf)))
+        lines.append(_line_part(COLUMN_LINE, segments, p['myColumnMesh_Size'], p, 'C', (-1.0, 0.0, 0.0), half))
+
+    if end is not None:
+        z = hm.element_centroids(beam.nodes, beam.elements)[:, 2]
+        beam = trim_part(beam, z < end)
+        load_z = p['myLoad_D'] - p['myEndPlate_T']
+        points = [(0.0, 0.0, v) for v in [end] + ([load_z] if load_z > end + tol else []) + [p['myB_H']]]
+        lines.append(_line_part(BEAM_LINE, [points], p['myBeamMesh_Size'], p, 'B', (1.0, 0.0, 0.0), half))
+    return column, beam, lines
+
+
+# --------------------------------------------------------------------------
+# Deck
+# --------------------------------------------------------------------------
+def _name(name):
+    return '"%s"' % name if ' ' in name else name
+
+
+def _num(value):
+    text = '%.10g' % value
+    return text if ('.' in text or 'e' in text) else text + '.'
+
+
+def _id_lines(ids, per_line=16):
+    ids = list(ids)
+    return [', '.join('%d' % i for i in ids[k:k + per_line]) for k in range(0, len(ids), per_line)]
+
+
+def _node_lines(nodes, first=1):
+    return ['%d, %.8g, %.8g, %.8g' % ((first + i,) + tuple(xyz)) for i, xyz in enumerate(nodes)]
+
+
+def _element_lines(elements, first=1):
+    fmt = ', '.join(['%d']*(elements.shape[1] + 1))
+    return [fmt % ((first + i,) + tuple(row + 1)) for i, row in enumerate(elements)]
+
+
+def _part_lines(part):
+    lines = ['*Part, name=%s' % _name(part.name), '*Node']
+    lines += _node_lines(part.nodes)
+    lines.append('*Element, type=%s' % part.element_type)
+    lines += _element_lines(part.elements)
+    for name, ids in part.elsets.items():
+        lines.append('*Elset, elset=%s' % _name(name))
+        lines += _id_lines(ids + 1)
+    for section in part.sections:
+        lines += list(section)
+    lines.append('*End Part')
+    return lines
+
+
+def _instance_lines(instance):
+    lines = ['*Instance, name=%s, part=%s' % (_name(instance.name), _name(instance.part.name))]
+    if np.any(instance.translation):
+        lines.append(', '.join(_num(v) for v in instance.translation))
+    lines.append('*End Instance')
+    return lines
+
+
+def _nset_lines(name, instance, ids):
+    return ['*Nset, nset=%s, instance=%s' % (_name(name), _name(instance.name))] + _id_lines(np.asarray(ids) + 1)
+
+
+def _material_lines(name, density, modulus, plastic):
+    lines = ['*Material, name=%s' % _name(name), '*Density', '%s,' % _num(density),
+             '*Elastic', '%s, 0.3' % _num(modulus), '*Plastic']
+    lines += ['%s, %s' % (_num(stress), _num(strain)) for stress, strain in plastic]
+    return lines
+
+
+def _fire_material_lines(name, tables):
+    """Temperature-dependent material of fep.fire_materials.tables()."""
+    lines = ['*Material, name=%s' % _name(name)]
+    for keyword, table in (('*Conductivity', 'conductivity'), ('*Density', 'density'),
+                           ('*Elastic', 'elastic'), ('*Expansion, zero=20.', 'expansion'),
+                           ('*Plastic', 'plastic'), ('*Specific Heat', 'specific_heat')):
+        lines.append(keyword)
+        lines += [', '.join(_num(v) for v in row) + (',' if len(row) == 1 else '') for row in tables[table]]
+    return lines
+
+
+PART_BUILDERS = OrderedDict([(COLUMN, column_part), (BEAM, beam_part), (END_PLATE, end_plate_part), (BOLT, bolt_part)])
+
+
+def assemble(p, cache=None, half=False, bolts='solid', detail=None):
+    """Parts and instances of one case; parts come from `cache` (a PartCache) when given.
+
+    half keeps the x >= 0 half of the column, end plate and beam (cut
+    from the whole cached parts, the beam web at half its thickness) and
+    the bolts of the positive bolt column, numbered as in the whole joint.
+    bolts 'connector' leaves the bolt part and instances out.  detail is
+    the length of column and beam kept in detail (detail_parts()); the
+    B31 line parts come last.
+    """
+    builders = [(name, build) for name, build in PART_BUILDERS.items() if bolts == 'solid' or name != BOLT]
+    if cache is None:
+        parts = [build(p) for name, build in builders]
+    else:
+        parts = [cache.fetch(name, p, build) for name, build in builders]
+    column, beam, plate = parts[:3]
+    if half:
+        cols = sorted(bolt_columns(p))
+        if not np.allclose(cols, [-x for x in reversed(cols)]) or min(np.abs(cols)) <= 0.0:
+            raise ValueError('Half model needs the bolt columns symmetric about x = 0, got %s' % cols)
+        column, plate, beam = half_part(column), half_part(plate), half_part(beam)
+        _beam_sections(beam, p, p['myB_Web_T']/2.0)
+    lines = []
+    if detail:
+        column, beam, lines = detail_parts(p, column, beam, detail, half)
+    half_h = p['myC_H']/2.0
+    beam_offset = (0.0, half_h, p['myC_Depth']/2.0 + p['myEndPlate_T'])
+    instances = [Instance(COLUMN, column),
+                 Instance(BEAM, beam, beam_offset),
+                 Instance(END_PLATE, plate, (0.0, half_h, p['myC_Depth']/2.0))]
+    if bolts == 'solid':
+        for n, x, y in bolt_positions(p, half):
+            instances.append(Instance('%s-%d' % (BOLT, n), parts[3], (x, y, p['myC_Web_H']/2.0)))
+    for line in lines:
+        instances.append(Instance(line.name, line, beam_offset if line.name == BEAM_LINE else (0.0, 0.0, 0.0)))
+    return [column, beam, plate] + parts[3:] + lines, instances
+
+
+def restart_line(intervals=None):
+    """*Restart request of a step: none, or `intervals` points per step, each overwriting the last."""
+    if not intervals:
+        return '*Restart, write, frequency=0'
+    return '*Restart, write, number interval=%d, time marks=NO, overlay' % intervals
+
+
+def _set_lines(name, instances):
+    """Assembly node and element set of whole instances."""
+    lines = []
+    for instance in instances:
+        n_nodes, n_elements = len(instance.part.nodes), len(instance.part.elements)
+        lines += ['*Nset, nset=%s, instance=%s, generate' % (name, _name(instance.name)), '1, %d, 1' % n_nodes,
+                  '*Elset, elset=%s, instance=%s, generate' % (name, _name(instance.name)), '1, %d, 1' % n_elements]
+    return lines
+
+
+def tie_lines(p, plate, beam, tol=1e-6):
+    """End plate face against the beam (main) and the beam end (secondary, node based), tied."""
+    t = p['myEndPlate_T']
+    faces = hm.hex_faces_where(plate.part.nodes, plate.part.elements, lambda x, y, z: np.abs(z - t) < tol)
+    lines, data = [], []
+    for number, ids in sorted(faces.items()):
+        elset = '_EPlate_Surface_For_Beam_S%d' % number
+        lines += ['*Elset, elset=%s, internal, instance=%s' % (elset, _name(plate.name))] + _id_lines(ids + 1)
+        data.append('%s, S%d' % (elset, number))
+    lines += ['*Surface, type=ELEMENT, name=EPlate_Surface_For_Beam'] + data
+    lines += _nset_lines('_Beam_surf_EP', beam, hm.nodes_where(beam.part.nodes, lambda x, y, z: np.abs(z) < tol))
+    lines += ['*Surface, type=NODE, name=Beam_surf_EP', '_Beam_surf_EP, 1.']
+    lines += ['** Constraint: EPlate_to_Beam_Tie',
+              '*Tie, name=EPlate_to_Beam_Tie, adjust=yes', 'Beam_surf_EP, EPlate_Surface_For_Beam']
+    return lines
+
+
+def symmetry_lines(p, column, beam, plate, lines=(), tol=1e-6):
+    """Node set of the cut faces of a half model at x = 0.
+
+    Nodes of the rigid bodies (column ends, beam load section), of the
+    kinematic couplings to the B31 lines and the tied beam end are left
+    out: RP-1 has the same constraints as XSYMM, RP-2 and RP-3 are
+    fixed.  The B31 line nodes are added, except those of the rigid bodies.
+    """
+    load_z = p['myLoad_D'] - p['myEndPlate_T']
+    y_min, y_max = column.part.nodes[:, 1].min(), column.part.nodes[:, 1].max()
+    z_cut = beam.part.nodes[:, 2].max() if beam.part.nodes[:, 2].max() < p['myB_H'] - tol else np.inf
+    out = _nset_lines(SYMMETRY_SET, column, hm.nodes_where(
+        column.part.nodes, lambda x, y, z: (np.abs(x) < tol) & (y > y_min + tol) & (y < y_max - tol)))
+    out += _nset_lines(SYMMETRY_SET, plate, hm.nodes_where(plate.part.nodes, lambda x, y, z: np.abs(x) < tol))
+    out += _nset_lines(SYMMETRY_SET, beam, hm.nodes_where(
+        beam.part.nodes, lambda x, y, z: (np.abs(x) < tol) & (z > tol) & (np.abs(z - load_z) > tol)
+                                         & (np.abs(z - z_cut) > tol)))
+    for line in lines:
+        if line.name == COLUMN_LINE:
+            ends = hm.nodes_where(line.part.nodes, lambda x, y, z: (y < tol) | (y > p['myC_H'] - tol))
+        else:
+            ends = hm.nodes_where(line.part.nodes, lambda x, y, z: np.abs(z - load_z) < tol)
+        out += _nset_lines(SYMMETRY_SET, line, np.setdiff1d(np.arange(len(line.part.nodes)), ends))
+    return out
+
+
+def interface_lines(p, instances, tol=1e-6):
+    """Kinematic couplings of the cut sections of the detailed column and beam to the B31 line nodes there."""
+    named = dict((instance.name, instance) for instance in instances)
+    column, beam = named[COLUMN], named[BEAM]
+    ys, zs = column.part.nodes[:, 1], beam.part.nodes[:, 2]
+    cuts = []
+    if ys.min() > tol:
+        cuts.append(('Column_Bottom', column, named[COLUMN_LINE], 1, ys.min()))
+    if ys.max() < p['myC_H'] - tol:
+        cuts.append(('Column_Top', column, named[COLUMN_LINE], 1, ys.max()))
+    if zs.max() < p['myB_H'] - tol:
+        cuts.append(('Beam_End', beam, named[BEAM_LINE], 2, zs.max()))
+    lines = []
+    for name, member, line, axis, value in cuts:
+        lines += _nset_lines(name + '_Node', line, np.nonzero(np.abs(line.part.nodes[:, axis] - value) < tol)[0])
+        lines += _nset_lines('_%s_Section' % name, member,
+                             np.nonzero(np.abs(member.part.nodes[:, axis] - value) < tol)[0])
+        lines += ['*Surface, type=NODE, name=%s_Section' % name, '_%s_Section, 1.' % name,
+                  '** Constraint: %s' % name,
+                  '*Coupling, constraint name=%s, ref node=%s_Node, surface=%s_Section' % (name, name, name),
+                  '*Kinematic']
+    return lines
+
+
+def _surface_lines(name, pieces):
+    """Element-face surface over several instances; pieces are (instance, {face number: element indices})."""
+    lines, data = [], []
+    for instance, faces in pieces:
+        for number, ids in sorted(faces.items()):
+            elset = '_%s_%s_S%d' % (name, instance.name.replace(' ', '_'), number)
+            lines += ['*Elset, elset=%s, internal, instance=%s' % (elset, _name(instance.name))] + _id_lines(ids + 1)
+            data.append('%s, S%d' % (elset, number))
+    return lines + ['*Surface, type=ELEMENT, name=%s' % name] + data
+
+
+def contact_surfaces(p, instances, tol=1e-4):
+    """{surface name: element-face pieces} of the faces that can come into contact.
+
+    Part coordinates: the column in global coordinates, the end plate
+    with z = 0 on the column flange, the bolt with its shank from the
+    nut (z = 0) to the head (z = myBolt_M_T).
+    """
+    column, plate = instances[0], instances[2]
+    bolts = [i for i in instances if i.part.name == BOLT]
+    h_w, t_f, half_h = p['myC_Web_H'], p['myC_FlangeTop_T'], p['myC_H']/2.0
+    zone = p['myEndPlate_H']/2.0 + tol
+    r_hole, r_bolt, shank = p['myBoltHoleDia']/2.0, p['myBolt_M_Dia']/2.0, p['myBolt_M_T']
+    rows, cols = bolt_rows(p), bolt_columns(p)
+
+    def bore(x, y, dy):
+        d = np.min([np.hypot(x - cx, y - dy - cy) for cy in rows for cx in cols], axis=0)
+        return np.abs(d - r_hole) < tol
+
+    def faces(instance, predicate):
+        return [(instance, hm.hex_faces_where(instance.part.nodes, instance.part.elements, predicate, free=True))]
+
+    return OrderedDict([
+        ('Column_Flange_Outer', faces(column, lambda x, y, z: (np.abs(z - h_w/2.0 - t_f) < tol)
+                                      & (np.abs(y - half_h) <= zone))),
+        ('Column_Flange_Inner', faces(column, lambda x, y, z: (np.abs(z - h_w/2.0) < tol)
+                                      & (np.abs(y - half_h) <= zone))),
+        ('Column_Bores', faces(column, lambda x, y, z: bore(x, y, half_h) & (z > h_w/2.0 - tol))),
+        ('EP_Front', faces(plate, lambda x, y, z: np.abs(z) < tol)),
+        ('EP_Back', faces(plate, lambda x, y, z: np.abs(z - p['myEndPlate_T']) < tol)),
+        ('EP_Bores', faces(plate, lambda x, y, z: bore(x, y, 0.0))),
+        ('Bolt_Heads', sum([faces(b, lambda x, y, z: np.abs(z - shank) < tol) for b in bolts], [])),
+        ('Bolt_Nuts', sum([faces(b, lambda x, y, z: np.abs(z) < tol) for b in bolts], [])),
+        ('Bolt_Shanks', sum([faces(b, lambda x, y, z: (np.abs(np.hypot(x, y) - r_bolt) < tol)
+                                   & (z > -tol) & (z < shank + tol)) for b in bolts], [])),
+    ])
+
+
+# (secondary, main) surfaces of the contact pairs
+CONTACT_PAIRS = (('EP_Front', 'Column_Flange_Outer'), ('Bolt_Heads', 'EP_Back'), ('Bolt_Nuts', 'Column_Flange_Inner'),
+                 ('Bolt_Shanks', 'EP_Bores'), ('Bolt_Shanks', 'Column_Bores'))
+
+
+def contact_pair_lines(p, instances):
+    """Surfaces and *Contact Pair of the targeted contact (--contact pairs)."""
+    surfaces = contact_surfaces(p, instances)
+    used = [name for name, pieces in surfaces.items() if any(faces for _, faces in pieces)]
+    lines = []
+    for name in used:
+        lines += _surface_lines(name, surfaces[name])
+    pairs = ['%s, %s' % pair for pair in CONTACT_PAIRS if pair[0] in used and pair[1] in used]
+    return lines, ['** Interaction: Contact pairs',
+                   '*Contact Pair, interaction=Intprop-1, type=SURFACE TO SURFACE'] + pairs
+
+
+def connector_bolt_lines(p, instances, half=False, first_node=4, surfaces=None):
+    """Assembly lines of the connector bolts (fep.bolt_connector): nodes, CONN3D2 elements, couplings.
+
+    The head node sits on the end plate outer face, the nut node on the
+    column flange inner face; each is coupled to the face nodes within
+    the head or nut radius.  surfaces are the contact_surfaces() whose
+    EP_Back and Column_Flange_Inner are still to be written.
+    """
+    head_z, nut_z = p['myC_Depth']/2.0 + p['myEndPlate_T'], p['myC_Web_H']/2.0
+    radius = {'Head': max(p['myBolt_T_Dia'], 1.1*p['myBoltHoleDia'])/2.0,
+              'Nut': max(p['myBolt_B_Dia'], 1.1*p['myBoltHoleDia'])/2.0}
+    lines = []
+    if surfaces is not None:
+        lines += _surface_lines('EP_Back', surfaces['EP_Back'])
+        lines += _surface_lines('Column_Flange_Inner', surfaces['Column_Flange_Inner'])
+    elements, couplings = [], []
+    for k, (n, x, y) in enumerate(bolt_positions(p, half)):
+        head, nut = first_node + 2*k, first_node + 2*k + 1
+        for label, end, z in ((head, 'Head', head_z), (nut, 'Nut', nut_z)):
+            name = '%s-%d_%s' % (BOLT, n, end)
+            lines += ['*Node', '%d, %s, %s, %s' % (label, _num(x), _num(y), _num(z)), '*Nset, nset=%s' % name, '%d,' % label]
+            surface = 'EP_Back' if end == 'Head' else 'Column_Flange_Inner'
+            couplings += ['*Coupling, constraint name=%s, ref node=%s, surface=%s, influence radius=%s'
+                          % (name, name, surface, _num(radius[end])),
+                          '*Distributing, weighting method=UNIFORM']
+        elements.append('%d, %d, %d' % (k + 1, head, nut))
+    lines += ['*Element, type=CONN3D2, elset=%s' % outputs.BOLT_SET] + elements
+    lines += ['*Connector Section, elset=%s, behavior=%s' % (outputs.BOLT_SET, bolt_connector.BEHAVIOR_NAME),
+              'Cartesian,']
+    return lines + couplings
+
+
+def connector_behavior_lines(p):
+    behavior = bolt_connector.behavior(p)
+    lines = ['*Connector Behavior, name=%s' % bolt_connector.BEHAVIOR_NAME]
+    for component, k in enumerate(behavior['stiffness'], 1):
+        lines += ['*Connector Elasticity, component=%d' % component, '%s,' % _num(k)]
+    for component, table in behavior['hardening'].items():
+        lines += ['*Connector Plasticity, component=%d' % component, '*Connector Hardening, definition=TABULAR']
+        lines += ['%s, %s' % (_num(force), _num(u)) for force, u in table]
+    return lines
+
+
+def _end_set(name, instance, line, predicate):
+    """RP node set on the member, or on its B31 line where the member is cut short; (lines, rigid body kind)."""
+    ids = hm.nodes_where(instance.part.nodes, predicate)
+    if len(ids) or line is None:
+        return _nset_lines(name, instance, ids), 'pin'
+    return _nset_lines(name, line, hm.nodes_where(line.part.nodes, predicate)), 'tie'
+
+
+def model_lines(p, job='Job-1', cache=None, materials=None, fire=None, half=False, contact='general', bolts='solid',
+                detail=None):
+    """Model data of one case (everything before the first step), see deck_lines()."""
+    parts, instances = assemble(p, cache, half, bolts, detail)
+    column, beam, plate = instances[0], instances[1], instances[2]
+    named = dict((instance.name, instance) for instance in instances)
+    line_instances = [i for i in instances if i.part.element_type == BEAM_ELEMENT]
+    tol = 1e-6
+
+    lines = ['*Heading', '** Job name: %s Model name: %s' % (job, job),
+             '** Generated by fep.inp_writer', '*Preprint, echo=NO, model=NO, history=NO, contact=NO']
+    for part in parts:
+        lines += _part_lines(part)
+
+    lines += ['*Assembly, name=Assembly']
+    for instance in instances:
+        lines += _instance_lines(instance)
+
+    # Reference points as assembly nodes, as CAE writes them
+    rps = [('RP-1', (0.0, p['myC_H']/2.0, p['myLoad_D'] + p['myB_Depth']/2.0)),
+           ('RP-2', (0.0, p['myC_H'], 0.0)),
+           ('RP-3', (0.0, 0.0, 0.0))]
+    for label, (name, xyz) in enumerate(rps, 1):
+        lines += ['*Node', '%d, %s' % (label, ', '.join(_num(v) for v in xyz)),
+                  '*Nset, nset=%s' % name, '%d,' % label]
+
+    load_z = p['myLoad_D'] - p['myEndPlate_T']
+    kinds = []
+    for rp, member, line, predicate in (
+            ('RP-1', beam, named.get(BEAM_LINE), lambda x, y, z: np.abs(z - load_z) < tol),
+            ('RP-2', column, named.get(COLUMN_LINE), lambda x, y, z: np.abs(y - p['myC_H']) < tol),
+            ('RP-3', column, named.get(COLUMN_LINE), lambda x, y, z: np.abs(y) < tol)):
+        set_lines, kind = _end_set('Beam_Set_' + rp, member, line, predicate)
+        lines += set_lines
+        kinds.append(kind)
+
+    lines += tie_lines(p, plate, beam)
+    if line_instances:
+        lines += interface_lines(p, instances)
+    for (rp, pins, name), kind in zip((('RP-1', 'Beam_Set_RP-1', 'Beam to RP-1'),
+                                       ('RP-2', 'Beam_Set_RP-2', 'Column to RP-2'),
+                                       ('RP-3', 'Beam_Set_RP-3', 'Column to RP-3')), kinds):
+        lines += ['** Constraint: %s' % name, '*Rigid Body, ref node=%s, %s nset=%s' % (rp, kind, pins)]
+    lines += _set_lines(outputs.BOLT_SET, [i for i in instances if i.part.name == BOLT])
+    lines += _set_lines(outputs.END_PLATE_SET, [plate])
+    if fire is not None:
+        lines += _set_lines(JOINT_SET, instances)
+    if half:
+        lines += symmetry_lines(p, column, beam, plate, line_instances)
+    if contact == 'pairs':
+        surface_lines, interaction_lines = contact_pair_lines(p, instances)
+        lines += surface_lines
+    if bolts == 'connector':
+        lines += connector_bolt_lines(p, instances, half, len(rps) + 1,
+                                      None if contact == 'pairs' else contact_surfaces(p, instances))
+    lines.append('*End Assembly')
+
+    lines += ['*Amplitude, name=Constant_Amp_Load', '0., 1., 1., 1.',
+              '*Amplitude, name=Ramp_Amp_Def', '0., 0., 1., 1.']
+    if materials is None:
+        lines += _material_lines('Bolt', p['myDensity'], p['MyBoltEM'], MyBoltPlastic)
+        lines += _material_lines('End Plate', p['myDensity'], p['MyEPEM'], MyEPPlastic)
+        lines += _material_lines('Flange', p['myDensity'], p['MyFlangeEM'], MyFlangePlastic)
+        lines += _material_lines('Web', p['myDensity'], p['MyWebEM'], MyWebPlastic)
+    else:
+        for name in ('Bolt', 'End Plate', 'Flange', 'Web'):
+            lines += _fire_material_lines(name, materials[name])
+    if bolts == 'connector':
+        lines += connector_behavior_lines(p)
+    lines += ['*Surface Interaction, name=Intprop-1', '1.,',
+              '*Friction, slip tolerance=0.005', '%s,' % _num(FRICTION),
+              '*Surface Behavior, pressure-overclosure=HARD']
+    lines += ['** BOUNDARY CONDITIONS',
+              '*Boundary', 'RP-2, ENCASTRE', 'RP-3, ENCASTRE']
+    if half:
+        lines.append('%s, XSYMM' % SYMMETRY_SET)
+    if fire is not None:
+        lines += ['*Initial Conditions, type=TEMPERATURE', '%s, %s' % (JOINT_SET, _num(AMBIENT))]
+    if contact == 'pairs':
+        lines += ['** INTERACTIONS'] + interaction_lines
+    else:
+        lines += ['** INTERACTIONS', '** Interaction: Self Contact', '*Contact, op=NEW',
+                  '*Contact Inclusions, ALL EXTERIOR', '*Contact Property Assignment', ' ,  , Intprop-1']
+    return lines
+
+
+def deck_lines(p, job='Job-1', cache=None, requests=None, materials=None, fire=None, restart=None, half=False,
+               contact='general', bolts='solid', detail=None):
+    """The complete input deck of one case as a list of lines.
+
+    requests are the field output requests (fep.outputs.profile()), the
+    standard profile by default.  materials maps the material names to
+    temperature-dependent tables (fep.fire_materials.joint_tables());
+    None writes the room-temperature tables.  fire = (thermal odb,
+    duration in s) adds a Fire step after Loading that holds the loads
+    and reads the nodal temperatures of that heat-transfer ODB.  restart
+    is the number of restart points written per step (fep.resume), none
+    by default.  half writes the half model about x = 0, which carries
+    half the column load (reactions to be scaled by HALF_REACTION_SCALE).
+    contact is 'general' (all exterior faces with themselves) or 'pairs'
+    (contact_pair_lines()).  bolts is 'solid' or 'connector'
+    (connector_bolt_lines()).  detail is the length of column and beam
+    meshed in detail, the rest being B31 lines (detail_parts()); None
+    meshes both members whole.
+    """
+    lines = model_lines(p, job, cache, materials, fire, half, contact, bolts, detail)
+    requests = outputs.profile() if requests is None else requests
+    if bolts == 'connector':
+        requests = bolt_connector.requests(requests)
+    column_load = p['myColumn_Load']/HALF_REACTION_SCALE if half else p['myColumn_Load']
+    lines += ['** STEP: %s' % STEP_NAME, '*Step, name=%s, nlgeom=YES, inc=100000' % STEP_NAME,
+              '*Static', '0.01, 1., 1e-15, 0.1',
+              '*Boundary, amplitude=Ramp_Amp_Def',
+              'RP-1, 1, 1', 'RP-1, 2, 2, %s' % _num(p['myBeamDisplacement']), 'RP-1, 5, 5', 'RP-1, 6, 6',
+              '*Cload, amplitude=Constant_Amp_Load', 'RP-3, 2, %s' % _num(column_load),
+              restart_line(restart)]
+    lines += outputs.deck_lines(requests)
+    lines += ['*Output, history, variable=PRESELECT',
+              '*End Step']
+    if fire is not None:
+        odb, duration = fire
+        lines += ['** STEP: %s' % FIRE_STEP_NAME, '*Step, name=%s, nlgeom=YES, inc=100000' % FIRE_STEP_NAME,
+                  '*Static', '1., %s, 1e-15, 60.' % _num(duration),
+                  '*Temperature, file=%s, bstep=1, binc=1, estep=1' % odb, restart_line(restart)]
+        lines += outputs.deck_lines(requests)
+        lines += ['*Output, field, number interval=%d' % max(1, int(round(duration/60.0))),
+                  '*Node Output', 'NT',
+                  '*Output, history, variable=PRESELECT',
+                  '*End Step']
+    return lines
+
+
+def write_deck(path, params, job=None, cache=None, requests=None, materials=None, fire=None, restart=None,
+               half=False, contact='general', bolts='solid', detail=None):
+    """Write the input deck of one case (params as returned by derive())."""
+    job = job or os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'w') as f:
+        f.write('\n'.join(deck_lines(params, job, cache, requests, materials, fire, restart, half, contact, bolts,
+                                     detail)) + '\n')
+    return path
+
+
+def write_sweep(base, cases, out_dir, cpus=1, cache=None, requests=None, material_cache=False, restart=None,
+                half=False, contact='general', bolts='solid', detail=None):
+    """write_deck() for every case, then the sweep manifest; returns the manifest entries.
+
+    material_cache False writes the room-temperature materials; None or a
+    fire_materials.material_cache() writes the temperature-dependent ones.
+    """
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    entries = []
+    for name, case in zip(doe.case_names(base, len(cases)), cases):
+        params = derive(case)
+        materials = None if material_cache is False else fire_materials.joint_tables(params, cache=material_cache)
+        inp = write_deck(os.path.join(out_dir, name + '.inp'), params, name, cache, requests, materials,
+                         restart=restart, half=half, contact=contact, bolts=bolts, detail=detail)
+        entries.append({'job': name, 'inp': os.path.abspath(inp), 'cpus': cpus, 'params': independent(params)})
+        if half:
+            entries[-1]['reaction_scale'] = HALF_REACTION_SCALE
+    doe.save_manifest(out_dir, base, entries)
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write Abaqus input decks of a sweep without CAE.')
+    parser.add_argument('spec', nargs='?', help='sweep spec (JSON); omit for the default case')
+    parser.add_argument('--model', default='Column_Trial_5', help='base job / model name')
+    parser.add_argument('--out', default='models')
+    parser.add_argument('--cpus', type=int, default=1, help='cpus recorded per case in the manifest')
+    parser.add_argument('--cache', default=None, help='meshed part cache (default: <out>/.partcache)')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--profile', default=outputs.DEFAULT_PROFILE, choices=list(outputs.PROFILES),
+                        help='output profile (see fep/outputs.py)')
+    parser.add_argument('--frames', type=int, default=None, help='field frames of the standard profile')
+    parser.add_argument('--fire-materials', action='store_true',
+                        help='EN 1993-1-2 temperature-dependent materials (cached in <out>/.materialcache)')
+    parser.add_argument('--restart-intervals', type=int, default=RESTART_INTERVALS,
+                        help='restart points per step, kept for fep.resume (0: no restart data)')
+    parser.add_argument('--half', action='store_true', help='half model about the web plane x = 0')
+    parser.add_argument('--contact', default='general', choices=CONTACT_MODES,
+                        help='general contact of all exterior faces, or targeted surface-to-surface pairs')
+    parser.add_argument('--bolts', default='solid', choices=bolt_connector.BOLT_MODELS,
+                        help='meshed solid bolts, or connector bolts for screening (fep.bolt_connector)')
+    parser.add_argument('--detail', type=float, default=None, metavar='LENGTH',
+                        help='mesh only this length (mm) of column and beam near the joint, B31 lines beyond')
+    args = parser.parse_args(argv)
+
+    cases = doe.generate(doe.load_spec(args.spec)) if args.spec else [{}]
+    cache = None if args.no_cache else partcache.PartCache(args.cache or os.path.join(args.out, '.partcache'))
+    start = time.time()
+    requests = outputs.profile(args.profile, args.frames)
+    material_cache = False
+    if args.fire_materials:
+        material_cache = fire_materials.material_cache(os.path.join(args.out, '.materialcache'))
+    entries = write_sweep(args.model, cases, args.out, args.cpus, cache, requests, material_cache,
+                          args.restart_intervals, args.half, args.contact, args.bolts, args.detail)
+    sys.stdout.write('%d decks written to %s in %.1f s\n' % (len(entries), args.out, time.time() - start))
+    if cache is not None:
+        sys.stdout.write('part cache: %(hits)d hits, %(misses)d misses\n' % cache.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+=======================================================================
+ fep.joints – moment-rotation properties and EC3 class of every case
+=======================================================================
+ The curves of a sweep (results/curves/<job>_curve.csv, fep.odb_extract)
+ are stacked into one (cases x points) array, padded with NaN, and every
+ property is computed for all cases at once:
+
+     S_j_ini          initial stiffness (kN·m/rad): slope through the
+                      origin of the elastic branch (up to a third of the
+                      peak moment), Huber-weighted so that slip and
+                      settling points do not pull it
+     M_j_R            plastic moment resistance (kN·m), two-tangent
+                      method: S_j_ini meets the straight line fitted to
+                      the pre-peak points above 90 % of the peak moment
+                      (slope S_j_post) at rotation_y
+     rotation_u       rotation capacity: where the moment falls below
+                      80 % of the peak after it, else the last rotation
+                      (capacity_reached 0: a lower bound)
+     ductility        rotation_u / rotation_y
+
+ and the joint is classified against the beam built by Create_Beam
+ (shell I-section on the flange and web centrelines, length myB_H)
+ as in EN 1993-1-8 5.2.2.5 and 5.2.3:
+
+     stiffness   rigid       S_j_ini >= k_b E I_b / L_b  (k_b 8 braced, 25 unbraced)
+                 pinned      S_j_ini <= 0.5 E I_b / L_b
+     strength    full        M_j_R >= M_pl,b,Rd
+                 pinned      M_j_R <= 0.25 M_pl,b,Rd
+                 else semi-rigid / partial.
+
+ The EN 1993-1-8 component values of fep.ec3 are listed next to them.
+ Rotation and moment are those of fep.response: RP-1 U2 and RF2 over the
+ lever arm from RP-1 to the column face.  Monotonic (Loading step)
+ curves only.
+
+     PYTHONPATH=src python -m fep.joints models/Column_Trial_5_sweep.json --curves results/curves --frame unbraced
+=======================================================================
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import ec3, response
+from fep.params import DEFAULTS, derive
+
+
+ELASTIC_FRACTION = 1.0/3.0      # of the peak moment: the elastic branch
+POST_FRACTION = 0.9             # of the peak moment: the post-limit branch
+CAPACITY_DROP = 0.8             # of the peak moment: end of the rotation capacity
+HUBER = 1.345                   # tuning constant of the Huber weights, times the robust residual scale
+K_B = {'braced': 8.0, 'unbraced': 25.0}
+STIFFNESS_CLASSES = ('pinned', 'semi-rigid', 'rigid')
+STRENGTH_CLASSES = ('pinned', 'partial', 'full')
+
+FIELDS = ('job', 'points', 'S_j_ini', 'S_j_post', 'M_j_R', 'rotation_y', 'M_max', 'rotation_at_max', 'rotation_u',
+          'capacity_reached', 'ductility', 'S_rigid', 'S_pinned', 'M_pl_b_Rd', 'stiffness_class', 'strength_class',
+          'S_j_ini_ec3', 'M_j_Rd_ec3')
+PROPERTIES_FILE = 'joint_properties.csv'
+
+
+def params_arrays(cases):
+    """derive() of each parameter dict, as one dict of arrays over the cases."""
+    derived = [derive(case) for case in cases]
+    return OrderedDict((name, np.array([p[name] for p in derived], dtype=float)) for name in derived[0])
+
+
+def stack(curves, p):
+    """(rotation, moment) arrays of shape (cases, points), NaN past the end of each curve.
+
+    curves is a list of fep.response.read_curve() dicts, p the
+    params_arrays() of the same cases.
+    """
+    points = max([len(curve['time']) for curve in curves] + [1])
+    u = np.full((len(curves), points), np.nan)
+    rf = np.full((len(curves), points), np.nan)
+    for i, curve in enumerate(curves):
+        u[i, :len(curve['U2_RP1'])] = curve['U2_RP1']
+        rf[i, :len(curve['RF2_RP1'])] = curve['RF2_RP1']
+    return response.moment_rotation({'U2_RP1': u, 'RF2_RP1': rf}, dict((name, p[name][:, None]) for name in p))
+
+
+def _fit_origin(r, m, mask, iterations=5):
+    """Huber-weighted least-squares slope through the origin of each row over mask."""
+    r0, m0 = np.where(mask, r, 0.0), np.where(mask, m, 0.0)
+    w = mask.astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        k = (w*r0*m0).sum(axis=1)/(w*r0*r0).sum(axis=1)
+        for _ in range(iterations):
+            e = np.where(mask, np.abs(m0 - k[:, None]*r0), np.nan)
+            scale = 1.4826*np.nanmedian(np.where(mask.any(axis=1)[:, None], e, 0.0), axis=1)
+            bound = HUBER*scale[:, None]
+            w = np.where(mask, np.where(e > bound, bound/np.where(e > 0, e, 1.0), 1.0), 0.0)
+            k = (w*r0*m0).sum(axis=1)/(w*r0*r0).sum(axis=1)
+    return k
+
+
+def _fit_line(r, m, mask):
+    """Least-squares (intercept, slope) of each row over mask; slope 0 through the mean with one point."""
+    n = mask.sum(axis=1)
+    r0, m0 = np.where(mask, r, 0.0), np.where(mask, m, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r_mean, m_mean = r0.sum(axis=1)/n, m0.sum(axis=1)/n
+        dr = np.where(mask, r0 - r_mean[:, None], 0.0)
+        sxx = (dr*dr).sum(axis=1)
+        slope = np.where((n > 1) & (sxx > 0), (dr*(m0 - m_mean[:, None])).sum(axis=1)/np.where(sxx > 0, sxx, 1.0),
+                         0.0)
+    slope = np.where(n > 0, slope, np.nan)
+    return m_mean - slope*r_mean, slope
+
+
+def properties(rotation, moment):
+    """Stiffness, resistance and rotation capacity of every row of stack(); dict of arrays."""
+    rotation, moment = np.asarray(rotation, dtype=float), np.asarray(moment, dtype=float)
+    cases, points = moment.shape
+    valid = np.isfinite(rotation) & np.isfinite(moment)
+    rows = np.arange(cases)
+    index = np.arange(points)[None, :]
+    m = np.where(valid, moment, -np.inf)
+    peak = m.argmax(axis=1)
+    m_max = np.where(valid.any(axis=1), m[rows, peak], np.nan)
+    before = valid & (index <= peak[:, None])
+
+    # Elastic branch: loaded pre-peak points up to a fraction of the peak, or
+    # the first loaded point when the first increment is already past it.
+    loaded = before & (rotation > 0)
+    elastic = loaded & (moment <= ELASTIC_FRACTION*m_max[:, None])
+    first = loaded & (np.cumsum(loaded, axis=1) == 1)
+    elastic = np.where(elastic.any(axis=1)[:, None], elastic, first)
+    s_ini = _fit_origin(rotation, moment, elastic)
+
+    # Two tangents: the elastic line and the post-limit line meet at rotation_y.
+    m0, s_post = _fit_line(rotation, moment, before & (moment >= POST_FRACTION*m_max[:, None]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rotation_y = m0/(s_ini - s_post)
+    rotation_y = np.where((s_ini > s_post) & (rotation_y > 0), rotation_y, np.nan)
+    m_j_r = s_ini*rotation_y
+
+    # Rotation capacity: first drop below CAPACITY_DROP of the peak after it, interpolated.
+    dropped = valid & (index > peak[:, None]) & (moment < CAPACITY_DROP*m_max[:, None])
+    reached = dropped.any(axis=1)
+    i = np.where(reached, dropped.argmax(axis=1), 0)
+    last = np.where(valid.any(axis=1), points - 1 - valid[:, ::-1].argmax(axis=1), 0)
+    r1, r2, m1, m2 = rotation[rows, i - 1], rotation[rows, i], moment[rows, i - 1], moment[rows, i]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.clip((m1 - CAPACITY_DROP*m_max)/(m1 - m2), 0.0, 1.0)
+    rotation_u = np.where(reached, r1 + t*(r2 - r1), rotation[rows, last])
+
+    out = OrderedDict()
+    out['points'] = valid.sum(axis=1)
+    out['S_j_ini'] = s_ini
+    out['S_j_post'] = s_post
+    out['M_j_R'] = m_j_r
+    out['rotation_y'] = rotation_y
+    out['M_max'] = m_max
+    out['rotation_at_max'] = np.where(valid.any(axis=1), rotation[rows, peak], np.nan)
+    out['rotation_u'] = np.where(valid.any(axis=1), rotation_u, np.nan)
+    out['capacity_reached'] = reached.astype(int)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out['ductility'] = out['rotation_u']/rotation_y
+    return out
+
+
+def beam_section(p):
+    """(I_b mm4, W_pl mm3) of the Create_Beam shell section: flanges and web on their centrelines."""
+    h = p['myB_Web_H_cc']
+    a_t = p['myB_FlangeTop_W']*p['myB_FlangeTop_T']
+    a_b = p['myB_FlangeBottom_W']*p['myB_FlangeBotom_T']
+    t_w = p['myB_Web_T']
+    a_w = t_w*h
+    area = a_t + a_b + a_w
+    y_c = (a_t*h + a_w*h/2.0)/area                                 # from the bottom flange centreline
+    inertia = a_w*h**2/12.0 + a_w*(h/2.0 - y_c)**2 + a_t*(h - y_c)**2 + a_b*y_c**2
+    y_p = np.clip((area/2.0 - a_b)/t_w, 0.0, h)                    # equal-area axis
+    w_pl = a_b*y_p + a_t*(h - y_p) + t_w*(y_p**2 + (h - y_p)**2)/2.0
+    return inertia, w_pl
+
+
+def classify(props, p, frame='unbraced', span=None):
+    """EN 1993-1-8 stiffness and strength class of each case; adds the limits to a copy of props.
+
+    span is the beam length L_b (mm), myB_H when None.
+    """
+    inertia, w_pl = beam_section(p)
+    span = p['myB_H'] if span is None else span
+    ei_l = p['myE']*inertia/span/1e6                               # kN·m/rad
+    out = OrderedDict(props)
+    out['S_rigid'] = K_B[frame]*ei_l
+    out['S_pinned'] = 0.5*ei_l
+    out['M_pl_b_Rd'] = w_pl*p['myFy']/ec3.GAMMA_M0/1e6
+    s, m = props['S_j_ini'], props['M_j_R']
+    stiffness = np.where(s >= out['S_rigid'], 2, np.where(s <= out['S_pinned'], 0, 1))
+    strength = np.where(m >= out['M_pl_b_Rd'], 2, np.where(m <= 0.25*out['M_pl_b_Rd'], 0, 1))
+    out['stiffness_class'] = np.where(np.isfinite(s), np.array(STIFFNESS_CLASSES, dtype=object)[stiffness], '')
+    out['strength_class'] = np.where(np.isfinite(m), np.array(STRENGTH_CLASSES, dtype=object)[strength], '')
+    return out
+
+
+def run(manifest_path, curve_dir='results/curves', out_path=None, frame='unbraced', span=None, log=None):
+    """Properties and classes of every case of a manifest with a curve; returns the rows written."""
+    from fep import doe
+    from fep.odb_extract import varying_params
+
+    log = log or (lambda message: sys.stdout.write(message + '\n'))
+    out_path = out_path or os.path.join(os.path.dirname(os.path.abspath(curve_dir)), PROPERTIES_FILE)
+    start = time.time()
+    cases = doe.load_manifest(manifest_path)['cases']
+    found = [case for case in cases if os.path.exists(os.path.join(curve_dir, case['job'] + '_curve.csv'))]
+    if len(found) < len(cases):
+        log('%d of %d cases have no curve in %s' % (len(cases) - len(found), len(cases), curve_dir))
+    if not found:
+        return []
+    curves = [response.read_curve(os.path.join(curve_dir, case['job'] + '_curve.csv')) for case in found]
+    p = params_arrays([case['params'] for case in found])
+    rotation, moment = stack(curves, p)
+    props = classify(properties(rotation, moment), p, frame, span)
+    joint = ec3.resistance(p)
+    props['S_j_ini_ec3'], props['M_j_Rd_ec3'] = joint['S_j_ini'], joint['M_j_Rd']
+
+    params = [name for name in varying_params(found) if name in DEFAULTS]
+    rows = []
+    with open(out_path, 'w') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(list(FIELDS) + params)
+        for i, case in enumerate(found):
+            values = [props[name][i] for name in FIELDS[1:]]
+            row = [case['job']] + [round(float(v), 6) if isinstance(v, (float, np.floating)) else v for v in values]
+            row = ['' if isinstance(v, float) and not np.isfinite(v) else v for v in row]
+            writer.writerow(row + [case['params'][name] for name in params])
+            rows.append(OrderedDict(zip(list(FIELDS) + params, row + [case['params'][name] for name in params])))
+    counts = ', '.join('%d %s' % (np.count_nonzero(props['stiffness_class'] == name), name)
+                       for name in STIFFNESS_CLASSES)
+    log('%d cases in %.2f s: %s (%s frame); written to %s' % (len(found), time.time() - start, counts, frame, out_path))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Moment-rotation properties and EN 1993-1-8 class of every case.')
+    parser.add_argument('manifest', help='models/<model>_sweep.json')
+    parser.add_argument('--curves', default='results/curves', help='<job>_curve.csv of fep.odb_extract')
+    parser.add_argument('--out', default=None, help='CSV written (default: joint_properties.csv next to curves/)')
+    parser.add_argument('--frame', choices=sorted(K_B), default='unbraced', help='k_b of the rigid limit')
+    parser.add_argument('--span', type=float, default=None, help='beam length L_b (mm), default myB_H')
+    args = parser.parse_args(argv)
+    run(args.manifest, args.curves, args.out, args.frame, args.span)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,13 @@
+"""
+=======================================================================
+ fep.materials – room-temperature steel tables of the FEP joint
+=======================================================================
+ True stress / plastic strain tables (N/mm2, -) used by Create_Material
+ in the main script and by the direct deck writer.
+=======================================================================
+"""
+
+MyBoltPlastic = (588.480037, 0.0), (620.221932, 0.001969588), (639.92125, 0.003119448), (660.066409, 0.004869265), (680.884675, 0.007497904), (702.708338, 0.011397498), (726.018148, 0.017111364), (751.50272, 0.025380009), (780.139135, 0.037193653), (813.301382, 0.053846562), (852.905183, 0.076983358), (901.6, 0.108620591), (1610.0, 0.68473987)
+MyFlangePlastic = (324.883797, 0.0), (342.263405, 0.001986836), (372.640806, 0.004168264), (403.927543, 0.008251454), (436.871142, 0.015530915), (472.714356, 0.027949365), (513.453487, 0.048276771), (562.200436, 0.080231161), (623.679429, 0.128434998), (704.895798, 0.198070686), (816.021472, 0.294140858), (971.55, 0.420409985), (1270.0, 0.686797181)
+MyWebPlastic = (324.883797, 0.0), (342.263405, 0.001986836), (372.640806, 0.004168264), (403.927543, 0.008251454), (436.871142, 0.015530915), (472.714356, 0.027949365), (513.453487, 0.048276771), (562.200436, 0.080231161), (623.679429, 0.128434998), (704.895798, 0.198070686), (816.021472, 0.294140858), (971.55, 0.420409985), (1270.0, 0.686797181)
+MyEPPlastic = (319.160569, 0.0), (336.231125, 0.001987108), (366.703443, 0.004193395), (398.090211, 0.00833728), (431.147856, 0.015741831), (467.135196, 0.028390912), (508.07507, 0.049107916), (557.120339, 0.081671038), (619.054958, 0.130755713), (700.967089, 0.201566892), (813.138202, 0.299072753), (970.2, 0.426931416), (1260.0, 0.686847181)
@@ -0,0 +1,368 @@
+"""
+=======================================================================
+ fep.odb_extract – parallel, streaming ODB post-processing of a sweep
+=======================================================================
+ Two halves in one file:
+
+ * worker (runs under `abaqus python`, standard library + odbAccess
+   only): opens one ODB read-only and reads the RP-1 / RP-2 / RP-3
+   history output written by every fep.outputs profile.  ODBs without
+   it are walked frame by frame, reading only the RP node-set subsets
+   of U and RF.  When the ODB has temperatures, the maximum NT11 of each
+   field frame is added, interpolated in time onto the history rows.
+   Each increment or frame becomes a row of
+   results/curves/<job>_curve.csv, flushed as it is written.  The
+   reactions are multiplied by the reaction_scale of the manifest entry
+   (2 for a half model, fep.inp_writer --half), so curves and summary
+   are always those of the whole joint.
+
+ * driver (plain Python): one worker process per ODB of the sweep
+   manifest, as many at a time as --workers, and one summary row per
+   case appended to results/summary_results.csv as soon as that case
+   finishes.  Cases already in the summary are skipped, so a crashed
+   or interrupted run resumes where it stopped.  With --db (fep.casedb)
+   a case whose model was extracted before takes the stored results,
+   one whose model ran under another job is read from that job's ODB,
+   and every new row is stored with its case.  A manifest entry with
+   `same_as` (a case repeating the model of an earlier case, not run)
+   gets a copy of that case's curve and summary row.
+
+     PYTHONPATH=src python -m fep.odb_extract models/Column_Trial_5_sweep.json --odb-dir results --workers 8
+=======================================================================
+"""
+
+import argparse
+import bisect
+import csv
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+
+RP_SETS = ('RP-1', 'RP-2', 'RP-3')
+CURVE_FIELDS = ('time', 'U2_RP1', 'RF2_RP1', 'RF2_RP2', 'RF2_RP3', 'max_temperature')
+SUMMARY_FIELDS = ('job', 'status', 'frames', 'final_time', 'peak_load', 'disp_at_peak', 'peak_moment',
+                  'rotation_at_peak', 'final_rotation', 'max_temperature', 'extract_seconds')
+SUMMARY_FILE = 'summary_results.csv'
+NOT_EXTRACTED = ('no odb', 'extract failed')      # not written, retried by the next run
+
+EXTRACT_COMMAND = ('abaqus', 'python', os.path.abspath(__file__), 'worker', '{odb}', '{curve}', '{scale}')
+
+
+# --------------------------------------------------------------------------
+# Worker (Abaqus Python)
+# --------------------------------------------------------------------------
+def _y(field, region):
+    values = field.getSubset(region=region).values
+    return values[0].data[1] if len(values) else float('nan')
+
+
+def _rp_history(step, node_set, variable):
+    """((time, value), ...) of an RP history output, or None when not requested."""
+    region = 'Node ASSEMBLY.%d' % node_set.nodes[0][0].label
+    if region not in step.historyRegions.keys():
+        return None
+    histories = step.historyRegions[region].historyOutputs
+    return histories[variable].data if variable in histories.keys() else None
+
+
+def _max_temperature(fields):
+    """Largest NT11 of a frame, None when the frame has no temperatures."""
+    if 'NT11' not in fields.keys():
+        return None
+    return max(float(block.data.max()) for block in fields['NT11'].bulkDataBlocks)
+
+
+def _frame_temperatures(step):
+    """([frame time], [max NT11]) of a step's field frames, None when it has no temperatures."""
+    times, values = [], []
+    for frame in step.frames:
+        value = _max_temperature(frame.fieldOutputs)
+        if value is not None:
+            times.append(frame.frameValue)
+            values.append(value)
+    return (times, values) if times else None
+
+
+def _temperature_at(temperatures, t):
+    """Max NT11 at step time t, linear between the frames around it ('' without temperatures)."""
+    if temperatures is None:
+        return ''
+    times, values = temperatures
+    i = bisect.bisect_left(times, t)
+    if i == 0:
+        return repr(values[0])
+    if i == len(times):
+        return repr(values[-1])
+    w = (t - times[i - 1])/(times[i] - times[i - 1]) if times[i] > times[i - 1] else 1.0
+    return repr(values[i - 1] + w*(values[i] - values[i - 1]))
+
+
+def _history_rows(step, regions, scale=1.0):
+    series = [_rp_history(step, regions['RP-1'], 'U2')] + \
+             [_rp_history(step, regions[rp], 'RF2') for rp in RP_SETS]
+    if any(s is None for s in series):
+        return None
+    temperatures = _frame_temperatures(step)
+    return [(step.totalTime + values[0][0], values[0][1]) + tuple(scale*v for _, v in values[1:])
+            + (_temperature_at(temperatures, values[0][0]),)
+            for values in zip(*series)]
+
+
+def extract(odb_path, curve_path, scale=1.0):
+    """Stream the RP curves of one ODB into curve_path; returns the number of rows.
+
+    RP history output (every increment, fep.outputs) is used when the
+    step has it, with the maximum NT11 of the step's field frames
+    interpolated to each increment; otherwise the field frames are
+    walked one by one.  The reactions are multiplied by `scale`.
+    """
+    from odbAccess import openOdb
+
+    odb = openOdb(path=odb_path, readOnly=True)
+    frames = 0
+    try:
+        sets = odb.rootAssembly.nodeSets
+        regions = dict((name, sets[name]) for name in RP_SETS)
+        with open(curve_path + '.tmp', 'w') as out:
+            out.write(','.join(CURVE_FIELDS) + '\n')
+            for step in odb.steps.values():
+                history = _history_rows(step, regions, scale)
+                if history is not None:
+                    for row in history:
+                        out.write(','.join(repr(float(v)) for v in row[:-1]) + ',' + row[-1] + '\n')
+                    out.flush()
+                    frames += len(history)
+                    continue
+                for frame in step.frames:
+                    fields = frame.fieldOutputs
+                    temperature = _max_temperature(fields)
+                    temperature = '' if temperature is None else repr(temperature)
+                    row = (step.totalTime + frame.frameValue,
+                           _y(fields['U'], regions['RP-1']),
+                           scale*_y(fields['RF'], regions['RP-1']),
+                           scale*_y(fields['RF'], regions['RP-2']),
+                           scale*_y(fields['RF'], regions['RP-3']))
+                    out.write(','.join(repr(float(v)) for v in row) + ',' + temperature + '\n')
+                    out.flush()
+                    frames += 1
+        if os.path.exists(curve_path):
+            os.remove(curve_path)
+        os.rename(curve_path + '.tmp', curve_path)
+    finally:
+        odb.close()
+    return frames
+
+
+def solver_status(odb_path):
+    """'completed', 'aborted' or 'unknown' from the .sta file next to the ODB."""
+    sta = os.path.splitext(odb_path)[0] + '.sta'
+    if not os.path.exists(sta):
+        return 'unknown'
+    with open(sta) as f:
+        text = f.read()
+    if 'COMPLETED SUCCESSFULLY' in text:
+        return 'completed'
+    return 'aborted' if 'NOT BEEN COMPLETED' in text else 'running'
+
+
+# --------------------------------------------------------------------------
+# Driver
+# --------------------------------------------------------------------------
+def summarize(job, curve, params, status):
+    """Summary row of one case from its curve (see fep.response)."""
+    import numpy as np
+    from fep import response
+
+    row = dict((name, '') for name in SUMMARY_FIELDS)
+    row.update(job=job, status=status, frames=len(curve['time']))
+    if len(curve['time']):
+        row.update(response.peak(curve, params))
+        rotation, _ = response.moment_rotation(curve, params)
+        row['final_time'] = curve['time'][-1]
+        row['final_rotation'] = rotation[-1]
+        if not np.all(np.isnan(curve['max_temperature'])):
+            row['max_temperature'] = np.nanmax(curve['max_temperature'])
+    return row
+
+
+def done_jobs(summary_path):
+    return set(summary_rows(summary_path))
+
+
+def summary_rows(summary_path):
+    """{job: summary row} of the cases already in the summary."""
+    if not os.path.exists(summary_path):
+        return {}
+    with open(summary_path) as f:
+        return dict((row['job'], row) for row in csv.DictReader(f))
+
+
+def summary_fields(summary_path, fields):
+    """Columns to append rows with: the summary's own header, widened by any new fields.
+
+    When fields adds columns, the summary is rewritten under the wider
+    header first (earlier rows blank in them), so rows of manifests with
+    different varying parameters never land under the wrong columns.
+    Returns (columns, whether a header still has to be written).
+    """
+    if not os.path.exists(summary_path) or not os.path.getsize(summary_path):
+        return list(fields), True
+    with open(summary_path) as f:
+        reader = csv.DictReader(f)
+        header = list(reader.fieldnames or [])
+        extra = [name for name in fields if name not in header]
+        if not extra:
+            return header, False
+        rows = list(reader)
+    header += extra
+    with open(summary_path + '.tmp', 'w') as f:
+        writer = csv.DictWriter(f, header, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(summary_path + '.tmp', summary_path)
+    return header, False
+
+
+def varying_params(cases):
+    """Parameter names whose value differs between cases, in manifest order."""
+    names = list(cases[0]['params']) if cases else []
+    return [name for name in names if len(set(repr(case['params'][name]) for case in cases)) > 1]
+
+
+def _extract_case(case, odb_dir, curve_dir, command, source=None):
+    """Summary row of one case, read from the ODB of job `source` (default: the case's own job)."""
+    from fep.params import derive
+    from fep.response import read_curve
+
+    job = case['job']
+    odb = os.path.abspath(os.path.join(odb_dir, (source or job) + '.odb'))
+    curve_path = os.path.abspath(os.path.join(curve_dir, job + '_curve.csv'))
+    start = time.time()
+    if not os.path.exists(odb):
+        row = summarize(job, {'time': []}, None, 'no odb')
+    else:
+        scale = case.get('reaction_scale', 1.0)
+        argv = [part.format(odb=odb, curve=curve_path, scale=repr(float(scale))) for part in command]
+        with open(os.path.join(curve_dir, job + '_extract.log'), 'w') as log:
+            code = subprocess.call(argv, cwd=curve_dir, stdout=log, stderr=subprocess.STDOUT)
+        if code != 0 or not os.path.exists(curve_path):
+            row = summarize(job, {'time': []}, None, 'extract failed')
+        else:
+            row = summarize(job, read_curve(curve_path), derive(case['params']), solver_status(odb))
+    row['extract_seconds'] = round(time.time() - start, 1)
+    return row
+
+
+def _copy_case(case, row, curve_dir):
+    """Summary row of a same_as case: the curve and results of the case that ran its model."""
+    shutil.copyfile(os.path.join(curve_dir, case['same_as'] + '_curve.csv'),
+                    os.path.join(curve_dir, case['job'] + '_curve.csv'))
+    return dict(row, job=case['job'], extract_seconds=0.0)
+
+
+def run(manifest_path, odb_dir='results', out_dir='results', workers=4, command=EXTRACT_COMMAND, log=None, db=None):
+    """Extract every case of a sweep manifest; returns the rows written in this run.
+
+    db is a fep.casedb.CaseDB the manifest is registered in, None for none.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from fep import doe
+
+    log = log or (lambda message: sys.stdout.write(message + '\n'))
+    cases = doe.load_manifest(manifest_path)['cases']
+    curve_dir = os.path.join(out_dir, 'curves')
+    if not os.path.isdir(curve_dir):
+        os.makedirs(curve_dir)
+    summary_path = os.path.join(out_dir, SUMMARY_FILE)
+    params = varying_params(cases)
+    fields = list(SUMMARY_FIELDS) + params
+    done = summary_rows(summary_path)
+    todo = [case for case in cases if case['job'] not in done and not case.get('same_as')]
+    copies = {}
+    for case in cases:
+        if case['job'] not in done and case.get('same_as'):
+            copies.setdefault(case['same_as'], []).append(case)
+    hashes, stored, sources = {}, {}, {}
+    if db is not None:
+        hashes = db.register_manifest(manifest_path)
+        for case in todo:
+            row, record = db.results(hashes[case['job']]), db.case(hashes[case['job']])
+            if row is not None:
+                stored[case['job']] = dict(row, job=case['job'], extract_seconds=0.0)
+            elif record['run_job'] != case['job']:
+                sources[case['job']] = record['run_job']
+    log('%d cases, %d already summarised, %d stored, %d to extract, %d copied'
+        % (len(cases), len(done), len(stored), len(todo) - len(stored), sum(map(len, copies.values()))))
+
+    fields, new_file = summary_fields(summary_path, fields)
+    rows = []
+    with open(summary_path, 'a') as f:
+        writer = csv.DictWriter(f, fields, restval='', extrasaction='ignore')
+        if new_file:
+            writer.writeheader()
+        # Threads only wait on the worker processes, one per ODB.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = dict((pool.submit(_extract_case, case, odb_dir, curve_dir, command, sources.get(case['job'])),
+                            case) for case in todo if case['job'] not in stored)
+
+            def rows_as_completed():
+                for job in copies:
+                    if job in done:
+                        yield None, done[job]
+                for case in todo:
+                    if case['job'] in stored:
+                        yield case, stored[case['job']]
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+
+            for case, row in rows_as_completed():
+                if row['status'] in NOT_EXTRACTED:
+                    log('%-24s %s' % (row['job'], row['status']))
+                    continue
+                if case is not None:
+                    if db is not None and case['job'] not in stored:
+                        db.store_results(hashes[case['job']], row)
+                    row.update((name, case['params'][name]) for name in params)
+                    writer.writerow(row)
+                    rows.append(row)
+                    log('%-24s %-14s %s frames (%.0f s)' % (row['job'], row['status'], row['frames'],
+                                                           row['extract_seconds']))
+                for copy in copies.get(row['job'], ()):
+                    copied = _copy_case(copy, row, curve_dir)
+                    copied.update((name, copy['params'][name]) for name in params)
+                    writer.writerow(copied)
+                    rows.append(copied)
+                    log('%-24s same as %s' % (copy['job'], row['job']))
+                f.flush()
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['worker']:
+        frames = extract(argv[1], argv[2], float(argv[3]) if len(argv) > 3 else 1.0)
+        sys.stdout.write('%d frames\n' % frames)
+        return 0
+
+    parser = argparse.ArgumentParser(description='Extract RP curves and summary rows from the ODBs of a sweep.')
+    parser.add_argument('manifest', help='models/<model>_sweep.json')
+    parser.add_argument('--odb-dir', default='results', help='where the solver wrote <job>.odb')
+    parser.add_argument('--out', default='results', help='summary_results.csv and curves/ go here')
+    parser.add_argument('--workers', type=int, default=4, help='ODBs extracted at a time')
+    parser.add_argument('--abaqus', default='abaqus', help='Abaqus launcher command')
+    parser.add_argument('--db', default=None, help='case database (fep.casedb), e.g. results/cases.sqlite')
+    args = parser.parse_args(argv)
+    command = (args.abaqus,) + EXTRACT_COMMAND[1:]
+    db = None
+    if args.db:
+        from fep import casedb
+        db = casedb.CaseDB(args.db)
+    run(args.manifest, args.odb_dir, args.out, args.workers, command, db=db)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+=======================================================================
+ fep.outputs – output request profiles
+=======================================================================
+ How much the solver writes per case.  Every profile records U and RF
+ of RP-1, RP-2 and RP-3 as history output at every increment, which
+ is all fep.odb_extract needs for the load-displacement and moment-
+ rotation curves.  They differ in the field output:
+
+     screening   U, RF of the whole model at the end of the step only
+     standard    U, RF of the whole model and S, PE, PEEQ of the
+                 bolts and the end plate at `frames` evenly spaced
+                 times (default 20)
+     full        S, PE, PEEQ, U, RF, CF, EVOL, STATUS of the whole
+                 model at every increment (the original request)
+
+ Frames are evenly spaced in step time (time marks), since the time of
+ peak load is not known before the run.
+=======================================================================
+"""
+
+from collections import OrderedDict, namedtuple
+
+
+RP_SETS = ('RP-1', 'RP-2', 'RP-3')
+RP_HISTORY = ('U', 'RF')
+BOLT_SET = 'Bolts'
+END_PLATE_SET = 'End_Plate'
+
+# region None = whole model; frames None = every increment, n = n evenly spaced times
+FieldRequest = namedtuple('FieldRequest', 'name region node_variables element_variables frames')
+
+DEFAULT_PROFILE = 'standard'
+DEFAULT_FRAMES = 20
+
+
+def profile(name=DEFAULT_PROFILE, frames=None):
+    """Field requests of a profile, frames overriding its default frame count."""
+    frames = frames or DEFAULT_FRAMES
+    if name == 'screening':
+        return [FieldRequest('F-Output-1', None, ('U', 'RF'), (), 1)]
+    if name == 'standard':
+        return [FieldRequest('F-Output-1', None, ('U', 'RF'), (), frames),
+                FieldRequest('F-Output-Bolts', BOLT_SET, (), ('S', 'PE', 'PEEQ'), frames),
+                FieldRequest('F-Output-EP', END_PLATE_SET, (), ('S', 'PE', 'PEEQ'), frames)]
+    if name == 'full':
+        return [FieldRequest('F-Output-1', None, ('U', 'RF', 'CF'), ('S', 'PE', 'PEEQ', 'EVOL', 'STATUS'), None)]
+    raise ValueError('Unknown output profile %r, expected one of %s' % (name, ', '.join(PROFILES)))
+
+
+PROFILES = OrderedDict((name, profile(name)) for name in ('screening', 'standard', 'full'))
+
+
+def history_name(rp):
+    return 'H-Output-' + rp
+
+
+def deck_lines(requests):
+    """*Output keyword lines of a profile for an input deck step."""
+    lines = []
+    for rp in RP_SETS:
+        lines += ['*Output, history, frequency=1', '*Node Output, nset=%s' % rp, ', '.join(RP_HISTORY)]
+    for request in requests:
+        if request.frames is None:
+            lines.append('*Output, field')
+        else:
+            lines.append('*Output, field, number interval=%d, time marks=YES' % request.frames)
+        region = ', elset=%s' % request.region if request.region else ''
+        if request.node_variables:
+            lines += ['*Node Output' + region.replace('elset', 'nset'), ', '.join(request.node_variables)]
+        if request.element_variables:
+            lines += ['*Element Output%s, directions=YES' % region, ', '.join(request.element_variables)]
+    return lines
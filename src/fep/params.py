@@ -0,0 +1,132 @@
+"""
+=======================================================================
+ fep.params – case parameters of the FEP joint
+=======================================================================
+ DEFAULTS holds the independent parameters of one case under the same
+ names the main script has always used (myEndPlate_T, MyBolt_D, New_Z,
+ ...).  derive() applies overrides and computes every dependent
+ dimension (web heights, bolt row positions, bolt shank length, ...)
+ exactly as the original parameter section did.  tensile_area() is the
+ bolt stress area As shared by fep.ec3 and fep.bolt_connector.
+
+ DESIGN_ONLY names the parameters the FE model never reads: the
+ nominal strengths and modulus of the design checks (fep.ec3, fep.fire,
+ fep.joints).  The FE materials are the fixed tables of fep.materials
+ with the part moduli My*EM.
+=======================================================================
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+DEFAULTS = OrderedDict([
+    #Column Parameter
+    ('myC_FlangeTop_W', 120),       #Column width
+    ('myC_FlangeTop_T', 12),        #Column Thickness
+    ('myC_FlangeBottom_W', 120),
+    ('myC_FlangeBotom_T', 12),
+    ('myC_Depth', 240),
+    ('myC_Web_T', 10),
+    ('myC_H', 1500),                #Column Height
+
+    #Beam Parameter
+    ('myB_FlangeTop_W', 120),       #Beam width
+    ('myB_FlangeTop_T', 12),        #Beam flange Thickness
+    ('myB_FlangeBottom_W', 120),
+    ('myB_FlangeBotom_T', 12),
+    ('myB_Depth', 240),
+    ('myB_Web_T', 10),
+    ('myB_H', 1500),                #Beam Height
+
+    #Bolt Parameter
+    ('myBolt_k', 10.0),             #outer thickness
+    ('MyBolt_S', 24.0),             #outer dia of T & B
+    ('MyBolt_D', 16.0),
+    ('MyBoltClear', 2.0),
+
+    #End Plate Parameter
+    ('myEndPlate_W', 120),          #width ep_w
+    ('myEndPlate_H', 260),          #Height ep_h
+    ('myEndPlate_T', 8),            #Thickness ept
+    ('myEndPlate_H_CC_T', 70),      #Horizontal distance of two bolt hole centres in top
+    ('myEndPlate_H_CC_B', 70),      #Horizontal distance of two bolt hole centres in bottom
+    ('Z_origonal', 179),
+    ('New_Z', 179),
+    ('myEndPlate_B_C', 65),         #Plate bottom to bolt hole center
+
+    #Loading
+    ('myLoad_D', 1470),             #Loading point to column edge surface
+    ('myColumn_Load', 20000),
+    ('myBeamDisplacement', -300.0),
+
+    #Material
+    ('myE', 200000),
+    ('myPoiratio', 0.3),
+    ('myDensity', 7.85e-9),
+    ('myFy', 355),
+    ('myFu', 470),
+    ('mySry', 0.0),
+    ('mySru', 0.18),
+    ('MyBoltEM', 191500),
+    ('MyFlangeEM', 200000),
+    ('MyWebEM', 200000),
+    ('MyEPEM', 198000),
+
+    #Mesh
+    ('myBeamMesh_Size', 40.0),
+    ('myBeamMeshEdge_Size', 8.0),
+    ('myBolrMesh_Size', 5.0),
+    ('myEPEdge_num', 2),
+    ('myEPMesh_Size', 8.0),
+    ('myColumnMesh_Size', 40.0),
+    ('myColumnMeshEdge_Size', 8.0),
+    ('myColumnEdge_num', 2),
+])
+
+DESIGN_ONLY = ('myE', 'myPoiratio', 'myFy', 'myFu', 'mySry', 'mySru')
+
+
+def derive(overrides=None):
+    """Return the full parameter dict of one case (independent + derived)."""
+    p = OrderedDict(DEFAULTS)
+    for name, value in (overrides or {}).items():
+        if name not in DEFAULTS:
+            raise KeyError('Unknown case parameter: %s' % name)
+        p[name] = value
+
+    p['myC_Web_H'] = p['myC_Depth'] - (p['myC_FlangeTop_T'] + p['myC_FlangeBotom_T'])  #just web height not in total
+    p['myB_Web_H'] = p['myB_Depth'] - (p['myB_FlangeTop_T'] + p['myB_FlangeBotom_T'])  #Just web height not in total
+    p['myB_Web_H_cc'] = p['myB_Web_H'] + (p['myB_FlangeTop_T'] + p['myB_FlangeBotom_T'])/2  #top to bottom flange CC distance
+
+    p['myBolt_T_Dia'] = p['MyBolt_S']
+    p['myBolt_T_T'] = p['myBolt_k']             #top thickness
+    p['myBolt_M_Dia'] = p['MyBolt_D']
+    p['myBolt_B_Dia'] = p['MyBolt_S']
+    p['myBolt_B_T'] = p['myBolt_k']             #Bottom Thickness
+
+    p['Z_vary'] = p['New_Z'] - p['Z_origonal']
+    p['myEndPlate_T_C'] = 65 - p['Z_vary']      #Plate top to bolt hole center
+    p['myBoltHoleDia'] = p['myBolt_M_Dia'] + p['MyBoltClear']
+    p['myBolt_M_T'] = p['myEndPlate_T'] + p['myC_FlangeTop_T']     #Middle Thickness
+    p['myEP_V_D_second_Row'] = 65 + p['Z_vary']     #1st row to second row
+    p['myEP_V_D_Third_Row'] = 130 + p['Z_vary']     #1st row to Third row
+    p['Cc_V'] = p['myEP_V_D_Third_Row'] - p['myEP_V_D_second_Row']     #2nd to 3rd row
+    return p
+
+
+# ISO 261 coarse thread pitch by nominal diameter, for the tensile stress area
+_NOMINAL = np.array([10.0, 12.0, 14.0, 16.0, 18.0, 20.0, 22.0, 24.0, 27.0, 30.0, 33.0, 36.0])
+_PITCH = np.array([1.5, 1.75, 2.0, 2.0, 2.5, 2.5, 2.5, 3.0, 3.0, 3.5, 3.5, 4.0])
+
+
+def tensile_area(d):
+    """Tensile stress area As (mm2) of a coarse thread of nominal diameter d (ISO 898-1)."""
+    d = np.asarray(d, dtype=float)
+    return np.pi/4.0*(d - 0.9382*np.interp(d, _NOMINAL, _PITCH))**2
+
+
+def independent(params):
+    """Strip derived entries, keeping only the DEFAULTS keys in order."""
+    return OrderedDict((name, params[name]) for name in DEFAULTS)
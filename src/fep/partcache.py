@@ -0,0 +1,124 @@
+"""
+=======================================================================
+ fep.partcache – meshed parts reused across the cases of a sweep
+=======================================================================
+ Every part of the joint depends on a handful of case parameters only
+ (the bolt on its diameters, head height and grip length, the beam on
+ its section, length and datum positions).  part_key() hashes exactly
+ those parameters, so two cases that differ elsewhere (New_Z, say)
+ share the key of their bolt and beam parts.
+
+ PartCache is a least-recently-used map from key to cached part, kept
+ in memory and optionally mirrored to a directory of pickles that is
+ itself trimmed to the most recently used entries.  In a CAE session
+ the cached value is the name of the model holding the meshed part
+ (copied with Part(objectToCopy=...)); fep.inp_writer caches its
+ MeshPart objects on disk.
+=======================================================================
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+
+
+CACHE_VERSION = 1
+
+_BOLT_ROWS = ('myEndPlate_H_CC_T', 'myEndPlate_H_CC_B', 'Cc_V', 'myEP_V_D_second_Row',
+              'myEP_V_D_Third_Row', 'myBoltHoleDia')
+
+# Case parameters (derived ones included) each part's geometry, partitions,
+# section assignment and mesh depend on.
+PART_DEPENDENCIES = OrderedDict([
+    ('Steel Column', ('myC_FlangeTop_W', 'myC_FlangeTop_T', 'myC_FlangeBottom_W', 'myC_FlangeBotom_T',
+                      'myC_Depth', 'myC_Web_T', 'myC_H', 'myEndPlate_W', 'myEndPlate_H')
+                     + _BOLT_ROWS + ('myColumnMesh_Size', 'myColumnMeshEdge_Size', 'myColumnEdge_num')),
+    # The load datum of the beam sits at myLoad_D - myEndPlate_T.
+    ('Steel Beam', ('myB_FlangeTop_W', 'myB_FlangeTop_T', 'myB_FlangeBottom_W', 'myB_FlangeBotom_T',
+                    'myB_Depth', 'myB_Web_T', 'myB_H', 'myLoad_D', 'myEndPlate_T',
+                    'myBeamMesh_Size', 'myBeamMeshEdge_Size')),
+    ('End Plate', ('myEndPlate_W', 'myEndPlate_H', 'myEndPlate_T', 'myEndPlate_T_C', 'myEndPlate_B_C')
+                  + _BOLT_ROWS + ('myEPMesh_Size', 'myEPEdge_num')),
+    ('Bolt', ('MyBolt_D', 'MyBolt_S', 'myBolt_k', 'myBolt_M_T', 'myBolrMesh_Size')),
+])
+
+
+def part_key(part, params, salt=''):
+    """Hex digest of the parameters `part` depends on (params as returned by derive())."""
+    values = [(name, float(params[name])) for name in PART_DEPENDENCIES[part]]
+    text = json.dumps([CACHE_VERSION, salt, part, values])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class PartCache(object):
+
+    def __init__(self, directory=None, max_entries=32, max_disk_entries=512):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def get(self, key):
+        """Cached value of `key` or None; a hit becomes the most recently used entry."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        if self.directory and os.path.exists(self._path(key)):
+            with open(self._path(key), 'rb') as f:
+                value = pickle.load(f)
+            os.utime(self._path(key), None)
+            self._remember(key, value)
+            self.hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.directory:
+            path = self._path(key)
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(value, f, protocol=2)
+            os.replace(path + '.tmp', path)
+            self._trim_disk()
+
+    def fetch(self, part, params, build):
+        """Cached `part` for these params, or build(params) stored under its key."""
+        key = part_key(part, params)
+        value = self.get(key)
+        if value is None:
+            value = build(params)
+            self.put(key, value)
+        return value
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _trim_disk(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.endswith('.pkl')]
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_disk_entries]:
+            os.remove(path)
+
+    def values(self):
+        """Values held in memory, most recently used last."""
+        return list(self._memory.values())
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._memory)}
@@ -0,0 +1,355 @@
+"""
+=======================================================================
+ fep.profiler – stage timings of the CAE model build
+=======================================================================
+ Profiler.case() times one case of P1_FEP_ParametricStudy.py
+ (myProfileDir) call by call, with sys.setprofile:
+
+ * every function of the script, and of the fep package, is a stage,
+   nested as it is called (Build_Model > Create_Bolt > ...);
+ * every call a stage makes directly into CAE (part.PartitionCellBy-
+   DatumPlane, p.generateMesh, ...) is a leaf under that stage; calls
+   into the standard library and NumPy are part of the stage's own
+   time.
+
+ The cells, faces, edges, elements and nodes of the case's model are
+ counted when a stage of the first count_depth levels starts and ends,
+ so the report shows what each builder added next to what it cost.
+ save() writes, for all cases profiled:
+
+ * <base>_stages.csv  one row per case and stack: calls, seconds, self
+                      seconds, entity counts after it and added by it;
+ * <base>.folded      "case;Build_Model;Create_Bolt;Part.generateMesh
+                      <self us>" lines for flamegraph.pl, speedscope or
+                      inferno, summed over the cases;
+ * <base>_report.txt  seconds per case of the stages and of the CAE
+                      calls, as returned by save().
+
+ Without a license the script runs against fep.cae_standin, a
+ recording stand-in of mdb whose geometry is a box complex; its CAE
+ times are those of the stand-in, the stage times and counts those of
+ the script:
+
+     PYTHONPATH=src python -m fep.profiler P1_FEP_ParametricStudy.py sweep.json --out results/profile
+     PYTHONPATH=src python -m fep.profiler P1_FEP_ParametricStudy.py --set myContact='"pairs"' --set myHalfModel=true
+=======================================================================
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+
+COUNTS = ('cells', 'faces', 'edges', 'elements', 'nodes')
+STAGE_FIELDS = ('case', 'stack', 'name', 'kind', 'calls', 'seconds', 'self_seconds') + COUNTS + \
+    tuple('d_' + name for name in COUNTS)
+TRANSPARENT = ('<lambda>', '<listcomp>', '<genexpr>', '<dictcomp>', '<setcomp>')
+# Output directory of a stand-in run (main), read by the script in place of
+# myModelDir and myProfileDir, and the model settings (--set) it applies.
+STANDIN_OUT = None
+STANDIN_SETTINGS = {}
+
+_NOT_STAGES = ('fep.profiler', 'fep.cae_standin')
+_LIBRARIES = set(getattr(sys, 'stdlib_module_names', ())) | set(['numpy', 'builtins', 'fep'])
+
+
+def model_counts(mdb, name):
+    """Cells, faces, edges, elements and nodes of the parts of model `name` (zeros before it exists)."""
+    counts = dict((key, 0) for key in COUNTS)
+    if name not in mdb.models.keys():
+        return counts
+    for part in mdb.models[name].parts.values():
+        for key in COUNTS:
+            counts[key] += len(getattr(part, key))
+    return counts
+
+
+class _Node(object):
+
+    __slots__ = ('kind', 'calls', 'seconds', 'child_seconds', 'counts', 'deltas')
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.calls = 0
+        self.seconds = self.child_seconds = 0.0
+        self.counts = self.deltas = None
+
+
+class _Frame(object):
+    """A stage or CAE call being timed."""
+
+    __slots__ = ('frame', 'path', 'kind', 'start', 'child', 'counts')
+
+    def __init__(self, frame, path, kind, start, counts=None):
+        self.frame = frame
+        self.path = path
+        self.kind = kind
+        self.start = start
+        self.child = 0.0
+        self.counts = counts
+
+
+class _Case(object):
+
+    def __init__(self, profiler, name, counter):
+        self.profiler = profiler
+        self.name = name
+        self.counter = counter
+
+    def __enter__(self):
+        self.profiler._start(self, sys._getframe(1))
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._stop()
+        return False
+
+
+class Profiler(object):
+    """Stage and CAE call timings of cases: the functions of the module
+    that opens case() and of the fep package are stages."""
+
+    def __init__(self, count_depth=2):
+        self.count_depth = count_depth
+        self.cases = []         # (case name, {path: _Node})
+        self._script = None     # globals of the module that opened the case
+        self._stages = {}       # code object: is a stage
+        self._stack = []
+        self._nodes = None
+        self._counter = None
+        self._overhead = 0.0
+
+    def case(self, name, counter=None):
+        """Context manager profiling the code of its block as case `name`.
+
+        counter() returns the entity counts of the case's model (see
+        model_counts), None for timings only.
+        """
+        return _Case(self, name, counter)
+
+    # -- recording ----------------------------------------------------------
+    def _is_stage(self, frame):
+        module = frame.f_globals.get('__name__', '')
+        return frame.f_code.co_name not in TRANSPARENT and module not in _NOT_STAGES and \
+            (frame.f_globals is self._script or module.startswith('fep.'))
+
+    def _stage_name(self, frame):
+        code = frame.f_code
+        stage = self._stages.get(code)
+        if stage is None:
+            stage = self._stages[code] = self._is_stage(frame)
+        if not stage:
+            return None
+        owner = frame.f_locals.get('self') if code.co_argcount else None
+        return type(owner).__name__ + '.' + code.co_name if owner is not None else code.co_name
+
+    def _call_name(self, frame, event, arg):
+        """Name of a CAE call, or None for a library call."""
+        if event == 'c_call':
+            owner = getattr(arg, '__self__', None)
+            module = getattr(type(owner), '__module__', None) if owner is not None else arg.__module__
+            if owner is None or module is None or module.split('.')[0] in _LIBRARIES:
+                return None
+            return type(owner).__name__ + '.' + arg.__name__
+        code = frame.f_code
+        module = frame.f_globals.get('__name__', '')
+        if module.split('.')[0] in _LIBRARIES and module not in _NOT_STAGES:
+            return None
+        if code.co_name.startswith('__') and code.co_name != '__call__' or code.co_name in TRANSPARENT:
+            return None
+        owner = frame.f_locals.get('self') if code.co_argcount else None
+        if owner is None:
+            return code.co_name
+        if isinstance(getattr(type(owner), code.co_name, None), property):
+            return None     # attribute access (p.faces), as in CAE
+        label = getattr(owner, '__dict__', {}).get('profile_name') or type(owner).__name__
+        return label if code.co_name == '__call__' else label + '.' + code.co_name
+
+    def _clock(self):
+        """Seconds, less the time spent in the profiler itself."""
+        return time.perf_counter() - self._overhead
+
+    def _push(self, frame, name, kind, now, count=False):
+        path = self._stack[-1].path + (name,)
+        if path not in self._nodes:
+            self._nodes[path] = _Node(kind)
+        counts = self._counter() if count and self._counter else None
+        self._stack.append(_Frame(frame, path, kind, now, counts))
+
+    def _pop(self, now):
+        item = self._stack.pop()
+        elapsed = now - item.start
+        node = self._nodes[item.path]
+        node.calls += 1
+        node.seconds += elapsed
+        node.child_seconds += item.child
+        if item.counts is not None:
+            counts = self._counter()
+            node.counts = counts
+            deltas = dict((key, counts[key] - item.counts[key]) for key in COUNTS)
+            node.deltas = deltas if node.deltas is None else \
+                dict((key, node.deltas[key] + deltas[key]) for key in COUNTS)
+        if self._stack:
+            self._stack[-1].child += elapsed
+
+    def _hook(self, frame, event, arg):
+        # Profiling is off while the hook runs, so the counter's own calls
+        # are not seen; its time and the hook's go into _overhead.
+        entered = time.perf_counter()
+        now = entered - self._overhead
+        top = self._stack[-1]
+        if event == 'call':
+            if top.kind == 'cae':       # inside a CAE call: part of it
+                pass
+            elif self._stage_name(frame) is not None:
+                self._push(frame, self._stage_name(frame), 'stage', now, len(top.path) <= self.count_depth)
+            elif frame.f_back is top.frame:
+                name = self._call_name(frame, event, arg)
+                if name is not None:
+                    self._push(frame, name, 'cae', now)
+        elif event == 'return':
+            if top.frame is frame and len(self._stack) > 1:
+                self._pop(now)
+        elif event == 'c_call':
+            if top.kind == 'stage' and top.frame is frame:
+                name = self._call_name(frame, event, arg)
+                if name is not None:
+                    self._push(None, name, 'cae', now)
+        elif event in ('c_return', 'c_exception'):
+            if top.frame is None and self._stack[-2].frame is frame:
+                self._pop(now)
+        self._overhead += time.perf_counter() - entered
+
+    def _start(self, case, frame):
+        self._nodes = {('case',): _Node('stage')}
+        self._counter = case.counter
+        self._script = frame.f_globals
+        self.cases.append((case.name, self._nodes))
+        counts = case.counter and case.counter()
+        self._stack = [_Frame(frame, ('case',), 'stage', self._clock(), counts)]
+        sys.setprofile(self._hook)
+
+    def _stop(self):
+        sys.setprofile(None)
+        now = self._clock()
+        while self._stack:     # stages left open by an exception, then the case
+            self._pop(now)
+        self._counter = None
+
+    # -- output ---------------------------------------------------------------
+    def rows(self):
+        """One row per case and stack, in the order the stacks were first entered."""
+        rows = []
+        for case, nodes in self.cases:
+            for path, node in nodes.items():
+                row = {'case': case, 'stack': ';'.join(path), 'name': path[-1],
+                       'kind': node.kind,
+                       'calls': node.calls, 'seconds': round(node.seconds, 6),
+                       'self_seconds': round(node.seconds - node.child_seconds, 6)}
+                for key in COUNTS:
+                    row[key] = node.counts[key] if node.counts else ''
+                    row['d_' + key] = node.deltas[key] if node.deltas else ''
+                rows.append(row)
+        return rows
+
+    def folded(self):
+        """{stack: self microseconds} summed over the cases, the case root named 'case'."""
+        stacks = {}
+        for _, nodes in self.cases:
+            for path, node in nodes.items():
+                stacks[path] = stacks.get(path, 0) + (node.seconds - node.child_seconds)*1e6
+        return [(';'.join(path), int(round(us))) for path, us in stacks.items() if us >= 0.5]
+
+    def report(self, depth=2, top=15):
+        """Per-stage table (seconds per case, share, entities added) and the slowest CAE calls."""
+        n = max(len(self.cases), 1)
+        totals = {}
+        for row in self.rows():
+            key = (row['stack'], row['kind'])
+            total = totals.setdefault(key, dict(calls=0, seconds=0.0, self_seconds=0.0, cases=0,
+                                                **dict((k, 0) for k in COUNTS)))
+            total['calls'] += row['calls']
+            total['seconds'] += row['seconds']
+            total['self_seconds'] += row['self_seconds']
+            total['cases'] += 1
+            for k in COUNTS:
+                total[k] += row['d_' + k] or 0
+        whole = sum(t['seconds'] for (stack, _), t in totals.items() if stack == 'case') or 1e-12
+        lines = ['%d case(s), %.2f s per case, profiler overhead %.2f s per case'
+                 % (len(self.cases), whole/n, self._overhead/n), '',
+                 '%-52s %7s %9s %9s %6s %8s %8s %10s' % ('stage', 'calls', 's/case', 'self s', 'share',
+                                                         'cells', 'faces', 'elements')]
+        first = {}
+        for stack, _ in totals:
+            first.setdefault(stack, len(first))
+        order = lambda stack: [first.get(';'.join(stack.split(';')[:i + 1]), 0)
+                               for i in range(stack.count(';') + 1)]
+        for (stack, kind), t in sorted(totals.items(), key=lambda item: order(item[0][0])):
+            path = stack.split(';')
+            if kind != 'stage' or len(path) > depth + 1:
+                continue
+            lines.append('%-52s %7.1f %9.3f %9.3f %5.1f%% %8s %8s %10s'
+                         % (('  '*(len(path) - 1) + path[-1])[:52], t['calls']/float(n), t['seconds']/n,
+                            t['self_seconds']/n, 100.0*t['seconds']/whole,
+                            *('%.0f' % (t[k]/float(n)) for k in ('cells', 'faces', 'elements'))))
+        calls = {}
+        for (stack, kind), t in totals.items():
+            if kind == 'cae':
+                name = stack.split(';')[-1]
+                total = calls.setdefault(name, [0, 0.0])
+                total[0] += t['calls']
+                total[1] += t['seconds']
+        lines += ['', '%-52s %7s %9s %6s' % ('CAE call', 'calls', 's/case', 'share')]
+        for name, (count, seconds) in sorted(calls.items(), key=lambda item: -item[1][1])[:top]:
+            lines.append('%-52s %7.1f %9.3f %5.1f%%' % (name[:52], count/float(n), seconds/n, 100.0*seconds/whole))
+        return '\n'.join(lines) + '\n'
+
+    def save(self, out_dir, base):
+        """Write <base>_stages.csv, <base>.folded and <base>_report.txt to out_dir; returns the report."""
+        if not os.path.isdir(out_dir):
+            os.makedirs(out_dir)
+        with open(os.path.join(out_dir, base + '_stages.csv'), 'w') as f:
+            writer = csv.DictWriter(f, STAGE_FIELDS, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(self.rows())
+        with open(os.path.join(out_dir, base + '.folded'), 'w') as f:
+            for stack, us in self.folded():
+                f.write('%s %d\n' % (stack, us))
+        text = self.report()
+        with open(os.path.join(out_dir, base + '_report.txt'), 'w') as f:
+            f.write(text)
+        return text
+
+
+def main(argv=None):
+    import runpy
+    from fep import cae_standin, profiler
+
+    parser = argparse.ArgumentParser(description='Profile the model build of the study script against the '
+                                                 'fep.cae_standin mdb.')
+    parser.add_argument('script', help='P1_FEP_ParametricStudy.py')
+    parser.add_argument('sweep', nargs='?', default=None, help='sweep spec (fep.doe); default: the script\'s myCase')
+    parser.add_argument('--out', default=os.path.join('results', 'profile'),
+                        help='decks, <model>_stages.csv, <model>.folded and <model>_report.txt go here')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='model setting of the study script (JSON value), e.g. myContact=\\"pairs\\"')
+    args = parser.parse_args(argv)
+    from fep import spec
+    settings = dict(spec._setting(text) for text in args.set)
+    unknown = [name for name in settings if name not in spec.SETTINGS]
+    if unknown:
+        parser.error('unknown model setting: %s' % ', '.join(unknown))
+    if not os.path.isdir(args.out):
+        os.makedirs(args.out)
+    cae_standin.install()
+    profiler.STANDIN_OUT = os.path.abspath(args.out)    # the module the script imports, not __main__
+    profiler.STANDIN_SETTINGS = settings
+    sys.argv = [args.script] + (['--', args.sweep] if args.sweep else [])
+    runpy.run_path(args.script, run_name='__main__')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
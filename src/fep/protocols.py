@@ -0,0 +1,318 @@
+"""
+=======================================================================
+ fep.protocols – cyclic loading protocols with shared restart prefixes
+=======================================================================
+ Displacement histories for RP-1 from the standard cyclic protocols,
+ in joint rotation (RP-1 displacement over the lever arm to the column
+ face, as fep.response reads it back):
+
+     aisc341   AISC 341-16 K2.4b qualifying cycles: 6 at 0.00375, 6 at
+               0.005, 6 at 0.0075, 4 at 0.01, 2 each at 0.015, 0.02,
+               0.03 and 0.04 rad, then 2 per further 0.01 rad
+     eccs      ECCS (1986) short procedure: one cycle each at 1/4, 1/2,
+               3/4 and 1 e_y, then 3 cycles each at 2, 4, 6 ... e_y;
+               e_y defaults to Mj,Rd / Sj,ini of fep.ec3
+
+ both up to max_rotation.  Every group of equal cycles is one step
+ (Cycles_01, Cycles_02, ...) after the Loading step, which here
+ applies the column load only; its tabular amplitude starts in the
+ direction of myBeamDisplacement.
+
+ Cases of the same model whose histories begin with the same groups
+ (two protocol lengths, an AISC run to 0.04 and to 0.06 rad) solve the
+ common groups once: the cases form a prefix tree, the shared part is
+ a job of its own that writes restart data at its last step, and each
+ continuation is a restart analysis (*Restart, read; fep.scheduler
+ runs it with oldjob=) holding only its remaining steps.
+
+     PYTHONPATH=src python -m fep.protocols cyclic.json --model Cyclic --out models
+
+ with cases varying "protocol", "max_rotation" or "yield_rotation"
+ next to the model parameters, writes models/<job>.inp, the case
+ manifest models/<model>_sweep.json and the shared prefixes in
+ models/<model>_prefix_sweep.json; run both manifests in one queue.
+ A restarted ODB holds its own steps only, so the curve of a case is
+ its chain of jobs put together (chain_curve()).
+=======================================================================
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import doe
+from fep import ec3
+from fep import inp_writer
+from fep import outputs
+from fep import partcache
+from fep import response
+from fep.params import derive, independent
+
+
+PROTOCOLS = ('aisc341', 'eccs')
+PROTOCOL_PARAMS = ('protocol', 'max_rotation', 'yield_rotation')
+DEFAULT_PROTOCOL = 'aisc341'
+DEFAULT_MAX_ROTATION = 0.04
+
+# AISC 341-16 K2.4b: rotation (rad), cycles
+AISC_341 = ((0.00375, 6), (0.005, 6), (0.0075, 6), (0.01, 4), (0.015, 2), (0.02, 2), (0.03, 2), (0.04, 2))
+AISC_341_INCREMENT = 0.01
+AISC_341_LATER_CYCLES = 2
+# ECCS (1986): fractions of e_y with one cycle each, then ECCS_CYCLES at 2, 4, 6 ... e_y
+ECCS_ELASTIC = (0.25, 0.5, 0.75, 1.0)
+ECCS_CYCLES = 3
+
+QUARTER = 1.0           # step time of a quarter cycle
+STEP_NAME = 'Cycles_%02d'
+AMPLITUDE_NAME = 'Cyclic_%02d'
+RESTART_WRITE = '*Restart, write, number interval=1, time marks=NO'
+NO_RESTART = '*Restart, write, frequency=0'
+
+
+# --------------------------------------------------------------------------
+# Protocols
+# --------------------------------------------------------------------------
+def aisc341(max_rotation=DEFAULT_MAX_ROTATION):
+    """(rotation, cycles) groups of AISC 341 up to max_rotation."""
+    groups = [(r, n) for r, n in AISC_341 if r <= max_rotation + 1e-12]
+    k = 1
+    while AISC_341[-1][0] + k*AISC_341_INCREMENT <= max_rotation + 1e-12:
+        groups.append((AISC_341[-1][0] + k*AISC_341_INCREMENT, AISC_341_LATER_CYCLES))
+        k += 1
+    return groups
+
+
+def eccs(yield_rotation, max_rotation=DEFAULT_MAX_ROTATION):
+    """(rotation, cycles) groups of the ECCS short procedure up to max_rotation."""
+    groups = [(f*yield_rotation, 1) for f in ECCS_ELASTIC]
+    k = 2
+    while k*yield_rotation <= max_rotation + 1e-12:
+        groups.append((k*yield_rotation, ECCS_CYCLES))
+        k += 2
+    return groups
+
+
+def yield_rotation(p):
+    """Mj,Rd / Sj,ini of the EN 1993-1-8 component method, the default ECCS e_y."""
+    r = ec3.resistance(p)
+    return float(r['M_j_Rd']/r['S_j_ini'])
+
+
+def groups(p, protocol=DEFAULT_PROTOCOL, max_rotation=DEFAULT_MAX_ROTATION, yield_rot=None):
+    """(RP-1 displacement amplitude in mm, cycles) groups of one case (p from derive())."""
+    if protocol == 'aisc341':
+        rotations = aisc341(max_rotation)
+    elif protocol == 'eccs':
+        rotations = eccs(yield_rot or yield_rotation(p), max_rotation)
+    else:
+        raise ValueError('Unknown protocol %r, expected one of %s' % (protocol, ', '.join(PROTOCOLS)))
+    arm = response.lever_arm(p)
+    return [(round(r*arm, 6), n) for r, n in rotations]      # rounded, so equal groups compare equal
+
+
+def case_history(case):
+    """(params, groups) of a sweep case whose protocol entries sit next to the model parameters."""
+    case = OrderedDict(case)
+    protocol = case.pop('protocol', DEFAULT_PROTOCOL)
+    max_rotation = case.pop('max_rotation', DEFAULT_MAX_ROTATION)
+    yield_rot = case.pop('yield_rotation', None)
+    p = derive(case)
+    return p, groups(p, protocol, max_rotation, yield_rot)
+
+
+def cycle_amplitude(cycles, sign=-1.0):
+    """(time, value) of unit cycles, the first excursion towards sign."""
+    values = np.append(np.tile([0.0, sign, 0.0, -sign], cycles), 0.0)
+    return QUARTER*np.arange(len(values)), values
+
+
+# --------------------------------------------------------------------------
+# Prefix tree
+# --------------------------------------------------------------------------
+def model_key(p):
+    """Cases can share restart files only when their model data is identical."""
+    text = json.dumps([(name, float(value)) for name, value in independent(p).items()])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _node():
+    return {'children': OrderedDict(), 'cases': []}
+
+
+def restart_plan(histories, prefix_name):
+    """Jobs of a set of histories, shared prefixes solved once.
+
+    histories is a list of (case name, model key, groups).  Returns the
+    jobs in solving order as dicts: job, case (None for a shared
+    prefix), source (the case it is built from, the first one below a
+    prefix), groups (of this job only), first (index of its first
+    group), parent (job restarted from, or None), children and
+    duplicates (other cases with exactly this history).
+    """
+    roots = OrderedDict()
+    for name, key, history in histories:
+        node = roots.setdefault(key, _node())
+        for group in history:
+            node = node['children'].setdefault(group, _node())
+        node['cases'].append(name)
+
+    jobs = []
+
+    def walk(node, parent, depth):
+        below = []
+        for group, child in node['children'].items():
+            segment = [group]
+            while not child['cases'] and len(child['children']) == 1:
+                group, child = next(iter(child['children'].items()))
+                segment.append(group)
+            if child['cases']:
+                job, case, duplicates = child['cases'][0], child['cases'][0], child['cases'][1:]
+            else:
+                job, case, duplicates = prefix_name(len([j for j in jobs if j['case'] is None]) + 1), None, []
+            entry = {'job': job, 'case': case, 'source': case, 'groups': segment, 'first': depth, 'parent': parent,
+                     'children': len(child['children']), 'duplicates': duplicates}
+            jobs.append(entry)
+            cases = walk(child, job, depth + len(segment))
+            entry['source'] = entry['source'] or cases[0]
+            below += ([case] if case else []) + cases
+        return below
+
+    for root in roots.values():
+        walk(root, None, 0)
+    return jobs
+
+
+# --------------------------------------------------------------------------
+# Deck lines
+# --------------------------------------------------------------------------
+def _step_end(requests):
+    return outputs.deck_lines(requests) + ['*Output, history, variable=PRESELECT', '*End Step']
+
+
+def loading_lines(p, requests, restart=False):
+    """Loading step: column load, RP-1 held at zero."""
+    return ['** STEP: %s' % inp_writer.STEP_NAME, '*Step, name=%s, nlgeom=YES, inc=100000' % inp_writer.STEP_NAME,
+            '*Static', '0.01, 1., 1e-15, 0.1',
+            '*Boundary', 'RP-1, 1, 1', 'RP-1, 2, 2', 'RP-1, 5, 5', 'RP-1, 6, 6',
+            '*Cload, amplitude=Constant_Amp_Load', 'RP-3, 2, %s' % inp_writer._num(p['myColumn_Load']),
+            RESTART_WRITE if restart else NO_RESTART] + _step_end(requests)
+
+
+def cycle_lines(number, amplitude, cycles, sign, requests, restart=False):
+    """One group of equal cycles as step Cycles_<number>."""
+    times, values = cycle_amplitude(cycles, sign)
+    pairs = ['%s, %s' % (inp_writer._num(t), inp_writer._num(v)) for t, v in zip(times, values)]
+    name, amp = STEP_NAME % number, AMPLITUDE_NAME % number
+    lines = ['** STEP: %s' % name, '*Step, name=%s, nlgeom=YES, inc=100000' % name,
+             '*Static', '0.05, %s, 1e-15, %s' % (inp_writer._num(times[-1]), inp_writer._num(QUARTER/4.0)),
+             '*Amplitude, name=%s' % amp]
+    lines += [', '.join(pairs[k:k + 4]) for k in range(0, len(pairs), 4)]
+    lines += ['*Boundary, amplitude=%s' % amp, 'RP-1, 2, 2, %s' % inp_writer._num(amplitude),
+              RESTART_WRITE if restart else NO_RESTART]
+    return lines + _step_end(requests)
+
+
+def job_lines(p, job, cache=None, requests=None):
+    """Input deck of one job of restart_plan(): the full model, or a restart of its parent."""
+    requests = outputs.profile() if requests is None else requests
+    sign = np.sign(p['myBeamDisplacement']) or -1.0
+    name = job['job']
+    if job['parent'] is None:
+        lines = inp_writer.model_lines(p, name, cache) + loading_lines(p, requests)
+    else:
+        # step 1 is Loading, group i is step i + 1
+        lines = ['*Heading', '** Job name: %s Model name: %s' % (name, name),
+                 '** Generated by fep.protocols, restart of %s' % job['parent'],
+                 '*Restart, read, step=%d' % (job['first'] + 1)]
+    last = len(job['groups']) - 1
+    for i, (amplitude, cycles) in enumerate(job['groups']):
+        lines += cycle_lines(job['first'] + i + 1, amplitude, cycles, sign, requests,
+                             restart=i == last and job['children'] > 0)
+    return lines
+
+
+def chain(jobs, name):
+    """Jobs from the first full-model run to `name`, in solving order."""
+    by_name = dict((j['job'], j) for j in jobs)
+    names = [name]
+    while by_name[names[0]]['parent'] is not None:
+        names.insert(0, by_name[names[0]]['parent'])
+    return names
+
+
+def chain_curve(curve_dir, jobs):
+    """RP curve of a case from the curves (fep.odb_extract) of its chain of jobs."""
+    curves = [response.read_curve(os.path.join(curve_dir, job + '_curve.csv')) for job in jobs]
+    return dict((field, np.concatenate([c[field] for c in curves])) for field in response.CURVE_FIELDS)
+
+
+# --------------------------------------------------------------------------
+# Sweep
+# --------------------------------------------------------------------------
+def write_sweep(base, cases, out_dir, cpus=1, cache=None, requests=None):
+    """Decks of every job of the restart plan and the two manifests; returns (jobs, case entries)."""
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    names = doe.case_names(base, len(cases))
+    params, histories = {}, []
+    for name, case in zip(names, cases):
+        p, history = case_history(case)
+        params[name] = (p, history, case)
+        histories.append((name, model_key(p), history))
+    jobs = restart_plan(histories, lambda k: '%s_P%02d' % (base, k))
+
+    cases_out, prefixes = [], []
+    for job in jobs:
+        p = params[job['source']][0]
+        inp = os.path.join(out_dir, job['job'] + '.inp')
+        with open(inp, 'w') as f:
+            f.write('\n'.join(job_lines(p, job, cache, requests)) + '\n')
+        entry = {'job': job['job'], 'inp': os.path.abspath(inp), 'cpus': cpus}
+        if job['parent'] is not None:
+            entry.update({'after': [job['parent']], 'oldjob': job['parent']})
+        entry['chain'] = chain(jobs, job['job'])
+        if job['case'] is None:
+            prefixes.append(entry)
+            continue
+        for case in [job['case']] + job['duplicates']:
+            p, history, overrides = params[case]
+            protocol = OrderedDict((k, overrides[k]) for k in PROTOCOL_PARAMS if k in overrides)
+            case_entry = dict(entry, params=independent(p), protocol=protocol, groups=[list(g) for g in history])
+            if case != job['case']:
+                case_entry['same_as'] = job['job']      # identical run, not solved twice
+            cases_out.append(case_entry)
+    doe.save_manifest(out_dir, base + '_prefix', prefixes)
+    doe.save_manifest(out_dir, base, [e for e in cases_out if 'same_as' not in e])
+    return jobs, cases_out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write cyclic-protocol decks, shared history prefixes solved once.')
+    parser.add_argument('spec', nargs='?', help='sweep spec (JSON) that may vary %s; omit for the default case'
+                        % ', '.join(PROTOCOL_PARAMS))
+    parser.add_argument('--model', default='Cyclic', help='base job / model name')
+    parser.add_argument('--out', default='models')
+    parser.add_argument('--cpus', type=int, default=1, help='cpus recorded per job in the manifests')
+    parser.add_argument('--profile', default=outputs.DEFAULT_PROFILE, choices=list(outputs.PROFILES))
+    parser.add_argument('--frames', type=int, default=None, help='field frames per cycle step (standard profile)')
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args(argv)
+
+    cases = doe.generate(doe.load_spec(args.spec)) if args.spec else [{}]
+    cache = None if args.no_cache else partcache.PartCache(os.path.join(args.out, '.partcache'))
+    jobs, entries = write_sweep(args.model, cases, args.out, args.cpus, cache,
+                                outputs.profile(args.profile, args.frames))
+    alone = sum(len(e['groups']) for e in entries if 'same_as' not in e)
+    shared = sum(len(job['groups']) for job in jobs)
+    sys.stdout.write('%d cases, %d jobs (%d shared prefixes): %d cycle steps to solve instead of %d\n'
+                     % (len(entries), len(jobs), len([j for j in jobs if j['case'] is None]), shared, alone))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
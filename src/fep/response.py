@@ -0,0 +1,72 @@
+"""
+=======================================================================
+ fep.response – load-displacement curves to joint response quantities
+=======================================================================
+ A curve is the per-case CSV written by fep.odb_extract (one row per
+ output time: total time, RP-1 U2 and RF2, RP-2/RP-3 RF2, maximum
+ temperature).  The beam is pushed at RP-1, so the joint moment at the
+ column face is RF2 times the lever arm from RP-1 to the face, and the
+ joint rotation is U2 over the same lever arm.
+
+ Units follow the model: N and mm in, kN·m and rad out.
+=======================================================================
+"""
+
+import csv
+
+import numpy as np
+
+
+CURVE_FIELDS = ('time', 'U2_RP1', 'RF2_RP1', 'RF2_RP2', 'RF2_RP3', 'max_temperature')
+
+
+def read_curve(path):
+    """{field: float array} of a curve CSV; empty cells become NaN."""
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    return dict((name, np.array([float(row[name]) if row.get(name) not in (None, '') else np.nan
+                                 for row in rows]))
+                for name in CURVE_FIELDS)
+
+
+def lever_arm(params):
+    """RP-1 to the column face (mm)."""
+    return params['myLoad_D'] + params['myB_Depth']/2.0 - params['myC_Depth']/2.0
+
+
+def moment_rotation(curve, params):
+    """(rotation rad, moment kN·m) arrays of the joint, both positive in the loading direction."""
+    arm = lever_arm(params)
+    rotation = np.abs(curve['U2_RP1'])/arm
+    moment = np.abs(curve['RF2_RP1'])*arm/1e6
+    return rotation, moment
+
+
+def peak(curve, params):
+    """Peak load (N) and the displacement, moment and rotation at it."""
+    rotation, moment = moment_rotation(curve, params)
+    load = np.abs(curve['RF2_RP1'])
+    if not len(load):
+        return {'peak_load': np.nan, 'disp_at_peak': np.nan, 'peak_moment': np.nan, 'rotation_at_peak': np.nan}
+    i = int(np.argmax(load))
+    return {'peak_load': load[i], 'disp_at_peak': abs(curve['U2_RP1'][i]),
+            'peak_moment': moment[i], 'rotation_at_peak': rotation[i]}
+
+
+def initial_stiffness(rotation, moment, fraction=1.0/3.0):
+    """Initial rotational stiffness Sj,ini (kN·m/rad).
+
+    Least-squares slope through the origin of the points up to
+    `fraction` of the peak moment, i.e. the elastic branch.
+    """
+    rotation, moment = np.asarray(rotation), np.asarray(moment)
+    if not len(moment) or np.nanmax(moment) <= 0:
+        return np.nan
+    loaded = np.nonzero(rotation > 0)[0]
+    if not len(loaded):
+        return np.nan
+    elastic = loaded[moment[loaded] <= fraction*np.nanmax(moment)]
+    if not len(elastic):
+        elastic = loaded[:1]    # first increment already past the elastic range
+    r, m = rotation[elastic], moment[elastic]
+    return float((r*m).sum()/(r*r).sum())
@@ -0,0 +1,279 @@
+"""
+=======================================================================
+ fep.resume – continue failed or killed jobs from their restart data
+=======================================================================
+ Decks written with restart points (inp_writer --restart-intervals,
+ myRestartIntervals in the script) keep the last of them in <job>.res.
+ For every case of a manifest that did not complete, this finds the
+ last increment with restart data and writes <job>_R1.inp (R2, ... on
+ later attempts), a restart analysis run with oldjob=<job>:
+
+     continue   *Restart, read at that increment, the step goes on as
+                it was (license drop, node reboot, killed process)
+     relax      the step is ended there and a step Loading_Resume takes
+                the remaining time and the full beam displacement with
+                a smaller initial and maximum increment and a smaller
+                minimum increment (a convergence cutback)
+
+ The failure is read from the .sta / .msg files: an increment that
+ ran out of attempts (cutbacks, "U" attempts) is a convergence failure
+ and is relaxed unless --no-relax; anything else continues.
+
+     PYTHONPATH=src python -m fep.resume models/Column_Trial_5_sweep.json --workdir results --cores 32
+
+ writes models/<model>_resume_sweep.json and runs the resumed jobs
+ with fep.scheduler.  A resumed ODB holds the rest of the analysis only;
+ its `chain` in the manifest lists the jobs whose curves make up the
+ case (fep.protocols.chain_curve()).
+=======================================================================
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from fep import doe
+from fep import inp_writer
+from fep import outputs
+from fep import scheduler
+from fep.odb_extract import solver_status
+
+
+RELAXED = {'initial': 1e-4, 'min': 1e-20, 'max': 0.02}
+RESUME_STEP = inp_writer.STEP_NAME + '_Resume'
+CONVERGENCE_MARKERS = ('TOO MANY ATTEMPTS MADE FOR THIS INCREMENT', 'TIME INCREMENT REQUIRED IS LESS THAN THE MINIMUM')
+
+_STEP = re.compile(r'^\*step\b.*name=([^,]+)', re.I)
+_RESTART_WRITE = re.compile(r'^\*restart,\s*write\b(.*)$', re.I)
+_RESTART_READ = re.compile(r'^\*restart,\s*read\b.*step=(\d+)', re.I)
+_MSG_RESTART = re.compile(r'RESTART.*?STEP\s+(\d+)\s+INCREMENT\s+(\d+)', re.I)
+
+
+# --------------------------------------------------------------------------
+# Reading the job files
+# --------------------------------------------------------------------------
+def deck_steps(inp):
+    """[(step number, name, time period, restart points)] of the steps of an input deck."""
+    with open(inp) as f:
+        lines = [line.strip() for line in f]
+    number, steps = 0, []
+    for i, line in enumerate(lines):
+        read = _RESTART_READ.match(line)
+        if read:
+            number = int(read.group(1))     # a restart deck numbers on from the old job
+        step = _STEP.match(line)
+        if step:
+            number += 1
+            steps.append([number, step.group(1).strip(), 1.0, 0])
+        elif steps and line.lower().startswith(('*static', '*heat transfer')):
+            data = lines[i + 1].split(',')
+            if len(data) > 1 and data[1].strip():
+                steps[-1][2] = float(data[1])
+        elif steps and _RESTART_WRITE.match(line):
+            intervals = re.search(r'number interval=(\d+)', line, re.I)
+            steps[-1][3] = int(intervals.group(1)) if intervals else 0
+    return [tuple(step) for step in steps]
+
+
+def increments(sta):
+    """[(step, increment, step time, converged)] of the rows of a .sta file."""
+    rows = []
+    if not os.path.exists(sta):
+        return rows
+    with open(sta) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 9 or not (parts[0].isdigit() and parts[1].isdigit()):
+                continue
+            try:
+                rows.append((int(parts[0]), int(parts[1]), float(parts[7]), not parts[2].endswith('U')))
+            except ValueError:
+                continue
+    return rows
+
+
+def diagnose(workdir, job):
+    """'completed', 'convergence' (the solver gave up on an increment) or 'killed'."""
+    base = os.path.join(workdir, job)
+    status = solver_status(base + '.odb')
+    if status == 'completed':
+        return status
+    text = ''
+    if os.path.exists(base + '.msg'):
+        with open(base + '.msg') as f:
+            text = f.read()
+    if any(marker in text for marker in CONVERGENCE_MARKERS):
+        return 'convergence'
+    rows = increments(base + '.sta')
+    return 'convergence' if status == 'aborted' and rows and not rows[-1][3] else 'killed'
+
+
+def chain_steps(decks):
+    """{step number: (name, period, restart points)} over a chain of decks, later decks winning.
+
+    A restart deck that only continues a step has no steps of its own,
+    so the steps of the decks before it still apply.
+    """
+    steps = {}
+    for deck in decks:
+        if os.path.exists(deck):
+            for number, name, period, points in deck_steps(deck):
+                steps[number] = (name, period, points)
+    return steps
+
+
+def last_restart(workdir, job, steps):
+    """(step, increment, step time) of the last restart point written, or None.
+
+    The .msg file names it; otherwise it is the first converged
+    increment past the last interval boundary the .sta reached, with
+    steps as returned by chain_steps().
+    """
+    base = os.path.join(workdir, job)
+    if not os.path.exists(base + '.res'):
+        return None
+    rows = [row for row in increments(base + '.sta') if row[3]]
+    if os.path.exists(base + '.msg'):
+        with open(base + '.msg') as f:
+            written = _MSG_RESTART.findall(f.read())
+        if written:
+            step, inc = int(written[-1][0]), int(written[-1][1])
+            times = [t for s, i, t, _ in rows if (s, i) == (step, inc)]
+            return step, inc, times[0] if times else None
+    for step in sorted(set(s for s, _, _, _ in rows), reverse=True):
+        _, period, points = steps.get(step, (None, 1.0, 0))
+        if not points:
+            continue
+        marks = [k*period/points for k in range(1, points + 1)]
+        for mark in reversed(marks):
+            past = [(i, t) for s, i, t, _ in rows if s == step and t >= mark*(1.0 - 1e-9)]
+            if past:
+                return step, past[0][0], past[0][1]
+    return None
+
+
+# --------------------------------------------------------------------------
+# Resume decks
+# --------------------------------------------------------------------------
+def attempts(job, workdir):
+    """Names of the resumed runs of a job that have started, <job>_R1, <job>_R2, ..."""
+    names = []
+    while os.path.exists(os.path.join(workdir, '%s_R%d.sta' % (job, len(names) + 1))):
+        names.append('%s_R%d' % (job, len(names) + 1))
+    return names
+
+
+def resume_lines(job, new, point, step_name=None, period=1.0, params=None, relax=None, requests=None,
+                 restart=inp_writer.RESTART_INTERVALS):
+    """Restart deck continuing `job` from point = (step, increment, step time).
+
+    relax (a dict like RELAXED) ends the step at that increment and
+    finishes the Loading step as Loading_Resume with those increments;
+    params (from derive()) give the beam displacement.
+    """
+    step, inc, time = point
+    lines = ['*Heading', '** Job name: %s Model name: %s' % (new, new),
+             '** Generated by fep.resume, restart of %s at step %d increment %d' % (job, step, inc)]
+    if not relax:
+        return lines + ['*Restart, read, step=%d, inc=%d' % (step, inc)]
+    if step_name != inp_writer.STEP_NAME or params is None or time is None:
+        raise ValueError('relaxed increments are only set for the %s step of an inp_writer deck'
+                         % inp_writer.STEP_NAME)
+    remaining = max(period - time, relax['min'])
+    lines += ['*Restart, read, step=%d, inc=%d, end step' % (step, inc),
+              '** STEP: %s' % RESUME_STEP, '*Step, name=%s, nlgeom=YES, inc=100000' % RESUME_STEP,
+              '*Static', '%s, %s, %s, %s' % tuple(inp_writer._num(v) for v in
+                                                 (min(relax['initial'], remaining), remaining, relax['min'],
+                                                  min(relax['max'], remaining))),
+              # no amplitude: ramps from where Loading stopped to the full displacement
+              '*Boundary', 'RP-1, 2, 2, %s' % inp_writer._num(params['myBeamDisplacement']),
+              inp_writer.restart_line(restart)]
+    lines += outputs.deck_lines(outputs.profile() if requests is None else requests)
+    return lines + ['*Output, history, variable=PRESELECT', '*End Step']
+
+
+def prepare(manifest_path, workdir, out_dir, relax=None, relaxed=None, requests=None, log=None):
+    """Resume decks of every unfinished case with restart data; returns the manifest entries.
+
+    relax None relaxes the increments after convergence failures only,
+    True or False always or never; the relaxed increments default to
+    RELAXED.  A
+    case resumed before continues from its latest resumed run.
+    """
+    log = log or (lambda message: sys.stdout.write(message + '\n'))
+    manifest = doe.load_manifest(manifest_path)
+    entries = []
+    for case in manifest['cases']:
+        if case.get('same_as'):
+            continue        # not run: takes the results of its same_as case
+        first = case.get('chain', [case['job']])
+        resumed = attempts(case['job'], workdir)
+        runs = first + resumed
+        latest = runs[-1]
+        why = diagnose(workdir, latest)
+        if why == 'completed':
+            continue
+        decks = [os.path.join(os.path.dirname(case['inp']), name + '.inp') for name in first]
+        steps = chain_steps(decks + [os.path.join(out_dir, name + '.inp') for name in resumed])
+        point = last_restart(workdir, latest, steps)
+        if point is None:
+            log('%-24s %s, no restart data: run it again' % (latest, why))
+            continue
+        settings = None
+        if relax or (relax is None and why == 'convergence'):
+            settings = relaxed or RELAXED
+        step_name, period, _ = steps.get(point[0], (None, 1.0, 0))
+        if settings and step_name != inp_writer.STEP_NAME:
+            log('%-24s failed in step %s, continued without relaxing' % (latest, step_name))
+            settings = None
+        new = '%s_R%d' % (case['job'], len(resumed) + 1)
+        inp = os.path.join(out_dir, new + '.inp')
+        with open(inp, 'w') as f:
+            f.write('\n'.join(resume_lines(latest, new, point, step_name, period, case.get('params'), settings,
+                                           requests)) + '\n')
+        log('%-24s %s at step %d inc %d -> %s%s' % (latest, why, point[0], point[1], new,
+                                                    ' (relaxed)' if settings else ''))
+        entries.append({'job': new, 'inp': os.path.abspath(inp), 'cpus': case.get('cpus', 1),
+                        'after': [latest], 'oldjob': latest, 'chain': runs + [new],
+                        'resumes': case['job'], 'params': case.get('params', {})})
+        if 'reaction_scale' in case:
+            entries[-1]['reaction_scale'] = case['reaction_scale']
+    doe.save_manifest(out_dir, manifest['model'] + '_resume', entries)
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Resume the unfinished jobs of a sweep from their restart data.')
+    parser.add_argument('manifest', help='models/<model>_sweep.json')
+    parser.add_argument('--workdir', default='results', help='where the jobs ran (.sta, .msg, .res)')
+    parser.add_argument('--out', default=None, help='where the resume decks go (default: next to the manifest)')
+    relax = parser.add_mutually_exclusive_group()
+    relax.add_argument('--relax', action='store_true', default=None, help='relax the increments for every job')
+    relax.add_argument('--no-relax', dest='relax', action='store_false', help='never relax, continue as is')
+    parser.add_argument('--initial-inc', type=float, default=RELAXED['initial'])
+    parser.add_argument('--min-inc', type=float, default=RELAXED['min'])
+    parser.add_argument('--max-inc', type=float, default=RELAXED['max'])
+    parser.add_argument('--profile', default=outputs.DEFAULT_PROFILE, choices=list(outputs.PROFILES))
+    parser.add_argument('--cores', type=int, default=os.cpu_count())
+    parser.add_argument('--tokens', type=int, default=None)
+    parser.add_argument('--write-only', action='store_true', help='write the decks and manifest, do not solve')
+    parser.add_argument('--standin', action='store_true', help='run fep/standin_solver.py instead of abaqus')
+    args = parser.parse_args(argv)
+
+    relaxed = {'initial': args.initial_inc, 'min': args.min_inc, 'max': args.max_inc}
+    entries = prepare(args.manifest, args.workdir, args.out or os.path.dirname(os.path.abspath(args.manifest)),
+                      args.relax, relaxed, outputs.profile(args.profile))
+    if args.write_only or not entries:
+        return 0
+    jobs = [scheduler.SolverJob(e['job'], e['inp'], e['cpus'], e['after'], e['oldjob']) for e in entries]
+    command = scheduler.STANDIN_COMMAND if args.standin else scheduler.ABAQUS_COMMAND
+    done = scheduler.Scheduler(jobs, args.cores, args.tokens, command=command, workdir=args.workdir).run()
+    failed = [job.name for job in done if job.status == scheduler.FAILED]
+    if failed:
+        sys.stderr.write('failed: %s\n' % ', '.join(failed))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
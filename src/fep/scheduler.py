@@ -0,0 +1,249 @@
+"""
+=======================================================================
+ fep.scheduler – concurrent solver runs under a core / token budget
+=======================================================================
+ Takes the jobs of a sweep manifest (models/<model>_sweep.json, written
+ by P1_FEP_ParametricStudy.py) and keeps as many solver processes
+ running as the core and license-token budget allows.  Every job is
+ tracked through pending -> running -> done | failed, with its exit
+ code, attempts and wall time, in <workdir>/scheduler_status.json.
+ Jobs already marked done there are not run again.  A job listing
+ others in `after` (a fire case and its heat-transfer run) waits until
+ they are done and fails without running if one of them failed; with
+ `oldjob` set (fep.protocols) it is started as a restart analysis
+ reading that job's restart files from the same work directory.  A
+ case marked `same_as` repeats the model of an earlier case and is not
+ run (fep.odb_extract copies that case's results).
+
+ With --db (fep.casedb) every deck is hashed first: jobs whose model
+ was solved before, or is queued under an earlier job, are not run, and
+ status, attempts and wall time go to the case database as well.
+
+ The solver command is a template, so a local stand-in executable
+ (fep/standin_solver.py) can replace Abaqus for testing:
+
+     PYTHONPATH=src python -m fep.scheduler models/Column_Trial_5_sweep.json \\
+         --cores 64 --tokens 80 --cpus-per-job 4 --workdir results
+=======================================================================
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+ABAQUS_COMMAND = ('abaqus', 'job={job}', 'input={inp}', 'cpus={cpus}', 'interactive')
+STANDIN_COMMAND = (sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'standin_solver.py'),
+                   'job={job}', 'input={inp}', 'cpus={cpus}')
+STATUS_FILE = 'scheduler_status.json'
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def license_tokens(cpus):
+    """Abaqus analysis tokens checked out by one job on `cpus` cores."""
+    return int(5*cpus**0.422)
+
+
+class SolverJob(object):
+
+    def __init__(self, name, inp, cpus=1, after=(), oldjob=None):
+        self.name = name
+        self.inp = inp
+        self.cpus = cpus
+        self.oldjob = oldjob
+        self.after = tuple(after) + ((oldjob,) if oldjob and oldjob not in after else ())
+        self.tokens = license_tokens(cpus)
+        self.status = PENDING
+        self.attempts = 0
+        self.exit_codes = []
+        self.started = None
+        self.finished = None
+        self.process = None
+
+    @property
+    def wall_time(self):
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+    def as_dict(self):
+        return {'job': self.name, 'inp': self.inp, 'cpus': self.cpus, 'tokens': self.tokens,
+                'after': list(self.after), 'oldjob': self.oldjob, 'status': self.status, 'attempts': self.attempts, 'exit_codes': self.exit_codes,
+                'wall_time': self.wall_time}
+
+
+class Scheduler(object):
+
+    def __init__(self, jobs, max_cores, max_tokens=None, retries=1, command=ABAQUS_COMMAND,
+                 workdir='.', poll=2.0, log=None):
+        self.jobs = list(jobs)
+        self.max_cores = max_cores
+        self.max_tokens = max_tokens
+        self.retries = retries
+        self.command = command
+        self.workdir = os.path.abspath(workdir)
+        self.poll = poll
+        self.log = log or (lambda message: sys.stdout.write(message + '\n'))
+        self.listeners = []
+        for job in self.jobs:
+            if job.cpus > max_cores or (max_tokens is not None and job.tokens > max_tokens):
+                raise ValueError('Job %s needs %d cores / %d tokens, more than the whole budget'
+                                 % (job.name, job.cpus, job.tokens))
+
+    # -- budget ---------------------------------------------------------
+    def _running(self):
+        return [job for job in self.jobs if job.status == RUNNING]
+
+    def _fits(self, job):
+        running = self._running()
+        if sum(j.cpus for j in running) + job.cpus > self.max_cores:
+            return False
+        if self.max_tokens is not None and sum(j.tokens for j in running) + job.tokens > self.max_tokens:
+            return False
+        return True
+
+    def _waiting(self, job):
+        """True while a job named in job.after is not done; fails the job if one of them failed."""
+        jobs = dict((j.name, j) for j in self.jobs)
+        needed = [jobs[name] for name in job.after if name in jobs]     # others ran earlier
+        if any(j.status == FAILED for j in needed):
+            job.status = FAILED
+            self.log('skipped  %s (%s failed)' % (job.name, ', '.join(j.name for j in needed if j.status == FAILED)))
+            self._changed(job)
+            return True
+        return any(j.status != DONE for j in needed)
+
+    # -- process control ------------------------------------------------
+    def _start(self, job):
+        lck = os.path.join(self.workdir, job.name + '.lck')
+        if os.path.exists(lck):
+            os.remove(lck)      # left behind by a killed attempt, blocks the solver
+        argv = [part.format(job=job.name, inp=os.path.abspath(job.inp), cpus=job.cpus)
+                for part in self.command]
+        if job.oldjob:
+            argv.append('oldjob=%s' % job.oldjob)
+        out = open(os.path.join(self.workdir, job.name + '.log'), 'a')
+        job.process = subprocess.Popen(argv, cwd=self.workdir, stdout=out, stderr=subprocess.STDOUT)
+        out.close()
+        job.status = RUNNING
+        job.attempts += 1
+        job.started = time.time()
+        job.finished = None
+        self.log('started  %s (%d cpus, attempt %d)' % (job.name, job.cpus, job.attempts))
+        self._changed(job)
+
+    def _reap(self, job):
+        code = job.process.poll()
+        if code is None:
+            return False
+        job.process = None
+        job.exit_codes.append(code)
+        job.finished = time.time()
+        if code == 0:
+            job.status = DONE
+        elif job.attempts <= self.retries:
+            job.status = PENDING
+        else:
+            job.status = FAILED
+        self.log('finished %s exit=%d -> %s (%.0f s)' % (job.name, code, job.status, job.wall_time))
+        self._changed(job)
+        return True
+
+    def _changed(self, job):
+        self.save_status()
+        for listener in self.listeners:
+            listener(job)
+
+    def run(self):
+        """Run every pending job; returns the jobs once none is pending or running."""
+        os.makedirs(self.workdir, exist_ok=True)
+        try:
+            while True:
+                for job in self._running():
+                    self._reap(job)
+                for job in self.jobs:
+                    if job.status == PENDING and not self._waiting(job) and self._fits(job):
+                        self._start(job)
+                if not any(job.status in (PENDING, RUNNING) for job in self.jobs):
+                    return self.jobs
+                time.sleep(self.poll)
+        except KeyboardInterrupt:
+            for job in self._running():
+                job.process.terminate()
+                job.process.wait()
+                job.status = PENDING
+                self._changed(job)
+            raise
+
+    # -- status file ----------------------------------------------------
+    def save_status(self):
+        path = os.path.join(self.workdir, STATUS_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump([job.as_dict() for job in self.jobs], f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def load_status(self):
+        """Carry over done jobs from a previous run of the same workdir."""
+        path = os.path.join(self.workdir, STATUS_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            previous = dict((entry['job'], entry) for entry in json.load(f))
+        for job in self.jobs:
+            entry = previous.get(job.name)
+            if entry and entry['status'] == DONE:
+                job.status = DONE
+                job.attempts = entry['attempts']
+                job.exit_codes = entry['exit_codes']
+
+
+def jobs_from_manifest(path, cpus=None):
+    with open(path) as f:
+        manifest = json.load(f)
+    return [SolverJob(case['job'], case['inp'], cpus or case.get('cpus', 1), case.get('after', ()), case.get('oldjob'))
+            for case in manifest['cases'] if not case.get('same_as')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the solver jobs of a sweep manifest concurrently.')
+    parser.add_argument('manifest', nargs='+', help='models/<model>_sweep.json (several run as one queue)')
+    parser.add_argument('--cores', type=int, default=os.cpu_count(), help='core budget (default: all cores)')
+    parser.add_argument('--tokens', type=int, default=None, help='license token budget (default: unlimited)')
+    parser.add_argument('--cpus-per-job', type=int, default=None, help='override the cpus recorded per case')
+    parser.add_argument('--retries', type=int, default=1)
+    parser.add_argument('--workdir', default='results')
+    parser.add_argument('--poll', type=float, default=2.0)
+    parser.add_argument('--standin', action='store_true', help='run fep/standin_solver.py instead of abaqus')
+    parser.add_argument('--db', default=None, help='case database (fep.casedb), e.g. results/cases.sqlite')
+    args = parser.parse_args(argv)
+
+    jobs = [job for manifest in args.manifest for job in jobs_from_manifest(manifest, args.cpus_per_job)]
+    db = None
+    if args.db:
+        from fep import casedb
+        db = casedb.CaseDB(args.db)
+        for manifest in args.manifest:
+            db.register_manifest(manifest)
+        jobs = casedb.plan(db, jobs)
+    scheduler = Scheduler(jobs, args.cores, args.tokens,
+                          retries=args.retries, command=STANDIN_COMMAND if args.standin else ABAQUS_COMMAND,
+                          workdir=args.workdir, poll=args.poll)
+    scheduler.load_status()
+    if db is not None:
+        scheduler.listeners.append(db.job_changed)
+    jobs = scheduler.run()
+    failed = [job.name for job in jobs if job.status == FAILED]
+    if failed:
+        sys.stderr.write('failed: %s\n' % ', '.join(failed))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+=======================================================================
+ fep.selection – geometric selection of part cells, faces and edges
+=======================================================================
+ Replaces getSequenceFromMask() masks and raw f[167] style indices in
+ the CAE script.  Both depend on the order in which the geometry
+ kernel numbers entities, which changes whenever a dimension or a
+ partition changes.  A PartIndex instead records the bounding box of
+ every cell, face and edge of a part once (BoxIndex, a KD-tree over
+ the box centres) and answers geometric queries:
+
+     index = PartIndex(mdb.models[model].parts[part])
+     web = index.inside('cells', (-tw/2, None, None), (tw/2, None, None))
+     p.Set(cells=index.sequence('cells', web), name='Web')
+
+ None in a bound leaves that axis open.  The index describes the part
+ as it was when built; build a new one after partitioning or cutting.
+ sequence() hands the selection to CAE as one mask built from the
+ current indices, in a single getSequenceFromMask() call.
+=======================================================================
+"""
+
+import numpy as np
+
+from fep.spatial import BoxIndex
+
+
+KINDS = ('cells', 'faces', 'edges')
+TOL = 1e-4
+
+
+def _bound(values, fill):
+    return np.array([fill if v is None else v for v in values], dtype=float)
+
+
+def entity_box(part, entity):
+    """Bounding box (xmin, ymin, zmin, xmax, ymax, zmax) of a part entity.
+
+    Taken from the entity's vertices and its pointOn; for a vertex-less
+    or single-vertex arc this under-estimates the box, which is why hole
+    rims are selected by radius (PartIndex.arcs) rather than by box.
+    """
+    points = [part.vertices[i].pointOn[0] for i in entity.getVertices()]
+    points.append(entity.pointOn[0])
+    points = np.array(points, dtype=float)
+    return np.concatenate([points.min(axis=0), points.max(axis=0)])
+
+
+def mask(indices):
+    """getSequenceFromMask() mask of entity indices: 32-bit words in hex, lowest first."""
+    indices = np.unique(np.asarray(indices, dtype=np.int64))
+    words = np.zeros(indices[-1]//32 + 1, dtype=np.uint64)
+    np.bitwise_or.at(words, indices//32, np.left_shift(np.uint64(1), (indices % 32).astype(np.uint64)))
+    return '[%s ]' % ' '.join('#%x' % w for w in words)
+
+
+def _radius(edge):
+    try:
+        return edge.getRadius()
+    except Exception:       # straight edges raise
+        return np.nan
+
+
+class PartIndex(object):
+
+    def __init__(self, part, kinds=KINDS):
+        self.part = part
+        self.boxes = {}
+        for kind in kinds:
+            entities = getattr(part, kind)
+            self.boxes[kind] = BoxIndex([entity_box(part, e) for e in entities])
+        self._radii = None
+
+    @property
+    def bounds(self):
+        """(lo, hi) corners of the whole part."""
+        return self.boxes[[k for k in KINDS if k in self.boxes][0]].bounds
+
+    # -- queries -----------------------------------------------------------
+    def all(self, kind):
+        return np.arange(len(self.boxes[kind]))
+
+    def inside(self, kind, lo, hi, tol=TOL):
+        """Entities lying entirely within the box lo..hi (None = open)."""
+        return self.boxes[kind].inside(_bound(lo, -np.inf), _bound(hi, np.inf), tol)
+
+    def on_plane(self, kind, axis, value, tol=TOL):
+        """Entities lying in the plane coordinate[axis] == value."""
+        lo, hi = [None]*3, [None]*3
+        lo[axis] = hi[axis] = value
+        return self.inside(kind, lo, hi, tol)
+
+    def containing(self, kind, point, tol=TOL):
+        """Entities whose box contains `point`."""
+        return self.boxes[kind].containing(point, tol)
+
+    def nearest(self, kind, point, k=1, among=None):
+        """The k entities whose box centres are closest to `point`, optionally within `among`."""
+        if among is None:
+            return self.boxes[kind].nearest(point, k)
+        among = np.asarray(among)
+        d = np.sqrt(((self.boxes[kind].centres[among] - point)**2).sum(axis=1))
+        return among[np.argsort(d, kind='mergesort')[:k]]
+
+    def where(self, kind, predicate, among=None):
+        """Entities whose box satisfies predicate(lo, hi) (vectorized over (N, 3) arrays)."""
+        boxes = self.boxes[kind]
+        among = self.all(kind) if among is None else np.asarray(among)
+        return among[predicate(boxes.lo[among], boxes.hi[among])]
+
+    def straight(self, axis, length=None, among=None, tol=TOL):
+        """Straight edges parallel to `axis`, optionally of the given length."""
+        def parallel(lo, hi):
+            ext = hi - lo
+            others = [a for a in range(3) if a != axis]
+            keep = np.all(ext[:, others] <= tol, axis=1) & (ext[:, axis] > tol)
+            if length is not None:
+                keep &= np.abs(ext[:, axis] - length) <= tol
+            return keep
+        return self.where('edges', parallel, among)
+
+    @property
+    def radii(self):
+        if self._radii is None:
+            self._radii = np.array([_radius(e) for e in self.part.edges], dtype=float)
+        return self._radii
+
+    def arcs(self, radius, among=None, tol=TOL):
+        """Circular edges of the given radius (hole rims, bolt shank outlines)."""
+        among = self.all('edges') if among is None else np.asarray(among)
+        return among[np.abs(self.radii[among] - radius) <= tol]
+
+    def minus(self, kind, indices):
+        """Every entity of `kind` except `indices`."""
+        return np.setdiff1d(self.all(kind), indices)
+
+    # -- Abaqus sequences ------------------------------------------------------
+    def sequence(self, kind, indices):
+        """The entities as an Abaqus sequence, usable in Set(), seedEdge*, setMeshControls()."""
+        if not len(indices):
+            raise ValueError('Empty %s selection on part %s' % (kind, self.part.name))
+        return getattr(self.part, kind).getSequenceFromMask(mask=(mask(indices),))
+
+    def entity(self, kind, index):
+        return getattr(self.part, kind)[int(index)]
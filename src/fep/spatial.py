@@ -0,0 +1,136 @@
+"""
+=======================================================================
+ fep.spatial – KD-tree over points and bounding boxes
+=======================================================================
+ A small NumPy KD-tree (no SciPy, so it runs inside Abaqus Python)
+ with the two queries the geometric selections need: every point in
+ an axis-aligned box, and the k nearest points to a location.
+
+ BoxIndex stores one axis-aligned bounding box per entity and answers
+ "boxes inside this region" and "boxes containing this point" through
+ a tree over the box centres, widened by the largest half extent.
+=======================================================================
+"""
+
+import heapq
+
+import numpy as np
+
+
+LEAF_SIZE = 16
+
+
+class KDTree(object):
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        self.points = np.asarray(points, dtype=float).reshape(len(points), -1)
+        self.leaf_size = leaf_size
+        # node: [lo, hi, left, right, indices]; lo/hi bound the points below the node
+        self.nodes = []
+        if len(self.points):
+            self._build(np.arange(len(self.points)))
+
+    def _build(self, idx):
+        pts = self.points[idx]
+        node = [pts.min(axis=0), pts.max(axis=0), -1, -1, None]
+        self.nodes.append(node)
+        if len(idx) <= self.leaf_size:
+            node[4] = idx
+            return len(self.nodes) - 1
+        axis = int(np.argmax(node[1] - node[0]))
+        order = idx[np.argsort(pts[:, axis], kind='mergesort')]
+        half = len(order)//2
+        me = len(self.nodes) - 1
+        node[2] = self._build(order[:half])
+        node[3] = self._build(order[half:])
+        return me
+
+    def in_box(self, lo, hi):
+        """Indices of the points p with lo <= p <= hi (componentwise)."""
+        lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+        out = []
+        stack = [0] if self.nodes else []
+        while stack:
+            n_lo, n_hi, left, right, idx = self.nodes[stack.pop()]
+            if np.any(n_hi < lo) or np.any(n_lo > hi):
+                continue
+            if idx is not None:
+                pts = self.points[idx]
+                out.append(idx[np.all((pts >= lo) & (pts <= hi), axis=1)])
+            elif np.all(n_lo >= lo) and np.all(n_hi <= hi):
+                out.append(self._leaves(left))
+                out.append(self._leaves(right))
+            else:
+                stack.extend((left, right))
+        return np.sort(np.concatenate(out)) if out else np.zeros(0, dtype=np.int64)
+
+    def _leaves(self, node):
+        out, stack = [], [node]
+        while stack:
+            _, _, left, right, idx = self.nodes[stack.pop()]
+            if idx is not None:
+                out.append(idx)
+            else:
+                stack.extend((left, right))
+        return np.concatenate(out)
+
+    def nearest(self, point, k=1):
+        """(distances, indices) of the k points closest to `point`, closest first."""
+        point = np.asarray(point, dtype=float)
+        best = []       # max-heap of (-distance, index)
+        heap = [(0.0, 0)] if self.nodes else []
+        while heap:
+            bound, node = heapq.heappop(heap)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            _, _, left, right, idx = self.nodes[node]
+            if idx is not None:
+                d = np.sqrt(((self.points[idx] - point)**2).sum(axis=1))
+                for dist, i in zip(d, idx):
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist, int(i)))
+                    elif dist < -best[0][0]:
+                        heapq.heapreplace(best, (-dist, int(i)))
+                continue
+            for child in (left, right):
+                c_lo, c_hi = self.nodes[child][0], self.nodes[child][1]
+                gap = np.maximum(np.maximum(c_lo - point, point - c_hi), 0.0)
+                heapq.heappush(heap, (float(np.sqrt((gap**2).sum())), child))
+        best = sorted((-d, i) for d, i in best)
+        return np.array([d for d, _ in best]), np.array([i for _, i in best], dtype=np.int64)
+
+
+class BoxIndex(object):
+    """Axis-aligned boxes (N, 2*dim: mins then maxes) searchable by region and by point."""
+
+    def __init__(self, boxes):
+        boxes = np.asarray(boxes, dtype=float)
+        dim = boxes.shape[1]//2
+        self.lo, self.hi = boxes[:, :dim], boxes[:, dim:]
+        self.centres = (self.lo + self.hi)/2.0
+        self.reach = ((self.hi - self.lo)/2.0).max(axis=0) if len(boxes) else np.zeros(dim)
+        self.tree = KDTree(self.centres)
+
+    def __len__(self):
+        return len(self.centres)
+
+    @property
+    def bounds(self):
+        return self.lo.min(axis=0), self.hi.max(axis=0)
+
+    def inside(self, lo, hi, tol=1e-6):
+        """Indices of boxes lying entirely within [lo, hi]."""
+        lo, hi = np.asarray(lo, dtype=float) - tol, np.asarray(hi, dtype=float) + tol
+        idx = self.tree.in_box(lo, hi)
+        keep = np.all(self.lo[idx] >= lo, axis=1) & np.all(self.hi[idx] <= hi, axis=1)
+        return idx[keep]
+
+    def containing(self, point, tol=1e-6):
+        """Indices of boxes that contain `point`."""
+        point = np.asarray(point, dtype=float)
+        idx = self.tree.in_box(point - self.reach - tol, point + self.reach + tol)
+        keep = np.all(self.lo[idx] <= point + tol, axis=1) & np.all(self.hi[idx] >= point - tol, axis=1)
+        return idx[keep]
+
+    def nearest(self, point, k=1):
+        return self.tree.nearest(point, k)[1]
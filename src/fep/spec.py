@@ -0,0 +1,206 @@
+"""
+=======================================================================
+ fep.spec – description of one model, in plain Python
+=======================================================================
+ A ModelSpec is one case of the study: the overrides of fep.params
+ DEFAULTS, every dimension derive() computes from them, and the model
+ settings of P1_FEP_ParametricStudy.py (output profile, contact, half
+ model, ...).  It imports nothing from Abaqus, so a sweep is generated,
+ checked and reduced to its distinct models in milliseconds, before a
+ CAE process is started:
+
+ * spec.myC_Web_H, spec.Cc_V, ... are the derived dimensions;
+ * problems() lists what makes the case unbuildable (unknown settings,
+   non-numeric or non-positive dimensions, then the bolt layout checks
+   of fep.feasibility), validate() raises on them;
+ * key is a SHA-1 of the independent parameters and the settings, the
+   same for two specs that build the same model (parameters of
+   fep.params DESIGN_ONLY do not enter it);
+ * build(name) imports the CAE modules into the study script and runs
+   its Build_Model (inside a CAE process only).
+
+     PYTHONPATH=src python -m fep.spec sweep.json --model Column_Trial_5 --set myHalfModel=true
+=======================================================================
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import sys
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from fep import feasibility
+from fep.params import DEFAULTS, DESIGN_ONLY, derive, independent
+
+
+SPEC_VERSION = 1
+STUDY_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            'P1_FEP_ParametricStudy.py')
+
+# Settings of the study script that change the model, with their defaults.
+SETTINGS = OrderedDict([
+    ('myOutputProfile', 'standard'),
+    ('myOutputFrames', 20),
+    ('myRestartIntervals', 10),
+    ('myFireMaterials', False),
+    ('myFireThermalOdb', None),
+    ('myFireDuration', 3600.0),
+    ('myProtocol', None),
+    ('myMaxRotation', 0.04),
+    ('myYieldRotation', None),
+    ('myHalfModel', False),
+    ('myContact', 'general'),
+    ('myBoltModel', 'solid'),
+    ('myDetailLength', None),
+])
+_CHOICES = {'myOutputProfile': ('screening', 'standard', 'full'),
+            'myProtocol': (None, 'aisc341', 'eccs'),
+            'myContact': ('general', 'pairs'),
+            'myBoltModel': ('solid', 'connector')}
+# Parameters that may be zero or negative: a downward displacement, the
+# column load, the shift of the bolt rows and the plastic strain at yield.
+SIGNED = ('myBeamDisplacement', 'myColumn_Load', 'Z_vary', 'mySry')
+
+
+class ModelSpec(object):
+    """One case: parameters (independent and derived) and model settings."""
+
+    def __init__(self, case=None, **settings):
+        unknown = [name for name in settings if name not in SETTINGS]
+        if unknown:
+            raise KeyError('Unknown model setting: %s' % ', '.join(unknown))
+        self.params = derive(case)
+        self.settings = OrderedDict((name, settings.get(name, value)) for name, value in SETTINGS.items())
+        self._key = None
+
+    def __getattr__(self, name):
+        params = self.__dict__.get('params', {})
+        if name in params:
+            return params[name]
+        raise AttributeError(name)
+
+    def __repr__(self):
+        return 'ModelSpec(%s)' % self.key[:12]
+
+    @property
+    def case(self):
+        """The independent parameters, as in a sweep manifest."""
+        return independent(self.params)
+
+    def namespace(self):
+        """Every parameter as an attribute, the `p` of the study script's builders."""
+        return SimpleNamespace(**self.params)
+
+    @property
+    def key(self):
+        if self._key is None:
+            text = json.dumps([SPEC_VERSION, [(name, float(self.params[name])) for name in DEFAULTS
+                                              if name not in DESIGN_ONLY],
+                               list(self.settings.items())])
+            self._key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        return self._key
+
+    def problems(self):
+        """Reasons the model cannot be built, empty when it can."""
+        out = []
+        for name, value in self.params.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                out.append('%s = %r is not a finite number' % (name, value))
+            elif value <= 0 and name not in SIGNED:
+                out.append('%s = %r must be positive' % (name, value))
+        for name in ('myEPEdge_num', 'myColumnEdge_num'):
+            if self.params[name] != int(self.params[name]):
+                out.append('%s = %r must be a whole number of elements' % (name, self.params[name]))
+        s = self.settings
+        for name, choices in _CHOICES.items():
+            if s[name] not in choices:
+                out.append('%s = %r, expected one of %s' % (name, s[name], ', '.join(map(repr, choices))))
+        if s['myOutputFrames'] < 1 or s['myRestartIntervals'] < 0:
+            out.append('myOutputFrames must be at least 1 and myRestartIntervals not negative')
+        for name in ('myMaxRotation', 'myYieldRotation', 'myDetailLength', 'myFireDuration'):
+            if s[name] is not None and s[name] <= 0:
+                out.append('%s = %r must be positive' % (name, s[name]))
+        if not out:
+            out += feasibility.check(self.params)
+        return out
+
+    def validate(self):
+        """Raise ValueError listing the problems; returns the spec."""
+        problems = self.problems()
+        if problems:
+            raise ValueError('Case cannot be built: ' + '; '.join(problems))
+        return self
+
+    def build(self, name):
+        """Build the model `name` with the study script's Build_Model (CAE only); returns the mdb model."""
+        study = study_module()
+        study.Import_CAE()
+        for setting, value in self.settings.items():
+            setattr(study, setting, value)
+        study.Build_Model(name, self.namespace())
+        return study.mdb.models[name]
+
+
+def study_module():
+    """P1_FEP_ParametricStudy.py as a module: __main__ when it is the script running, else imported once."""
+    main = sys.modules.get('__main__')
+    if os.path.abspath(getattr(main, '__file__', '') or '') == STUDY_SCRIPT:
+        return main
+    if 'P1_FEP_ParametricStudy' not in sys.modules:
+        loader = importlib.util.spec_from_file_location('P1_FEP_ParametricStudy', STUDY_SCRIPT)
+        module = importlib.util.module_from_spec(loader)
+        sys.modules['P1_FEP_ParametricStudy'] = module
+        loader.loader.exec_module(module)
+    return sys.modules['P1_FEP_ParametricStudy']
+
+
+def plan(cases, base, **settings):
+    """[(job, spec, job of the same model earlier in the sweep or None), ...] of a list of overrides."""
+    from fep import doe
+
+    out, first = [], {}
+    for name, case in zip(doe.case_names(base, len(cases)), cases):
+        spec = ModelSpec(case, **settings)
+        out.append((name, spec, first.get(spec.key)))
+        first.setdefault(spec.key, name)
+    return out
+
+
+def _setting(text):
+    name, _, value = text.partition('=')
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def main(argv=None):
+    from fep import doe
+
+    parser = argparse.ArgumentParser(description='Derive, check and hash the cases of a sweep without CAE.')
+    parser.add_argument('sweep', help='sweep spec (fep.doe)')
+    parser.add_argument('--model', default='Column_Trial_5', help='base model name')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='model setting of the study script (JSON value), e.g. myContact=\\"pairs\\"')
+    args = parser.parse_args(argv)
+    start = time.time()
+    cases = doe.generate(doe.load_spec(args.sweep))
+    rows = plan(cases, args.model, **dict(_setting(text) for text in args.set))
+    invalid = 0
+    for name, spec, same in rows:
+        problems = spec.problems()
+        invalid += bool(problems)
+        status = 'invalid: ' + '; '.join(problems) if problems else ('same as ' + same if same else 'build')
+        sys.stdout.write('%-24s %s  %s\n' % (name, spec.key[:12], status))
+    sys.stderr.write('%d cases, %d distinct models, %d invalid in %.1f ms\n'
+                     % (len(rows), len(set(spec.key for _, spec, _ in rows)), invalid, 1000.0*(time.time() - start)))
+    return 1 if invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
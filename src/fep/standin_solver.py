@@ -0,0 +1,67 @@
+"""
+=======================================================================
+ fep.standin_solver – license-free stand-in for `abaqus job=...`
+=======================================================================
+ Accepts the same job=/input=/cpus=/oldjob= arguments as the Abaqus
+ driver, holds <job>.lck while it "solves", writes a status file in
+ the Abaqus/Standard .sta layout (a failing job ends on a cut-back
+ attempt, "1U"), leaves <job>.res when the deck requests restart
+ points and exits like the real solver.
+
+ Environment:
+     FEP_STANDIN_SECONDS   run time per job (default 1.0)
+     FEP_STANDIN_FAIL      comma separated job names that exit with 1
+=======================================================================
+"""
+
+import os
+import sys
+import time
+
+
+STA_HEADER = (' SUMMARY OF JOB INFORMATION:\n'
+              ' STEP  INC ATT SEVERE EQUIL TOTAL  TOTAL      STEP       INC OF       DOF    IF\n'
+              '               DISCON ITERS ITERS  TIME/      TIME/LPF    TIME/LPF    MONITOR RIKS\n'
+              '               ITERS               FREQ\n')
+
+
+def main(argv):
+    args = dict(arg.split('=', 1) for arg in argv if '=' in arg)
+    job = args['job']
+    if not os.path.exists(args.get('input', job + '.inp')):
+        sys.stderr.write('***ERROR: input file %s not found\n' % args.get('input'))
+        return 1
+    if 'oldjob' in args and not os.path.exists(args['oldjob'] + '.sta'):
+        sys.stderr.write('***ERROR: restart files of job %s not found\n' % args['oldjob'])
+        return 1
+    seconds = float(os.environ.get('FEP_STANDIN_SECONDS', '1.0'))
+    fail = job in os.environ.get('FEP_STANDIN_FAIL', '').split(',')
+    with open(args.get('input', job + '.inp')) as f:
+        restart = 'number interval' in f.read().lower()
+
+    open(job + '.lck', 'w').close()
+    increments = 10
+    with open(job + '.sta', 'w') as sta:
+        sta.write(' Abaqus/Standard stand-in            DATE %s\n' % time.strftime('%d-%b-%Y TIME %H:%M:%S'))
+        sta.write(STA_HEADER)
+        for inc in range(1, increments + 1):
+            time.sleep(seconds/increments)
+            t = inc/float(increments)
+            sta.write('%5d %5d %3d %5d %5d %5d %11.4g %11.4g %11.4g\n' % (1, inc, 1, 0, 2, 2, t, t, 0.1))
+            sta.flush()
+            if fail and inc == increments//2:
+                sta.write('%5d %5d %3s %5d %5d %5d %11.4g %11.4g %11.4g\n' % (1, inc + 1, '1U', 0, 12, 12, t, t, 0.1))
+                sta.write(' THE ANALYSIS HAS NOT BEEN COMPLETED\n')
+                break
+        else:
+            sta.write(' THE ANALYSIS HAS COMPLETED SUCCESSFULLY\n')
+    with open(job + '.msg', 'w') as msg:
+        msg.write(' STAND-IN SOLVER, %s CPUS\n' % args.get('cpus', '1'))
+    if restart:
+        open(job + '.res', 'w').close()
+    os.remove(job + '.lck')
+    return 1 if fail else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
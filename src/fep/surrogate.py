@@ -0,0 +1,266 @@
+"""
+=======================================================================
+ fep.surrogate – Gaussian-process surrogate and active learning
+=======================================================================
+ Fits one Gaussian process per joint response (peak moment, initial
+ stiffness Sj,ini) to the finished cases of one or more sweeps, over
+ the factors of a sweep spec (fep.doe).  The spec is the design-chart
+ domain: its cases are the candidate pool, and the next batch is the
+ `batch` candidates that remove the most predictive uncertainty.
+
+ Batch selection is greedy: the candidate with the largest summed
+ standard deviation (each response in units of its own prior s.d.) is
+ taken, the models are conditioned on it (the GP variance does not
+ depend on the unknown result), and so on.  The batch therefore
+ spreads out instead of clustering around the one most uncertain
+ spot, and it can run in parallel.
+
+     PYTHONPATH=src python -m fep.surrogate chart.json --manifest models/Column_Trial_5_sweep.json \\
+         --batch 8 --next models/next_batch.json --chart results/design_chart.csv
+
+ writes next_batch.json as a "cases" sweep spec for the deck writer or
+ the CAE script (give each batch its own --model name), and the mean
+ and s.d. of every response over the whole pool to design_chart.csv.
+ The leave-one-out error printed with every fit says when the chart
+ is good enough to stop.
+
+ Factors must reach the FE model: the parameters of fep.params
+ DESIGN_ONLY (myFy, myFu, ...) are rejected, since the FE materials
+ are the fixed tables of fep.materials and varying them would only
+ repeat the same model.
+
+ Squared-exponential kernel with one length scale per factor (factors
+ scaled to [0, 1] over the spec ranges) and a nugget; the signal
+ variance is profiled out of the marginal likelihood, the length
+ scales and nugget are found by a Sobol search plus pattern search.
+=======================================================================
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from fep import doe
+from fep import response
+from fep.params import DESIGN_ONLY, derive
+
+
+RESPONSES = ('peak_moment', 'stiffness')
+LENGTH_RANGE = (0.05, 5.0)     # length scales, in units of the factor range
+NUGGET_RANGE = (1e-8, 1e-1)    # relative to the signal variance
+
+
+# --------------------------------------------------------------------------
+# Training data
+# --------------------------------------------------------------------------
+def factor_bounds(spec):
+    """(names, lo, hi) of the numeric factors of a sweep spec."""
+    names, lo, hi = [], [], []
+    for name, factor in spec['factors'].items():
+        if name in DESIGN_ONLY:
+            raise ValueError('%s does not reach the FE model (fep.params DESIGN_ONLY), it cannot be a factor' % name)
+        values = [factor['low'], factor['high']] if isinstance(factor, dict) else list(factor)
+        names.append(name)
+        lo.append(min(values))
+        hi.append(max(values))
+    return names, np.array(lo, dtype=float), np.array(hi, dtype=float)
+
+
+def case_responses(curve_path, params):
+    """{response: value} of one finished case from its extracted curve."""
+    curve = response.read_curve(curve_path)
+    rotation, moment = response.moment_rotation(curve, params)
+    return {'peak_moment': response.peak(curve, params)['peak_moment'],
+            'stiffness': response.initial_stiffness(rotation, moment)}
+
+
+def training_data(manifests, results='results', statuses=('completed',)):
+    """[(params, responses)] of every case of the manifests that finished and was extracted."""
+    summary_path = os.path.join(results, 'summary_results.csv')
+    status = {}
+    if os.path.exists(summary_path):
+        with open(summary_path) as f:
+            status = dict((row['job'], row['status']) for row in csv.DictReader(f))
+    data = []
+    for manifest in manifests:
+        for case in doe.load_manifest(manifest)['cases']:
+            curve_path = os.path.join(results, 'curves', case['job'] + '_curve.csv')
+            if status.get(case['job']) not in statuses or not os.path.exists(curve_path):
+                continue
+            values = case_responses(curve_path, derive(case['params']))
+            if all(np.isfinite(values[name]) for name in RESPONSES):
+                data.append((case['params'], values))
+    return data
+
+
+# --------------------------------------------------------------------------
+# Gaussian process
+# --------------------------------------------------------------------------
+def _sqdist(a, b, lengths):
+    a, b = a/lengths, b/lengths
+    d = (a*a).sum(axis=1)[:, None] + (b*b).sum(axis=1)[None, :] - 2.0*a.dot(b.T)
+    return np.maximum(d, 0.0)
+
+
+class GaussianProcess(object):
+    """GP regression of one response over factors bounded by lo..hi."""
+
+    def __init__(self, lo, hi):
+        self.lo = np.asarray(lo, dtype=float)
+        self.span = np.where(np.asarray(hi) > self.lo, np.asarray(hi) - self.lo, 1.0)
+
+    def unit(self, X):
+        return (np.atleast_2d(np.asarray(X, dtype=float)) - self.lo)/self.span
+
+    def _factor(self, theta, U=None):
+        """Cholesky factor of the correlation matrix of U (default: the training points)."""
+        U = self.U if U is None else U
+        lengths, nugget = np.exp(theta[:-1]), np.exp(theta[-1])
+        R = np.exp(-0.5*_sqdist(U, U, lengths)) + nugget*np.eye(len(U))
+        return np.linalg.cholesky(R)
+
+    def log_likelihood(self, theta):
+        """Marginal log likelihood with the signal variance profiled out."""
+        try:
+            L = self._factor(theta)
+        except np.linalg.LinAlgError:
+            return -np.inf
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, self.y))
+        n = len(self.y)
+        return -0.5*n*np.log(max(self.y.dot(alpha)/n, 1e-300)) - np.log(np.diag(L)).sum()
+
+    def fit(self, X, y, starts=64):
+        self.U = self.unit(X)
+        y = np.asarray(y, dtype=float)
+        self.y_mean, self.y_scale = y.mean(), (y.std() or 1.0)
+        self.y = (y - self.y_mean)/self.y_scale
+
+        d = self.U.shape[1]
+        lo = np.log(np.r_[[LENGTH_RANGE[0]]*d, NUGGET_RANGE[0]])
+        hi = np.log(np.r_[[LENGTH_RANGE[1]]*d, NUGGET_RANGE[1]])
+        trials = lo + doe.sobol(starts, d + 1, skip=1)*(hi - lo)
+        scores = [self.log_likelihood(t) for t in trials]
+        theta, best = trials[int(np.argmax(scores))], max(scores)
+        step = (hi - lo)/8.0
+        while step.max() > 1e-2:
+            improved = False
+            for i in range(d + 1):
+                for sign in (1, -1):
+                    trial = theta.copy()
+                    trial[i] = np.clip(trial[i] + sign*step[i], lo[i], hi[i])
+                    score = self.log_likelihood(trial)
+                    if score > best:
+                        theta, best, improved = trial, score, True
+            if not improved:
+                step = step/2.0
+
+        self.theta = theta
+        self.L = self._factor(theta)
+        self.alpha = np.linalg.solve(self.L.T, np.linalg.solve(self.L, self.y))
+        self.sigma2 = self.y.dot(self.alpha)/len(self.y)
+        return self
+
+    @property
+    def lengths(self):
+        """Length scale per factor, in units of its range: short = influential."""
+        return np.exp(self.theta[:-1])
+
+    def _correlation(self, U, V):
+        return np.exp(-0.5*_sqdist(U, V, self.lengths))
+
+    def predict(self, X):
+        """(mean, s.d.) of the response at X, in the response units."""
+        k = self._correlation(self.unit(X), self.U)
+        mean = k.dot(self.alpha)
+        v = np.linalg.solve(self.L, k.T)
+        var = self.sigma2*np.maximum(1.0 - (v*v).sum(axis=0), 0.0)
+        return mean*self.y_scale + self.y_mean, np.sqrt(var)*self.y_scale
+
+    def relative_variance(self, X, extra=None):
+        """Predictive variance over the prior variance at X, given the training points plus `extra`."""
+        U = self.U if extra is None or not len(extra) else np.vstack([self.U, self.unit(extra)])
+        L = self.L if U is self.U else self._factor(self.theta, U)
+        v = np.linalg.solve(L, self._correlation(self.unit(X), U).T)
+        return np.maximum(1.0 - (v*v).sum(axis=0), 0.0)
+
+    def loo_errors(self):
+        """Leave-one-out prediction errors at the training points (closed form)."""
+        inverse = np.linalg.solve(self.L.T, np.linalg.solve(self.L, np.eye(len(self.y))))
+        return self.alpha/np.diag(inverse)*self.y_scale
+
+
+def fit(data, names, lo, hi):
+    """{response: GaussianProcess} over the factors `names`."""
+    X = np.array([[params[name] for name in names] for params, _ in data], dtype=float)
+    return OrderedDict((r, GaussianProcess(lo, hi).fit(X, [values[r] for _, values in data]))
+                       for r in RESPONSES)
+
+
+def propose(models, candidates, batch, tol=1e-6):
+    """Indices of the next `batch` candidates, greedy on the summed predictive s.d."""
+    candidates = np.asarray(candidates, dtype=float)
+    chosen = []
+    for _ in range(min(batch, len(candidates))):
+        extra = candidates[chosen]
+        score = sum(np.sqrt(model.relative_variance(candidates, extra)) for model in models.values())
+        score[chosen] = -np.inf
+        best = int(np.argmax(score))
+        if score[best] <= tol:
+            break       # every remaining candidate is already known
+        chosen.append(best)
+    return chosen
+
+
+# --------------------------------------------------------------------------
+# Command line
+# --------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit the joint-response surrogate and propose the next cases.')
+    parser.add_argument('spec', help='sweep spec whose factors and cases are the design-chart domain')
+    parser.add_argument('--manifest', action='append', required=True, help='sweep manifest(s) already run')
+    parser.add_argument('--results', default='results', help='summary_results.csv and curves/ of the runs')
+    parser.add_argument('--batch', type=int, default=8, help='cases to propose')
+    parser.add_argument('--next', default=None, help='write the proposed cases here as a "cases" sweep spec')
+    parser.add_argument('--chart', default=None, help='write the predictions over the pool here (CSV)')
+    args = parser.parse_args(argv)
+
+    spec = doe.load_spec(args.spec)
+    names, lo, hi = factor_bounds(spec)
+    pool = doe.generate(spec)
+    data = training_data(args.manifest, args.results)
+    if len(data) < len(names) + 2:
+        sys.stdout.write('%d finished cases, need at least %d to fit %d factors\n'
+                         % (len(data), len(names) + 2, len(names)))
+        return 1
+    models = fit(data, names, lo, hi)
+    for name, model in models.items():
+        errors = model.loo_errors()
+        mean = np.abs([values[name] for _, values in data]).mean()
+        sys.stdout.write('%-12s LOO error %.1f %% (rms), length scales %s\n'
+                         % (name, 100*np.sqrt((errors**2).mean())/mean,
+                            ', '.join('%s %.2f' % kv for kv in zip(names, model.lengths))))
+
+    X = np.array([[case[name] for name in names] for case in pool], dtype=float)
+    chosen = propose(models, X, args.batch)
+    sys.stdout.write('%d finished cases, %d of %d candidates proposed\n' % (len(data), len(chosen), len(pool)))
+    if args.next:
+        with open(args.next, 'w') as f:
+            json.dump({'method': 'cases', 'cases': [pool[i] for i in chosen]}, f, indent=2)
+    if args.chart:
+        columns = OrderedDict((name, X[:, i]) for i, name in enumerate(names))
+        for name, model in models.items():
+            columns[name], columns[name + '_sd'] = model.predict(X)
+        with open(args.chart, 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow(list(columns))
+            writer.writerows(zip(*columns.values()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+=======================================================================
+ fep.telemetry – solver run telemetry from the .sta, .msg and .dat files
+=======================================================================
+ Tails the status and message files of every job of a sweep manifest
+ while the solver writes them (or reads them once after the runs):
+
+ * every attempt row of <job>.sta (step, increment, attempt, cutback
+   "U", severe discontinuity and equilibrium iterations, total, step
+   and increment time) goes to results/telemetry/<job>_telemetry.csv,
+   stamped with the wall time since the job started (the DATE / TIME
+   of the .sta header) when the row was seen being written (blank for rows written before the
+   monitor started);
+ * <job>.msg adds the contact status changes and the reasons given for
+   the cutbacks, <job>.dat / .msg the memory estimate and the wall clock
+   and CPU times of the job time summary;
+ * one row per case, with the parameters that vary over the sweep, goes
+   to results/telemetry_summary.csv, rewritten as the jobs progress.
+
+ At the end the parameter ranges, and pairs of ranges, with the most
+ cutbacks and the longest wall times relative to the study are listed
+ (hotspots()), e.g. a thin myEndPlate_T together with a large New_Z:
+
+     PYTHONPATH=src python -m fep.telemetry models/Column_Trial_5_sweep.json --workdir results --follow
+=======================================================================
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from fep import doe
+from fep.odb_extract import varying_params
+from fep.scheduler import PENDING, RUNNING, STATUS_FILE
+
+
+SERIES_FIELDS = ('wall', 'step', 'increment', 'attempt', 'cutback', 'severe_iters', 'equil_iters',
+                 'total_iters', 'total_time', 'step_time', 'inc_time')
+SUMMARY_FIELDS = ('job', 'status', 'increments', 'attempts', 'cutbacks', 'longest_cutback_run', 'severe_iters',
+                  'equil_iters', 'contact_changes', 'min_inc', 'total_time', 'wall_time', 'cpu_time',
+                  'wall_per_increment', 'memory_min_mb', 'memory_io_mb', 'cutback_reasons')
+SUMMARY_FILE = 'telemetry_summary.csv'
+
+# Abaqus/Standard message text of a cutback, by the reason reported.
+CUTBACK_REASONS = (('diverging', 'APPEARS TO BE DIVERGING'),
+                   ('iterations', 'CONVERGENCE IS JUDGED UNLIKELY'),
+                   ('iterations', 'TOO MANY ITERATIONS'),
+                   ('severe discontinuities', 'TOO MANY SEVERE DISCONTINUITY ITERATIONS'),
+                   ('distortion', 'EXCESSIVELY DISTORTED'),
+                   ('distortion', 'DISTORTED EXCESSIVELY'),
+                   ('overclosure', 'OVERCLOSURE'))
+
+_CONTACT_CHANGE = re.compile(r'(\d+)\s+POINTS? CHANGED FROM', re.I)
+_MEMORY = re.compile(r'^\s*\d+\s+\S+\s+(\d+(?:\.\d*)?)\s+(\d+(?:\.\d*)?)\s*$')
+_STARTED = re.compile(r'DATE\s+(\d+-\w+-\d+)\s+TIME\s+(\d+:\d+:\d+)')
+_TIME = re.compile(r'(WALLCLOCK|TOTAL CPU) TIME \(SEC\)\s*=\s*([\d.E+-]+)', re.I)
+
+
+# --------------------------------------------------------------------------
+# Reading the job files
+# --------------------------------------------------------------------------
+def sta_row(line):
+    """{field: value} of one attempt row of a .sta file (wall left blank), or None."""
+    parts = line.split()
+    if len(parts) < 9 or not (parts[0].isdigit() and parts[1].isdigit()):
+        return None
+    try:
+        return {'wall': '', 'step': int(parts[0]), 'increment': int(parts[1]),
+                'attempt': int(parts[2].rstrip('U')), 'cutback': int(parts[2].endswith('U')),
+                'severe_iters': int(parts[3]), 'equil_iters': int(parts[4]), 'total_iters': int(parts[5]),
+                'total_time': float(parts[6]), 'step_time': float(parts[7]), 'inc_time': float(parts[8])}
+    except ValueError:
+        return None
+
+
+def memory_estimate(path):
+    """(minimum memory, memory to minimize I/O) in MB of the .dat memory estimate, or (None, None)."""
+    if not os.path.exists(path):
+        return None, None
+    with open(path) as f:
+        lines = iter(f)
+        for line in lines:
+            if 'M E M O R Y   E S T I M A T E' in line:
+                for row in itertools.islice(lines, 12):
+                    match = _MEMORY.match(row)
+                    if match:
+                        return float(match.group(1)), float(match.group(2))
+    return None, None
+
+
+def job_times(*paths):
+    """{'wall_time': s, 'cpu_time': s} of the job time summary in the first file that has one."""
+    for path in paths:
+        if os.path.exists(path):
+            with open(path) as f:
+                found = _TIME.findall(f.read())
+            if found:
+                names = {'WALLCLOCK': 'wall_time', 'TOTAL CPU': 'cpu_time'}
+                return dict((names[name.upper()], float(value)) for name, value in found)
+    return {}
+
+
+class JobTail(object):
+    """The .sta and .msg files of one job, read on from where the last poll() stopped."""
+
+    def __init__(self, workdir, job, since=None):
+        self.job = job
+        self.since = time.time() if since is None else since
+        self.base = os.path.join(workdir, job)
+        self.offsets = {'.sta': 0, '.msg': 0}
+        self.rows = []
+        self.contact_changes = 0
+        self.reasons = {}
+        self.status = 'pending'
+        self.started = None
+
+    def _new_lines(self, ext):
+        """Complete lines written to <job><ext> since the last call."""
+        path = self.base + ext
+        if not os.path.exists(path):
+            return []
+        if os.path.getsize(path) < self.offsets[ext]:
+            self.offsets[ext] = 0       # rewritten by a new attempt of the job
+            if ext == '.sta':
+                self.rows, self.status = [], 'pending'
+        with open(path, 'rb') as f:
+            f.seek(self.offsets[ext])
+            text = f.read()
+        end = text.rfind(b'\n') + 1
+        self.offsets[ext] += end
+        return text[:end].decode('latin-1').splitlines()
+
+    def poll(self, now=None):
+        """Read what the solver wrote since the last poll; returns the new .sta rows."""
+        now = time.time() if now is None else now
+        stamp = self.offsets['.sta'] > 0
+        new = []
+        for line in self._new_lines('.sta'):
+            row = sta_row(line)
+            if row is not None:
+                if self.started is None:
+                    self.started = now
+                if stamp or self.started >= self.since:
+                    row['wall'] = round(now - self.started, 1)
+                new.append(row)
+            elif self.started is None and _STARTED.search(line):
+                date = _STARTED.search(line)
+                self.started = time.mktime(time.strptime(' '.join(date.groups()), '%d-%b-%Y %H:%M:%S'))
+            elif 'COMPLETED SUCCESSFULLY' in line:
+                self.status = 'completed'
+            elif 'NOT BEEN COMPLETED' in line:
+                self.status = 'aborted'
+        if new and self.status == 'pending':
+            self.status = 'running'
+        for line in self._new_lines('.msg'):
+            change = _CONTACT_CHANGE.search(line)
+            if change:
+                self.contact_changes += int(change.group(1))
+            for reason, marker in CUTBACK_REASONS:
+                if marker in line:
+                    self.reasons[reason] = self.reasons.get(reason, 0) + 1
+                    break
+        self.rows += new
+        return new
+
+    @property
+    def finished(self):
+        return self.status in ('completed', 'aborted')
+
+    def summary(self):
+        """Telemetry summary row of the job."""
+        row = dict((name, '') for name in SUMMARY_FIELDS)
+        row.update(job=self.job, status=self.status)
+        if self.rows:
+            cutback = np.array([r['cutback'] for r in self.rows], dtype=bool)
+            converged = [r for r in self.rows if not r['cutback']]
+            runs = np.diff(np.flatnonzero(np.diff(np.concatenate(([0], cutback.astype(int), [0])))))[::2]
+            row.update(increments=len(converged), attempts=len(self.rows), cutbacks=int(cutback.sum()),
+                       longest_cutback_run=int(runs.max()) if len(runs) else 0,
+                       severe_iters=sum(r['severe_iters'] for r in self.rows),
+                       equil_iters=sum(r['equil_iters'] for r in self.rows),
+                       total_time=converged[-1]['total_time'] if converged else 0.0,
+                       min_inc=min(r['inc_time'] for r in converged) if converged else '')
+            stamped = [r['wall'] for r in self.rows if r['wall'] != '']
+            if stamped:
+                row['wall_time'] = stamped[-1]
+        row['contact_changes'] = self.contact_changes
+        row['cutback_reasons'] = ';'.join('%s=%d' % item for item in sorted(self.reasons.items()))
+        row.update(job_times(self.base + '.msg', self.base + '.dat'))
+        row['memory_min_mb'], row['memory_io_mb'] = [value if value is not None else ''
+                                                     for value in memory_estimate(self.base + '.dat')]
+        if row['wall_time'] != '' and row['increments']:
+            row['wall_per_increment'] = round(row['wall_time']/row['increments'], 2)
+        return row
+
+
+# --------------------------------------------------------------------------
+# Study
+# --------------------------------------------------------------------------
+def hotspots(rows, params, metric='cutbacks', top=5, min_cases=2):
+    """Parameter ranges, single and in pairs, where `metric` is highest relative to the study.
+
+    Each numeric parameter is split at its median into 'low' (at or below)
+    and 'high'; a range, or a pair of ranges of two parameters, scores
+    the mean metric of its cases over the mean of all cases.  Returns the
+    ranges above the mean as [(score, cases, ((name, 'low' | 'high'),
+    ...))], best first.
+    """
+    rows = [row for row in rows if row.get(metric) not in (None, '')]
+    values = np.array([float(row[metric]) for row in rows])
+    if len(values) < 2*min_cases or values.mean() <= 0:
+        return []
+    ranges = []
+    for name in params:
+        try:
+            x = np.array([float(row[name]) for row in rows])
+        except (TypeError, ValueError):
+            continue        # a category, e.g. the protocol name
+        high = x > np.median(x)
+        if high.any() and not high.all():
+            ranges += [((name, 'low'), ~high), ((name, 'high'), high)]
+    found = []
+    for size in (1, 2):
+        for combo in itertools.combinations(ranges, size):
+            if len(set(name for (name, _), _ in combo)) < size:
+                continue
+            mask = np.logical_and.reduce([cases for _, cases in combo])
+            if mask.sum() >= min_cases and values[mask].mean() > values.mean():
+                found.append((float(values[mask].mean()/values.mean()), int(mask.sum()),
+                              tuple(label for label, _ in combo)))
+    found.sort(key=lambda item: (-item[0], len(item[2])))
+    return found[:top]
+
+
+def _write_csv(path, fields, rows):
+    with open(path + '.tmp', 'w') as f:
+        writer = csv.DictWriter(f, fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(path + '.tmp', path)
+
+
+def _scheduler_busy(workdir, jobs):
+    """True while fep.scheduler has one of the jobs pending or running (a failed attempt may be retried)."""
+    path = os.path.join(workdir, STATUS_FILE)
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        status = dict((entry['job'], entry['status']) for entry in json.load(f))
+    return any(status.get(job) in (PENDING, RUNNING) for job in jobs)
+
+
+def monitor(manifest_path, workdir='results', out_dir='results', follow=False, poll=5.0, log=None):
+    """Telemetry of every case of a sweep manifest; returns the summary rows.
+
+    Reads the job files once, or with `follow` until every job has
+    finished and fep.scheduler has none left to run, appending the new
+    .sta rows of each poll to the case's series and rewriting the
+    summary.  A job run again starts its series afresh.
+    """
+    log = log or (lambda message: sys.stdout.write(message + '\n'))
+    cases = [case for case in doe.load_manifest(manifest_path)['cases'] if not case.get('same_as')]
+    params = varying_params(cases)
+    series_dir = os.path.join(out_dir, 'telemetry')
+    if not os.path.isdir(series_dir):
+        os.makedirs(series_dir)
+    since = float(int(time.time())) if follow else float('inf')     # the .sta header has whole seconds
+    tails = [JobTail(workdir, case['job'], since) for case in cases]
+    paths = dict((tail.job, os.path.join(series_dir, tail.job + '_telemetry.csv')) for tail in tails)
+    written = dict((tail.job, 0) for tail in tails)
+    reported = set()
+    for path in paths.values():
+        _write_csv(path, SERIES_FIELDS, [])
+    while True:
+        for tail in tails:
+            new = tail.poll()
+            if len(tail.rows) < written[tail.job] + len(new):
+                _write_csv(paths[tail.job], SERIES_FIELDS, tail.rows)
+                reported.discard(tail.job)
+            elif new:
+                with open(paths[tail.job], 'a') as f:
+                    csv.DictWriter(f, SERIES_FIELDS).writerows(new)
+            written[tail.job] = len(tail.rows)
+        rows = [dict(tail.summary(), **dict((name, case['params'][name]) for name in params))
+                for tail, case in zip(tails, cases)]
+        _write_csv(os.path.join(out_dir, SUMMARY_FILE), list(SUMMARY_FIELDS) + params, rows)
+        for tail, row in zip(tails, rows):
+            if tail.finished and tail.job not in reported:
+                reported.add(tail.job)
+                log('%-24s %-9s %4s increments %4s cutbacks' % (row['job'], row['status'], row['increments'],
+                                                               row['cutbacks']))
+        if not follow or (all(tail.finished for tail in tails) and not _scheduler_busy(workdir, written)):
+            return rows
+        time.sleep(poll)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Increment, cutback, iteration, time and memory telemetry '
+                                                 'of the solver jobs of a sweep.')
+    parser.add_argument('manifest', help='models/<model>_sweep.json')
+    parser.add_argument('--workdir', default='results', help='where the solver writes <job>.sta / .msg / .dat')
+    parser.add_argument('--out', default='results', help='telemetry_summary.csv and telemetry/ go here')
+    parser.add_argument('--follow', action='store_true', help='keep tailing until every job has finished')
+    parser.add_argument('--poll', type=float, default=5.0)
+    parser.add_argument('--top', type=int, default=5, help='hotspots listed per metric')
+    args = parser.parse_args(argv)
+
+    cases = doe.load_manifest(args.manifest)['cases']
+    rows = monitor(args.manifest, args.workdir, args.out, args.follow, args.poll)
+    params = varying_params(cases)
+    for metric in ('cutbacks', 'wall_time'):
+        spots = hotspots(rows, params, metric, args.top)
+        if spots:
+            sys.stdout.write('%s, relative to the study mean:\n' % metric)
+        for score, count, ranges in spots:
+            sys.stdout.write('  %5.2fx  %3d cases  %s\n' % (score, count,
+                                                           ' & '.join('%s %s' % (level, name) for name, level in ranges)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())